@@ -0,0 +1 @@
+"""Suite de benchmarks reproducibles (corpus sintético + mediciones por etapa)."""
@@ -0,0 +1,193 @@
+"""
+Generador determinista del corpus de benchmarks.
+
+Con la misma semilla y el mismo perfil produce siempre los mismos archivos
+(mismo contenido, mismos nombres), de modo que los resultados se pueden
+comparar entre commits. ``manifest.json`` registra el SHA-256 de cada archivo
+para detectar un corpus distinto.
+
+Perfiles:
+    small: pocos archivos y páginas, para CI y tests (segundos)
+    full:  JPEG/PNG hasta A4 a 300 dpi, TIFF multipágina y PDFs de 1 a 500 páginas
+
+Uso:
+    python -m benchmarks.corpus --out bench_corpus --profile full
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+DEFAULT_SEED = 1234
+CORPUS_VERSION = 1  # incrementar si cambia la forma de generar archivos
+
+
+@dataclass
+class Profile:
+    """Qué se genera en cada perfil."""
+    image_sizes: list[tuple[int, int]]        # resoluciones en px (JPEG y PNG)
+    tiff_pages: list[int]                     # páginas de cada TIFF G4
+    pdf_pages: list[int]                      # páginas de cada PDF
+    cases: dict[str, list[str]] = field(default_factory=dict)  # caso -> prefijos de archivo
+
+
+PROFILES = {
+    "small": Profile(
+        image_sizes=[(320, 240), (827, 1169)],
+        tiff_pages=[3],
+        pdf_pages=[1, 10, 50],
+        cases={"mixto": ["img_", "tiff_", "pdf_0001", "pdf_0010"]},
+    ),
+    "full": Profile(
+        image_sizes=[(640, 480), (1654, 2339), (2480, 3508)],
+        tiff_pages=[5, 50],
+        pdf_pages=[1, 10, 100, 500],
+        cases={
+            "imagenes": ["img_"],
+            "escaneos": ["tiff_", "pdf_0100"],
+            "mixto": ["img_", "tiff_0005", "pdf_0001", "pdf_0010", "pdf_0100"],
+        },
+    ),
+}
+
+
+@dataclass
+class CorpusFile:
+    path: str      # relativa a la raíz del corpus
+    kind: str      # jpeg, png, tiff o pdf
+    pages: int
+    bytes: int
+    sha256: str
+
+
+def _draw_page(size: tuple[int, int], rng: random.Random, mode: str):
+    """Página sintética: fondo claro, bloques de "texto" y un recuadro, como un escaneo."""
+    from PIL import Image, ImageDraw
+
+    w, h = size
+    im = Image.new(mode, size, "white" if mode == "RGB" else 255 if mode == "L" else 1)
+    draw = ImageDraw.Draw(im)
+    ink = (20, 20, 60) if mode == "RGB" else 0
+    line_h = max(8, h // 60)
+    for y in range(line_h * 3, h - line_h * 3, line_h * 2):
+        x = w // 12
+        while x < w - w // 12:
+            word = rng.randint(w // 40, w // 10)
+            draw.rectangle((x, y, min(x + word, w - w // 12), y + line_h), fill=ink)
+            x += word + rng.randint(w // 80, w // 40)
+    if mode == "RGB":
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        draw.ellipse((w // 2, h // 8, w // 2 + w // 4, h // 8 + w // 4), fill=color)
+    return im
+
+
+def _write_pdf(path: Path, pages: int, rng: random.Random) -> None:
+    """PDF con ``pages`` páginas de texto (Helvetica), escrito en streaming."""
+    from pdf_consolidator.pdfstream import Name, StreamingPdfWriter, serialize
+
+    with open(path, "wb") as fp:
+        writer = StreamingPdfWriter(fp)
+        font = writer.reserve()
+        writer.write_object(font, serialize({"Type": Name("Font"), "Subtype": Name("Type1"),
+                                             "BaseFont": Name("Helvetica")}))
+        for n in range(pages):
+            lines = [b"BT /F1 11 Tf 56 780 Td 14 TL"]
+            lines.append(b"(Pagina %d de %d) '" % (n + 1, pages))
+            for _ in range(40):
+                words = " ".join("x" * rng.randint(2, 9) for _ in range(rng.randint(6, 12)))
+                lines.append(b"(" + words.encode("ascii") + b") '")
+            lines.append(b"ET")
+            content, page = writer.reserve(), writer.reserve()
+            writer.write_stream(content, {}, b"\n".join(lines))
+            writer.write_object(page, serialize({
+                "Type": Name("Page"), "Parent": writer.pages_ref,
+                "MediaBox": [0, 0, 595, 842],
+                "Resources": {"Font": {"F1": font}},
+                "Contents": content,
+            }))
+            writer.add_page(page)
+        writer.close()
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def generate_corpus(root: Path, profile: str = "small", seed: int = DEFAULT_SEED) -> list[CorpusFile]:
+    """Genera el corpus en ``root`` (si ya existe uno idéntico, lo reutiliza)."""
+    from PIL import TiffImagePlugin
+
+    spec = PROFILES[profile]
+    manifest_path = root / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if (manifest.get("profile"), manifest.get("seed"), manifest.get("version")) == \
+                (profile, seed, CORPUS_VERSION):
+            return [CorpusFile(**f) for f in manifest["files"]]
+
+    files_dir = root / "files"
+    files_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    entries: list[tuple[Path, str, int]] = []
+
+    for w, h in spec.image_sizes:
+        im = _draw_page((w, h), rng, "RGB")
+        jpg = files_dir / f"img_{w}x{h}.jpg"
+        im.save(jpg, "JPEG", quality=85, dpi=(200, 200))
+        png = files_dir / f"img_{w}x{h}.png"
+        im.save(png, "PNG", dpi=(200, 200))
+        entries += [(jpg, "jpeg", 1), (png, "png", 1)]
+
+    fax_size = (1728, 2200)
+    saved_strip = TiffImagePlugin.STRIP_SIZE
+    TiffImagePlugin.STRIP_SIZE = (fax_size[0] + 7) // 8 * fax_size[1]  # una tira por página, como un fax
+    try:
+        for pages in spec.tiff_pages:
+            frames = [_draw_page(fax_size, rng, "1") for _ in range(pages)]
+            tif = files_dir / f"tiff_{pages:04d}.tif"
+            frames[0].save(tif, save_all=True, append_images=frames[1:],
+                           compression="group4", dpi=(204, 196))
+            entries.append((tif, "tiff", pages))
+    finally:
+        TiffImagePlugin.STRIP_SIZE = saved_strip
+
+    for pages in spec.pdf_pages:
+        pdf = files_dir / f"pdf_{pages:04d}.pdf"
+        _write_pdf(pdf, pages, rng)
+        entries.append((pdf, "pdf", pages))
+
+    files = [CorpusFile(str(p.relative_to(root)), kind, pages, p.stat().st_size, _sha256(p))
+             for p, kind, pages in entries]
+    manifest = {"version": CORPUS_VERSION, "profile": profile, "seed": seed,
+                "files": [asdict(f) for f in files]}
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return files
+
+
+def case_files(root: Path, files: list[CorpusFile], case: str, profile: str) -> list[Path]:
+    """Archivos del caso ``case`` (los que empiezan con alguno de sus prefijos), ordenados."""
+    prefixes = PROFILES[profile].cases[case]
+    return sorted(root / f.path for f in files
+                  if any(Path(f.path).name.startswith(p) for p in prefixes))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Genera el corpus sintético de benchmarks")
+    parser.add_argument("--out", type=Path, default=Path("bench_corpus"))
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+    files = generate_corpus(args.out, args.profile, args.seed)
+    total = sum(f.bytes for f in files) / 1024 / 1024
+    print(f"Corpus '{args.profile}' en {args.out}: {len(files)} archivos, {total:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Suite de benchmarks por etapa sobre el corpus sintético.
+
+Mide ``convert_image_to_pdf`` (por archivo), ``copy_pdf``, ``merge_pdfs``
+(en memoria y en streaming) y el proceso completo (``consolidate``) por caso.
+Cada medición se repite ``--repeat`` veces y se informa la mediana. Los
+resultados se guardan en JSON; con ``--baseline`` se comparan contra una
+ejecución anterior y el código de salida es 1 si alguna etapa empeoró más que
+``--threshold``.
+
+Uso:
+    python -m benchmarks.suite --profile small --out bench.json
+    python -m benchmarks.suite --baseline bench_main.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from benchmarks.corpus import DEFAULT_SEED, PROFILES, case_files, generate_corpus  # noqa: E402
+
+DEFAULT_THRESHOLD = 0.20   # 20 % más lento que la línea base = regresión
+MIN_DELTA_S = 0.005        # por debajo de esto la diferencia es ruido del reloj
+
+
+@dataclass
+class BenchResult:
+    name: str
+    stage: str
+    repeats: int
+    median_s: float
+    min_s: float
+    mean_s: float
+    pages: int = 0
+    bytes_in: int = 0
+
+    @property
+    def pages_per_s(self) -> float:
+        return self.pages / self.median_s if self.median_s > 0 else 0.0
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_s / self.baseline_s - 1
+
+
+def measure(name: str, stage: str, fn: Callable[[], int], repeats: int,
+            bytes_in: int = 0, setup: Callable[[], None] | None = None) -> BenchResult:
+    """Ejecuta ``fn`` (que devuelve páginas) ``repeats`` veces tras una vuelta de calentamiento."""
+    if setup:
+        setup()
+    pages = fn()  # calentamiento: imports, cachés del sistema de archivos
+    times = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return BenchResult(name, stage, repeats, statistics.median(times), min(times),
+                       statistics.fmean(times), pages, bytes_in)
+
+
+def run_suite(corpus_root: Path, work_dir: Path, profile: str = "small", repeats: int = 3,
+              seed: int = DEFAULT_SEED, stages: set[str] | None = None) -> list[BenchResult]:
+    """Genera (o reutiliza) el corpus y corre las etapas pedidas (todas por defecto)."""
+    from pdf_consolidator.core import convert_image_to_pdf, copy_pdf, merge_pdfs
+    from pdf_consolidator.engine import ConversionEngine
+    from pdf_consolidator.pipeline import consolidate
+
+    files = generate_corpus(corpus_root, profile, seed)
+    stages = stages or {"convert", "copy", "merge", "pipeline"}
+    results: list[BenchResult] = []
+    out = work_dir / "out"
+    out.mkdir(parents=True, exist_ok=True)
+
+    def clean_out():
+        shutil.rmtree(out, ignore_errors=True)
+        out.mkdir(parents=True)
+
+    images = [f for f in files if f.kind in ("jpeg", "png", "tiff")]
+    pdfs = [f for f in files if f.kind == "pdf"]
+
+    if "convert" in stages:
+        for f in images:
+            src = corpus_root / f.path
+            dst = out / f"{src.stem}.pdf"
+            results.append(measure(
+                f"convert/{src.name}", "convert",
+                lambda src=src, dst=dst, f=f: (convert_image_to_pdf(src, dst), f.pages)[1],
+                repeats, f.bytes))
+
+    if "copy" in stages:
+        for f in pdfs:
+            src = corpus_root / f.path
+            results.append(measure(
+                f"copy/{src.name}", "copy",
+                lambda src=src, f=f: (copy_pdf(src, out / src.name), f.pages)[1],
+                repeats, f.bytes, setup=clean_out))
+
+    if "merge" in stages:
+        paths = [corpus_root / f.path for f in pdfs]
+        size = sum(f.bytes for f in pdfs)
+        for streaming in (False, True):
+            mode = "streaming" if streaming else "memoria"
+            results.append(measure(
+                f"merge/{mode}", "merge",
+                lambda s=streaming: merge_pdfs(paths, out / "merge.pdf", streaming=s),
+                repeats, size))
+
+    if "pipeline" in stages:
+        for case in PROFILES[profile].cases:
+            case_paths = case_files(corpus_root, files, case, profile)
+            size = sum(p.stat().st_size for p in case_paths)
+
+            def run_case(paths=case_paths, case=case) -> int:
+                # Sin caché: se mide la conversión real
+                with ConversionEngine() as engine:
+                    pages, _ = consolidate(engine, paths, work_dir / "temp", out / f"{case}.pdf")
+                shutil.rmtree(work_dir / "temp", ignore_errors=True)
+                return pages
+
+            results.append(measure(f"pipeline/{case}", "pipeline", run_case, repeats, size))
+
+    return results
+
+
+def compare(results: list[BenchResult], baseline: dict, threshold: float) -> list[Regression]:
+    """Etapas cuya mediana empeoró más que ``threshold`` respecto a ``baseline``."""
+    previous = {r["name"]: r["median_s"] for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        base = previous.get(r.name)
+        if base is None or base <= 0:
+            continue
+        if r.median_s - base > MIN_DELTA_S and r.median_s / base - 1 > threshold:
+            regressions.append(Regression(r.name, base, r.median_s))
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def to_json(results: list[BenchResult], profile: str, seed: int, repeats: int) -> dict:
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "profile": profile,
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": [dict(asdict(r), pages_per_s=round(r.pages_per_s, 2)) for r in results],
+    }
+
+
+def format_table(results: list[BenchResult]) -> str:
+    lines = [f"{'Benchmark':<34} {'Mediana s':>10} {'Mín s':>8} {'Págs':>6} {'págs/s':>9}"]
+    for r in results:
+        lines.append(f"{r.name:<34} {r.median_s:>10.4f} {r.min_s:>8.4f} "
+                     f"{r.pages:>6} {r.pages_per_s:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa sobre un corpus sintético")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    parser.add_argument("--stage", action="append", choices=["convert", "copy", "merge", "pipeline"],
+                        help="Etapa a medir (repetible; por defecto todas)")
+    parser.add_argument("--corpus", type=Path, default=Path("bench_corpus"),
+                        help="Carpeta del corpus (se genera si no existe)")
+    parser.add_argument("--out", type=Path, help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Regresión tolerada (0.2 = 20%% más lento)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        results = run_suite(args.corpus / args.profile, Path(tmp), args.profile, args.repeat,
+                            args.seed, set(args.stage) if args.stage else None)
+    print(format_table(results))
+
+    data = to_json(results, args.profile, args.seed, args.repeat)
+    if args.out:
+        args.out.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        print(f"\nResultados en {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for reg in regressions:
+            print(f"REGRESIÓN {reg.name}: {reg.baseline_s:.4f}s -> {reg.current_s:.4f}s "
+                  f"(+{reg.ratio:.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"Sin regresiones respecto a {args.baseline} (umbral {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,406 +1,55 @@
 import os
 import re
 import sys
-import time
+import queue
 import shutil
-import logging
-import unicodedata
+import multiprocessing
 from pathlib import Path
+from typing import TYPE_CHECKING
 from tkinter import Tk, Label, Entry, Button, Frame, Listbox, END, StringVar, messagebox, PhotoImage
 from tkinter import ttk
-from logging.handlers import RotatingFileHandler
 
-# --- Dependencias de conversión ---
-import img2pdf                    # Imágenes → PDF (jpg/png)
-from pypdf import PdfReader, PdfWriter  # Merge PDFs
-
-# Office -> PDF (Windows + MS Office)
-try:
-    import win32com.client as win32  # pywin32
-    HAS_WIN32 = True
-except Exception:
-    HAS_WIN32 = False
-
-# Threading para optimizaciones
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-
-# =============================
-# Configuración general
-# =============================
-
-def get_app_version() -> str:
-    """Lee la versión de la aplicación desde el archivo VERSION."""
-    try:
-        version_file = Path(__file__).parent / "VERSION"
-        if version_file.exists():
-            return f"v{version_file.read_text().strip()}"
-        else:
-            # Fallback si no existe el archivo VERSION
-            return "v1.2.1"
-    except Exception:
-        return "v1.2.1"
-
-APP_VERSION = get_app_version()
-INPUT_DIR = Path("data/input")
-OUTPUT_DIR = Path("data/output")
-TEMP_DIR = Path("temp")
-LOG_DIR = Path("logs")
-ASSETS_DIR = Path("assets")  # coloca aquí tus imágenes
-LOGO_EMPRESA = ASSETS_DIR / "logo_empresa.png"   # <-- agrega tus imágenes si quieres
-LOGO_CAMPANA = ASSETS_DIR / "logo_campana.png"   # <-- agrega tus imágenes si quieres
-LOGO_EXPANSION = ASSETS_DIR / "Expansión.png"   # Logo de Expansión (header centrado)
-LOGO_ASCENSION = ASSETS_DIR / "LogoLApng-1920w.webp"   # Logo de La Ascensión (icono app/ventana)
-
-# Extensiones de archivos soportadas por categoría
-IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
-WORD_EXTS = {".doc", ".docx"}
-EXCEL_EXTS = {".xls", ".xlsx"}
-PDF_EXTS = {".pdf"}
-
-ALLOWED_EXTS = IMAGE_EXTS | WORD_EXTS | EXCEL_EXTS | PDF_EXTS
-INVALID_FS_CHARS = r'<>:"/\\|?*'  # Windows
-
-# Archivos que se deben excluir del procesamiento
-EXCLUDED_FILES = {"README.md", "readme.md", "README.txt", "readme.txt"}
-
-# Constantes para formatos de exportación Office
-WD_FORMAT_PDF = 17  # Word PDF export format
-XL_TYPE_PDF = 0     # Excel PDF export format
-
-# =============================
-# Optimizaciones de rendimiento
-# =============================
-# Variables globales para reutilizar instancias COM
-_word_app = None
-_excel_app = None
-_word_lock = threading.Lock()
-_excel_lock = threading.Lock()
-
-
-# =============================
-# Logging
-# =============================
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-logger = logging.getLogger("consolidador")
-logger.setLevel(logging.INFO)
-handler = RotatingFileHandler(LOG_DIR / "app.log", maxBytes=1_000_000, backupCount=3, encoding="utf-8")
-fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-handler.setFormatter(fmt)
-logger.addHandler(handler)
-
-
-# =============================
-# Utilidades
-# =============================
-def resource_path(relative: Path) -> str:
-    """Compat con PyInstaller --onefile: devuelve la ruta real del recurso empaquetado."""
-    try:
-        base_path = Path(sys._MEIPASS)  # type: ignore[attr-defined]
-    except Exception:
-        base_path = Path(".")
-    return str(base_path / relative)
-
-
-def ensure_dirs():
-    for d in (INPUT_DIR, OUTPUT_DIR, TEMP_DIR, ASSETS_DIR):
-        d.mkdir(parents=True, exist_ok=True)
-
-
-def sanitize_component(s: str) -> str:
-    """Limpia nombre: quita inválidos, colapsa espacios y normaliza acentos a ASCII."""
-    s = s.strip()
-    s = "".join("_" if c in INVALID_FS_CHARS else c for c in s)
-    s = re.sub(r"\s+", " ", s)
-    # Normaliza tildes/acentos para minimizar problemas en FS o con otros sistemas
-    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    return s
-
-
-def final_pdf_name(ident: str, cliente: str, reembolso: str) -> str:
-    ident = sanitize_component(ident)
-    cliente = sanitize_component(cliente)
-    reembolso = sanitize_component(reembolso)
-    base = f"{ident}_{cliente}_{reembolso}".strip("_ ").replace(" ", "_")
-    return base + ".pdf"
-
-
-def get_supported_extensions_display() -> str:
-    """
-    Retorna una cadena legible con las extensiones soportadas agrupadas por tipo.
-    """
-    return (f"PDF: {', '.join(sorted(PDF_EXTS))} | "
-            f"Word: {', '.join(sorted(WORD_EXTS))} | "
-            f"Excel: {', '.join(sorted(EXCEL_EXTS))} | "
-            f"Imágenes: {', '.join(sorted(IMAGE_EXTS))}")
-
-
-def list_input_files() -> list[Path]:
-    if not INPUT_DIR.exists():
-        return []
-    files = []
-    for f in INPUT_DIR.iterdir():
-        if (f.is_file() and 
-            f.suffix.lower() in ALLOWED_EXTS and 
-            f.name not in EXCLUDED_FILES):
-            files.append(f)
-    files.sort(key=lambda p: p.name.lower())  # orden alfabético
-    return files
-
-
-# =============================
-# Conversión a PDF por tipo
-# =============================
-
-def get_word_instance():
-    """Obtiene una instancia reutilizable de Word COM para mejor rendimiento."""
-    global _word_app
-    try:
-        if _word_app is None:
-            _word_app = win32.DispatchEx("Word.Application")
-            _word_app.Visible = False
-            # Optimizaciones de rendimiento para Word
-            _word_app.Options.DoNotPromptForConvert = True
-            _word_app.Options.ConfirmConversions = False
-            _word_app.DisplayAlerts = False
-        return _word_app
-    except Exception as e:
-        logger.error(f"Error creando instancia de Word: {e}")
-        return None
-
-def get_excel_instance():
-    """Obtiene una instancia reutilizable de Excel COM para mejor rendimiento."""
-    global _excel_app
-    try:
-        if _excel_app is None:
-            _excel_app = win32.DispatchEx("Excel.Application")
-            _excel_app.Visible = False
-            _excel_app.DisplayAlerts = False
-            # Optimizaciones de rendimiento para Excel
-            _excel_app.ScreenUpdating = False
-            _excel_app.EnableEvents = False
-            _excel_app.Calculation = -4135  # xlCalculationManual
-        return _excel_app
-    except Exception as e:
-        logger.error(f"Error creando instancia de Excel: {e}")
-        return None
-
-def cleanup_office_instances():
-    """Limpia las instancias COM reutilizables al finalizar."""
-    global _word_app, _excel_app
-    
-    if _word_app:
-        try:
-            _word_app.Quit()
-        except:
-            pass
-        finally:
-            _word_app = None
-    
-    if _excel_app:
-        try:
-            _excel_app.Quit()
-        except:
-            pass
-        finally:
-            _excel_app = None
-
-def convert_image_to_pdf(src: Path, dst_pdf: Path):
-    """Convierte JPG/PNG/TIF a PDF. Usa Pillow para TIFF multipágina; img2pdf para el resto."""
-    dst_pdf.parent.mkdir(parents=True, exist_ok=True)
-    ext = src.suffix.lower()
-
-    if ext in (".tif", ".tiff"):
-        from PIL import Image  # import local: solo si hace falta
-        frames = []
-        im = Image.open(src)
-        try:
-            while True:
-                frames.append(im.convert("RGB").copy())
-                im.seek(im.tell() + 1)
-        except EOFError:
-            pass
-        if not frames:
-            raise RuntimeError(f"TIFF sin frames: {src.name}")
-        frames[0].save(dst_pdf, save_all=True, append_images=frames[1:])
-        logger.info(f"TIFF multipágina -> {dst_pdf.name}")
-    else:
-        with open(dst_pdf, "wb") as f_out:
-            f_out.write(img2pdf.convert(str(src)))
-        logger.info(f"Imagen convertida -> {dst_pdf.name}")
-
-
-def convert_word_to_pdf(src: Path, dst_pdf: Path):
-    """
-    Convierte documentos Word (.doc/.docx) a PDF usando Microsoft Word vía COM.
-    Versión optimizada que reutiliza instancia de Word para mejor rendimiento.
-    
-    Args:
-        src: Ruta del archivo Word de origen
-        dst_pdf: Ruta donde guardar el PDF convertido
-        
-    Raises:
-        RuntimeError: Si no está disponible win32com o MS Office
-    """
-    if not HAS_WIN32:
-        raise RuntimeError("Conversión de documentos Word requiere Windows + pywin32 + MS Office.")
-    
-    with _word_lock:  # Sincronización para thread safety
-        word = get_word_instance()
-        if not word:
-            raise RuntimeError("No se pudo obtener instancia de Word")
-        
-        try:
-            logger.info(f"Iniciando conversión Word -> PDF (optimizada): {src.name}")
-            
-            # Asegurar ruta absoluta para MS Word
-            src_absolute = src.resolve()
-            dst_absolute = dst_pdf.resolve()
-            
-            logger.debug(f"Ruta absoluta origen: {src_absolute}")
-            logger.debug(f"Ruta absoluta destino: {dst_absolute}")
-            
-            # Abrir documento con configuraciones optimizadas
-            doc = word.Documents.Open(
-                str(src_absolute),
-                False,  # ConfirmConversions
-                True,   # ReadOnly
-                False,  # AddToRecentFiles
-                "",     # PasswordDocument
-                "",     # PasswordTemplate
-                False,  # Revert
-                "",     # WritePasswordDocument
-                "",     # WritePasswordTemplate
-                0       # Format
-            )
-            
-            # Exportar como PDF usando ruta absoluta
-            doc.ExportAsFixedFormat(str(dst_absolute), WD_FORMAT_PDF)
-            doc.Close(False)
-            
-            logger.info(f"Word -> PDF optimizado completado: {dst_pdf.name}")
-            
-        except Exception as e:
-            logger.error(f"Error convirtiendo {src.name}: {e}")
-            raise
-
-
-def convert_excel_to_pdf(src: Path, dst_pdf: Path):
-    """
-    Convierte documentos Excel (.xls/.xlsx) a PDF usando Microsoft Excel vía COM.
-    Versión optimizada que reutiliza instancia de Excel para mejor rendimiento.
-    
-    Args:
-        src: Ruta del archivo Excel de origen
-        dst_pdf: Ruta donde guardar el PDF convertido
-        
-    Raises:
-        RuntimeError: Si no está disponible win32com o MS Office
-    """
-    if not HAS_WIN32:
-        raise RuntimeError("Conversión de documentos Excel requiere Windows + pywin32 + MS Office.")
-    
-    with _excel_lock:  # Sincronización para thread safety
-        excel = get_excel_instance()
-        if not excel:
-            raise RuntimeError("No se pudo obtener instancia de Excel")
-        
-        try:
-            logger.info(f"Iniciando conversión Excel -> PDF (optimizada): {src.name}")
-            
-            # Asegurar ruta absoluta para MS Excel
-            src_absolute = src.resolve()
-            dst_absolute = dst_pdf.resolve()
-            
-            logger.debug(f"Ruta absoluta origen: {src_absolute}")
-            logger.debug(f"Ruta absoluta destino: {dst_absolute}")
-            
-            # Abrir libro con configuraciones optimizadas
-            wb = excel.Workbooks.Open(
-                str(src_absolute),
-                False,  # UpdateLinks
-                True,   # ReadOnly
-                None,   # Format
-                "",     # Password
-                "",     # WriteResPassword
-                True,   # IgnoreReadOnlyRecommended
-                None,   # Origin
-                None,   # Delimiter
-                False,  # Editable
-                False,  # Notify
-                None,   # Converter
-                False   # AddToMru
-            )
-            
-            # Exportar como PDF usando ruta absoluta
-            wb.ExportAsFixedFormat(XL_TYPE_PDF, str(dst_absolute))
-            wb.Close(False)
-            
-            logger.info(f"Excel -> PDF optimizado completado: {dst_pdf.name}")
-            
-        except Exception as e:
-            logger.error(f"Error convirtiendo {src.name}: {e}")
-            raise
-
-
-def copy_pdf(src: Path, dst_pdf: Path):
-    dst_pdf.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dst_pdf)
-    logger.info(f"PDF copiado: {dst_pdf.name}")
-
-
-def convert_to_pdf(src: Path) -> Path | None:
-    """
-    Convierte un archivo permitido a PDF y devuelve la ruta del PDF temporal.
-    
-    Args:
-        src: Ruta del archivo a convertir
-        
-    Returns:
-        Path del PDF temporal creado, o None si la conversión falla
-    """
-    try:
-        dst = TEMP_DIR / (src.stem + ".pdf")
-        ext = src.suffix.lower()
-        
-        logger.info(f"Iniciando conversión: {src.name} ({ext})")
-        
-        if ext in IMAGE_EXTS:
-            convert_image_to_pdf(src, dst)
-        elif ext in PDF_EXTS:
-            copy_pdf(src, dst)
-        elif ext in WORD_EXTS:
-            convert_word_to_pdf(src, dst)
-        elif ext in EXCEL_EXTS:
-            convert_excel_to_pdf(src, dst)
-        else:
-            raise RuntimeError(f"Extensión no soportada: {ext}")
-            
-        logger.info(f"Conversión exitosa: {src.name} -> {dst.name}")
-        return dst
-        
-    except Exception as e:
-        logger.exception(f"Error convirtiendo {src.name}: {e}")
-        return None
-
-
-# =============================
-# Unión de PDFs
-# =============================
-def merge_pdfs(pdf_paths: list[Path], out_path: Path):
-    writer = PdfWriter()
-    for p in pdf_paths:
-        try:
-            reader = PdfReader(str(p))
-            for page in reader.pages:
-                writer.add_page(page)
-        except Exception as e:
-            logger.exception(f"Error leyendo {p.name}: {e}")
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "wb") as f:
-        writer.write(f)
-    logger.info(f"PDF final creado: {out_path.name}")
+# El núcleo (conversión/unión) vive en el paquete src/pdf_consolidator
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from pdf_consolidator.core import (  # noqa: E402
+    APP_VERSION, INPUT_DIR, OUTPUT_DIR, TEMP_DIR, LOG_DIR, ASSETS_DIR,
+    LOGO_EMPRESA, LOGO_CAMPANA, LOGO_EXPANSION, LOGO_ASCENSION,
+    IMAGE_EXTS, WORD_EXTS, EXCEL_EXTS, PDF_EXTS, ALLOWED_EXTS,
+    INVALID_FS_CHARS, EXCLUDED_FILES, WD_FORMAT_PDF, XL_TYPE_PDF, HAS_WIN32,
+    logger, setup_logging, resource_path, ensure_dirs, sanitize_component, final_pdf_name,
+    get_supported_extensions_display, list_input_files,
+    get_word_instance, get_excel_instance, cleanup_office_instances,
+    convert_image_to_pdf, convert_word_to_pdf, convert_excel_to_pdf, copy_pdf,
+    convert_to_pdf, merge_pdfs,
+)
+from pdf_consolidator.profiling import (  # noqa: E402  (liviano: sin cProfile hasta activarlo)
+    enable_profiling, profile_stage, profiling_configured,
+)
+# pipeline, cache y scheduler (pools, multiprocessing) se importan al convertir:
+# la ventana abre sin cargarlos (medir con scripts/benchmark_startup.py)
+if TYPE_CHECKING:
+    from pdf_consolidator.engine import ConversionEngine
+    from pdf_consolidator.journal import JobJournal
+    from pdf_consolidator.pipeline import PipelineRunner, ProgressEvent
+
+# Los nombres del núcleo se reexportan: scripts/ y tests/ los importan desde main
+__all__ = [
+    "App",
+    "APP_VERSION", "INPUT_DIR", "OUTPUT_DIR", "TEMP_DIR", "LOG_DIR", "ASSETS_DIR",
+    "LOGO_EMPRESA", "LOGO_CAMPANA", "LOGO_EXPANSION", "LOGO_ASCENSION",
+    "IMAGE_EXTS", "WORD_EXTS", "EXCEL_EXTS", "PDF_EXTS", "ALLOWED_EXTS",
+    "INVALID_FS_CHARS", "EXCLUDED_FILES", "WD_FORMAT_PDF", "XL_TYPE_PDF", "HAS_WIN32",
+    "logger", "setup_logging", "resource_path", "ensure_dirs", "sanitize_component",
+    "final_pdf_name", "get_supported_extensions_display", "list_input_files",
+    "get_word_instance", "get_excel_instance", "cleanup_office_instances",
+    "convert_image_to_pdf", "convert_word_to_pdf", "convert_excel_to_pdf", "copy_pdf",
+    "convert_to_pdf", "merge_pdfs",
+]
+
+POLL_INTERVAL_MS = 16      # ~60 fps al leer eventos del proceso en segundo plano
+MAX_EVENTS_PER_POLL = 50   # acota el trabajo por tick para no congelar la ventana
+CLOSE_TIMEOUT_S = 10       # espera máxima al cerrar con un proceso en curso
 
 
 # =============================
@@ -416,11 +65,10 @@ class App(Tk):
         # Establecer icono de la ventana con logo de La Ascensión
         try:
             if LOGO_ASCENSION.exists():
-                from PIL import Image, ImageTk
-                # Cargar y redimensionar el logo para icono de ventana (32x32)
-                pil_image = Image.open(resource_path(LOGO_ASCENSION))
-                pil_image = pil_image.resize((32, 32), Image.Resampling.LANCZOS)
-                self.window_icon = ImageTk.PhotoImage(pil_image)
+                from pdf_consolidator.assets import cached_icon
+                # PNG 32x32 en caché: PIL solo se carga la primera vez
+                icon = cached_icon(resource_path(LOGO_ASCENSION), (32, 32))
+                self.window_icon = PhotoImage(file=str(icon))
                 self.iconphoto(True, self.window_icon)
         except Exception as e:
             logger.warning(f"No se pudo cargar icono de ventana: {e}")
@@ -497,9 +145,22 @@ class App(Tk):
         bottom.pack(pady=8)
         self.progress = ttk.Progressbar(bottom, length=500, mode="determinate")
         self.progress.pack(pady=4)
-        self.btn_convert = Button(bottom, text="Convertir y Consolidar",
+        actions = Frame(bottom)
+        actions.pack(pady=6)
+        self.btn_convert = Button(actions, text="Convertir y Consolidar",
                                   command=self.run_process, width=30)
-        self.btn_convert.pack(pady=6)
+        self.btn_convert.pack(side="left", padx=4)
+        self.btn_cancel = Button(actions, text="Cancelar", command=self.cancel_process,
+                                 width=12, state="disabled")
+        self.btn_cancel.pack(side="left", padx=4)
+        self.btn_resume = Button(actions, text="Reanudar", command=self.resume_process,
+                                 width=12, state="disabled")
+        self.btn_resume.pack(side="left", padx=4)
+        self.runner: "PipelineRunner | None" = None
+        # Motor compartido por los casos de esta ventana: pools y Office siguen abiertos
+        self.engine: "ConversionEngine | None" = None
+        self.pending_job: "JobJournal | None" = None  # trabajo interrumpido o con fallidos
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Leyenda PI
         Label(
@@ -509,6 +170,36 @@ class App(Tk):
         ).pack(pady=4)
 
         self.reload_files()
+        self.after(0, self.offer_resume)
+
+    def offer_resume(self):
+        """Ofrece continuar un proceso de la carpeta de entrada que quedó interrumpido."""
+        from pdf_consolidator.journal import pending_jobs
+
+        jobs = [j for j in pending_jobs(TEMP_DIR)
+                if j.meta.get("carpeta") == str(INPUT_DIR) and not j.finished]
+        if not jobs:
+            return
+        job = jobs[0]
+        self.set_pending_job(job)
+        self.var_ident.set(job.meta.get("ident", ""))
+        self.var_cliente.set(job.meta.get("cliente", ""))
+        self.var_reembolso.set(job.meta.get("reembolso", ""))
+        if messagebox.askyesno(
+            "Proceso interrumpido",
+            f"El proceso de {job.name} quedó sin terminar "
+            f"({len(job.done)} de {len(job.files)} archivos convertidos).\n"
+            "¿Reanudarlo sin volver a convertir lo ya convertido?"
+        ):
+            self.resume_process()
+
+    def set_pending_job(self, job: "JobJournal | None"):
+        self.pending_job = job
+        self.btn_resume.configure(state="normal" if job is not None else "disabled")
+
+    def resume_process(self):
+        if self.pending_job is not None:
+            self.run_process(resume=self.pending_job)
 
     def reload_files(self):
         self.listbox.delete(0, END)
@@ -520,6 +211,16 @@ class App(Tk):
             for f in files:
                 self.listbox.insert(END, f.name)
             self.btn_convert.configure(state="normal")
+            if any(f.suffix.lower() in WORD_EXTS | EXCEL_EXTS for f in files):
+                # Word/Excel o LibreOffice arrancan mientras se completa el formulario
+                self.get_engine().prewarm(files)
+
+    def get_engine(self) -> "ConversionEngine":
+        if self.engine is None:
+            from pdf_consolidator.cache import cache_from_config
+            from pdf_consolidator.engine import ConversionEngine
+            self.engine = ConversionEngine(cache=cache_from_config())
+        return self.engine
 
     def open_folder(self, path: Path):
         path.mkdir(parents=True, exist_ok=True)
@@ -545,101 +246,142 @@ class App(Tk):
             return False, f"Los campos no deben contener ninguno de estos caracteres: {INVALID_FS_CHARS}"
         return True, ""
 
-    def run_process(self):
-        # Deshabilitar botón para evitar doble clic mientras procesa
+    def run_process(self, resume: "JobJournal | None" = None):
+        # Deshabilitar botones para evitar doble clic mientras procesa
         self.btn_convert.configure(state="disabled")
+        self.btn_resume.configure(state="disabled")
 
+        with profile_stage("scan"):
+            files = list_input_files()  # un solo escaneo para validar y procesar
         ok, msg = self.validate_form()
         if not ok:
             messagebox.showerror("Validación", msg)
             # re-habilita si hay archivos para reintentar
-            if list_input_files():
+            if files:
                 self.btn_convert.configure(state="normal")
+            self.set_pending_job(self.pending_job)
             return
 
-        files = list_input_files()
         if not files:
             messagebox.showwarning("Sin archivos", f"No hay archivos con formatos admitidos en {INPUT_DIR}.")
+            self.set_pending_job(self.pending_job)
             return  # seguirá deshabilitado si no hay archivos (correcto)
 
-        # limpiar y preparar temporales
-        if TEMP_DIR.exists():
-            shutil.rmtree(TEMP_DIR, ignore_errors=True)
-        TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        from pdf_consolidator.pipeline import PipelineRunner
+        from pdf_consolidator.scheduler import new_workspace
+
+        # unión en segundo plano: la ventana sigue respondiendo y se puede cancelar
+        out_name = final_pdf_name(self.var_ident.get(), self.var_cliente.get(), self.var_reembolso.get())
+        if resume is not None:
+            # misma carpeta de trabajo: solo se convierte lo fallido o faltante
+            work_dir = resume.work_dir
+        else:
+            if self.pending_job is not None:
+                self.pending_job.discard()  # se empieza de cero: el trabajo anterior ya no sirve
+            # carpeta de trabajo propia: no pisa la de otra ventana o de un batch en curso
+            work_dir = new_workspace(TEMP_DIR, "gui")
+        self.set_pending_job(None)
+        meta = {"ident": self.var_ident.get().strip(), "cliente": self.var_cliente.get().strip(),
+                "reembolso": self.var_reembolso.get().strip(), "carpeta": str(INPUT_DIR)}
+        self.runner = PipelineRunner(files, OUTPUT_DIR / out_name, work_dir,
+                                     meta=meta, engine=self.get_engine())
 
-        # conversión
         self.progress["value"] = 0
         self.progress["maximum"] = len(files)
-        
-        # Mostrar información de progreso
         self.title(f"Procesando ({len(files)} archivos)...")
-
-        converted: list[Path] = []
-        for idx, f in enumerate(files, 1):
-            # Actualizar título con archivo actual
-            self.title(f"Procesando {idx}/{len(files)}: {f.name[:30]}...")
-            self.progress["value"] = idx - 1
-            self.progress.update()
-            
-            start_time = time.perf_counter()
-            pdf = convert_to_pdf(f)
-            conversion_time = time.perf_counter() - start_time
-            
-            if pdf:
-                converted.append(pdf)
-                logger.info(f"Conversión completada en {conversion_time:.2f}s: {f.name}")
-            else:
-                logger.error(f"Conversión fallida en {conversion_time:.2f}s: {f.name}")
-
-        self.progress["value"] = len(files)
-        self.progress.update()
-        self.title("Consolidador de Archivos a PDF")  # Restaurar título original
-
-        if not converted:
-            messagebox.showerror("Error", "No se pudo convertir ninguno de los archivos. Revise el log.")
-            # limpiar instancias COM en caso de error
-            cleanup_office_instances()
-            # re-habilita si aún hay archivos (para reintentar)
-            if list_input_files():
-                self.btn_convert.configure(state="normal")
-            return
-
-        # unión
-        out_name = final_pdf_name(self.var_ident.get(), self.var_cliente.get(), self.var_reembolso.get())
-        out_path = OUTPUT_DIR / out_name
-        try:
-            merge_pdfs(converted, out_path)
-        except Exception as e:
-            logger.exception(f"Error uniendo PDFs: {e}")
-            messagebox.showerror(
-                "Error",
-                "Falló la unión de PDFs.\n"
-                "Verifica que el archivo de salida no esté abierto y vuelve a intentarlo."
-            )
-            # limpiar instancias COM en caso de error
-            cleanup_office_instances()
-            # re-habilita si hay archivos para reintentar
-            if list_input_files():
-                self.btn_convert.configure(state="normal")
+        self.btn_cancel.configure(state="normal")
+        self._files_done = 0
+        self._rejected: list[str] = []
+        self.runner.start()
+        self.after(POLL_INTERVAL_MS, self.poll_pipeline)
+
+    def poll_pipeline(self):
+        """Consume los eventos del proceso en segundo plano sin bloquear Tk."""
+        from pdf_consolidator.pipeline import FILE_DONE, FILE_STARTED, MERGE_STARTED, TERMINAL_EVENTS
+
+        runner = self.runner
+        if runner is None:
             return
-        finally:
-            # limpiar temporales
-            shutil.rmtree(TEMP_DIR, ignore_errors=True)
-            # limpiar instancias COM reutilizables para liberar memoria
-            cleanup_office_instances()
-
-        logger.info(f"Proceso completo -> {out_path}")
-        messagebox.showinfo("Listo", f"PDF consolidado creado:\n{out_path.resolve()}")
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                event = runner.events.get_nowait()
+            except queue.Empty:
+                break
+            if event.kind == FILE_STARTED:
+                self.title(f"Procesando {self._files_done + 1}/{event.total}: {event.name[:30]}...")
+            elif event.kind == FILE_DONE:
+                self._files_done += 1
+                if event.message:  # rechazado en la validación previa o tiempo agotado
+                    self._rejected.append(f"{event.name}: {event.message}")
+                self.progress["value"] = self._files_done
+                self.title(f"Procesando {self._files_done}/{event.total}: {event.name[:30]}...")
+            elif event.kind == MERGE_STARTED:
+                self.title("Uniendo PDFs...")
+            elif event.kind in TERMINAL_EVENTS:
+                self.finish_pipeline(event)
+                return
+        self.after(POLL_INTERVAL_MS, self.poll_pipeline)
+
+    def cancel_process(self):
+        if self.runner is not None:
+            self.btn_cancel.configure(state="disabled")
+            self.title("Cancelando...")
+            self.runner.cancel()
+
+    def finish_pipeline(self, event: "ProgressEvent"):
+        from pdf_consolidator.pipeline import CANCELLED, FAILED
+
+        journal = self.runner.journal
+        self.runner = None
+        self.btn_cancel.configure(state="disabled")
+        self.set_pending_job(journal if journal.resumable else None)
+        self.progress["value"] = self.progress["maximum"]
+        self.title("Consolidador de Archivos a PDF")  # Restaurar título original
 
-        # Abrir salida y limpiar formulario + carpeta ARCHIVOS
-        self.open_folder(OUTPUT_DIR)
-        self.clear_form_and_input()
+        if event.kind == CANCELLED:
+            self.progress["value"] = 0
+            messagebox.showinfo("Cancelado", "Proceso cancelado. No se generó el PDF consolidado.")
+        elif event.kind == FAILED:
+            if event.message.startswith("No se pudo convertir"):
+                message = event.message
+                if self._rejected:
+                    message += "\n\nArchivos omitidos:\n" + "\n".join(self._rejected)
+                messagebox.showerror("Error", message)
+            else:
+                messagebox.showerror(
+                    "Error",
+                    "Falló la unión de PDFs.\n"
+                    "Verifica que el archivo de salida no esté abierto y vuelve a intentarlo."
+                )
+        else:
+            message = f"PDF consolidado creado:\n{event.output.resolve()}"
+            if self._rejected:
+                message += "\n\nArchivos omitidos:\n" + "\n".join(self._rejected)
+            if self.pending_job is not None:
+                # hubo fallidos: se conservan los archivos para reintentar solo esos
+                message += ("\n\nAlgunos archivos no se pudieron convertir. Corríjalos en la carpeta "
+                            "de entrada y use \"Reanudar\" para reintentar solo esos.")
+                messagebox.showwarning("Listo con errores", message)
+                self.open_folder(OUTPUT_DIR)
+            else:
+                messagebox.showinfo("Listo", message)
+                # Abrir salida y limpiar formulario + carpeta ARCHIVOS
+                self.open_folder(OUTPUT_DIR)
+                self.clear_form_and_input()
 
-        # Tras limpiar data/input, el botón quedará deshabilitado por reload_files().
-        # Si hubiera archivos (p. ej., el usuario ya colocó nuevos), se habilitará.
+        # re-habilita si hay archivos (para reintentar o para un nuevo caso)
         if list_input_files():
             self.btn_convert.configure(state="normal")
 
+    def on_close(self):
+        """Cancela el proceso en curso (si lo hay) antes de cerrar la ventana."""
+        if self.runner is not None:
+            self.runner.cancel()
+            self.runner.join(timeout=CLOSE_TIMEOUT_S)
+        if self.engine is not None:
+            self.engine.shutdown()
+        self.destroy()
+
     def clear_form_and_input(self):
         """Limpia los 3 campos del formulario y elimina el contenido de data/input."""
         try:
@@ -671,6 +413,15 @@ class App(Tk):
 
 
 if __name__ == "__main__":
+    # Necesario para el pool de procesos en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
+    setup_logging()
+    # Con argumentos se usa el modo línea de comandos (p. ej. `python main.py batch casos.csv`)
+    if sys.argv[1:] and sys.argv[1:] != ["--profile"]:
+        from pdf_consolidator.main import main
+        sys.exit(main())
+    if "--profile" in sys.argv or profiling_configured():
+        enable_profiling()
     try:
         app = App()
         app.mainloop()
@@ -678,5 +429,6 @@ if __name__ == "__main__":
         logger.exception(f"Fallo crítico: {e}")
         raise
     finally:
-        # Asegurar limpieza de instancias COM al cerrar aplicación
-        cleanup_office_instances()
+        # Asegurar limpieza de instancias COM / procesos LibreOffice al cerrar aplicación
+        from pdf_consolidator.backends import close_backends
+        close_backends()
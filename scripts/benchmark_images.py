@@ -0,0 +1,99 @@
+"""
+Benchmark de imágenes chicas: conversión una por una (un img2pdf, un PDF
+temporal y un ``PdfReader`` por imagen) contra tandas de imágenes
+consecutivas (``conversion.image_group_size``), de la conversión a la unión.
+La validación previa se omite y la optimización de la unión (``merge.optimize``,
+ver ``benchmark_optimize.py``) solo se incluye con ``--optimize``: cuestan lo
+mismo en ambas variantes.
+
+Uso:
+    python scripts/benchmark_images.py                  # 10, 100 y 1000 capturas
+    python scripts/benchmark_images.py --counts 500 --workers 4 --group-size 64
+"""
+
+import argparse
+import io
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+# Agregar src al path para importar el paquete
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image  # noqa: E402
+from pypdf import PdfReader  # noqa: E402
+
+from pdf_consolidator import engine as engine_mod  # noqa: E402
+from pdf_consolidator.engine import ConversionEngine  # noqa: E402
+from pdf_consolidator.pipeline import consolidate  # noqa: E402
+
+
+def make_images(folder: Path, count: int, seed: int = 0) -> list[Path]:
+    """Capturas de pantalla chicas (PNG) y fotos reducidas (JPEG), alternadas."""
+    rng = random.Random(seed)
+    folder.mkdir(parents=True)
+    files = []
+    for i in range(count):
+        size = (rng.randint(320, 640), rng.randint(240, 480))
+        image = Image.new("RGB", size, (rng.randrange(256), rng.randrange(256), 255))
+        image.paste(Image.effect_noise((size[0] // 4, size[1] // 4), 30).convert("RGB"))
+        path = folder / f"captura{i:04d}.{'png' if i % 2 else 'jpg'}"
+        if path.suffix == ".png":
+            image.save(path)
+        else:
+            buf = io.BytesIO()
+            image.save(buf, "JPEG", quality=80)
+            path.write_bytes(buf.getvalue())
+        files.append(path)
+    return files
+
+
+def run(files: list[Path], work: Path, workers: int, group_size: int,
+        optimize: bool = False) -> tuple[float, int]:
+    out = work / f"salida_{group_size}.pdf"
+    with mock.patch.object(engine_mod, "image_group_size", lambda: group_size), \
+            mock.patch("pdf_consolidator.pipeline.preflight", lambda files: {}), \
+            mock.patch("pdf_consolidator.core.use_merge_optimization", lambda: optimize):
+        with ConversionEngine(max_workers=workers) as engine:
+            start = time.perf_counter()
+            pages, _ = consolidate(engine, files, work / f"tmp_{group_size}", out,
+                                   pipelined=True, streaming=False)
+            elapsed = time.perf_counter() - start
+    assert len(PdfReader(str(out)).pages) == pages == len(files)
+    return elapsed, out.stat().st_size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Cantidades de imágenes a medir")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de conversión")
+    parser.add_argument("--group-size", type=int, default=32, help="Imágenes por tanda")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se informa la mediana)")
+    parser.add_argument("--optimize", action="store_true", help="Incluir merge.optimize")
+    args = parser.parse_args()
+
+    print(f"{'Imágenes':>9} {'1 x 1 (s)':>10} {'tandas (s)':>11} {'mejora':>8} "
+          f"{'img/s tandas':>13} {'MB 1x1':>8} {'MB tandas':>10}")
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            files = make_images(root / "entrada", count)
+            single, grouped = [], []
+            for _ in range(args.repeat):
+                single.append(run(files, root, args.workers, 1, args.optimize))
+                grouped.append(run(files, root, args.workers, args.group_size, args.optimize))
+            t_single = statistics.median(t for t, _ in single)
+            t_grouped = statistics.median(t for t, _ in grouped)
+            print(f"{count:>9} {t_single:>10.2f} {t_grouped:>11.2f} {t_single / t_grouped:>7.1f}x "
+                  f"{count / t_grouped:>13.0f} {single[0][1] / 1e6:>8.1f} "
+                  f"{grouped[0][1] / 1e6:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
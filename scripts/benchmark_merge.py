@@ -0,0 +1,88 @@
+"""
+Benchmark de unión de PDFs: ``PdfWriter`` en memoria frente a la unión en
+streaming.
+
+Cada modo se ejecuta en un proceso aparte para medir su pico de RSS. Las
+entradas son PDFs de páginas escaneadas (JPEG con ruido, que no se comprime)
+generados al vuelo.
+
+Uso:
+    python scripts/benchmark_merge.py --files 20 --pages 20
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar src al path para importar el paquete
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from benchmark_tiff import peak_rss_mb  # noqa: E402
+
+
+def make_scanned_pdf(path: Path, pages: int, size=(1240, 1754)) -> None:
+    """PDF de ``pages`` páginas A4 a 150 dpi, cada una un JPEG distinto."""
+    import img2pdf
+    from PIL import Image
+
+    jpegs = []
+    for _ in range(pages):
+        im = Image.frombytes("L", size, os.urandom(size[0] * size[1]))
+        buf = io.BytesIO()
+        im.save(buf, "JPEG", quality=50, dpi=(150, 150))
+        jpegs.append(buf.getvalue())
+    path.write_bytes(img2pdf.convert(jpegs))
+
+
+def _run_mode(streaming: bool, inputs: list[Path], out: Path, queue) -> None:
+    from pdf_consolidator.core import merge_pdfs
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    pages = merge_pdfs(inputs, out, streaming=streaming)
+    seconds = time.perf_counter() - start
+    queue.put((seconds, pages, base, peak_rss_mb(), out.stat().st_size))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=20, help="PDFs de entrada")
+    parser.add_argument("--pages", type=int, default=20, help="Páginas por PDF")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        ctx = multiprocessing.get_context("spawn")
+        print(f"Generando {args.files} PDFs de {args.pages} páginas...")
+        inputs = [tmp_dir / f"scan{i:03d}.pdf" for i in range(args.files)]
+        # En otro proceso: el pico de RSS del padre se heredaría en los hijos
+        procs = [ctx.Process(target=make_scanned_pdf, args=(p, args.pages)) for p in inputs]
+        for proc in procs:
+            proc.start()
+            proc.join()
+        total_mb = sum(p.stat().st_size for p in inputs) / 1024 / 1024
+        largest_mb = max(p.stat().st_size for p in inputs) / 1024 / 1024
+        print(f"Entrada: {total_mb:.1f} MB en total, {largest_mb:.1f} MB la mayor\n")
+
+        print(f"{'Modo':<10} {'Págs':>5} {'Total s':>8} {'Pico RSS MB':>12} "
+              f"{'Δ RSS MB':>9} {'Salida MB':>10}")
+        for name, streaming in (("memoria", False), ("streaming", True)):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run_mode,
+                               args=(streaming, inputs, tmp_dir / f"{name}.pdf", queue))
+            proc.start()
+            seconds, pages, base, peak, size = queue.get()
+            proc.join()
+            delta = f"{peak - base:9.1f}" if peak is not None and base is not None else "      n/d"
+            peak_txt = f"{peak:12.1f}" if peak is not None else "         n/d"
+            print(f"{name:<10} {pages:>5} {seconds:>8.2f} {peak_txt} {delta} "
+                  f"{size / 1024 / 1024:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark de conversión Office: ruta anterior (una instancia compartida,
+un documento a la vez) frente al pool de procesos ``OfficeWorkerPool``.
+
+Con ``--docs`` se convierten documentos reales con el backend configurado
+(COM o LibreOffice). Sin ``--docs`` se simula un backend que tarda
+``--latency`` segundos por documento, útil para medir el despacho del pool en
+máquinas sin Office.
+
+Uso:
+    python scripts/benchmark_office.py --workers 4 --count 16
+    python scripts/benchmark_office.py --docs ruta/a/documentos --workers 4
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Agregar src al path para importar el paquete
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pdf_consolidator.backends import (  # noqa: E402
+    OFFICE_EXTS, ConverterBackend, close_backends, get_backend, office_backend_name,
+)
+from pdf_consolidator.office_pool import OfficeWorkerPool  # noqa: E402
+
+
+class SimulatedBackend(ConverterBackend):
+    """Backend ficticio: duerme la latencia indicada en el archivo y escribe un PDF mínimo."""
+
+    name = "simulado"
+
+    def convert(self, src: Path, dst: Path) -> None:
+        time.sleep(float(src.read_text(encoding="utf-8")))
+        dst.write_bytes(b"%PDF-1.4\n%%EOF\n")
+
+
+def run_single_lock(files: list[Path], out_dir: Path, backend: ConverterBackend) -> float:
+    """Ruta anterior: una instancia protegida por un candado global."""
+    lock = threading.Lock()
+    start = time.perf_counter()
+    for f in files:
+        with lock:
+            backend.convert(f, out_dir / f"{f.stem}.pdf")
+    return time.perf_counter() - start
+
+
+def run_pool(files: list[Path], out_dir: Path, workers: int, spec) -> tuple[float, int]:
+    """Pool de procesos; incluye el arranque de los trabajadores. Devuelve (segundos, fallos)."""
+    start = time.perf_counter()
+    failed = 0
+    with OfficeWorkerPool(workers, backend=spec) as pool:
+        futures = [pool.submit(f, out_dir / f"{f.stem}.pdf") for f in files]
+        for future in futures:
+            try:
+                future.result()
+            except RuntimeError:
+                failed += 1
+    return time.perf_counter() - start, failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=Path, help="Carpeta con .doc/.docx/.xls/.xlsx reales")
+    parser.add_argument("--workers", type=int, default=4, help="Procesos del pool")
+    parser.add_argument("--count", type=int, default=16, help="Documentos simulados")
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="Segundos por documento simulado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.docs:
+            files = sorted(p for p in args.docs.iterdir() if p.suffix.lower() in OFFICE_EXTS)
+            spec = office_backend_name()
+            backend = get_backend(spec)
+        else:
+            files = []
+            for i in range(args.count):
+                f = tmp_dir / f"doc{i:03d}.docx"
+                f.write_text(str(args.latency), encoding="utf-8")
+                files.append(f)
+            spec = SimulatedBackend
+            backend = SimulatedBackend()
+        if not files:
+            print("No hay documentos Office para convertir")
+            return 1
+        label = spec if isinstance(spec, str) else spec.name
+        print(f"{len(files)} documentos, backend {label}, {args.workers} procesos\n")
+
+        (tmp_dir / "single").mkdir()
+        (tmp_dir / "pool").mkdir()
+        try:
+            single = run_single_lock(files, tmp_dir / "single", backend)
+        finally:
+            close_backends()
+        pooled, failed = run_pool(files, tmp_dir / "pool", args.workers, spec)
+
+        print(f"{'Ruta':<14} {'Total s':>8} {'s/doc':>7} {'docs/min':>9}")
+        for name, seconds in (("candado único", single), (f"pool x{args.workers}", pooled)):
+            print(f"{name:<14} {seconds:>8.2f} {seconds / len(files):>7.2f} "
+                  f"{len(files) / seconds * 60:>9.1f}")
+        print(f"\nAceleración: {single / pooled:.2f}x"
+              + (f" ({failed} fallidos en el pool)" if failed else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
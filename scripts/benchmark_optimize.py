@@ -0,0 +1,116 @@
+"""
+Benchmark de la optimización de la unión (``merge.optimize``): tamaño y
+tiempo de escritura con y sin deduplicación/compresión, en ambos modos.
+
+Las entradas imitan exportaciones de Word de un mismo origen: cada PDF
+incrusta el mismo programa de fuente y el mismo membrete (JPEG con perfil
+ICC), y el texto de las páginas va sin comprimir.
+
+Uso:
+    python scripts/benchmark_optimize.py --files 20 --pages 5
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar src al path para importar el paquete
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pdf_consolidator.core import merge_pdfs  # noqa: E402
+from pdf_consolidator.pdfstream import Name, StreamingPdfWriter, serialize  # noqa: E402
+
+
+def make_shared_assets(font_kb: int) -> tuple[bytes, bytes, bytes]:
+    """(programa de fuente, JPEG del membrete, perfil ICC sRGB), iguales en todas las entradas."""
+    from PIL import Image, ImageCms
+
+    icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    buf = io.BytesIO()
+    Image.effect_noise((600, 150), 40).convert("RGB").save(buf, "JPEG", quality=85)
+    return os.urandom(font_kb * 1024), buf.getvalue(), icc
+
+
+def make_word_export(path: Path, pages: int, assets: tuple[bytes, bytes, bytes],
+                     rng: random.Random) -> None:
+    font_program, logo, icc = assets
+    with open(path, "wb") as fp:
+        w = StreamingPdfWriter(fp)
+        font_file, descriptor, font = w.reserve(), w.reserve(), w.reserve()
+        icc_ref, logo_ref = w.reserve(), w.reserve()
+        w.write_stream(font_file, {"Length1": len(font_program)}, font_program)
+        w.write_object(descriptor, serialize({
+            "Type": Name("FontDescriptor"), "FontName": Name("Calibri"), "Flags": 32,
+            "FontBBox": [-503, -250, 1240, 750], "ItalicAngle": 0, "Ascent": 750,
+            "Descent": -250, "CapHeight": 632, "StemV": 80, "FontFile2": font_file}))
+        w.write_object(font, serialize({
+            "Type": Name("Font"), "Subtype": Name("TrueType"), "BaseFont": Name("Calibri"),
+            "FirstChar": 32, "LastChar": 126, "Widths": [500] * 95,
+            "FontDescriptor": descriptor}))
+        w.write_stream(icc_ref, {"N": 3}, icc)
+        w.write_stream(logo_ref, {"Type": Name("XObject"), "Subtype": Name("Image"),
+                                  "Width": 600, "Height": 150, "BitsPerComponent": 8,
+                                  "ColorSpace": [Name("ICCBased"), icc_ref],
+                                  "Filter": Name("DCTDecode")}, logo)
+        for _page in range(pages):
+            lines = [b"q 480 0 0 120 56 700 cm /Logo Do Q", b"BT /F1 11 Tf 56 660 Td 14 TL"]
+            for _ in range(40):
+                words = " ".join("x" * rng.randint(2, 9) for _ in range(rng.randint(6, 12)))
+                lines.append(b"(" + words.encode("ascii") + b") '")
+            lines.append(b"ET")
+            content, page = w.reserve(), w.reserve()
+            w.write_stream(content, {}, b"\n".join(lines))  # sin filtro, como muchos exportadores
+            w.write_object(page, serialize({
+                "Type": Name("Page"), "Parent": w.pages_ref, "MediaBox": [0, 0, 595, 842],
+                "Resources": {"Font": {"F1": font}, "XObject": {"Logo": logo_ref}},
+                "Contents": content}))
+            w.add_page(page)
+        w.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=20, help="PDFs de entrada")
+    parser.add_argument("--pages", type=int, default=5, help="Páginas por PDF")
+    parser.add_argument("--font-kb", type=int, default=300, help="Tamaño del programa de fuente")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se informa la mejor)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        assets = make_shared_assets(args.font_kb)
+        rng = random.Random(1234)
+        inputs = [tmp_dir / f"word{i:03d}.pdf" for i in range(args.files)]
+        for path in inputs:
+            make_word_export(path, args.pages, assets, rng)
+        total_mb = sum(p.stat().st_size for p in inputs) / 1024 / 1024
+        print(f"Entrada: {args.files} PDFs de {args.pages} págs, {total_mb:.1f} MB\n")
+
+        print(f"{'Modo':<10} {'Optimizar':<10} {'Total s':>8} {'Salida MB':>10} {'vs. sin':>8}")
+        for streaming in (False, True):
+            plain_size = None
+            for optimize in (False, True):
+                out = tmp_dir / "final.pdf"
+                seconds = min(_timed(merge_pdfs, inputs, out, streaming, optimize)
+                              for _ in range(args.repeat))
+                size = out.stat().st_size
+                plain_size = plain_size or size
+                mode = "streaming" if streaming else "memoria"
+                print(f"{mode:<10} {'sí' if optimize else 'no':<10} {seconds:>8.2f} "
+                      f"{size / 1024 / 1024:>10.2f} {size / plain_size - 1:>+8.0%}")
+    return 0
+
+
+def _timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sys.exit(main())
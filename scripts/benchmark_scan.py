@@ -0,0 +1,78 @@
+"""
+Benchmark del escaneo de la carpeta de entrada: ``iterdir()`` + ``is_file()``
++ ``stat()`` (implementación anterior) contra ``scanner.DirectoryScanner``
+en frío y desde la caché.
+
+Uso:
+    python scripts/benchmark_scan.py --files 10000
+    python scripts/benchmark_scan.py --dir //servidor/share/ARCHIVOS   # carpeta real
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar src al path para importar el paquete
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pdf_consolidator.core import ALLOWED_EXTS, EXCLUDED_FILES  # noqa: E402
+from pdf_consolidator.scanner import DirectoryScanner  # noqa: E402
+
+EXTS = (".pdf", ".docx", ".xlsx", ".jpg", ".png", ".tif", ".txt")
+
+
+def legacy_scan(folder: Path) -> list[tuple[Path, int]]:
+    """La implementación anterior, más el stat que hacía quien necesitaba el tamaño."""
+    files = [f for f in folder.iterdir()
+             if f.is_file() and f.suffix.lower() in ALLOWED_EXTS and f.name not in EXCLUDED_FILES]
+    files.sort(key=lambda p: p.name.lower())
+    return [(f, f.stat().st_size) for f in files]
+
+
+def make_folder(root: Path, count: int) -> Path:
+    folder = root / "entrada"
+    folder.mkdir()
+    for i in range(count):
+        (folder / f"doc{i:05d}{EXTS[i % len(EXTS)]}").write_bytes(b"%PDF")
+    return folder
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=10_000, help="Archivos a generar")
+    parser.add_argument("--dir", type=Path, default=None, help="Medir una carpeta existente")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones (se informa la mediana)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.dir or make_folder(Path(tmp), args.files)
+        expected = [p for p, _ in legacy_scan(folder)]
+        scanner = DirectoryScanner(clock=lambda: time.time() + 60)  # sin ventana de mtime reciente
+        assert [f.path for f in scanner.scan(folder)] == expected
+
+        legacy = _time(lambda: legacy_scan(folder), args.repeat)
+        cold = _time(lambda: (scanner.invalidate(), scanner.scan(folder)), args.repeat)
+        cached = _time(lambda: scanner.scan(folder), args.repeat)
+
+        print(f"Carpeta: {folder} ({len(expected)} archivos admitidos)\n")
+        print(f"{'Variante':<22} {'ms':>9} {'vs. anterior':>13}")
+        for label, seconds in (("iterdir + stat", legacy), ("scandir (frío)", cold),
+                               ("scandir (caché)", cached)):
+            print(f"{label:<22} {seconds * 1000:>9.1f} {legacy / seconds:>12.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark de arranque: tiempo de importación de la interfaz (``main.py``)
+medido con ``python -X importtime`` en un proceso nuevo.
+
+Informa el total, los módulos más caros y los módulos pesados (pypdf,
+img2pdf, PIL, pikepdf, pywin32) que se cargaron antes de abrir la ventana.
+Con ``--budget-ms`` termina con código 1 si el arranque supera el
+presupuesto o si se importó algún módulo pesado (útil en CI).
+
+Uso:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --budget-ms 150 --repeat 5
+    python scripts/benchmark_startup.py --module pdf_consolidator.core
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ("pypdf", "img2pdf", "PIL", "pikepdf", "win32com", "pythoncom")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str) -> dict[str, tuple[int, int]]:
+    """Importa ``module`` en un proceso nuevo; devuelve {módulo: (propio_us, acumulado_us)}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import sys; sys.path.insert(0, {str(ROOT / 'src')!r}); import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, cumulative, _, name = match.groups()
+            times[name] = (int(own), int(cumulative))
+    return times
+
+
+def heavy_imports(times: dict[str, tuple[int, int]]) -> list[str]:
+    """Módulos pesados de primer nivel que aparecen en la importación."""
+    return sorted({name.split(".")[0] for name in times} & set(HEAVY_MODULES))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="main", help="Módulo a importar (por defecto la interfaz)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se informa la mediana)")
+    parser.add_argument("--top", type=int, default=10, help="Módulos más caros a listar")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Falla (código 1) si el arranque supera este tiempo")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(max(1, args.repeat))]
+    totals = [run[args.module][1] / 1000 for run in runs]
+    total = statistics.median(totals)
+    times = min(runs, key=lambda run: abs(run[args.module][1] / 1000 - total))
+
+    print(f"Importar {args.module}: {total:.1f} ms (mediana de {len(runs)})\n")
+    print(f"{'Módulo':<40} {'propio ms':>10} {'acum. ms':>10}")
+    ranked = sorted(times.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (own, cumulative) in ranked[:args.top]:
+        print(f"{name:<40} {own / 1000:>10.1f} {cumulative / 1000:>10.1f}")
+
+    heavy = heavy_imports(times)
+    if heavy:
+        print(f"\nMódulos pesados cargados al arrancar: {', '.join(heavy)}")
+
+    if args.budget_ms is not None:
+        if total > args.budget_ms or heavy:
+            print(f"\nFUERA DE PRESUPUESTO: {total:.1f} ms (límite {args.budget_ms:.0f} ms)")
+            return 1
+        print(f"\nDentro del presupuesto ({args.budget_ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark de conversión TIFF -> PDF: implementación anterior (todos los frames
+en memoria como RGB) frente a la conversión en streaming.
+
+Cada variante se ejecuta en un proceso aparte para medir su pico de RSS sin
+interferencias. Si no se indica un TIFF, se genera un fax sintético bilevel
+comprimido con CCITT Group 4.
+
+Uso:
+    python scripts/benchmark_tiff.py --pages 200
+    python scripts/benchmark_tiff.py --tiff ruta/al/archivo.tif
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar src al path para importar el paquete
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+def peak_rss_mb() -> float | None:
+    """Pico de memoria residente del proceso actual en MB (None si no se puede medir)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KB; macOS reporta bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil  # opcional en Windows
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except Exception:
+            return None
+
+
+def legacy_convert(src: Path, dst_pdf: Path) -> int:
+    """Implementación anterior: todos los frames como RGB y un único save_all."""
+    from PIL import Image
+    frames = []
+    im = Image.open(src)
+    try:
+        while True:
+            frames.append(im.convert("RGB").copy())
+            im.seek(im.tell() + 1)
+    except EOFError:
+        pass
+    frames[0].save(dst_pdf, save_all=True, append_images=frames[1:])
+    return len(frames)
+
+
+def streaming_convert(src: Path, dst_pdf: Path) -> int:
+    from pdf_consolidator.tiff import convert_tiff_to_pdf
+    return convert_tiff_to_pdf(src, dst_pdf)
+
+
+VARIANTS = {"anterior": legacy_convert, "streaming": streaming_convert}
+
+
+def _run_variant(name: str, src: Path, dst: Path, queue) -> None:
+    import PIL.Image  # noqa: F401  (importar antes de medir la base)
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    pages = VARIANTS[name](src, dst)
+    seconds = time.perf_counter() - start
+    queue.put((seconds, pages, base, peak_rss_mb(), dst.stat().st_size))
+
+
+def make_fax_tiff(path: Path, pages: int, width: int = 1728, height: int = 2200) -> None:
+    """Genera un TIFF multipágina bilevel (G4, 204x196 dpi) con contenido determinista."""
+    from PIL import Image, ImageDraw, TiffImagePlugin
+
+    # Una sola tira por página, como los TIFF de los servidores de fax
+    TiffImagePlugin.STRIP_SIZE = (width + 7) // 8 * height
+
+    def frames():
+        for i in range(pages):
+            im = Image.new("1", (width, height), 1)
+            draw = ImageDraw.Draw(im)
+            for row in range(40, height - 40, 48):
+                length = 200 + (row * 7 + i * 13) % (width - 400)
+                draw.rectangle((80, row, 80 + length, row + 18), fill=0)
+            yield im
+
+    it = frames()
+    first = next(it)
+    first.save(path, save_all=True, append_images=it, compression="group4", dpi=(204, 196))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiff", type=Path, help="TIFF a convertir (por defecto, uno sintético)")
+    parser.add_argument("--pages", type=int, default=100, help="Páginas del TIFF sintético")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        ctx = multiprocessing.get_context("spawn")
+        src = args.tiff
+        if src is None:
+            src = tmp_dir / "fax.tif"
+            print(f"Generando TIFF sintético de {args.pages} páginas...")
+            # En otro proceso: el pico de RSS del padre se heredaría en los hijos
+            proc = ctx.Process(target=make_fax_tiff, args=(src, args.pages))
+            proc.start()
+            proc.join()
+        print(f"Entrada: {src.name} ({src.stat().st_size / 1024 / 1024:.1f} MB)\n")
+
+        print(f"{'Variante':<10} {'Págs':>5} {'Total s':>8} {'s/pág':>8} "
+              f"{'Pico RSS MB':>12} {'Δ RSS MB':>9} {'Salida MB':>10}")
+        for name in VARIANTS:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run_variant,
+                               args=(name, src, tmp_dir / f"{name}.pdf", queue))
+            proc.start()
+            seconds, pages, base, peak, size = queue.get()
+            proc.join()
+            delta = f"{peak - base:9.1f}" if peak is not None and base is not None else "      n/d"
+            peak_txt = f"{peak:12.1f}" if peak is not None else "         n/d"
+            print(f"{name:<10} {pages:>5} {seconds:>8.2f} {seconds / pages:>8.4f} "
+                  f"{peak_txt} {delta} {size / 1024 / 1024:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
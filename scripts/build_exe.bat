@@ -49,7 +49,7 @@ if not exist "assets\icon.ico" (
 REM Generar ejecutable incluyendo assets y VERSION
 echo 🔨 Generando ejecutable...
 echo.
-pyinstaller --onefile --windowed %ICON_ARG% --add-data "assets;assets" --add-data "VERSION;." --name="PDFConsolidator" main.py
+pyinstaller --onefile --windowed %ICON_ARG% --paths src --add-data "assets;assets" --add-data "VERSION;." --name="PDFConsolidator" main.py
 
 if errorlevel 1 (
     echo ❌ ERROR: No se pudo generar el ejecutable
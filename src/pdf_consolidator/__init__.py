@@ -9,8 +9,36 @@ __version__ = "1.2.0"
 __author__ = "La Ascensión S.A"
 __email__ = "edwin.clavijo@laascension.com"
 
-from .main import main
-from .converter import DocumentConverter
-from .gui import ConsolidatorGUI
+from typing import Any
 
-__all__ = ["main", "DocumentConverter", "ConsolidatorGUI"]
\ No newline at end of file
+from .main import main  # liviano: los subcomandos importan lo que usan
+
+# El resto se importa al pedir el nombre (PEP 562): ``import pdf_consolidator``
+# no carga pypdf, img2pdf ni los pools de conversión
+_EXPORTS = {
+    "convert_to_pdf": "core",
+    "merge_pdfs": "core",
+    "list_input_files": "core",
+    "final_pdf_name": "core",
+    "BatchCase": "batch",
+    "CaseResult": "batch",
+    "load_manifest": "batch",
+    "run_batch": "batch",
+    "WatchDaemon": "watch",
+}
+
+__all__ = ["main", *_EXPORTS]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,7 @@
+"""Permite ejecutar ``python -m pdf_consolidator``."""
+
+import sys
+
+from .main import main
+
+sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Caché en disco de los recursos gráficos de la interfaz.
+
+El icono de la ventana se recorta de un logo WebP de 300x195: abrirlo y
+reducirlo con PIL en cada arranque carga Pillow entero solo para eso. Aquí se
+reduce una vez y se guarda un PNG que Tk abre directamente con ``PhotoImage``.
+
+La clave es el contenido del original (no su mtime): el ejecutable de
+PyInstaller ``--onefile`` extrae los recursos a una carpeta nueva en cada
+arranque, con mtime nuevo, y una clave por mtime no acertaría nunca.
+"""
+
+import hashlib
+from pathlib import Path
+
+from .core import CACHE_DIR, logger
+
+ASSET_CACHE_DIR = CACHE_DIR / "assets"
+
+
+def cached_icon(src: Path, size: tuple[int, int] = (32, 32),
+                cache_dir: Path = ASSET_CACHE_DIR) -> Path:
+    """
+    PNG de ``src`` reducido a ``size``; solo usa PIL la primera vez.
+
+    Returns:
+        Ruta del PNG en caché (versiones anteriores del mismo recurso se borran)
+    """
+    digest = hashlib.sha1(src.read_bytes()).hexdigest()[:16]
+    width, height = size
+    prefix = f"{src.stem}_{width}x{height}_"
+    cached = cache_dir / f"{prefix}{digest}.png"
+    if cached.exists():
+        return cached
+
+    from PIL import Image  # import local: solo si hace falta
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with Image.open(src) as image:
+        icon = image.convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+    tmp = cached.with_suffix(".tmp")
+    icon.save(tmp, "PNG")
+    tmp.replace(cached)
+    for stale in cache_dir.glob(f"{prefix}*.png"):
+        if stale != cached:
+            stale.unlink(missing_ok=True)
+    logger.info(f"Icono generado en caché: {cached.name}")
+    return cached
@@ -0,0 +1,473 @@
+"""
+Backends de conversión a PDF.
+
+``convert_to_pdf`` delega en el backend registrado para cada tipo de archivo:
+
+- ``image``: Pillow/img2pdf (TIFF en streaming).
+- ``office-com``: Microsoft Word/Excel vía COM (solo Windows).
+- ``libreoffice``: LibreOffice sin interfaz, con un proceso ``soffice``
+  escuchando por socket UNO que se mantiene vivo entre archivos, de modo que
+  el arranque de varios segundos se paga una sola vez.
+
+El backend de documentos Office se elige en ``app_config.json``::
+
+    "conversion": {"office_backend": "auto" | "office-com" | "libreoffice",
+                   "libreoffice_path": ""}
+
+Con ``auto`` se usa COM si pywin32 está disponible y LibreOffice en otro caso.
+Los documentos Office que se convierten en el proceso principal pasan por un
+``warm.WarmConverter`` (que vigila su tiempo máximo, ver ``watchdog``): con
+``conversion.office_keep_warm`` la instancia queda abierta entre ejecuciones;
+sin él se cierra en cuanto queda sin uso.
+"""
+
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .core import (
+    EXCEL_EXTS, HAS_WIN32, IMAGE_EXTS, PDF_EXTS, WORD_EXTS,
+    cleanup_office_instances, convert_excel_to_pdf, convert_image_to_pdf,
+    convert_word_to_pdf, get_config, get_excel_instance, get_word_instance, logger,
+    office_instances_alive, office_process_ids,
+)
+
+OFFICE_EXTS = WORD_EXTS | EXCEL_EXTS
+
+# Filtros de exportación PDF de LibreOffice según la aplicación que abre el archivo
+LO_PDF_FILTERS = {**{ext: "writer_pdf_Export" for ext in WORD_EXTS},
+                  **{ext: "calc_pdf_Export" for ext in EXCEL_EXTS}}
+
+LO_START_TIMEOUT_S = 60       # espera máxima a que soffice acepte conexiones
+LO_CONVERT_TIMEOUT_S = 300    # solo para el modo ``--convert-to`` sin UNO
+LO_WINDOWS_PATHS = (
+    Path(r"C:\Program Files\LibreOffice\program\soffice.exe"),
+    Path(r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"),
+)
+
+
+# =============================
+# Estadísticas por backend
+# =============================
+@dataclass
+class BackendStats:
+    """Tiempos acumulados de conversión de un backend."""
+    conversions: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        total = self.conversions + self.failures
+        return self.seconds / total if total else 0.0
+
+
+_stats: dict[str, BackendStats] = {}
+_stats_lock = threading.Lock()
+
+
+def record_conversion(backend: str, seconds: float, ok: bool) -> None:
+    """Suma una conversión a las estadísticas de ``backend``."""
+    with _stats_lock:
+        stats = _stats.setdefault(backend, BackendStats())
+        stats.seconds += seconds
+        if ok:
+            stats.conversions += 1
+        else:
+            stats.failures += 1
+
+
+def backend_stats() -> dict[str, BackendStats]:
+    """Copia de las estadísticas acumuladas en este proceso."""
+    with _stats_lock:
+        return {name: BackendStats(s.conversions, s.failures, s.seconds)
+                for name, s in _stats.items()}
+
+
+def reset_backend_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def format_backend_stats(stats: dict[str, BackendStats]) -> str:
+    """Una línea por backend: conversiones, fallos, tiempo total y promedio."""
+    return "\n".join(
+        f"Backend {name}: {s.conversions} conversiones, {s.failures} fallidas, "
+        f"{s.seconds:.2f}s ({s.avg_seconds:.2f}s/archivo)"
+        for name, s in sorted(stats.items())
+    )
+
+
+# =============================
+# Registro de backends
+# =============================
+class ConverterBackend:
+    """Interfaz de un backend: convierte ``src`` en el PDF ``dst``."""
+
+    name = ""
+    extensions: set[str] = set()
+
+    def available(self) -> bool:
+        return True
+
+    def convert(self, src: Path, dst: Path) -> None:
+        raise NotImplementedError
+
+    def start(self, extensions: set[str]) -> None:
+        """Arranca por adelantado lo necesario para convertir ``extensions`` (precalentado)."""
+
+    def healthy(self) -> bool:
+        """Si lo que el backend mantiene abierto sigue respondiendo."""
+        return True
+
+    def process_ids(self) -> list[int]:
+        """
+        Procesos externos que el backend tiene abiertos tras ``start``, para
+        terminarlos si una conversión se cuelga (ver ``watchdog``).
+        """
+        return []
+
+    def close(self) -> None:
+        """Libera procesos o instancias que el backend mantenga abiertos."""
+
+
+_BACKENDS: dict[str, type[ConverterBackend]] = {}
+_instances: dict[str, ConverterBackend] = {}
+_instances_lock = threading.Lock()
+
+
+def register_backend(cls: type[ConverterBackend]) -> type[ConverterBackend]:
+    """Decorador: registra ``cls`` con su ``name``."""
+    _BACKENDS[cls.name] = cls
+    return cls
+
+
+def create_backend(name: str) -> ConverterBackend:
+    """Instancia nueva, no compartida, del backend ``name``."""
+    if name not in _BACKENDS:
+        raise RuntimeError(f"Backend de conversión desconocido: {name}")
+    return _BACKENDS[name]()
+
+
+def get_backend(name: str) -> ConverterBackend:
+    """Instancia compartida (por proceso) del backend ``name``."""
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = create_backend(name)
+        return backend
+
+
+def office_backend_name() -> str:
+    """Backend configurado para Word/Excel (resuelve ``auto``)."""
+    name = get_config("conversion", "office_backend", "auto")
+    if name == "auto":
+        return "office-com" if HAS_WIN32 else "libreoffice"
+    return str(name)
+
+
+def backend_name_for(src: Path) -> str:
+    """Nombre del backend que convierte ``src`` (``pdf`` para PDFs nativos)."""
+    ext = src.suffix.lower()
+    if ext in PDF_EXTS:
+        return "pdf"
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in OFFICE_EXTS:
+        return office_backend_name()
+    raise RuntimeError(f"Extensión no soportada: {ext}")
+
+
+def backend_for(src: Path) -> ConverterBackend:
+    name = backend_name_for(src)
+    if src.suffix.lower() in OFFICE_EXTS:
+        from .warm import cold_converter, keep_warm, warm_converter  # import local: evita el ciclo
+        return warm_converter(name) if keep_warm() else cold_converter(name)
+    return get_backend(name)
+
+
+def close_backends() -> None:
+    """Cierra todas las instancias abiertas en este proceso (también las precalentadas)."""
+    from .warm import shutdown_warm  # import local: evita el ciclo
+    shutdown_warm()
+    with _instances_lock:
+        instances = list(_instances.values())
+        _instances.clear()
+    for backend in instances:
+        try:
+            backend.close()
+        except Exception as e:
+            logger.warning(f"Error cerrando backend {backend.name}: {e}")
+
+
+# =============================
+# Backends incluidos
+# =============================
+@register_backend
+class ImageBackend(ConverterBackend):
+    name = "image"
+    extensions = IMAGE_EXTS
+
+    def convert(self, src: Path, dst: Path) -> None:
+        convert_image_to_pdf(src, dst)
+
+
+@register_backend
+class OfficeComBackend(ConverterBackend):
+    """Microsoft Word/Excel vía COM, con una instancia reutilizable por aplicación."""
+
+    name = "office-com"
+    extensions = OFFICE_EXTS
+
+    def __init__(self) -> None:
+        self._pids: list[int] = []  # se leen desde otro hilo: las instancias COM son por hilo
+
+    def available(self) -> bool:
+        return HAS_WIN32
+
+    def convert(self, src: Path, dst: Path) -> None:
+        if src.suffix.lower() in WORD_EXTS:
+            convert_word_to_pdf(src, dst)
+        else:
+            convert_excel_to_pdf(src, dst)
+
+    def start(self, extensions: set[str]) -> None:
+        if extensions & WORD_EXTS:
+            get_word_instance()
+        if extensions & EXCEL_EXTS:
+            get_excel_instance()
+        self._pids = office_process_ids()
+
+    def healthy(self) -> bool:
+        return office_instances_alive()
+
+    def process_ids(self) -> list[int]:
+        return list(self._pids)
+
+    def close(self) -> None:
+        cleanup_office_instances()
+        self._pids = []
+
+
+def find_soffice() -> str | None:
+    """Ruta del ejecutable de LibreOffice (config, PATH o instalación estándar)."""
+    configured = get_config("conversion", "libreoffice_path", "")
+    if configured:
+        return configured if Path(configured).exists() else None
+    for name in ("soffice", "libreoffice"):
+        found = shutil.which(name)
+        if found:
+            return found
+    for path in LO_WINDOWS_PATHS:
+        if path.exists():
+            return str(path)
+    return None
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _props(**values: object) -> tuple[Any, ...]:
+    import uno  # type: ignore[import-not-found]
+    props = []
+    for name, value in values.items():
+        prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        prop.Name, prop.Value = name, value
+        props.append(prop)
+    return tuple(props)
+
+
+class SofficeListener:
+    """
+    Un proceso ``soffice --headless`` con perfil propio, escuchando por socket UNO.
+
+    Cada documento se abre, exporta y cierra dentro del mismo proceso, sin
+    volver a pagar el arranque de LibreOffice.
+    """
+
+    def __init__(self, binary: str, profile_dir: Path):
+        self.binary = binary
+        self.profile_dir = profile_dir
+        self.port = 0
+        self._proc: subprocess.Popen | None = None
+        self._desktop: Any = None  # com.sun.star.frame.Desktop, vía UNO
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    @property
+    def pid(self) -> int | None:
+        return self._proc.pid if self._proc is not None else None
+
+    def start(self) -> None:
+        import uno
+        from com.sun.star.connection import NoConnectException  # type: ignore[import-not-found]
+
+        self.port = _free_port()
+        accept = f"socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+        start = time.perf_counter()
+        self._proc = subprocess.Popen(
+            [self.binary, "--headless", "--invisible", "--nologo", "--norestore",
+             "--nodefault", "--nolockcheck",
+             f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+             f"--accept={accept}"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local)
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:{accept}")
+                break
+            except NoConnectException:
+                if not self.alive() or time.perf_counter() - start > LO_START_TIMEOUT_S:
+                    self.stop()
+                    raise RuntimeError("LibreOffice no aceptó conexiones UNO a tiempo")
+                time.sleep(0.25)
+        self._desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx)
+        logger.info(f"LibreOffice iniciado en {time.perf_counter() - start:.2f}s "
+                    f"(puerto {self.port}, pid {self._proc.pid})")
+
+    def convert(self, src: Path, dst: Path) -> None:
+        doc = self._desktop.loadComponentFromURL(
+            src.resolve().as_uri(), "_blank", 0, _props(Hidden=True, ReadOnly=True))
+        if doc is None:
+            raise RuntimeError(f"LibreOffice no pudo abrir {src.name}")
+        try:
+            doc.storeToURL(dst.resolve().as_uri(),
+                           _props(FilterName=LO_PDF_FILTERS[src.suffix.lower()]))
+        finally:
+            doc.close(True)
+
+    def stop(self) -> None:
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass  # el proceso ya no responde; se termina abajo
+            self._desktop = None
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+            self._proc = None
+
+
+@register_backend
+class LibreOfficeBackend(ConverterBackend):
+    """
+    LibreOffice sin interfaz.
+
+    Con el módulo ``uno`` (el Python de LibreOffice o el paquete
+    ``python3-uno``) mantiene un ``SofficeListener`` vivo entre archivos y lo
+    reinicia si muere. Sin ``uno`` recurre a ``soffice --convert-to`` por
+    archivo, reutilizando al menos el mismo perfil.
+    """
+
+    name = "libreoffice"
+    extensions = OFFICE_EXTS
+
+    def __init__(self, binary: str | None = None, profile_dir: Path | None = None):
+        self.binary = binary or find_soffice()
+        self._own_profile = profile_dir is None
+        self.profile_dir = profile_dir or Path(tempfile.mkdtemp(prefix="lo_profile_"))
+        self._listener: SofficeListener | None = None
+        self._lock = threading.Lock()
+        try:
+            import uno  # noqa: F401
+            self.has_uno = True
+        except ImportError:
+            self.has_uno = False
+        atexit.register(self.close)
+
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def convert(self, src: Path, dst: Path) -> None:
+        self._soffice()  # falla antes de tomar el candado si no hay LibreOffice
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Iniciando conversión LibreOffice -> PDF: {src.name}")
+        with self._lock:  # un proceso soffice atiende un documento a la vez
+            if self.has_uno:
+                self._convert_uno(src, dst)
+            else:
+                self._convert_cli(src, dst)
+        logger.info(f"LibreOffice -> PDF completado: {dst.name}")
+
+    def start(self, extensions: set[str]) -> None:
+        if self.available() and self.has_uno:
+            with self._lock:
+                self._ensure_listener()
+
+    def healthy(self) -> bool:
+        return self._listener is None or self._listener.alive()
+
+    def process_ids(self) -> list[int]:
+        listener = self._listener
+        pid = listener.pid if listener is not None and listener.alive() else None
+        return [pid] if pid is not None else []
+
+    def _soffice(self) -> str:
+        if self.binary is None:
+            raise RuntimeError("Conversión de documentos Office requiere LibreOffice "
+                               "(soffice no encontrado; configure conversion.libreoffice_path).")
+        return self.binary
+
+    def _ensure_listener(self) -> SofficeListener:
+        listener = self._listener
+        if listener is None or not listener.alive():
+            if listener is not None:
+                logger.warning("El proceso de LibreOffice terminó; reiniciando")
+                listener.stop()
+            listener = self._listener = SofficeListener(self._soffice(), self.profile_dir)
+            listener.start()
+        return listener
+
+    def _convert_uno(self, src: Path, dst: Path) -> None:
+        listener = self._ensure_listener()
+        try:
+            listener.convert(src, dst)
+        except Exception:
+            if not listener.alive():
+                self._listener = None  # se reinicia en el próximo archivo
+            raise
+
+    def _convert_cli(self, src: Path, dst: Path) -> None:
+        out_dir = Path(tempfile.mkdtemp(prefix="lo_out_", dir=dst.parent))
+        try:
+            proc = subprocess.run(
+                [self._soffice(), "--headless", "--norestore", "--nolockcheck",
+                 f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+                 "--convert-to", "pdf", "--outdir", str(out_dir), str(src.resolve())],
+                stdin=subprocess.DEVNULL, capture_output=True, timeout=LO_CONVERT_TIMEOUT_S,
+            )
+            produced = out_dir / f"{src.stem}.pdf"
+            if not produced.exists():
+                detail = proc.stderr.decode(errors="replace").strip()
+                raise RuntimeError(f"LibreOffice no generó PDF para {src.name}: {detail}")
+            os.replace(produced, dst)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+            if self._own_profile:
+                shutil.rmtree(self.profile_dir, ignore_errors=True)
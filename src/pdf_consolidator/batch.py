@@ -0,0 +1,213 @@
+"""
+Procesamiento por lotes (sin interfaz gráfica) a partir de un manifiesto.
+
+El manifiesto puede ser CSV (con encabezado) o JSONL (un objeto por línea) y
+cada caso debe declarar ``ident``, ``cliente``, ``reembolso`` y ``carpeta``
+(carpeta con los documentos del caso; si es relativa, se resuelve respecto
+al manifiesto).
+"""
+
+import csv
+import json
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .cache import ConversionCache
+from .core import OUTPUT_DIR, TEMP_DIR, logger, final_pdf_name
+from .engine import ConversionEngine
+from .journal import JobJournal
+from .metrics import export_configured, run_context, span
+from .pipeline import NothingConverted, consolidate
+from .profiling import profile_stage
+from .scanner import scan_inputs
+from .watchdog import timeout_reason
+
+MANIFEST_FIELDS = ("ident", "cliente", "reembolso", "carpeta")
+
+
+@dataclass
+class BatchCase:
+    """Un caso del manifiesto: metadatos del PDF final y carpeta de entrada."""
+    ident: str
+    cliente: str
+    reembolso: str
+    carpeta: Path
+
+    @property
+    def output_name(self) -> str:
+        return final_pdf_name(self.ident, self.cliente, self.reembolso)
+
+    def as_meta(self) -> dict[str, str]:
+        """Metadatos para la bitácora del trabajo (permiten reanudarlo luego)."""
+        return {"ident": self.ident, "cliente": self.cliente, "reembolso": self.reembolso,
+                "carpeta": str(self.carpeta)}
+
+    @classmethod
+    def from_meta(cls, meta: dict[str, str]) -> "BatchCase":
+        return cls(meta["ident"], meta["cliente"], meta["reembolso"], Path(meta["carpeta"]))
+
+
+@dataclass
+class CaseResult:
+    """Resultado de consolidar un caso."""
+    case: BatchCase
+    output: Path | None = None
+    files: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    failed_files: list[str] = field(default_factory=list)
+    rejected: dict[str, str] = field(default_factory=dict)  # archivo -> motivo (validación o tiempo)
+    error: str = ""
+    work_dir: Path | None = None  # carpeta conservada para reanudar (None si se limpió)
+
+    @property
+    def ok(self) -> bool:
+        return self.output is not None and not self.error
+
+
+def _case_from_record(record: dict, base_dir: Path, line: int) -> BatchCase:
+    missing = [k for k in MANIFEST_FIELDS if not str(record.get(k) or "").strip()]
+    if missing:
+        raise ValueError(f"Línea {line} del manifiesto: faltan campos {', '.join(missing)}")
+    carpeta = Path(str(record["carpeta"]).strip())
+    if not carpeta.is_absolute():
+        carpeta = base_dir / carpeta
+    return BatchCase(
+        ident=str(record["ident"]).strip(),
+        cliente=str(record["cliente"]).strip(),
+        reembolso=str(record["reembolso"]).strip(),
+        carpeta=carpeta,
+    )
+
+
+def load_manifest(path: Path) -> list[BatchCase]:
+    """
+    Lee un manifiesto CSV o JSONL y devuelve los casos en el orden del archivo.
+
+    Raises:
+        ValueError: Si el formato no es soportado o falta algún campo obligatorio
+    """
+    base_dir = path.parent
+    cases: list[BatchCase] = []
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    cases.append(_case_from_record(json.loads(line), base_dir, line_no))
+    elif path.suffix.lower() == ".csv":
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                cases.append(_case_from_record(row, base_dir, line_no))
+    else:
+        raise ValueError(f"Formato de manifiesto no soportado: {path.suffix} (use .csv o .jsonl)")
+    return cases
+
+
+def run_case(case: BatchCase, output_dir: Path, work_dir: Path,
+             engine: ConversionEngine) -> CaseResult:
+    """Convierte y une los documentos de un caso usando su propia carpeta temporal."""
+    result = CaseResult(case=case)
+    start = time.perf_counter()
+    with run_context(), span("case", case=case.output_name) as case_span:
+        _run_case(case, result, output_dir, work_dir, engine)
+        case_span.ok = result.ok
+        case_span.pages = result.pages
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _run_case(case: BatchCase, result: CaseResult, output_dir: Path, work_dir: Path,
+              engine: ConversionEngine) -> None:
+    files: list[Path] = []
+    journal = JobJournal(work_dir)
+    started = time.monotonic()  # solo cuentan los tiempos agotados de este caso
+    try:
+        with span("scan") as s, profile_stage("scan", case.output_name):
+            scanned = scan_inputs(case.carpeta)
+            files = [f.path for f in scanned]
+            s.bytes_in = sum(f.size for f in scanned)
+        result.files = len(files)
+        if not files:
+            raise RuntimeError(f"Sin archivos admitidos en {case.carpeta}")
+
+        work_dir.mkdir(parents=True, exist_ok=True)
+        out_path = output_dir / case.output_name
+        journal.start(files, out_path, case.as_meta())
+
+        def on_reject(_: int, f: Path, reason: str) -> None:
+            result.rejected[f.name] = reason
+
+        result.pages, failed = consolidate(engine, files, work_dir, out_path,
+                                           on_reject=on_reject, journal=journal)
+        result.failed_files = [f.name for f in failed]
+        for f in failed:
+            reason = timeout_reason(f, started)
+            if reason:
+                result.rejected.setdefault(f.name, reason)
+        result.output = out_path
+    except NothingConverted as e:
+        logger.error(f"Caso {case.output_name} fallido: {e}")
+        result.failed_files = [f.name for f in files]
+        result.error = str(e)
+    except Exception as e:
+        logger.exception(f"Caso {case.output_name} fallido: {e}")
+        result.error = str(e)
+    finally:
+        with span("cleanup"):
+            if journal.resumable:
+                result.work_dir = work_dir
+                logger.info(f"Trabajo conservado para reanudar: {work_dir}")
+            else:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_batch(cases: Iterable[BatchCase], output_dir: Path = OUTPUT_DIR,
+              temp_dir: Path = TEMP_DIR, workers: int | None = None,
+              on_result: Callable[[CaseResult], None] | None = None,
+              cache: ConversionCache | None = None,
+              max_jobs: int | None = None, resume: bool = False) -> list[CaseResult]:
+    """
+    Procesa los casos y devuelve los resultados en el orden del manifiesto.
+
+    Hasta ``max_jobs`` casos corren a la vez (por defecto ``jobs.max_concurrent``),
+    cada uno en su propia carpeta de trabajo, compartiendo un único pool de
+    ``workers`` procesos y la caché, si se indica. ``on_result`` se invoca al
+    terminar cada caso, en el orden en que terminan. Con ``resume``, los casos
+    con un trabajo interrumpido solo convierten los archivos fallidos o faltantes.
+    """
+    from .scheduler import JobScheduler  # import local: evita el ciclo
+
+    with JobScheduler(max_jobs, output_dir, temp_dir, workers, cache,
+                      resume=resume) as scheduler:
+        futures = [scheduler.submit(case, on_result) for case in cases]
+        results = [future.result() for future in futures]
+    export_configured()
+    return results
+
+
+def format_case_line(result: CaseResult) -> str:
+    """Línea de resumen por caso: estado, páginas, tiempo y páginas/s."""
+    status = "OK  " if result.ok else "FAIL"
+    rate = result.pages / result.seconds if result.seconds > 0 else 0.0
+    line = (f"[{status}] {result.case.output_name}: {result.files} archivos, "
+            f"{result.pages} págs, {result.seconds:.2f}s ({rate:.1f} págs/s)")
+    if result.failed_files:
+        failed = (f"{name} ({result.rejected[name]})" if name in result.rejected else name
+                  for name in result.failed_files)
+        line += f" | fallidos: {', '.join(failed)}"
+    if result.error:
+        line += f" | error: {result.error}"
+    return line
+
+
+def format_summary(results: list[CaseResult], elapsed: float) -> str:
+    """Resumen agregado del lote: casos/min y páginas/s sobre el tiempo total."""
+    ok = sum(1 for r in results if r.ok)
+    pages = sum(r.pages for r in results)
+    cases_per_min = len(results) / elapsed * 60 if elapsed > 0 else 0.0
+    pages_per_s = pages / elapsed if elapsed > 0 else 0.0
+    return (f"Casos: {ok}/{len(results)} OK | Páginas: {pages} | Tiempo: {elapsed:.2f}s | "
+            f"{cases_per_min:.1f} casos/min | {pages_per_s:.1f} págs/s")
@@ -0,0 +1,220 @@
+"""
+Caché persistente de conversiones, direccionada por contenido.
+
+La clave es el SHA-256 del archivo de origen más el identificador del
+convertidor (backend + versión), de modo que un mismo documento se convierte una
+sola vez aunque llegue con otro nombre o en otro caso. El tamaño total está
+acotado y se desalojan primero las entradas usadas hace más tiempo (LRU, según
+la fecha de modificación que se actualiza en cada acierto).
+
+Estructura en disco::
+
+    cache/
+    ├── objects/ab/abcdef....pdf
+    └── stats.json            # contadores acumulados
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+from .backends import backend_name_for
+from .core import (
+    CACHE_DIR, EXCEL_EXTS, IMAGE_EXTS, WORD_EXTS,
+    get_config, link_or_copy, logger,
+)
+from .handoff import MemoryPdf
+
+# Incrementar cuando cambie la salida de algún convertidor para invalidar la caché
+CONVERTER_VERSION = "1"
+
+# Los PDF nativos no se convierten, así que no se guardan en caché
+CACHEABLE_EXTS = IMAGE_EXTS | WORD_EXTS | EXCEL_EXTS
+
+DEFAULT_MAX_SIZE_MB = 500
+_HASH_CHUNK = 1024 * 1024
+
+
+def converter_id(src: Path) -> str:
+    """Identificador del convertidor que procesa ``src`` (backend + versión, forma parte de la clave)."""
+    backend = backend_name_for(src)
+    if backend == "image":
+        from .imaging import image_policy
+        return f"{backend}/{CONVERTER_VERSION}/{image_policy().cache_tag}"
+    return f"{backend}/{CONVERTER_VERSION}"
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso de la caché."""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ConversionCache:
+    """Caché de PDFs convertidos con tamaño máximo y desalojo LRU."""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._persisted = CacheStats()  # parte de ``stats`` ya sumada a stats.json
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    # -- claves -----------------------------------------------------------
+    @staticmethod
+    def is_cacheable(src: Path) -> bool:
+        return src.suffix.lower() in CACHEABLE_EXTS
+
+    @staticmethod
+    def key_for(src: Path) -> str:
+        """SHA-256 del contenido de ``src`` combinado con su convertidor."""
+        digest = hashlib.sha256(converter_id(src).encode("ascii") + b"\0")
+        with open(src, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}.pdf"
+
+    # -- operaciones ------------------------------------------------------
+    def get(self, key: str, dst: Path) -> Path | None:
+        """
+        Materializa la entrada ``key`` en ``dst`` (reflink si es posible, si no copia).
+
+        Nunca un hardlink: los convertidores reescriben sus temporales en el
+        lugar y truncarían la entrada compartida.
+        """
+        entry = self._entry_path(key)
+        try:
+            if not entry.exists():
+                raise FileNotFoundError(entry)
+            link_or_copy(entry, dst, hardlink=False)
+            os.utime(entry)  # marca de uso reciente para LRU
+        except OSError:  # ausente o desalojada por otro proceso
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            self.stats.hits += 1
+        return dst
+
+    def put(self, key: str, pdf: "Path | MemoryPdf") -> None:
+        """Guarda ``pdf`` como resultado de ``key`` y aplica el límite de tamaño."""
+        entry = self._entry_path(key)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if isinstance(pdf, MemoryPdf):
+                tmp.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_bytes(pdf.data)
+            else:
+                link_or_copy(pdf, tmp, hardlink=False)
+            os.replace(tmp, entry)
+            os.utime(entry)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar en caché {pdf.name}: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self.stats.stores += 1
+            if self._total_bytes is not None:
+                self._total_bytes += entry.stat().st_size
+        if self.total_bytes() > self.max_bytes:
+            self.prune()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """(mtime, tamaño, ruta) de cada entrada."""
+        entries = []
+        if self.objects_dir.exists():
+            for sub in os.scandir(self.objects_dir):
+                if not sub.is_dir():
+                    continue
+                for e in os.scandir(sub.path):
+                    if e.name.endswith(".pdf"):
+                        st = e.stat()
+                        entries.append((st.st_mtime, st.st_size, e.path))
+        return entries
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            return self._total_bytes
+
+    def entry_count(self) -> int:
+        return len(self._entries())
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """Desaloja las entradas menos usadas hasta quedar bajo el límite. Devuelve cuántas."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())  # más antiguas primero
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total_bytes = total
+            self.stats.evictions += removed
+        if removed:
+            logger.info(f"Caché: {removed} entradas desalojadas ({total / 1024 / 1024:.1f} MB en uso)")
+        return removed
+
+    def clear(self) -> int:
+        return self.prune(0)
+
+    # -- contadores persistentes -----------------------------------------
+    @property
+    def stats_file(self) -> Path:
+        return self.root / "stats.json"
+
+    def load_totals(self) -> CacheStats:
+        """Contadores acumulados de ejecuciones anteriores."""
+        try:
+            return CacheStats(**json.loads(self.stats_file.read_text(encoding="utf-8")))
+        except (FileNotFoundError, ValueError, TypeError):
+            return CacheStats()
+
+    def save_stats(self) -> None:
+        """Suma a ``stats.json`` lo acumulado en esta sesión desde el último guardado."""
+        with self._lock:
+            session, previous = replace(self.stats), self._persisted
+            self._persisted = session
+        totals = self.load_totals()
+        for name, value in asdict(session).items():
+            setattr(totals, name, getattr(totals, name) + value - getattr(previous, name))
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.stats_file.write_text(json.dumps(asdict(totals)), encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"No se pudieron guardar los contadores de caché: {e}")
+        logger.info(f"Caché: {session.hits} aciertos, {session.misses} fallos, "
+                    f"{session.evictions} desalojos")
+
+
+def cache_from_config() -> ConversionCache | None:
+    """Crea la caché según la sección ``cache`` de app_config.json (None si está deshabilitada)."""
+    if not get_config("cache", "enabled", True):
+        return None
+    root = Path(get_config("cache", "dir", str(CACHE_DIR)))
+    max_mb = float(get_config("cache", "max_size_mb", DEFAULT_MAX_SIZE_MB))
+    return ConversionCache(root, int(max_mb * 1024 * 1024))
@@ -0,0 +1,828 @@
+"""
+Núcleo del consolidador: configuración, conversión a PDF y unión de PDFs.
+
+No depende de Tkinter, de modo que puede usarse tanto desde la interfaz
+gráfica (``main.py``) como desde la línea de comandos (``pdf-consolidator``).
+"""
+
+import gc
+import io
+import hashlib
+import os
+import atexit
+import queue
+import re
+import sys
+import mmap
+import shutil
+import logging
+import json
+import unicodedata
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import TYPE_CHECKING, Any, Iterator
+
+# Threading para optimizaciones
+import threading
+
+# --- Dependencias de conversión ---
+# img2pdf, pypdf y pywin32 se importan al usarlos: la ventana abre sin cargarlos
+if TYPE_CHECKING:
+    from pypdf import PdfReader, PdfWriter
+
+    from .handoff import HandoffPolicy, MemoryPdf
+    from .pdfstream import StreamingPdfWriter
+
+# Office -> PDF (Windows + MS Office): se busca el paquete sin importarlo
+try:
+    HAS_WIN32 = find_spec("win32com") is not None
+except (ImportError, ValueError):
+    HAS_WIN32 = False
+
+
+# =============================
+# Configuración general
+# =============================
+
+def get_app_version() -> str:
+    """Lee la versión de la aplicación desde el archivo VERSION."""
+    try:
+        # Empaquetado con PyInstaller (VERSION en _MEIPASS) o raíz del proyecto
+        base_path = Path(getattr(sys, "_MEIPASS", Path(__file__).resolve().parents[2]))
+        version_file = base_path / "VERSION"
+        if version_file.exists():
+            return f"v{version_file.read_text().strip()}"
+        else:
+            # Fallback si no existe el archivo VERSION
+            return "v1.2.1"
+    except Exception:
+        return "v1.2.1"
+
+APP_VERSION = get_app_version()
+INPUT_DIR = Path("data/input")
+OUTPUT_DIR = Path("data/output")
+TEMP_DIR = Path("temp")
+LOG_ENV = "PDF_CONSOLIDATOR_LOG_DIR"  # otra carpeta de logs (la heredan los procesos hijos)
+LOG_DIR = Path(os.environ.get(LOG_ENV) or "logs")
+CACHE_DIR = Path("cache")  # caché persistente de conversiones
+CONFIG_FILE = Path("config/app_config.json")
+ASSETS_DIR = Path("assets")  # coloca aquí tus imágenes
+LOGO_EMPRESA = ASSETS_DIR / "logo_empresa.png"   # <-- agrega tus imágenes si quieres
+LOGO_CAMPANA = ASSETS_DIR / "logo_campana.png"   # <-- agrega tus imágenes si quieres
+LOGO_EXPANSION = ASSETS_DIR / "Expansión.png"   # Logo de Expansión (header centrado)
+LOGO_ASCENSION = ASSETS_DIR / "LogoLApng-1920w.webp"   # Logo de La Ascensión (icono app/ventana)
+
+# Extensiones de archivos soportadas por categoría
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+WORD_EXTS = {".doc", ".docx"}
+EXCEL_EXTS = {".xls", ".xlsx"}
+PDF_EXTS = {".pdf"}
+
+ALLOWED_EXTS = IMAGE_EXTS | WORD_EXTS | EXCEL_EXTS | PDF_EXTS
+INVALID_FS_CHARS = r'<>:"/\\|?*'  # Windows
+
+# Archivos que se deben excluir del procesamiento
+EXCLUDED_FILES = {"README.md", "readme.md", "README.txt", "readme.txt"}
+
+# Constantes para formatos de exportación Office
+WD_FORMAT_PDF = 17  # Word PDF export format
+XL_TYPE_PDF = 0     # Excel PDF export format
+
+# =============================
+# Optimizaciones de rendimiento
+# =============================
+# Instancias COM reutilizables, por hilo: un objeto COM no se puede usar
+# desde otro apartamento (ver ``office_thread`` y ``warm``). Sin candado
+# global: un documento colgado no bloquea la conversión en otros hilos
+_com_apps = threading.local()
+
+
+# =============================
+# Logging
+# =============================
+logger = logging.getLogger("consolidador")
+logger.setLevel(logging.INFO)
+_log_handler: QueueHandler | None = None
+_log_lock = threading.Lock()
+
+
+def _restart_listener(listener: QueueListener) -> None:
+    if listener._thread is not None:
+        listener._thread = None  # hilo del proceso padre, inexistente en el hijo
+        listener.start()
+
+
+class QueueLogHandler(QueueHandler):
+    """``QueueHandler`` que conserva su ``QueueListener`` para vaciar la cola a demanda."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, listener: QueueListener) -> None:
+        super().__init__(log_queue)
+        self.listener = listener
+
+
+def start_log_listener(*handlers: logging.Handler) -> QueueLogHandler:
+    """
+    Escritura asíncrona de logs: devuelve un ``QueueHandler`` que solo encola
+    el registro; un hilo aparte lo formatea y lo escribe con ``handlers``.
+    Así el disco no está en el camino de la conversión.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # vacía la cola antes de salir
+    if hasattr(os, "register_at_fork"):
+        # Los hilos no sobreviven a fork(): el hijo (pool de conversión) necesita su propio escritor
+        os.register_at_fork(after_in_child=lambda: _restart_listener(listener))
+    return QueueLogHandler(log_queue, listener)
+
+
+def setup_logging(log_dir: Path | None = None) -> None:
+    """
+    Conecta ``logger`` al log rotativo ``log_dir/app.log`` (por defecto
+    ``LOG_DIR``; escritura asíncrona).
+
+    La llaman los puntos de entrada (interfaz, línea de comandos, procesos de
+    Office), no la importación: importar el paquete no crea carpetas ni hilos.
+    Llamarla más de una vez no tiene efecto.
+    """
+    global _log_handler
+    with _log_lock:
+        if _log_handler is not None:
+            return
+        log_dir = log_dir or LOG_DIR
+        log_dir.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(log_dir / "app.log", maxBytes=1_000_000, backupCount=3,
+                                      encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        _log_handler = start_log_listener(handler)
+        logger.addHandler(_log_handler)
+
+
+# =============================
+# Utilidades
+# =============================
+def resource_path(relative: Path) -> str:
+    """Compat con PyInstaller --onefile: devuelve la ruta real del recurso empaquetado."""
+    try:
+        base_path = Path(sys._MEIPASS)  # type: ignore[attr-defined]
+    except Exception:
+        base_path = Path(".")
+    return str(base_path / relative)
+
+
+@lru_cache(maxsize=1)
+def load_app_config() -> dict:
+    """Lee config/app_config.json. Devuelve {} si no existe o no es válido."""
+    try:
+        data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"No se pudo leer {CONFIG_FILE}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def get_config(section: str, key: str, default: Any = None) -> Any:
+    """Valor ``section.key`` de la configuración, o ``default`` si no está definido."""
+    return load_app_config().get(section, {}).get(key, default)
+
+
+def ensure_dirs() -> None:
+    for d in (INPUT_DIR, OUTPUT_DIR, TEMP_DIR, ASSETS_DIR):
+        d.mkdir(parents=True, exist_ok=True)
+
+
+def sanitize_component(s: str) -> str:
+    """Limpia nombre: quita inválidos, colapsa espacios y normaliza acentos a ASCII."""
+    s = s.strip()
+    s = "".join("_" if c in INVALID_FS_CHARS else c for c in s)
+    s = re.sub(r"\s+", " ", s)
+    # Normaliza tildes/acentos para minimizar problemas en FS o con otros sistemas
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return s
+
+
+def final_pdf_name(ident: str, cliente: str, reembolso: str) -> str:
+    ident = sanitize_component(ident)
+    cliente = sanitize_component(cliente)
+    reembolso = sanitize_component(reembolso)
+    base = f"{ident}_{cliente}_{reembolso}".strip("_ ").replace(" ", "_")
+    return base + ".pdf"
+
+
+def get_supported_extensions_display() -> str:
+    """
+    Retorna una cadena legible con las extensiones soportadas agrupadas por tipo.
+    """
+    return (f"PDF: {', '.join(sorted(PDF_EXTS))} | "
+            f"Word: {', '.join(sorted(WORD_EXTS))} | "
+            f"Excel: {', '.join(sorted(EXCEL_EXTS))} | "
+            f"Imágenes: {', '.join(sorted(IMAGE_EXTS))}")
+
+
+def list_input_files(input_dir: Path | None = None) -> list[Path]:
+    """
+    Archivos admitidos de ``input_dir`` (por defecto INPUT_DIR), en orden alfabético.
+
+    Usa el escáner con caché de ``scanner.py``; ``scan_inputs`` devuelve además
+    tamaño y tipo de cada archivo.
+    """
+    from .scanner import scan_inputs  # import local: evita el ciclo
+    return [f.path for f in scan_inputs(input_dir)]
+
+
+# =============================
+# Conversión a PDF por tipo
+# =============================
+
+def _com_process_id(app: Any, window_class: str | None = None) -> int | None:
+    """
+    PID del proceso de una aplicación COM, para terminarlo si se cuelga.
+
+    Excel expone la ventana principal (``Hwnd``); Word no, así que se le pone
+    un título único y se busca su ventana (clase ``OpusApp``).
+    """
+    try:
+        import win32gui  # type: ignore[import-untyped]
+        import win32process  # type: ignore[import-untyped]  # incluidos en pywin32
+        if window_class:
+            caption = f"consolidador-{os.getpid()}-{threading.get_ident()}"
+            app.Caption = caption
+            hwnd = win32gui.FindWindow(window_class, caption)
+        else:
+            hwnd = app.Hwnd
+        pid: int = win32process.GetWindowThreadProcessId(hwnd)[1]
+        return pid or None
+    except Exception as e:
+        logger.debug(f"No se pudo obtener el PID de la aplicación COM: {e}")
+        return None
+
+def get_word_instance() -> Any:
+    """Obtiene una instancia reutilizable (en este hilo) de Word COM para mejor rendimiento."""
+    try:
+        word = getattr(_com_apps, "word", None)
+        if word is None:
+            import win32com.client as win32  # type: ignore[import-untyped]  # pywin32
+            word = win32.DispatchEx("Word.Application")
+            word.Visible = False
+            # Optimizaciones de rendimiento para Word
+            word.Options.DoNotPromptForConvert = True
+            word.Options.ConfirmConversions = False
+            word.DisplayAlerts = False
+            _com_apps.word = word
+            _com_apps.word_pid = _com_process_id(word, "OpusApp")
+        return word
+    except Exception as e:
+        logger.error(f"Error creando instancia de Word: {e}")
+        return None
+
+def get_excel_instance() -> Any:
+    """Obtiene una instancia reutilizable (en este hilo) de Excel COM para mejor rendimiento."""
+    try:
+        excel = getattr(_com_apps, "excel", None)
+        if excel is None:
+            import win32com.client as win32  # pywin32
+            excel = win32.DispatchEx("Excel.Application")
+            excel.Visible = False
+            excel.DisplayAlerts = False
+            # Optimizaciones de rendimiento para Excel
+            excel.ScreenUpdating = False
+            excel.EnableEvents = False
+            excel.Calculation = -4135  # xlCalculationManual
+            _com_apps.excel = excel
+            _com_apps.excel_pid = _com_process_id(excel)
+        return excel
+    except Exception as e:
+        logger.error(f"Error creando instancia de Excel: {e}")
+        return None
+
+def cleanup_office_instances() -> None:
+    """Limpia las instancias COM reutilizables de este hilo al finalizar."""
+    for attr in ("word", "excel"):
+        app = getattr(_com_apps, attr, None)
+        if app:
+            try:
+                app.Quit()
+            except Exception:
+                pass
+            finally:
+                setattr(_com_apps, attr, None)
+                setattr(_com_apps, f"{attr}_pid", None)
+
+
+def office_instances_alive() -> bool:
+    """Comprueba que las instancias COM de este hilo sigan respondiendo."""
+    for attr, collection in (("word", "Documents"), ("excel", "Workbooks")):
+        app = getattr(_com_apps, attr, None)
+        if app is not None:
+            try:
+                getattr(app, collection).Count
+            except Exception:
+                return False
+    return True
+
+def office_process_ids() -> list[int]:
+    """PIDs de Word/Excel abiertos por este hilo (los que se conocen)."""
+    return [pid for pid in (getattr(_com_apps, "word_pid", None),
+                            getattr(_com_apps, "excel_pid", None)) if pid]
+
+@contextmanager
+def office_thread() -> Iterator[None]:
+    """
+    Prepara el hilo actual para usar Office vía COM desde fuera del hilo principal.
+
+    Inicializa COM al entrar y, al salir, cierra las instancias creadas en este
+    hilo (no se pueden usar desde otro apartamento COM) y libera COM.
+    """
+    if not HAS_WIN32:
+        yield
+        return
+    import pythoncom  # type: ignore[import-untyped]  # incluido en pywin32
+    pythoncom.CoInitialize()
+    try:
+        yield
+    finally:
+        cleanup_office_instances()
+        pythoncom.CoUninitialize()
+
+def convert_image_to_pdf(src: Path, dst_pdf: Path) -> None:
+    """
+    Convierte JPG/PNG/TIF a PDF. TIFF frame a frame en streaming; img2pdf para
+    el resto, tras normalizar la imagen si ``conversion.pdf_compression`` está activo.
+    """
+    dst_pdf.parent.mkdir(parents=True, exist_ok=True)
+    ext = src.suffix.lower()
+
+    if ext in (".tif", ".tiff"):
+        from .tiff import convert_tiff_to_pdf  # import local: solo si hace falta
+        pages = convert_tiff_to_pdf(src, dst_pdf)
+        logger.info(f"TIFF multipágina ({pages} págs) -> {dst_pdf.name}")
+    else:
+        from .imaging import NORMALIZED_EXTS, image_policy, write_normalized_pdf
+        policy = image_policy()
+        if policy.enabled and ext in NORMALIZED_EXTS and write_normalized_pdf(src, dst_pdf, policy):
+            return
+        import img2pdf  # type: ignore[import-untyped]  # import local: carga PIL y pikepdf
+        with open(dst_pdf, "wb") as f_out:
+            f_out.write(img2pdf.convert(str(src)))
+        logger.info(f"Imagen convertida -> {dst_pdf.name}")
+
+
+def image_pdf_bytes(srcs: list[Path]) -> bytes:
+    """
+    PDF de varias imágenes JPG/PNG, armado en memoria con una llamada a img2pdf.
+
+    Una página por imagen, en el orden de ``srcs``, iguales a las de
+    ``convert_image_to_pdf``: cada imagen pasa por la misma normalización y
+    conserva su tamaño de página.
+
+    Raises:
+        RuntimeError: Si alguna imagen no produce exactamente una página
+    """
+    import img2pdf  # import local: carga PIL y pikepdf, solo si hace falta
+
+    from .imaging import NORMALIZED_EXTS, image_policy, normalize_image, report_normalized
+
+    policy = image_policy()
+    images: list[str | bytes] = []
+    dpis: list[tuple[float, float] | None] = []  # DPI fijo de las normalizadas
+    for src in srcs:
+        result = None
+        if policy.enabled and src.suffix.lower() in NORMALIZED_EXTS:
+            result = normalize_image(src, policy)
+        if result is None:
+            images.append(str(src))
+            dpis.append(None)
+        else:
+            report_normalized(src, result)
+            images.append(result.data)
+            dpis.append(result.dpi)
+
+    pages = 0
+
+    def layout(width: int, height: int, ndpi: tuple[float, float]) -> Any:
+        # img2pdf la invoca una vez por página, en el orden de ``images``
+        nonlocal pages
+        dpi = dpis[pages] if pages < len(dpis) else None
+        pages += 1
+        return img2pdf.default_layout_fun(width, height, dpi or ndpi)
+
+    data: bytes = img2pdf.convert(*images, layout_fun=layout)
+    if pages != len(srcs):
+        # p. ej. un MPO con varias imágenes: los DPI quedarían desfasados
+        raise RuntimeError(f"{pages} páginas para {len(srcs)} imágenes")
+    return data
+
+
+def convert_images_to_pdf(srcs: list[Path], dst_pdf: Path) -> None:
+    """
+    Convierte varias imágenes JPG/PNG a un solo PDF (ver ``image_pdf_bytes``).
+
+    Evita, por imagen, la llamada a img2pdf, el PDF temporal y su lectura al unir.
+
+    Raises:
+        RuntimeError: Si alguna imagen no produce exactamente una página
+    """
+    data = image_pdf_bytes(srcs)
+    dst_pdf.parent.mkdir(parents=True, exist_ok=True)
+    dst_pdf.write_bytes(data)
+    logger.info(f"{len(srcs)} imágenes convertidas -> {dst_pdf.name}")
+
+
+def convert_word_to_pdf(src: Path, dst_pdf: Path) -> None:
+    """
+    Convierte documentos Word (.doc/.docx) a PDF usando Microsoft Word vía COM.
+    Versión optimizada que reutiliza instancia de Word para mejor rendimiento.
+    
+    Args:
+        src: Ruta del archivo Word de origen
+        dst_pdf: Ruta donde guardar el PDF convertido
+        
+    Raises:
+        RuntimeError: Si no está disponible win32com o MS Office
+    """
+    if not HAS_WIN32:
+        raise RuntimeError("Conversión de documentos Word requiere Windows + pywin32 + MS Office.")
+    
+    word = get_word_instance()
+    if not word:
+        raise RuntimeError("No se pudo obtener instancia de Word")
+    
+    try:
+        logger.info(f"Iniciando conversión Word -> PDF (optimizada): {src.name}")
+        
+        # Asegurar ruta absoluta para MS Word
+        src_absolute = src.resolve()
+        dst_absolute = dst_pdf.resolve()
+        
+        logger.debug(f"Ruta absoluta origen: {src_absolute}")
+        logger.debug(f"Ruta absoluta destino: {dst_absolute}")
+        
+        # Abrir documento con configuraciones optimizadas
+        doc = word.Documents.Open(
+            str(src_absolute),
+            False,  # ConfirmConversions
+            True,   # ReadOnly
+            False,  # AddToRecentFiles
+            "",     # PasswordDocument
+            "",     # PasswordTemplate
+            False,  # Revert
+            "",     # WritePasswordDocument
+            "",     # WritePasswordTemplate
+            0       # Format
+        )
+        
+        # Exportar como PDF usando ruta absoluta
+        doc.ExportAsFixedFormat(str(dst_absolute), WD_FORMAT_PDF)
+        doc.Close(False)
+        
+        logger.info(f"Word -> PDF optimizado completado: {dst_pdf.name}")
+        
+    except Exception as e:
+        logger.error(f"Error convirtiendo {src.name}: {e}")
+        raise
+
+
+def convert_excel_to_pdf(src: Path, dst_pdf: Path) -> None:
+    """
+    Convierte documentos Excel (.xls/.xlsx) a PDF usando Microsoft Excel vía COM.
+    Versión optimizada que reutiliza instancia de Excel para mejor rendimiento.
+    
+    Args:
+        src: Ruta del archivo Excel de origen
+        dst_pdf: Ruta donde guardar el PDF convertido
+        
+    Raises:
+        RuntimeError: Si no está disponible win32com o MS Office
+    """
+    if not HAS_WIN32:
+        raise RuntimeError("Conversión de documentos Excel requiere Windows + pywin32 + MS Office.")
+    
+    excel = get_excel_instance()
+    if not excel:
+        raise RuntimeError("No se pudo obtener instancia de Excel")
+    
+    try:
+        logger.info(f"Iniciando conversión Excel -> PDF (optimizada): {src.name}")
+        
+        # Asegurar ruta absoluta para MS Excel
+        src_absolute = src.resolve()
+        dst_absolute = dst_pdf.resolve()
+        
+        logger.debug(f"Ruta absoluta origen: {src_absolute}")
+        logger.debug(f"Ruta absoluta destino: {dst_absolute}")
+        
+        # Abrir libro con configuraciones optimizadas
+        wb = excel.Workbooks.Open(
+            str(src_absolute),
+            False,  # UpdateLinks
+            True,   # ReadOnly
+            None,   # Format
+            "",     # Password
+            "",     # WriteResPassword
+            True,   # IgnoreReadOnlyRecommended
+            None,   # Origin
+            None,   # Delimiter
+            False,  # Editable
+            False,  # Notify
+            None,   # Converter
+            False   # AddToMru
+        )
+        
+        # Exportar como PDF usando ruta absoluta
+        wb.ExportAsFixedFormat(XL_TYPE_PDF, str(dst_absolute))
+        wb.Close(False)
+        
+        logger.info(f"Excel -> PDF optimizado completado: {dst_pdf.name}")
+        
+    except Exception as e:
+        logger.error(f"Error convirtiendo {src.name}: {e}")
+        raise
+
+
+FICLONE = 0x40049409  # ioctl de Linux para reflink (btrfs, XFS, ...)
+
+
+def link_or_copy(src: Path, dst: Path, hardlink: bool = True) -> str:
+    """
+    Materializa ``src`` en ``dst`` evitando copiar bytes cuando es posible.
+
+    Intenta, en orden: hardlink, reflink (copy-on-write) y copia normal. Con
+    ``hardlink=False`` no se comparte el inodo: escribir luego sobre ``dst``
+    (``open(dst, "wb")``) no altera ``src``.
+
+    Returns:
+        Método usado: "hardlink", "reflink" o "copy"
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists():
+        dst.unlink()
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    try:
+        import fcntl  # solo POSIX
+        with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+            fcntl.ioctl(f_out.fileno(), FICLONE, f_in.fileno())
+        shutil.copystat(src, dst)
+        return "reflink"
+    except (ImportError, OSError):
+        dst.unlink(missing_ok=True)
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def copy_pdf(src: Path, dst_pdf: Path) -> None:
+    method = link_or_copy(src, dst_pdf)
+    logger.info(f"PDF copiado ({method}): {dst_pdf.name}")
+
+
+def _folder_tag(src: Path) -> str:
+    """Huella corta de la carpeta de ``src`` (``a/scan.tif`` y ``b/scan.tif`` difieren)."""
+    folder = os.path.abspath(src.parent).encode("utf-8", "surrogatepass")
+    return hashlib.blake2s(folder, digest_size=4).hexdigest()
+
+
+def temp_pdf_path(src: Path, temp_dir: Path | None = None) -> Path:
+    """
+    Ruta del PDF temporal que corresponde a ``src``: ``foto.jpg.<carpeta>.pdf``.
+
+    Conserva la extensión para que ``foto.jpg`` y ``foto.png`` del mismo caso
+    no compartan temporal, y la huella de la carpeta para que tampoco lo
+    compartan dos ``scan.tif`` de subcarpetas distintas (``scan.recursive``).
+    """
+    return (temp_dir or TEMP_DIR) / f"{src.name}.{_folder_tag(src)}.pdf"
+
+
+def group_pdf_path(srcs: list[Path], temp_dir: Path | None = None) -> Path:
+    """
+    PDF temporal de una tanda de imágenes: ``primera.jpg+N.<carpeta>.pdf``
+    (N = imágenes siguientes; la carpeta, como en ``temp_pdf_path``).
+    """
+    return (temp_dir or TEMP_DIR) / f"{srcs[0].name}+{len(srcs) - 1}.{_folder_tag(srcs[0])}.pdf"
+
+
+def convert_to_pdf(src: Path, temp_dir: Path | None = None,
+                   handoff: "HandoffPolicy | None" = None) -> "Path | MemoryPdf | None":
+    """
+    Convierte un archivo permitido a PDF y devuelve la ruta del PDF temporal.
+    Los PDF nativos no se copian: se devuelve la ruta original. El resto se
+    convierte con el backend correspondiente (ver ``backends``).
+    
+    Args:
+        src: Ruta del archivo a convertir
+        temp_dir: Carpeta de temporales (por defecto TEMP_DIR)
+        handoff: Entrega en memoria (ver ``handoff``); las imágenes JPG/PNG
+            cuyo PDF no supera el umbral se devuelven como ``MemoryPdf``
+        
+    Returns:
+        Path del PDF temporal creado (o ``MemoryPdf``), o None si la conversión falla
+    """
+    try:
+        dst = temp_pdf_path(src, temp_dir)
+        ext = src.suffix.lower()
+        
+        logger.info(f"Iniciando conversión: {src.name} ({ext})")
+        
+        if ext in PDF_EXTS:
+            # PDF nativo: pasa directo de la entrada a la unión, sin copia temporal
+            logger.info(f"PDF nativo sin copia: {src.name}")
+            return src
+
+        if handoff is not None and handoff.max_bytes:
+            from .handoff import MEMORY_EXTS, package  # import local: evita el ciclo
+            if ext in MEMORY_EXTS:
+                pdf = package(image_pdf_bytes([src]), dst, handoff)
+                logger.info(f"Conversión exitosa: {src.name} -> {pdf.name}"
+                            f"{' (en memoria)' if pdf is not dst else ''}")
+                return pdf
+
+        # imágenes, COM o LibreOffice según el registro (import local: evita el ciclo)
+        from .backends import backend_for
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        backend_for(src).convert(src, dst)
+
+        logger.info(f"Conversión exitosa: {src.name} -> {dst.name}")
+        return dst
+        
+    except Exception as e:
+        logger.exception(f"Error convirtiendo {src.name}: {e}")
+        return None
+
+
+# =============================
+# Unión de PDFs
+# =============================
+def open_pdf_reader(path: "Path | MemoryPdf", stack: ExitStack) -> "PdfReader":
+    """
+    Abre un PDF mapeado en memoria (sin leerlo entero a un buffer propio).
+
+    El mapeo queda registrado en ``stack`` y debe seguir abierto hasta escribir
+    el PDF de salida, porque pypdf lee los streams de las páginas de forma diferida.
+    Un ``MemoryPdf`` se lee directamente de sus bytes.
+    """
+    from pypdf import PdfReader
+
+    from .handoff import MemoryPdf  # import local: evita el ciclo
+
+    if isinstance(path, MemoryPdf):
+        return PdfReader(io.BytesIO(path.data))
+
+    f = stack.enter_context(open(path, "rb"))
+    try:
+        mm = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except ValueError:  # archivo vacío: no se puede mapear
+        return PdfReader(f)
+    return PdfReader(mm)  # type: ignore[arg-type]  # se lee como un archivo binario
+
+
+# Por encima de este tamaño total de entrada se une en streaming (merge.streaming = "auto")
+STREAMING_MERGE_THRESHOLD_MB = 64
+
+
+def use_streaming_merge(pdf_paths: "list[Path | MemoryPdf]") -> bool:
+    """Decide el modo de unión según ``merge.streaming`` (true, false o "auto")."""
+    mode = get_config("merge", "streaming", "auto")
+    if mode != "auto":
+        return bool(mode)
+    threshold = float(get_config("merge", "streaming_threshold_mb", STREAMING_MERGE_THRESHOLD_MB))
+    total = 0
+    for p in pdf_paths:
+        try:
+            total += p.stat().st_size if isinstance(p, Path) else p.size
+        except OSError:
+            pass
+    return total >= threshold * 1024 * 1024
+
+
+DEDUP_PASSES = 3
+
+
+def use_merge_optimization() -> bool:
+    """``merge.optimize``: deduplicar y comprimir al unir (activado por defecto)."""
+    return bool(get_config("merge", "optimize", True))
+
+
+def _optimize_writer(writer: "PdfWriter") -> None:
+    """Equivalente en memoria: comprime contenidos sin filtro y une objetos idénticos."""
+    for page in writer.pages:
+        contents = page.get("/Contents")
+        streams = contents.get_object() if contents is not None else []
+        if not isinstance(streams, list):
+            streams = [streams]
+        if any("/Filter" not in s.get_object() for s in streams):
+            page.compress_content_streams()
+    if hasattr(writer, "compress_identical_objects"):  # pypdf >= 4.3
+        # Cada pasada une un nivel: programa de fuente -> descriptor -> fuente
+        for _ in range(DEDUP_PASSES):
+            writer.compress_identical_objects()
+
+
+class MergeSink:
+    """
+    Destino de una unión que recibe los PDFs de a uno, en orden.
+
+    En modo streaming cada entrada se copia al archivo y se libera al
+    recibirla; si no, se acumulan en un ``PdfWriter`` que se escribe al
+    cerrar. Se escribe sobre ``<salida>.part`` y se renombra en ``close()``,
+    así una unión abortada no deja un PDF a medias con el nombre final.
+
+    Con ``optimize`` (por defecto ``merge.optimize``) los streams idénticos
+    entre entradas se escriben una vez y los contenidos sin comprimir se
+    comprimen; en streaming además se usan object streams y xref comprimida
+    (PDF 1.5), que ``PdfWriter`` no sabe escribir.
+    """
+
+    def __init__(self, out_path: Path, streaming: bool = False, optimize: bool | None = None):
+        self.out_path = out_path
+        self.streaming = streaming
+        self.optimize = use_merge_optimization() if optimize is None else optimize
+        self.part_path = out_path.with_name(out_path.name + ".part")
+        self._stack = ExitStack()
+        self._writer: "StreamingPdfWriter | PdfWriter"
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if streaming:
+            from . import pdfstream  # import local: solo si hace falta
+            self._file = self._stack.enter_context(open(self.part_path, "wb"))
+            self._writer = pdfstream.StreamingPdfWriter(self._file, compact=self.optimize)
+        else:
+            from pypdf import PdfWriter
+            self._writer = PdfWriter()
+
+    @property
+    def page_count(self) -> int:
+        from pypdf import PdfWriter  # import local: ya cargado por la unión (ambos modos)
+        if isinstance(self._writer, PdfWriter):
+            return len(self._writer.pages)
+        return self._writer.page_count
+
+    def add(self, path: "Path | MemoryPdf") -> None:
+        """Agrega las páginas de ``path``; si no se puede leer se registra y se omite."""
+        from pypdf import PdfWriter
+        try:
+            if isinstance(self._writer, PdfWriter):
+                # el mapeo debe seguir abierto hasta escribir: pypdf lee los streams al final
+                reader = open_pdf_reader(path, self._stack)
+                for page in reader.pages:
+                    self._writer.add_page(page)
+            else:
+                from .pdfstream import import_pages
+                with ExitStack() as stack:  # el mapeo de la entrada se libera al terminarla
+                    import_pages(self._writer, open_pdf_reader(path, stack))
+        except Exception as e:
+            # Las páginas completas ya copiadas se conservan
+            logger.exception(f"Error leyendo {path.name}: {e}")
+        if self.streaming:
+            # Los objetos de pypdf se referencian en ciclo con su lector: sin esto la
+            # memoria de cada entrada espera al recolector y crece con el total
+            gc.collect()
+
+    def close(self) -> int:
+        """Termina el PDF, lo mueve a su nombre final y devuelve el número de páginas."""
+        from pypdf import PdfWriter
+        with self._stack:
+            if isinstance(self._writer, PdfWriter):
+                if self.optimize:
+                    _optimize_writer(self._writer)
+                with open(self.part_path, "wb") as f:
+                    self._writer.write(f)
+            else:
+                self._writer.close()
+        os.replace(self.part_path, self.out_path)
+        mode = " (streaming)" if self.streaming else ""
+        logger.info(f"PDF final creado{mode}: {self.out_path.name}")
+        return self.page_count
+
+    def abort(self) -> None:
+        """Descarta la unión en curso sin tocar ``out_path``."""
+        self._stack.close()
+        self.part_path.unlink(missing_ok=True)
+
+
+def merge_pdfs(pdf_paths: "list[Path | MemoryPdf]", out_path: Path, streaming: bool | None = None,
+               optimize: bool | None = None) -> int:
+    """
+    Une los PDFs en orden y devuelve el número de páginas escritas.
+
+    Con ``streaming`` (por defecto según ``use_streaming_merge``) cada entrada
+    se copia y se descarta antes de abrir la siguiente, así que la memoria
+    queda acotada por la entrada más grande y no por la suma de todas.
+    ``optimize`` (por defecto ``merge.optimize``): ver ``MergeSink``.
+    """
+    if streaming is None:
+        streaming = use_streaming_merge(pdf_paths)
+    sink = MergeSink(out_path, streaming, optimize)
+    try:
+        for p in pdf_paths:
+            sink.add(p)
+        return sink.close()
+    except BaseException:
+        sink.abort()
+        raise
@@ -0,0 +1,598 @@
+"""
+Motor de conversión multinúcleo.
+
+Las imágenes se convierten en un ``ProcessPoolExecutor`` (Pillow/img2pdf
+quedan fuera del GIL del proceso principal). Los documentos Office van a un
+``OfficeWorkerPool``: procesos aislados, cada uno con su propia instancia de
+Word/Excel o LibreOffice. Los PDF nativos no requieren conversión. Con un solo
+trabajador de Office se conserva la ruta anterior: conversión en el proceso
+que llama, con una instancia compartida que se mantiene abierta entre
+ejecuciones (ver ``warm``) y se precalienta al empezar cada caso.
+
+El resultado conserva siempre el orden de entrada (el de ``list_input_files``),
+por lo que la unión posterior es determinista.
+
+Varios casos pueden compartir un mismo motor desde hilos distintos (ver
+``scheduler.JobScheduler``): cada llamada a ``convert_ordered`` es un trabajo
+y los pools se reparten por turnos entre los trabajos activos
+(``FairDispatcher``), de modo que un caso grande no demora a los demás.
+
+Con ``group_images`` las imágenes JPG/PNG consecutivas se convierten en
+tandas (``conversion.image_group_size``): una llamada a img2pdf y un solo PDF
+por tanda, que comparten todos sus archivos. Con ``in_memory`` esos PDF llegan
+como ``MemoryPdf`` (ver ``handoff``), sin pasar por ``temp_dir``.
+"""
+
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, wait
+from collections import deque
+from functools import partial
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .backends import OFFICE_EXTS, backend_name_for, record_conversion
+from .cache import ConversionCache
+from .core import (
+    IMAGE_EXTS, convert_images_to_pdf, convert_to_pdf, get_config, group_pdf_path,
+    image_pdf_bytes, logger, temp_pdf_path,
+)
+from .handoff import MEMORY_EXTS, HandoffPolicy, MemoryPdf, accept, handoff_policy, package
+from .metrics import file_size, record_span
+from .office_pool import OfficeWorkerPool, default_office_workers
+from .profiling import profile_stage
+from .warm import prewarm
+
+# Tipos que se convierten en procesos hijos (CPU intensivos y sin COM)
+PARALLEL_EXTS = IMAGE_EXTS
+# Imágenes que se pueden convertir en tanda (los TIFF van frame a frame por su ruta)
+GROUPED_EXTS = {".jpg", ".jpeg", ".png"}
+GROUP_MAX_BYTES = 32 * 1024 * 1024  # entrada máxima de una tanda: img2pdf la arma en memoria
+
+# on_start(indice, archivo_origen)
+StartCallback = Callable[[int, Path], None]
+# on_done(indice, archivo_origen, pdf_o_None, segundos)
+DoneCallback = Callable[[int, Path, "Path | MemoryPdf | None", float], None]
+
+# Cada cuánto se revisa la señal de cancelación mientras el pool trabaja
+CANCEL_POLL_SECONDS = 0.1
+
+
+class ConversionCancelled(Exception):
+    """La conversión se detuvo porque se activó la señal de cancelación."""
+
+
+class FairDispatcher:
+    """
+    Reparte ``slots`` lugares de un pool entre trabajos, un archivo por turno.
+
+    ``submit(job, *args)`` devuelve un ``Future`` propio; el trabajo se envía
+    al pool (``submit_fn(*args)``) cuando hay lugar y le toca a ``job``. Los
+    archivos cancelados mientras esperan turno no llegan al pool. El despacho
+    corre en un hilo aparte: los callbacks de los pools no deben reenviarles
+    trabajo desde sus propios hilos.
+    """
+
+    def __init__(self, submit_fn: Callable[..., Future], slots: int, name: str = "dispatch"):
+        self.submit_fn = submit_fn
+        self.slots = max(1, slots)
+        self.name = name
+        self._queues: dict[int, deque[tuple[Future, tuple]]] = {}
+        self._turns: deque[int] = deque()  # trabajos con pendientes, en orden de turno
+        self._running = 0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def submit(self, job: int, *args: object) -> Future:
+        proxy: Future = Future()
+        with self._cond:
+            if job not in self._queues:
+                self._queues[job] = deque()
+                self._turns.append(job)
+            self._queues[job].append((proxy, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return proxy
+
+    @property
+    def queued(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def _take(self) -> tuple[Future, tuple] | None:
+        """Próximo archivo por turnos (con el lock tomado); None si no hay."""
+        while self._turns:
+            job = self._turns.popleft()
+            queue = self._queues[job]
+            proxy, args = queue.popleft()
+            if queue:
+                self._turns.append(job)
+            else:
+                del self._queues[job]
+            if proxy.set_running_or_notify_cancel():
+                return proxy, args
+        return None
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and (self._running >= self.slots or not self._turns):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                item = self._take()
+                if item is None:
+                    continue
+                self._running += 1
+            proxy, args = item
+            try:
+                inner = self.submit_fn(*args)
+            except BaseException as e:
+                proxy.set_exception(e)
+                self._release()
+                continue
+            inner.add_done_callback(partial(self._relay, proxy))
+
+    def _relay(self, proxy: Future, inner: Future) -> None:
+        if inner.cancelled():
+            proxy.set_exception(CancelledError())
+        elif inner.exception() is not None:
+            proxy.set_exception(inner.exception())
+        else:
+            proxy.set_result(inner.result())
+        self._release()
+
+    def _release(self) -> None:
+        with self._cond:
+            self._running -= 1
+            self._cond.notify()
+
+    def shutdown(self) -> None:
+        """Cancela lo que espera turno y detiene el hilo (se reinicia con el próximo ``submit``)."""
+        with self._cond:
+            self._closed = True
+            pending = [proxy for q in self._queues.values() for proxy, _ in q]
+            self._queues.clear()
+            self._turns.clear()
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        for proxy in pending:
+            proxy.cancel()
+        if thread is not None:
+            thread.join()
+        with self._cond:
+            self._closed = False
+
+
+def default_workers() -> int:
+    """Número de procesos por defecto: uno por núcleo disponible."""
+    return max(1, os.cpu_count() or 1)
+
+
+def image_group_size() -> int:
+    """Imágenes por tanda (``conversion.image_group_size``; 0 o 1 = sin tandas)."""
+    return int(get_config("conversion", "image_group_size", 32) or 0)
+
+
+def _backend_label(src: Path) -> str:
+    """Backend al que se atribuye el tiempo de ``src`` en las estadísticas."""
+    try:
+        return backend_name_for(src)
+    except RuntimeError:
+        return "no-soportado"
+
+
+def _init_worker() -> None:
+    """
+    Inicialización de cada proceso del pool, justo después de fork.
+
+    Los logs del hijo salen solo por las colas de ``start_log_listener``: un
+    handler síncrono heredado (p. ej. uno de la raíz) puede tener el lock de
+    su stream tomado por un hilo del padre que no existe en el hijo, y la
+    primera escritura quedaría bloqueada para siempre.
+    """
+    prefix = logger.name + "."
+    names = [logger.name, *(n for n in logging.root.manager.loggerDict if n.startswith(prefix))]
+    for name in names:
+        child_logger = logging.getLogger(name)
+        child_logger.propagate = False
+        child_logger.handlers = [h for h in child_logger.handlers if isinstance(h, QueueHandler)]
+
+
+def _convert_job(src: Path, temp_dir: Path | None, handoff: HandoffPolicy | None = None
+                 ) -> tuple[Path | MemoryPdf | None, float]:
+    """Trabajo ejecutado en el proceso hijo; devuelve (pdf, segundos)."""
+    start = time.perf_counter()
+    with profile_stage("convert", src.name):
+        pdf = convert_to_pdf(src, temp_dir, handoff)
+    return pdf, time.perf_counter() - start
+
+
+def _convert_group_job(srcs: list[Path], temp_dir: Path | None,
+                       handoff: HandoffPolicy | None = None
+                       ) -> tuple[list[Path | MemoryPdf | None], float]:
+    """
+    Convierte una tanda de imágenes a un solo PDF; devuelve (pdf por archivo, segundos).
+
+    Si la tanda falla se convierte archivo por archivo, para que solo cuente
+    como fallida la imagen que no se puede convertir.
+    """
+    start = time.perf_counter()
+    dst = group_pdf_path(srcs, temp_dir)
+    with profile_stage("convert", dst.stem):
+        try:
+            if handoff is not None:
+                pdf = package(image_pdf_bytes(srcs), dst, handoff)
+                where = " (en memoria)" if isinstance(pdf, MemoryPdf) else ""
+                logger.info(f"{len(srcs)} imágenes convertidas -> {pdf.name}{where}")
+            else:
+                convert_images_to_pdf(srcs, dst)
+                pdf = dst
+            pdfs: list[Path | MemoryPdf | None] = [pdf] * len(srcs)
+        except Exception as e:
+            logger.warning(f"Tanda de {len(srcs)} imágenes desde {srcs[0].name} falló ({e}); "
+                           f"se convierten una por una")
+            dst.unlink(missing_ok=True)
+            pdfs = [convert_to_pdf(src, temp_dir, handoff) for src in srcs]
+    return pdfs, time.perf_counter() - start
+
+
+def _hand_off(pdfs: list, policy: HandoffPolicy, memory_capable: bool) -> list:
+    """Aplica ``handoff.accept`` una vez por resultado (los de una tanda son el mismo objeto)."""
+    accepted: dict[int, Path | MemoryPdf | None] = {}
+    for pdf in pdfs:
+        if id(pdf) not in accepted:
+            accepted[id(pdf)] = accept(pdf, policy, memory_capable)
+    return [accepted[id(pdf)] for pdf in pdfs]
+
+
+def plan_units(files: list[Path], group_size: int = 1) -> list[list[int]]:
+    """
+    Divide ``files`` en unidades de trabajo, en orden: índices de un archivo, o
+    de una tanda de hasta ``group_size`` imágenes JPG/PNG consecutivas (y hasta
+    ``GROUP_MAX_BYTES`` de entrada).
+    """
+    units: list[list[int]] = []
+    run: list[int] = []
+    run_bytes = 0
+    for i, f in enumerate(files):
+        groupable = group_size > 1 and f.suffix.lower() in GROUPED_EXTS
+        size = file_size(f) if groupable else 0
+        if run and (not groupable or len(run) >= group_size
+                    or run_bytes + size > GROUP_MAX_BYTES):
+            units.append(run)
+            run, run_bytes = [], 0
+        if groupable:
+            run.append(i)
+            run_bytes += size
+        else:
+            units.append([i])
+    if run:
+        units.append(run)
+    return units
+
+
+def conversion_units(files: list[Path], group_images: bool) -> list[list[int]]:
+    """Unidades que arma ``convert_ordered`` (tandas según ``image_group_size``)."""
+    return plan_units(files, image_group_size() if group_images else 1)
+
+
+class ConversionEngine:
+    """
+    Pool de procesos reutilizable para convertir listas de archivos a PDF.
+
+    Si se indica ``cache``, los archivos ya convertidos en ejecuciones
+    anteriores se toman de la caché y los nuevos se guardan en ella.
+
+    Con ``inline_office=False`` los documentos Office siempre van al pool de
+    Office, aunque sea uno solo: necesario cuando varios hilos convierten a la
+    vez (la instancia COM compartida no admite más de un hilo).
+
+    Se puede usar como context manager para garantizar el cierre del pool:
+
+        with ConversionEngine() as engine:
+            pdfs = engine.convert(files, temp_dir)
+    """
+
+    def __init__(self, max_workers: int | None = None, cache: ConversionCache | None = None,
+                 office_workers: int | None = None, inline_office: bool = True):
+        self.max_workers = max_workers or default_workers()
+        self.office_workers = office_workers or default_office_workers()
+        self.inline_office = inline_office
+        self.cache = cache
+        self._lock = threading.Lock()  # los pools se crean a demanda, quizá desde varios hilos
+        self._pool: ProcessPoolExecutor | None = None
+        self._office_pool: OfficeWorkerPool | None = None
+        # Un archivo en espera por proceso: el pool no queda ocioso entre despachos
+        self._image_dispatch = FairDispatcher(lambda *a: self._get_pool().submit(*a),
+                                              self.max_workers * 2, "despacho-imagenes")
+        self._office_dispatch = FairDispatcher(lambda *a: self._get_office_pool().submit(*a),
+                                               self.office_workers * 2, "despacho-office")
+        self._job_ids = itertools.count(1)
+
+    def __enter__(self) -> "ConversionEngine":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 initializer=_init_worker)
+                logger.info(f"Pool de conversión iniciado con {self.max_workers} procesos")
+            return self._pool
+
+    def _get_office_pool(self) -> OfficeWorkerPool:
+        with self._lock:
+            if self._office_pool is None:
+                self._office_pool = OfficeWorkerPool(self.office_workers)
+            return self._office_pool
+
+    def _uses_office_pool(self, documents: int) -> bool:
+        """Si ``documents`` documentos Office de un caso van al pool de Office."""
+        return not self.inline_office or self.office_workers > 1 and documents > 1
+
+    def prewarm(self, files: list[Path]) -> None:
+        """
+        Arranca en segundo plano la aplicación de Office que necesitarán ``files``.
+
+        Útil apenas se conoce la lista de entrada (p. ej. al abrir la interfaz):
+        la conversión posterior ya no espera el arranque de Word/Excel/LibreOffice.
+        """
+        office = [f for f in files if f.suffix.lower() in OFFICE_EXTS]
+        if not office:
+            return
+        if self._uses_office_pool(len(office)):
+            self._get_office_pool().start({f.suffix.lower() for f in office})
+        else:
+            prewarm(office)
+
+    def shutdown(self) -> None:
+        self._image_dispatch.shutdown()
+        self._office_dispatch.shutdown()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._office_pool is not None:
+            self._office_pool.shutdown()
+            self._office_pool = None
+        if self.cache is not None:
+            self.cache.save_stats()
+
+    def _lookup_cache(self, files: list[Path], units: list[list[int]], temp_dir: Path | None
+                      ) -> tuple[dict[int, str], dict[int, tuple[Path, float]]]:
+        """
+        Calcula las claves de caché y devuelve (claves, aciertos).
+
+        Las claves van por unidad (índice de su primer archivo; la de una tanda
+        combina las de sus imágenes) y los aciertos por índice de archivo.
+        """
+        keys: dict[int, str] = {}
+        hits: dict[int, tuple[Path, float]] = {}
+        if self.cache is None:
+            return keys, hits
+        for unit in units:
+            if not all(self.cache.is_cacheable(files[i]) for i in unit):
+                continue
+            start = time.perf_counter()
+            try:
+                member_keys = [self.cache.key_for(files[i]) for i in unit]
+            except OSError as e:
+                logger.warning(f"No se pudo calcular la clave de caché de {files[unit[0]].name}: {e}")
+                continue
+            if len(unit) == 1:
+                keys[unit[0]] = member_keys[0]
+                dst = temp_pdf_path(files[unit[0]], temp_dir)
+            else:
+                keys[unit[0]] = hashlib.sha256("\0".join(["tanda", *member_keys]).encode("ascii")
+                                               ).hexdigest()
+                dst = group_pdf_path([files[i] for i in unit], temp_dir)
+            pdf = self.cache.get(keys[unit[0]], dst)
+            if pdf:
+                names = files[unit[0]].name if len(unit) == 1 else f"{len(unit)} imágenes"
+                logger.info(f"Caché: {names} reutilizado sin convertir")
+                seconds = (time.perf_counter() - start) / len(unit)
+                hits.update((i, (pdf, seconds)) for i in unit)
+        return keys, hits
+
+    def convert(self, files: list[Path], temp_dir: Path | None = None,
+                on_done: DoneCallback | None = None,
+                on_start: StartCallback | None = None,
+                cancel: threading.Event | None = None,
+                group_images: bool = False,
+                in_memory: bool = False) -> list[Path | MemoryPdf | None]:
+        """
+        Convierte ``files`` a PDF y devuelve los resultados en el mismo orden.
+
+        Args:
+            files: Archivos de entrada, ya ordenados
+            temp_dir: Carpeta de temporales (por defecto TEMP_DIR)
+            on_done: Callback opcional invocado en el proceso que llama al
+                terminar cada archivo (útil para barras de progreso)
+            on_start: Callback opcional al iniciar (o encolar en el pool) cada archivo
+            cancel: Señal opcional; al activarse se descartan los trabajos pendientes
+            group_images: Convertir las imágenes JPG/PNG consecutivas en tandas;
+                los archivos de una tanda comparten el mismo PDF
+            in_memory: Entregar los PDF de imágenes JPG/PNG como ``MemoryPdf``
+                según ``conversion.memory_handoff_mb`` (ver ``handoff``), sin
+                escribirlos en ``temp_dir``
+
+        Returns:
+            Lista paralela a ``files`` con el PDF generado o None si falló
+
+        Raises:
+            ConversionCancelled: Si se activó ``cancel`` antes de terminar
+        """
+        results: list[Path | MemoryPdf | None] = [None] * len(files)
+        for i, pdf in self.convert_ordered(files, temp_dir, on_done, on_start, cancel,
+                                           group_images, in_memory):
+            results[i] = pdf
+        return results
+
+    def convert_ordered(self, files: list[Path], temp_dir: Path | None = None,
+                        on_done: DoneCallback | None = None,
+                        on_start: StartCallback | None = None,
+                        cancel: threading.Event | None = None,
+                        group_images: bool = False,
+                        in_memory: bool = False,
+                        units: list[list[int]] | None = None
+                        ) -> Iterator[tuple[int, Path | MemoryPdf | None]]:
+        """
+        Igual que ``convert``, pero entrega ``(indice, pdf)`` en orden de entrada
+        en cuanto cada resultado y todos los anteriores están listos.
+
+        Los archivos que terminan antes de su turno esperan en un buffer de
+        reordenamiento, de modo que quien consume (la unión) puede avanzar
+        mientras los pools siguen convirtiendo el resto.
+
+        Con ``group_images`` los archivos de una tanda llegan seguidos y con el
+        mismo PDF (una página por imagen): quien une debe agregarlo una sola vez
+        por tanda. Para saber qué archivos forman cada tanda puede armarlas con
+        ``conversion_units`` y pasarlas en ``units`` (reemplaza a ``group_images``).
+        Con ``in_memory`` debe además soltar cada ``MemoryPdf`` tras agregarlo:
+        hasta entonces cuenta en ``conversion.memory_budget_mb``.
+        """
+        def check_cancel() -> None:
+            if cancel is not None and cancel.is_set():
+                raise ConversionCancelled()
+
+        ready: dict[int, Path | MemoryPdf | None] = {}  # buffer de reordenamiento
+        not_done: set[Future] = set()
+        handoff = handoff_policy() if in_memory else None
+        if handoff is not None and not handoff.max_bytes:
+            handoff = None
+
+        def finish(unit: list[int], pdfs: list[Path | MemoryPdf | None], seconds: float) -> None:
+            hit = unit[0] in hits
+            memory_capable = files[unit[0]].suffix.lower() in MEMORY_EXTS
+            if handoff is not None and not hit:
+                pdfs = _hand_off(pdfs, handoff, memory_capable)
+            share = seconds / len(unit)  # una tanda reparte su tiempo entre sus imágenes
+            shared = len(unit) > 1 and pdfs[0] is not None and len(set(pdfs)) == 1
+            for i, pdf in zip(unit, pdfs):
+                ready[i] = pdf
+                backend = _backend_label(files[i])
+                if not hit:
+                    record_conversion(backend, share, pdf is not None)
+                tags: dict[str, Any] = {"group": len(unit)} if shared else {}
+                if handoff is not None and memory_capable and pdf is not None and not hit:
+                    tags["handoff"] = "memory" if isinstance(pdf, MemoryPdf) else "disk"
+                record_span("convert", share, bytes_in=file_size(files[i]),
+                            bytes_out=file_size(pdf) // (len(unit) if shared else 1),
+                            ok=pdf is not None, type=files[i].suffix.lower().lstrip("."),
+                            backend=backend, cache="hit" if hit else "miss", **tags)
+            first = pdfs[0]
+            if (self.cache is not None and not hit and unit[0] in keys and first is not None
+                    and (len(unit) == 1 or shared)):
+                self.cache.put(keys[unit[0]], first)
+            if on_done:
+                for i, pdf in zip(unit, pdfs):
+                    on_done(i, files[i], pdf, share)
+
+        def run(unit: list[int]) -> tuple[list[Path | MemoryPdf | None], float]:
+            if len(unit) > 1:
+                return _convert_group_job([files[i] for i in unit], temp_dir, handoff)
+            pdf, seconds = _convert_job(files[unit[0]], temp_dir, handoff)
+            return [pdf], seconds
+
+        def started(unit: list[int]) -> None:
+            if on_start:
+                for i in unit:
+                    on_start(i, files[i])
+
+        def collect(timeout: float | None) -> None:
+            nonlocal not_done
+            done, not_done = wait(not_done, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: futures[f][0]):
+                unit = futures[future]
+                try:
+                    pdfs, seconds = future.result()
+                    if len(unit) == 1:
+                        pdfs = [pdfs]
+                except Exception as e:  # conversión fallida o proceso hijo caído
+                    logger.error(f"Error en proceso de conversión para {files[unit[0]].name}: {e}")
+                    pdfs, seconds = [None] * len(unit), 0.0
+                finish(unit, pdfs, seconds)
+
+        if units is None:
+            units = conversion_units(files, group_images)
+        keys, hits = self._lookup_cache(files, units, temp_dir)
+        for unit in units:
+            if unit[0] in hits:
+                finish(unit, [hits[i][0] for i in unit], sum(hits[i][1] for i in unit))
+
+        pending = [u for u in units if u[0] not in hits]
+        parallel = [u for u in pending if files[u[0]].suffix.lower() in PARALLEL_EXTS]
+        office = [u for u in pending if files[u[0]].suffix.lower() in OFFICE_EXTS]
+
+        # Con un solo proceso o un solo archivo cada pool solo añade latencia
+        job = next(self._job_ids)
+        pooled: set[int] = set()
+        futures: dict[Future, list[int]] = {}
+        if office and self._uses_office_pool(len(office)):
+            for unit in office:
+                [i] = unit
+                dst = temp_pdf_path(files[i], temp_dir)
+                futures[self._office_dispatch.submit(job, files[i], dst)] = unit
+                started(unit)
+                pooled.add(i)
+        elif office:
+            # en este proceso: Office arranca en segundo plano mientras se convierte lo anterior
+            prewarm([files[u[0]] for u in office])
+        if self.max_workers > 1 and len(parallel) > 1:
+            for unit in parallel:
+                if len(unit) > 1:
+                    future = self._image_dispatch.submit(
+                        job, _convert_group_job, [files[i] for i in unit], temp_dir, handoff)
+                else:
+                    future = self._image_dispatch.submit(job, _convert_job, files[unit[0]],
+                                                         temp_dir, handoff)
+                futures[future] = unit
+                started(unit)
+                pooled.add(unit[0])
+        # PDFs nativos y lo que no va a un pool, en este proceso mientras los pools trabajan
+        sequential = deque(u for u in pending if u[0] not in pooled)
+        not_done = set(futures)
+
+        try:
+            for next_i in range(len(files)):
+                while next_i not in ready:
+                    check_cancel()
+                    if sequential:
+                        # Mientras llega el turno de un archivo del pool, adelantar trabajo propio
+                        collect(0)
+                        if next_i in ready:
+                            break
+                        unit = sequential.popleft()
+                        started(unit)
+                        finish(unit, *run(unit))
+                    else:
+                        collect(CANCEL_POLL_SECONDS)
+                yield next_i, ready.pop(next_i)
+        except BaseException as e:  # cancelación, o quien consume dejó de iterar
+            for future in futures:
+                future.cancel()
+            if isinstance(e, ConversionCancelled):
+                logger.warning("Conversión cancelada; trabajos pendientes descartados")
+            raise
+
+
+def convert_files(files: list[Path], temp_dir: Path | None = None,
+                  max_workers: int | None = None,
+                  on_done: DoneCallback | None = None,
+                  cache: ConversionCache | None = None,
+                  cancel: threading.Event | None = None,
+                  office_workers: int | None = None) -> list[Path | MemoryPdf | None]:
+    """Atajo para convertir una sola lista con pools de vida corta."""
+    with ConversionEngine(max_workers, cache, office_workers) as engine:
+        return engine.convert(files, temp_dir, on_done, cancel=cancel)
@@ -0,0 +1,189 @@
+"""
+Entrega en memoria de los PDF convertidos a la unión.
+
+img2pdf ya devuelve el PDF de una imagen (o de una tanda) en memoria:
+escribirlo en la carpeta de trabajo para volver a leerlo al unir solo suma
+E/S, lenta en discos de escritorio y en carpetas revisadas por el antivirus.
+Con ``conversion.memory_handoff_mb`` > 0 esos resultados viajan como
+``MemoryPdf`` hasta ``MergeSink``. Se escriben a disco ("spill"):
+
+* los que superan ``conversion.memory_handoff_mb``;
+* los que llegan cuando los retenidos a la espera de la unión ya suman
+  ``conversion.memory_budget_mb`` (un archivo lento puede demorar el turno
+  de muchos ya convertidos).
+
+El spill va a la ruta temporal de siempre o, si se configura
+``conversion.spill_dir`` (p. ej. un tmpfs como ``/dev/shm``), a una
+subcarpeta con el nombre de la carpeta de trabajo. Los documentos Office y
+los TIFF se siguen convirtiendo a disco, y los PDF nativos no se copian.
+
+``handoff_stats()`` cuenta PDFs y bytes entregados en memoria y a disco.
+"""
+
+import shutil
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+
+from .core import get_config, logger
+
+# Imágenes cuyo PDF se arma en memoria (img2pdf); los TIFF van frame a frame a disco
+MEMORY_EXTS = {".jpg", ".jpeg", ".png"}
+
+
+@dataclass(eq=False)
+class MemoryPdf:
+    """
+    PDF convertido que todavía no está en disco.
+
+    ``path`` es la ruta temporal que habría tenido (y la del spill). Se compara
+    por identidad: los archivos de una tanda comparten el mismo objeto.
+    """
+    path: Path
+    data: bytes
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+@dataclass(frozen=True)
+class HandoffPolicy:
+    """Parámetros de la entrega en memoria (sección ``conversion``)."""
+    max_bytes: int = 0            # 0 = todo a disco
+    budget_bytes: int = 0         # 0 = sin límite
+    spill_dir: Path | None = None
+
+
+def handoff_policy() -> HandoffPolicy:
+    mb = 1024 * 1024
+    spill = get_config("conversion", "spill_dir", "") or ""
+    return HandoffPolicy(
+        max_bytes=int(float(get_config("conversion", "memory_handoff_mb", 8) or 0) * mb),
+        budget_bytes=int(float(get_config("conversion", "memory_budget_mb", 256) or 0) * mb),
+        spill_dir=Path(spill) if spill else None,
+    )
+
+
+# =============================
+# Contadores y presupuesto
+# =============================
+@dataclass
+class HandoffStats:
+    """PDFs y bytes entregados a la unión en memoria y a disco."""
+    kept: int = 0
+    kept_bytes: int = 0
+    spilled: int = 0
+    spilled_bytes: int = 0
+    retained_bytes: int = 0       # en memoria ahora mismo, a la espera de la unión
+    peak_bytes: int = 0
+
+
+_stats = HandoffStats()
+_lock = threading.Lock()
+
+
+def handoff_stats() -> HandoffStats:
+    """Copia de los contadores acumulados en este proceso."""
+    with _lock:
+        return HandoffStats(**vars(_stats))
+
+
+def reset_handoff_stats() -> None:
+    global _stats
+    with _lock:
+        _stats = HandoffStats(retained_bytes=_stats.retained_bytes)
+
+
+def format_handoff_stats(stats: HandoffStats) -> str:
+    mb = 1024 * 1024
+    return (f"Entrega a la unión: {stats.kept} en memoria ({stats.kept_bytes / mb:.1f} MB, "
+            f"pico {stats.peak_bytes / mb:.1f} MB), {stats.spilled} a disco "
+            f"({stats.spilled_bytes / mb:.1f} MB)")
+
+
+def _release(size: int) -> None:
+    with _lock:
+        _stats.retained_bytes -= size
+
+
+def _reserve(size: int, budget: int) -> bool:
+    with _lock:
+        if budget and _stats.retained_bytes + size > budget:
+            return False
+        _stats.retained_bytes += size
+        _stats.peak_bytes = max(_stats.peak_bytes, _stats.retained_bytes)
+        _stats.kept += 1
+        _stats.kept_bytes += size
+        return True
+
+
+def _count_spill(size: int) -> None:
+    with _lock:
+        _stats.spilled += 1
+        _stats.spilled_bytes += size
+
+
+# =============================
+# Entrega
+# =============================
+def spill_path(path: Path, policy: HandoffPolicy) -> Path:
+    """Ruta en disco de un resultado: la temporal, o la equivalente en ``spill_dir``."""
+    if policy.spill_dir is None:
+        return path
+    return policy.spill_dir / path.parent.name / path.name
+
+
+def discard_spill(work_dir: Path, policy: HandoffPolicy | None = None) -> None:
+    """Elimina lo que la carpeta de trabajo ``work_dir`` haya escrito en ``spill_dir``."""
+    policy = policy or handoff_policy()
+    if policy.spill_dir is not None:
+        shutil.rmtree(policy.spill_dir / work_dir.name, ignore_errors=True)
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def package(data: bytes, path: Path, policy: HandoffPolicy) -> "MemoryPdf | Path":
+    """
+    Empaqueta el PDF recién convertido (en el proceso que convierte).
+
+    Solo aplica el umbral por resultado; el presupuesto se controla al
+    recibirlo (``accept``), en el proceso que une.
+    """
+    if policy.max_bytes and len(data) <= policy.max_bytes:
+        return MemoryPdf(path, data)
+    return _write(spill_path(path, policy), data)
+
+
+def accept(pdf: "MemoryPdf | Path | None", policy: HandoffPolicy,
+           memory_capable: bool = True) -> "MemoryPdf | Path | None":
+    """
+    Registra la entrega de ``pdf`` (en el proceso que une) y aplica el presupuesto.
+
+    Un ``MemoryPdf`` que no entra en el presupuesto se escribe a disco. Los
+    bytes retenidos se liberan del presupuesto cuando el objeto se descarta
+    (tras agregarlo a la unión). ``memory_capable`` indica si ``pdf`` pudo
+    haber llegado en memoria: si llegó como archivo, cuenta como spill.
+    """
+    if isinstance(pdf, MemoryPdf):
+        if _reserve(pdf.size, policy.budget_bytes):
+            weakref.finalize(pdf, _release, pdf.size)
+            return pdf
+        logger.info(f"Presupuesto de memoria agotado: {pdf.name} se escribe a disco")
+        _count_spill(pdf.size)
+        return _write(spill_path(pdf.path, policy), pdf.data)
+    if pdf is not None and memory_capable and policy.max_bytes:
+        try:
+            _count_spill(pdf.stat().st_size)
+        except OSError:
+            pass
+    return pdf
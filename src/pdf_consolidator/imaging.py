@@ -0,0 +1,247 @@
+"""
+Normalización de imágenes antes de incrustarlas en el PDF.
+
+``img2pdf`` incrusta las imágenes tal cual: una foto de teléfono de 12 MP
+ocupa varios MB aunque se imprima en una hoja A4. Con
+``conversion.pdf_compression`` activado, cada JPG/PNG pasa antes por esta
+etapa:
+
+* Limita la resolución efectiva a ``conversion.image_max_dpi`` para la hoja
+  ``conversion.image_page_size`` (orientada como la imagen). El tamaño de la
+  página del PDF no cambia: solo se reduce la cantidad de píxeles.
+* Los JPEG que se vuelven a codificar usan ``conversion.image_quality``.
+* Detecta escaneos en escala de grises (canales casi iguales) y bilevel (casi
+  sin medios tonos) y los guarda en gris de 8 bits o a 1 bit.
+
+Las estadísticas de píxeles usan NumPy si está instalado y los histogramas de
+Pillow si no; ambos caminos dan el mismo resultado. Los TIFF tienen su propia
+ruta en ``tiff.py`` y no pasan por aquí.
+"""
+
+import io
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .core import get_config, logger
+
+if TYPE_CHECKING:  # Pillow se importa al normalizar
+    from PIL.Image import Image
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Tamaños de hoja en pulgadas (lado corto, lado largo)
+PAGE_SIZES = {
+    "A4": (210 / 25.4, 297 / 25.4),
+    "LETTER": (8.5, 11.0),
+    "LEGAL": (8.5, 14.0),
+}
+DEFAULT_DPI = 96.0          # el que asume img2pdf cuando la imagen no declara DPI
+NORMALIZED_EXTS = {".jpg", ".jpeg", ".png"}
+
+GRAY_TOLERANCE = 16          # diferencia máxima entre canales de un píxel "gris"
+GRAY_MAX_COLOR_FRACTION = 0.005  # píxeles con color tolerados en un escaneo gris
+MIDTONE_RANGE = (64, 192)    # [desde, hasta) niveles que no son ni tinta ni papel
+BILEVEL_MAX_MIDTONE_FRACTION = 0.02
+BILEVEL_THRESHOLD = 128
+STATS_SAMPLE_PX = 512        # lado de la miniatura usada para detectar color
+MIN_DOWNSCALE = 0.9          # reducir menos del 10 % no compensa la recompresión
+
+EXIF_ORIENTATION = 0x0112
+
+
+@dataclass(frozen=True)
+class ImagePolicy:
+    """Parámetros de la normalización (sección ``conversion`` de la configuración)."""
+    enabled: bool = False
+    max_dpi: int = 200
+    page_size: str = "A4"
+    quality: int = 95
+    detect_depth: bool = True
+
+    @property
+    def cache_tag(self) -> str:
+        """Parte de la clave de caché: otra política produce otro PDF."""
+        if not self.enabled:
+            return "orig"
+        depth = "auto" if self.detect_depth else "rgb"
+        return f"{self.max_dpi}dpi-{self.page_size}-q{self.quality}-{depth}"
+
+
+@dataclass
+class NormalizedImage:
+    """Imagen lista para img2pdf y lo que costó obtenerla."""
+    data: bytes
+    dpi: tuple[float, float]
+    size: tuple[int, int]
+    kind: str               # "color", "gris" o "bilevel"
+    bytes_in: int
+    seconds: float = 0.0
+
+    @property
+    def bytes_out(self) -> int:
+        return len(self.data)
+
+    @property
+    def reduction(self) -> float:
+        return 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+
+def image_policy() -> ImagePolicy:
+    page = str(get_config("conversion", "image_page_size", "A4")).upper()
+    return ImagePolicy(
+        enabled=bool(get_config("conversion", "pdf_compression", False)),
+        max_dpi=int(get_config("conversion", "image_max_dpi", 200)),
+        page_size=page if page in PAGE_SIZES else "A4",
+        quality=int(get_config("conversion", "image_quality", 95)),
+        detect_depth=bool(get_config("conversion", "image_detect_depth", True)),
+    )
+
+
+# =============================
+# Estadísticas de píxeles
+# =============================
+def color_fraction(im: "Image") -> float:
+    """Fracción de píxeles con canales que difieren más de ``GRAY_TOLERANCE``."""
+    sample = im.copy()
+    sample.thumbnail((STATS_SAMPLE_PX, STATS_SAMPLE_PX))
+    if HAS_NUMPY:
+        px = np.asarray(sample, dtype=np.int16)
+        spread = px.max(axis=2) - px.min(axis=2)
+        return float(np.count_nonzero(spread > GRAY_TOLERANCE) / spread.size)
+
+    from PIL import ImageChops
+
+    r, g, b = sample.split()
+    high = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    low = ImageChops.darker(ImageChops.darker(r, g), b)
+    hist = ImageChops.difference(high, low).histogram()
+    return float(sum(hist[GRAY_TOLERANCE + 1:]) / (sample.width * sample.height))
+
+
+def midtone_fraction(gray: "Image") -> float:
+    """Fracción de píxeles (imagen en modo L) en ``MIDTONE_RANGE``."""
+    lo, hi = MIDTONE_RANGE
+    if HAS_NUMPY:
+        hist = np.bincount(np.asarray(gray, dtype=np.uint8).ravel(), minlength=256)
+    else:
+        hist = gray.histogram()
+    return float(sum(hist[lo:hi]) / (gray.width * gray.height))
+
+
+# =============================
+# Normalización
+# =============================
+def effective_dpi(size: tuple[int, int], page_size: str) -> float:
+    """DPI al ajustar la imagen a la hoja, con la hoja girada como la imagen."""
+    short_in, long_in = PAGE_SIZES[page_size]
+    return max(max(size) / long_in, min(size) / short_in)
+
+
+def _source_dpi(im: "Image") -> tuple[float, float]:
+    try:
+        xdpi, ydpi = (float(d) or DEFAULT_DPI for d in im.info["dpi"])
+    except (KeyError, TypeError, ValueError):
+        xdpi = ydpi = DEFAULT_DPI
+    return xdpi, ydpi
+
+
+def normalize_image(src: Path, policy: ImagePolicy) -> NormalizedImage | None:
+    """
+    Reduce resolución y profundidad de ``src`` según ``policy``.
+
+    Returns:
+        La imagen recodificada, o None si no hay nada que ganar (modo no
+        soportado, o el resultado no es más chico que el original sin
+        haber reducido píxeles)
+    """
+    from PIL import Image  # import local: solo si hace falta
+
+    start = time.perf_counter()
+    bytes_in = src.stat().st_size
+    with Image.open(src) as im:
+        if im.mode not in ("RGB", "L"):
+            return None  # transparencia, paleta, 16 bits...: ruta original
+        is_jpeg = im.format == "JPEG"
+        orientation = im.getexif().get(EXIF_ORIENTATION, 1)
+        xdpi, ydpi = _source_dpi(im)
+        frame = im.copy()
+    orig_size = frame.size
+    original_kind = kind = "color" if frame.mode == "RGB" else "gris"
+
+    # La profundidad se decide a resolución completa: al reducir aparecen medios tonos
+    if policy.detect_depth:
+        if frame.mode == "RGB" and color_fraction(frame) <= GRAY_MAX_COLOR_FRACTION:
+            frame = frame.convert("L")
+            kind = "gris"
+        if frame.mode == "L" and midtone_fraction(frame) <= BILEVEL_MAX_MIDTONE_FRACTION:
+            kind = "bilevel"
+
+    factor = policy.max_dpi / effective_dpi(orig_size, policy.page_size)
+    if factor < MIN_DOWNSCALE:
+        target = (max(1, round(orig_size[0] * factor)), max(1, round(orig_size[1] * factor)))
+        frame = frame.resize(target, Image.Resampling.LANCZOS)
+    if kind == "bilevel":
+        frame = frame.point(lambda v: 255 if v >= BILEVEL_THRESHOLD else 0).convert("1")
+
+    # Los píxeles se giran aquí porque la imagen recodificada ya no lleva EXIF
+    t = Image.Transpose
+    transpose = {2: t.FLIP_LEFT_RIGHT, 3: t.ROTATE_180, 4: t.FLIP_TOP_BOTTOM, 5: t.TRANSPOSE,
+                 6: t.ROTATE_270, 7: t.TRANSVERSE, 8: t.ROTATE_90}
+    if orientation in transpose:
+        frame = frame.transpose(transpose[orientation])
+        if orientation >= 5:
+            xdpi, ydpi = ydpi, xdpi
+            orig_size = orig_size[::-1]
+
+    resized = frame.size != orig_size
+    if not resized and kind == original_kind:
+        return None  # mismos píxeles y misma profundidad: el original sirve
+
+    buf = io.BytesIO()
+    if is_jpeg and frame.mode != "1":
+        frame.save(buf, "JPEG", quality=policy.quality, optimize=True)
+    else:
+        frame.save(buf, "PNG")
+    if not resized and buf.tell() >= bytes_in:
+        return None
+
+    # Misma página que con la imagen original: se escala el DPI con los píxeles
+    dpi = (xdpi * frame.width / orig_size[0], ydpi * frame.height / orig_size[1])
+    return NormalizedImage(buf.getvalue(), dpi, frame.size, kind, bytes_in,
+                           time.perf_counter() - start)
+
+
+def write_normalized_pdf(src: Path, dst_pdf: Path, policy: ImagePolicy) -> bool:
+    """
+    Escribe ``dst_pdf`` con la imagen normalizada; False si conviene la ruta original.
+
+    Registra en el log (y como span ``normalize``) la reducción y el tiempo.
+    """
+    import img2pdf  # type: ignore[import-untyped]
+
+    result = normalize_image(src, policy)
+    if result is None:
+        return False
+    with open(dst_pdf, "wb") as f_out:
+        f_out.write(img2pdf.convert(result.data,
+                                    layout_fun=img2pdf.get_fixed_dpi_layout_fun(result.dpi)))
+    report_normalized(src, result)
+    return True
+
+
+def report_normalized(src: Path, result: NormalizedImage) -> None:
+    """Registra en el log (y como span ``normalize``) la reducción y el tiempo."""
+    from .metrics import record_span
+
+    logger.info(f"Imagen normalizada {src.name}: {result.bytes_in / 1024:.0f} KB -> "
+                f"{result.bytes_out / 1024:.0f} KB (-{result.reduction:.0%}) en "
+                f"{result.seconds:.2f}s [{result.size[0]}x{result.size[1]}, {result.kind}]")
+    record_span("normalize", result.seconds, bytes_in=result.bytes_in,
+                bytes_out=result.bytes_out, type=src.suffix.lower().lstrip("."),
+                kind=result.kind)
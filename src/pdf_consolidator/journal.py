@@ -0,0 +1,270 @@
+"""
+Bitácora de trabajos para reanudar consolidaciones interrumpidas.
+
+Cada caso escribe ``journal.jsonl`` en su carpeta de trabajo: una línea por
+evento, solo agregando al final (una caída a mitad de línea pierde a lo sumo
+ese registro, que se ignora al leer):
+
+* ``start``: salida, lista de archivos y metadatos del caso (ident, cliente,
+  reembolso, carpeta). Un trabajo reanudado agrega otro ``start``.
+* ``file``: estado de un archivo (``done``, ``failed`` o ``rejected``), PDF
+  generado, SHA-256 del PDF y huella del original (tamaño y mtime). Las
+  imágenes de una tanda registran el mismo PDF; las entregadas a la unión en
+  memoria (ver ``handoff``) se marcan ``memory`` y no tienen PDF que reutilizar.
+* ``finish``: páginas escritas y archivos fallidos.
+
+Si el proceso se cae, se cancela o termina con archivos fallidos, la carpeta
+de trabajo se conserva con la bitácora. Al reanudar (``consolidate`` con la
+misma bitácora) se reutilizan los PDF cuyo original no cambió y cuyo SHA-256
+coincide, y solo se convierten los fallidos o los que faltan antes de unir.
+
+    journal = JobJournal(work_dir).start(files, out_path, meta)
+    consolidate(engine, files, work_dir, out_path, journal=journal)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from .core import TEMP_DIR, get_config, logger
+from .handoff import MemoryPdf
+
+JOURNAL_NAME = "journal.jsonl"
+DONE = "done"
+FAILED = "failed"
+REJECTED = "rejected"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(path: Path) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class JobJournal:
+    """
+    Bitácora de un trabajo (una carpeta de trabajo).
+
+    Al crearla se relee la bitácora existente, si la hay. Es segura para
+    escribir desde varios hilos.
+    """
+
+    def __init__(self, work_dir: Path):
+        self.work_dir = work_dir
+        self.path = work_dir / JOURNAL_NAME
+        self.output: Path | None = None
+        self.files: list[Path] = []
+        self.meta: dict[str, str] = {}
+        self.records: dict[str, dict] = {}   # ruta del original -> último registro ``file``
+        self.finished = False
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._digests: dict[tuple[str, tuple | None], str] = {}  # (pdf, huella) -> SHA-256
+        self._load()
+
+    # -- lectura ----------------------------------------------------------
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # línea cortada por una caída
+            self._apply(record)
+
+    def _apply(self, record: dict) -> None:
+        event = record.get("event")
+        if event == "start":
+            self.output = Path(record["output"])
+            self.files = [Path(p) for p in record.get("files", [])]
+            self.meta = record.get("meta") or self.meta
+            self.finished = False
+        elif event == "file":
+            self.records[record["src"]] = record
+        elif event == "finish":
+            self.finished = True
+            self.pages = record.get("pages", 0)
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def name(self) -> str:
+        return self.output.name if self.output else self.work_dir.name
+
+    def _state(self, src: Path) -> str | None:
+        record = self.records.get(str(src))
+        return record["state"] if record else None
+
+    @property
+    def done(self) -> list[Path]:
+        return [f for f in self.files if self._state(f) == DONE]
+
+    @property
+    def failed(self) -> list[Path]:
+        return [f for f in self.files if self._state(f) in (FAILED, REJECTED)]
+
+    @property
+    def complete(self) -> bool:
+        """Terminó y todos los archivos se convirtieron: no hay nada que reanudar."""
+        return self.finished and not self.failed and len(self.done) == len(self.files)
+
+    @property
+    def resumable(self) -> bool:
+        """Quedó algo por hacer y hay conversiones que vale la pena reutilizar."""
+        return bool(self.files) and not self.complete and bool(self.done)
+
+    @property
+    def updated(self) -> float:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _sha256(self, pdf: Path) -> str:
+        """SHA-256 de ``pdf``, calculado una vez por versión del archivo (una tanda lo comparte)."""
+        key = (str(pdf), _fingerprint(pdf))
+        if key not in self._digests:
+            self._digests[key] = file_sha256(pdf)
+        return self._digests[key]
+
+    def reusable(self, files: list[Path]) -> dict[int, Path]:
+        """
+        PDF ya convertidos de ``files`` que se pueden unir sin volver a convertir.
+
+        Se descartan los registros cuyo original cambió (tamaño o mtime) o cuyo
+        PDF ya no existe o no coincide con el SHA-256 registrado, y los que se
+        entregaron en memoria (se vuelven a convertir). El PDF de una
+        tanda de imágenes se reutiliza solo si todas sus imágenes siguen
+        convertidas y contiguas en ``files``.
+        """
+        reused: dict[int, Path] = {}
+        for i, f in enumerate(files):
+            record = self.records.get(str(f))
+            if not record or record["state"] != DONE:
+                continue
+            if not record.get("pdf") or _fingerprint(f) != tuple(record.get("source") or ()):
+                continue
+            pdf = Path(record["pdf"])
+            try:
+                if record.get("sha256") and self._sha256(pdf) != record["sha256"]:
+                    continue
+            except OSError:
+                continue
+            reused[i] = pdf
+
+        members: dict[str, int] = {}
+        for record in self.records.values():
+            if record["state"] == DONE and record.get("pdf"):
+                members[record["pdf"]] = members.get(record["pdf"], 0) + 1
+        for pdf_str in {str(p) for p in reused.values()}:
+            if members.get(pdf_str, 0) < 2:
+                continue
+            indexes = [i for i, p in reused.items() if str(p) == pdf_str]
+            if len(indexes) != members[pdf_str] or indexes[-1] - indexes[0] != len(indexes) - 1:
+                for i in indexes:
+                    del reused[i]
+        return reused
+
+    # -- escritura --------------------------------------------------------
+    def _append(self, record: dict) -> None:
+        record["ts"] = round(time.time(), 3)
+        with self._lock:
+            self.work_dir.mkdir(parents=True, exist_ok=True)
+            # una línea por write y flush: una caída del proceso no deja registros a medias
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+            self._apply(record)
+
+    def start(self, files: list[Path], output: Path,
+              meta: dict[str, str] | None = None) -> "JobJournal":
+        self._append({"event": "start", "output": str(output),
+                      "files": [str(f) for f in files], "meta": meta or self.meta})
+        return self
+
+    def record(self, src: Path, pdf: Path | MemoryPdf | None, seconds: float = 0.0,
+               reason: str = "") -> None:
+        """Registra el resultado de ``src``: ``pdf`` None = fallido (o rechazado con ``reason``)."""
+        record = {"event": "file", "src": str(src), "source": _fingerprint(src),
+                  "seconds": round(seconds, 3)}
+        if isinstance(pdf, MemoryPdf):
+            record["state"] = DONE
+            record["memory"] = True
+        elif pdf is not None:
+            record["state"] = DONE
+            record["pdf"] = str(pdf)
+            # los PDF nativos no se copian: basta la huella del original
+            if pdf != src:
+                try:
+                    record["sha256"] = self._sha256(pdf)
+                except OSError as e:
+                    record["state"] = FAILED
+                    reason = f"PDF convertido ilegible: {e}"
+        else:
+            record["state"] = REJECTED if reason else FAILED
+        if reason:
+            record["reason"] = reason
+        self._append(record)
+
+    def finish(self, pages: int, failed: list[Path]) -> None:
+        self._append({"event": "finish", "pages": pages, "failed": [str(f) for f in failed]})
+
+    def discard(self) -> None:
+        """Elimina la carpeta de trabajo con la bitácora y los PDF convertidos."""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def keep_days() -> float:
+    return float(get_config("jobs", "journal_keep_days", 7) or 0)
+
+
+def pending_jobs(temp_dir: Path = TEMP_DIR) -> list[JobJournal]:
+    """
+    Trabajos reanudables en ``temp_dir``, del más reciente al más antiguo.
+
+    Los que superan ``jobs.journal_keep_days`` días sin cambios se eliminan.
+    """
+    jobs: list[JobJournal] = []
+    if not temp_dir.is_dir():
+        return jobs
+    max_age = keep_days() * 86400
+    now = time.time()
+    for path in temp_dir.glob(f"*/{JOURNAL_NAME}"):
+        journal = JobJournal(path.parent)
+        if not journal.resumable:
+            continue
+        if max_age and now - journal.updated > max_age:
+            logger.info(f"Trabajo interrumpido vencido, se elimina: {journal.name}")
+            journal.discard()
+            continue
+        jobs.append(journal)
+    jobs.sort(key=lambda j: j.updated, reverse=True)
+    return jobs
+
+
+def find_pending(output_name: str, temp_dir: Path = TEMP_DIR) -> JobJournal | None:
+    """Trabajo reanudable más reciente cuya salida se llama ``output_name``."""
+    for journal in pending_jobs(temp_dir):
+        if journal.output is not None and journal.output.name == output_name:
+            return journal
+    return None
@@ -0,0 +1,304 @@
+"""
+Punto de entrada de línea de comandos (``pdf-consolidator``).
+
+Ejemplos:
+    pdf-consolidator batch casos.csv --output data/output
+    pdf-consolidator resume                 # lista los trabajos interrumpidos
+    pdf-consolidator resume 123_Ana_5.pdf   # reconvierte solo lo fallido y une
+    pdf-consolidator watch data/inbox --max-cases 2
+    pdf-consolidator cache stats
+    pdf-consolidator metrics export --out /var/lib/node_exporter/consolidador.prom
+    pdf-consolidator --profile batch casos.csv   # cProfile/tracemalloc por etapa
+    pdf-consolidator profile --runs 5            # funciones y picos de memoria
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from .core import APP_VERSION, OUTPUT_DIR, TEMP_DIR, setup_logging
+
+if TYPE_CHECKING:  # los subcomandos importan sus módulos al ejecutarse
+    from .cache import CacheStats
+    from .journal import JobJournal
+
+
+def _format_cache_stats(stats: "CacheStats") -> str:
+    return (f"Caché: {stats.hits} aciertos, {stats.misses} fallos "
+            f"({stats.hit_ratio:.0%} aciertos), {stats.evictions} desalojos")
+
+
+def _cmd_batch(args: argparse.Namespace) -> int:
+    from .backends import backend_stats, close_backends, format_backend_stats
+    from .batch import format_case_line, format_summary, load_manifest, run_batch
+    from .cache import cache_from_config
+    from .handoff import format_handoff_stats, handoff_stats
+    from .watchdog import format_watchdog_stats, watchdog_stats
+
+    try:
+        cases = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error leyendo manifiesto: {e}", file=sys.stderr)
+        return 2
+
+    print(f"Procesando {len(cases)} casos de {args.manifest}")
+    cache = None if args.no_cache else cache_from_config()
+    start = time.perf_counter()
+    try:
+        results = run_batch(cases, output_dir=args.output, temp_dir=args.temp,
+                            workers=args.workers, cache=cache, max_jobs=args.jobs,
+                            on_result=lambda r: print(format_case_line(r), flush=True),
+                            resume=args.resume)
+    finally:
+        close_backends()
+    print(format_summary(results, time.perf_counter() - start))
+    if backend_stats():
+        print(format_backend_stats(backend_stats()))
+    handoff = handoff_stats()
+    if handoff.kept or handoff.spilled:
+        print(format_handoff_stats(handoff))
+    if watchdog_stats().timeouts:
+        print(format_watchdog_stats(watchdog_stats()))
+    if cache is not None:
+        print(_format_cache_stats(cache.stats))
+    return 0 if all(r.ok for r in results) else 1
+
+
+def _cmd_watch(args: argparse.Namespace) -> int:
+    from .backends import close_backends
+    from .batch import format_case_line
+    from .cache import cache_from_config
+    from .watch import WatchDaemon
+
+    daemon = WatchDaemon(args.inbox, output_dir=args.output, temp_dir=args.temp,
+                         settle_seconds=args.settle, max_cases=args.max_cases,
+                         workers=args.workers,
+                         cache=None if args.no_cache else cache_from_config(),
+                         on_result=lambda r: print(format_case_line(r), flush=True),
+                         use_inotify=False if args.poll else None)
+    print(f"Vigilando {daemon.inbox} (Ctrl+C para detener)", flush=True)
+    try:
+        daemon.run()  # al interrumpir, espera a los casos en curso antes de salir
+    except KeyboardInterrupt:
+        print("Vigilancia detenida", flush=True)
+    finally:
+        close_backends()
+    return 0
+
+
+def _format_job(journal: "JobJournal") -> str:
+    state = "con fallidos" if journal.finished else "interrumpido"
+    age_h = (time.time() - journal.updated) / 3600
+    return (f"{journal.name}: {len(journal.done)}/{len(journal.files)} convertidos, "
+            f"{len(journal.failed)} fallidos ({state}, hace {age_h:.1f} h) | {journal.work_dir}")
+
+
+def _cmd_resume(args: argparse.Namespace) -> int:
+    from .backends import close_backends
+    from .batch import BatchCase, format_case_line, run_batch
+    from .cache import cache_from_config
+    from .journal import pending_jobs
+
+    jobs = pending_jobs(args.temp)
+    if not args.names and not args.all:
+        if not jobs:
+            print("No hay trabajos para reanudar")
+        for journal in jobs:
+            print(_format_job(journal))
+        return 0
+
+    wanted = set(args.names)
+    selected = [j for j in jobs
+                if args.all or j.name in wanted or Path(j.name).stem in wanted]
+    missing = wanted - {j.name for j in selected} - {Path(j.name).stem for j in selected}
+    for name in sorted(missing):
+        print(f"Sin trabajo para reanudar: {name}", file=sys.stderr)
+    if args.discard:
+        for journal in selected:
+            journal.discard()
+            print(f"Descartado: {journal.name}")
+        return 1 if missing else 0
+
+    cache = None if args.no_cache else cache_from_config()
+    ok = not missing
+    try:
+        for journal in selected:
+            try:
+                case = BatchCase.from_meta(journal.meta)
+            except KeyError:
+                print(f"{journal.name}: la bitácora no tiene los datos del caso", file=sys.stderr)
+                ok = False
+                continue
+            if journal.output is None:
+                print(f"{journal.name}: la bitácora no tiene la salida del caso", file=sys.stderr)
+                ok = False
+                continue
+            [result] = run_batch([case], output_dir=journal.output.parent, temp_dir=args.temp,
+                                 workers=args.workers, cache=cache, max_jobs=1, resume=True)
+            print(format_case_line(result), flush=True)
+            ok = ok and result.ok and not result.failed_files
+    finally:
+        close_backends()
+    return 0 if ok else 1
+
+
+def _cmd_cache(args: argparse.Namespace) -> int:
+    from .cache import ConversionCache, cache_from_config
+
+    cache = cache_from_config() or ConversionCache()
+    if args.dir is not None:
+        cache = ConversionCache(args.dir, cache.max_bytes)
+
+    if args.action == "prune":
+        limit = None if args.max_size_mb is None else int(args.max_size_mb * 1024 * 1024)
+        print(f"Entradas desalojadas: {cache.prune(limit)}")
+    elif args.action == "clear":
+        print(f"Entradas eliminadas: {cache.clear()}")
+    cache.save_stats()
+
+    print(f"Directorio: {cache.root.resolve()}")
+    print(f"Entradas: {cache.entry_count()} | Tamaño: {cache.total_bytes() / 1024 / 1024:.1f} MB "
+          f"de {cache.max_bytes / 1024 / 1024:.0f} MB")
+    print(_format_cache_stats(cache.load_totals()) + " (acumulado)")
+    return 0
+
+
+def _cmd_metrics(args: argparse.Namespace) -> int:
+    from .metrics import (
+        export_prometheus, format_summary, load_spans, metrics_file, since_hours, summarize,
+    )
+
+    source = args.input or metrics_file()
+    since = since_hours(args.since_hours)
+    if args.action == "export":
+        if args.out is None:
+            print("Indique --out para exportar", file=sys.stderr)
+            return 2
+        count = export_prometheus(args.out, source, since)
+        print(f"{count} spans de {source} exportados a {args.out}")
+        return 0
+
+    spans = load_spans(source, since)
+    if not spans:
+        print(f"Sin métricas en {source}")
+        return 0
+    print(format_summary(summarize(spans)))
+    return 0
+
+
+def _cmd_profile(args: argparse.Namespace) -> int:
+    from .profiling import format_report, profile_runs
+
+    runs = profile_runs(args.dir, args.runs)
+    if not runs:
+        print("Sin ejecuciones perfiladas (use --profile)")
+        return 0
+    print(format_report(runs, args.top))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pdf-consolidator",
+        description="Consolidador de documentos a PDF (modo línea de comandos).",
+    )
+    parser.add_argument("--version", action="version", version=APP_VERSION)
+    parser.add_argument("--profile", action="store_true",
+                        help="Perfilar cada etapa (cProfile y tracemalloc) en logs/profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_batch = sub.add_parser("batch", help="Consolidar varios casos desde un manifiesto CSV/JSONL")
+    p_batch.add_argument("manifest", type=Path,
+                         help="Manifiesto con columnas ident, cliente, reembolso, carpeta")
+    p_batch.add_argument("--output", type=Path, default=OUTPUT_DIR,
+                         help=f"Carpeta de salida (por defecto {OUTPUT_DIR})")
+    p_batch.add_argument("--temp", type=Path, default=TEMP_DIR,
+                         help=f"Carpeta de temporales (por defecto {TEMP_DIR})")
+    p_batch.add_argument("--workers", type=int, default=None,
+                         help="Procesos de conversión en paralelo (por defecto, uno por núcleo)")
+    p_batch.add_argument("--jobs", type=int, default=None,
+                         help="Casos consolidados a la vez (por defecto jobs.max_concurrent)")
+    p_batch.add_argument("--no-cache", action="store_true",
+                         help="No usar la caché de conversiones")
+    p_batch.add_argument("--resume", action="store_true",
+                         help="Continuar casos interrumpidos sin reconvertir lo ya convertido")
+    p_batch.set_defaults(func=_cmd_batch)
+
+    p_resume = sub.add_parser("resume", help="Listar o reanudar trabajos interrumpidos o con fallidos")
+    p_resume.add_argument("names", nargs="*",
+                          help="Nombre del PDF de salida del trabajo (sin nombres: listar)")
+    p_resume.add_argument("--all", action="store_true", help="Reanudar todos los trabajos")
+    p_resume.add_argument("--discard", action="store_true",
+                          help="Descartar los trabajos indicados en lugar de reanudarlos")
+    p_resume.add_argument("--temp", type=Path, default=TEMP_DIR,
+                          help=f"Carpeta de temporales (por defecto {TEMP_DIR})")
+    p_resume.add_argument("--workers", type=int, default=None,
+                          help="Procesos de conversión en paralelo (por defecto, uno por núcleo)")
+    p_resume.add_argument("--no-cache", action="store_true",
+                          help="No usar la caché de conversiones")
+    p_resume.set_defaults(func=_cmd_resume)
+
+    p_watch = sub.add_parser("watch", help="Vigilar una bandeja y consolidar cada carpeta de caso")
+    p_watch.add_argument("inbox", type=Path, nargs="?", default=None,
+                         help="Bandeja con una subcarpeta por caso (por defecto watch.inbox)")
+    p_watch.add_argument("--output", type=Path, default=OUTPUT_DIR,
+                         help=f"Carpeta de salida (por defecto {OUTPUT_DIR})")
+    p_watch.add_argument("--temp", type=Path, default=TEMP_DIR,
+                         help=f"Carpeta de temporales (por defecto {TEMP_DIR})")
+    p_watch.add_argument("--settle", type=float, default=None,
+                         help="Segundos sin cambios antes de procesar una carpeta")
+    p_watch.add_argument("--max-cases", type=int, default=None,
+                         help="Casos procesados a la vez (por defecto watch.max_cases)")
+    p_watch.add_argument("--workers", type=int, default=None,
+                         help="Procesos de conversión en paralelo (por defecto, uno por núcleo)")
+    p_watch.add_argument("--poll", action="store_true",
+                         help="Revisar con os.scandir aunque inotify esté disponible")
+    p_watch.add_argument("--no-cache", action="store_true",
+                         help="No usar la caché de conversiones")
+    p_watch.set_defaults(func=_cmd_watch)
+
+    p_cache = sub.add_parser("cache", help="Inspeccionar o podar la caché de conversiones")
+    p_cache.add_argument("action", choices=("stats", "prune", "clear"), nargs="?", default="stats")
+    p_cache.add_argument("--dir", type=Path, default=None,
+                         help="Directorio de la caché (por defecto, el de app_config.json)")
+    p_cache.add_argument("--max-size-mb", type=float, default=None,
+                         help="Límite para 'prune' (por defecto, el configurado)")
+    p_cache.set_defaults(func=_cmd_cache)
+
+    p_metrics = sub.add_parser("metrics", help="Resumir o exportar las métricas por etapa")
+    p_metrics.add_argument("action", choices=("summary", "export"), nargs="?", default="summary")
+    p_metrics.add_argument("--out", type=Path, default=None,
+                           help="Archivo .prom para el textfile collector (con 'export')")
+    p_metrics.add_argument("--input", type=Path, default=None,
+                           help="JSONL de métricas (por defecto, el de app_config.json)")
+    p_metrics.add_argument("--since-hours", type=float, default=None,
+                           help="Considerar solo las últimas N horas")
+    p_metrics.set_defaults(func=_cmd_metrics)
+
+    p_profile = sub.add_parser("profile", help="Informe de las ejecuciones perfiladas")
+    p_profile.add_argument("--runs", type=int, default=5,
+                           help="Últimas N ejecuciones consideradas (0 = todas)")
+    p_profile.add_argument("--top", type=int, default=15,
+                           help="Funciones por etapa y picos de memoria a mostrar")
+    p_profile.add_argument("--dir", type=Path, default=None,
+                           help="Carpeta de perfiles (por defecto profiling.dir)")
+    p_profile.set_defaults(func=_cmd_profile)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    if args.command != "profile":
+        from .profiling import enable_profiling, profiling_configured
+        if args.profile or profiling_configured():
+            print(f"Perfil por etapa en {enable_profiling()}", file=sys.stderr)
+    command: Callable[[argparse.Namespace], int] = args.func
+    return command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
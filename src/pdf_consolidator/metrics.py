@@ -0,0 +1,289 @@
+"""
+Instrumentación por etapa: spans y exportación de métricas.
+
+Cada etapa del proceso (``scan``, ``convert``, ``merge``, ``write``,
+``cleanup``) registra un span con su duración, bytes de entrada/salida,
+páginas y etiquetas (tipo de archivo, backend, caso...). Los spans se
+escriben como una línea JSON en ``logs/metrics.jsonl`` a través de la misma
+cola asíncrona que los logs, sin E/S de disco en el hilo que convierte. Como
+``app.log``, el archivo rota al superar ``metrics.max_mb`` (se guardan
+``METRICS_BACKUPS`` anteriores): el resumen y la exportación leen solo el
+vigente.
+
+``export_prometheus`` resume ese archivo en formato *textfile* de Prometheus
+(p50/p95 de latencia por etapa y tipo) para el node_exporter::
+
+    consolidador_span_seconds{span="convert",type="jpg",quantile="0.95"} 0.041
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .core import LOG_DIR, QueueLogHandler, get_config, logger, start_log_listener
+from .handoff import MemoryPdf
+
+METRICS_FILE = LOG_DIR / "metrics.jsonl"
+METRICS_MAX_MB = 10
+METRICS_BACKUPS = 3
+QUANTILES = (0.5, 0.95, 0.99)
+
+_metrics_logger = logging.getLogger("consolidador.metrics")
+_metrics_logger.propagate = False  # no mezclar spans con app.log
+_metrics_logger.setLevel(logging.INFO)
+
+_handler: QueueLogHandler | None = None  # QueueHandler hacia el JSONL, creado al primer span
+
+# Identificador del proceso de consolidación en curso (un caso de batch o de la GUI)
+_current_run: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_run", default="")
+
+
+@dataclass
+class Span:
+    """Una etapa medida."""
+    name: str
+    ts: float = 0.0            # inicio, segundos desde epoch
+    duration_s: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    pages: int = 0
+    ok: bool = True
+    run: str = ""
+    tags: dict[str, str] = field(default_factory=dict)
+
+
+def metrics_enabled() -> bool:
+    return bool(get_config("metrics", "enabled", True))
+
+
+def metrics_file() -> Path:
+    """JSONL configurado en ``metrics.file`` (por defecto ``logs/metrics.jsonl``)."""
+    return Path(get_config("metrics", "file", "") or METRICS_FILE)
+
+
+def _ensure_handler() -> None:
+    global _handler
+    if _handler is None:
+        path = metrics_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        max_bytes = int(float(get_config("metrics", "max_mb", METRICS_MAX_MB) or 0) * 1024 * 1024)
+        jsonl = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=METRICS_BACKUPS,
+                                    encoding="utf-8", delay=True)
+        jsonl.setFormatter(logging.Formatter("%(message)s"))
+        _handler = start_log_listener(jsonl)
+        _metrics_logger.addHandler(_handler)
+
+
+def emit(span: Span) -> None:
+    """Encola ``span`` para escribirlo en el JSONL de métricas."""
+    if not metrics_enabled():
+        return
+    _ensure_handler()
+    _metrics_logger.info(json.dumps(asdict(span), ensure_ascii=False))
+
+
+def record_span(name: str, duration_s: float, *, bytes_in: int = 0, bytes_out: int = 0,
+                pages: int = 0, ok: bool = True, **tags: object) -> Span:
+    """Registra una etapa ya medida (p. ej. una conversión hecha en otro proceso)."""
+    span = Span(name, time.time() - duration_s, duration_s, bytes_in, bytes_out, pages, ok,
+                _current_run.get(), {k: str(v) for k, v in tags.items()})
+    emit(span)
+    return span
+
+
+@contextmanager
+def span(name: str, **tags: object) -> Iterator[Span]:
+    """
+    Mide el bloque como una etapa; se pueden completar bytes/páginas dentro::
+
+        with span("merge", files=3) as s:
+            s.pages = merge_pdfs(...)
+    """
+    s = Span(name, time.time(), run=_current_run.get(),
+             tags={k: str(v) for k, v in tags.items()})
+    start = time.perf_counter()
+    try:
+        yield s
+    except BaseException:
+        s.ok = False
+        raise
+    finally:
+        s.duration_s = time.perf_counter() - start
+        emit(s)
+
+
+@contextmanager
+def run_context(run_id: str | None = None) -> Iterator[str]:
+    """Agrupa los spans del bloque bajo un mismo ``run`` (uno por caso)."""
+    run_id = run_id or uuid.uuid4().hex[:12]
+    token = _current_run.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _current_run.reset(token)
+
+
+def file_size(path: "Path | MemoryPdf | None") -> int:
+    if isinstance(path, MemoryPdf):
+        return path.size
+    try:
+        return path.stat().st_size if path else 0
+    except OSError:
+        return 0
+
+
+# =============================
+# Lectura y exportación
+# =============================
+def load_spans(path: Path | None = None, since: float | None = None) -> list[Span]:
+    """Spans del JSONL (desde el timestamp ``since``, si se indica). Ignora líneas dañadas."""
+    path = path or metrics_file()
+    spans = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    s = Span(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                if since is None or s.ts >= since:
+                    spans.append(s)
+    except FileNotFoundError:
+        pass
+    return spans
+
+
+def quantile(sorted_values: list[float], q: float) -> float:
+    """Cuantil con interpolación lineal sobre valores ya ordenados."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _series_key(s: Span) -> tuple[str, str]:
+    return s.name, s.tags.get("type", "")
+
+
+def summarize(spans: Iterable[Span]) -> dict[tuple[str, str], dict]:
+    """Por (etapa, tipo): cantidad, suma, cuantiles, bytes, páginas y fallos."""
+    groups: dict[tuple[str, str], list[Span]] = {}
+    for s in spans:
+        groups.setdefault(_series_key(s), []).append(s)
+    summary = {}
+    for key, items in sorted(groups.items()):
+        durations = sorted(s.duration_s for s in items)
+        summary[key] = {
+            "count": len(items),
+            "sum": sum(durations),
+            "quantiles": {q: quantile(durations, q) for q in QUANTILES},
+            "bytes_in": sum(s.bytes_in for s in items),
+            "bytes_out": sum(s.bytes_out for s in items),
+            "pages": sum(s.pages for s in items),
+            "failures": sum(1 for s in items if not s.ok),
+        }
+    return summary
+
+
+def _labels(span_name: str, kind: str, **extra: str) -> str:
+    labels = {"span": span_name, **({"type": kind} if kind else {}), **extra}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def format_prometheus(summary: dict[tuple[str, str], dict]) -> str:
+    """Texto en formato de exposición de Prometheus."""
+    lines = [
+        "# HELP consolidador_span_seconds Duración de cada etapa del consolidador.",
+        "# TYPE consolidador_span_seconds summary",
+    ]
+    for (name, kind), data in summary.items():
+        for q, value in data["quantiles"].items():
+            lines.append(f"consolidador_span_seconds{_labels(name, kind, quantile=q)} {value:.6f}")
+        lines.append(f"consolidador_span_seconds_sum{_labels(name, kind)} {data['sum']:.6f}")
+        lines.append(f"consolidador_span_seconds_count{_labels(name, kind)} {data['count']}")
+    counters = (
+        ("failures", "consolidador_span_failures_total", "Etapas fallidas."),
+        ("pages", "consolidador_span_pages_total", "Páginas procesadas."),
+        ("bytes_in", "consolidador_span_bytes_in_total", "Bytes leídos."),
+        ("bytes_out", "consolidador_span_bytes_out_total", "Bytes escritos."),
+    )
+    for key, metric, help_text in counters:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for (name, kind), data in summary.items():
+            lines.append(f"{metric}{_labels(name, kind)} {data[key]}")
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(out_path: Path, metrics_path: Path | None = None,
+                      since: float | None = None) -> int:
+    """
+    Escribe ``out_path`` (formato textfile) a partir del JSONL; devuelve cuántos spans usó.
+
+    Se escribe en un temporal y se renombra, como exige el textfile collector.
+    """
+    spans = load_spans(metrics_path, since)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(format_prometheus(summarize(spans)), encoding="utf-8")
+    os.replace(tmp, out_path)
+    return len(spans)
+
+
+def export_configured() -> None:
+    """Exporta a ``metrics.prometheus_file`` si está configurado (al terminar un proceso)."""
+    target = get_config("metrics", "prometheus_file", "")
+    if not target or not metrics_enabled():
+        return
+    flush()
+    try:
+        export_prometheus(Path(target), metrics_file())
+    except OSError as e:
+        logger.warning(f"No se pudieron exportar las métricas a {target}: {e}")
+
+
+def flush() -> None:
+    """Espera a que los spans encolados se escriban (antes de leer el JSONL)."""
+    if _handler is not None:
+        _handler.listener.stop()   # procesa lo pendiente y detiene el hilo
+        _handler.listener.start()
+
+
+def close() -> None:
+    """Escribe lo pendiente y cierra el JSONL; el próximo span lo vuelve a abrir."""
+    global _handler
+    if _handler is not None:
+        _handler.listener.stop()
+        atexit.unregister(_handler.listener.stop)
+        for target in _handler.listener.handlers:
+            target.close()
+        _metrics_logger.removeHandler(_handler)
+        _handler = None
+
+
+def format_summary(summary: dict[tuple[str, str], dict]) -> str:
+    """Tabla legible de p50/p95 por etapa y tipo."""
+    lines = [f"{'Etapa':<10} {'Tipo':<6} {'N':>6} {'p50 s':>8} {'p95 s':>8} "
+             f"{'Págs':>7} {'Fallos':>6}"]
+    for (name, kind), data in summary.items():
+        q = data["quantiles"]
+        lines.append(f"{name:<10} {kind or '-':<6} {data['count']:>6} {q[0.5]:>8.3f} "
+                     f"{q[0.95]:>8.3f} {data['pages']:>7} {data['failures']:>6}")
+    return "\n".join(lines)
+
+
+def since_hours(hours: float | None) -> float | None:
+    if hours is None:
+        return None
+    return datetime.now(timezone.utc).timestamp() - hours * 3600
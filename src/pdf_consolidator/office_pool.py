@@ -0,0 +1,297 @@
+"""
+Pool de procesos aislados para convertir documentos Office en paralelo.
+
+Cada trabajador es un proceso propio con su instancia del backend de Office
+(su ``Word.Application``/``Excel.Application`` vía COM o su ``soffice`` con
+perfil de LibreOffice independiente), así que las conversiones no se
+serializan detrás de un único candado global.
+
+Un hilo del proceso principal atiende a cada trabajador y toma el siguiente
+documento de una cola común en cuanto queda libre. El proceso se recicla
+tras ``max_jobs`` documentos (Word/LibreOffice acumulan memoria), se detiene
+tras ``idle_seconds`` sin documentos (se vuelve a lanzar con el próximo) y se
+reemplaza si muere a mitad de una conversión; ese documento se marca como
+fallido y el resto sigue. Si muere sin documento (Office cerrado desde afuera),
+se reemplaza antes de enviarle el siguiente, que no cuenta como fallido. Antes de cada documento el trabajador comprueba que
+su instancia de Office responda (``ConverterBackend.healthy``).
+
+Si un documento agota su tiempo (``watchdog.conversion_timeout``), el hilo de
+despacho termina el proceso trabajador y la instancia de Word/Excel o
+``soffice`` que usaba (el trabajador informa sus PID antes de convertir), y
+el ``Future`` termina con ``watchdog.ConversionTimeout``.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, Iterable
+
+from .backends import ConverterBackend, close_backends, create_backend, office_backend_name
+from .core import get_config, logger, office_thread, setup_logging
+from .profiling import profile_stage
+from .warm import BackendSpec, office_idle_seconds, office_max_jobs
+from .watchdog import ConversionTimeout, conversion_timeout, kill_processes, record_timeout
+
+MAX_OFFICE_WORKERS = 4     # cada instancia de Office consume cientos de MB
+
+
+def default_office_workers() -> int:
+    """Trabajadores según ``conversion.office_workers`` (0 = automático)."""
+    configured = int(get_config("conversion", "office_workers", 0) or 0)
+    if configured > 0:
+        return configured
+    return max(1, min(os.cpu_count() or 1, MAX_OFFICE_WORKERS))
+
+
+def _new_backend(backend_spec: BackendSpec) -> ConverterBackend:
+    return create_backend(backend_spec) if isinstance(backend_spec, str) else backend_spec()
+
+
+def _worker_main(conn: Connection, backend_spec: BackendSpec,
+                 extensions: frozenset[str] = frozenset()) -> None:
+    """
+    Bucle del proceso trabajador: recibe (src, dst) y responde primero los PID
+    de la aplicación de Office que va a usar y luego (ok, segundos, error).
+
+    Al arrancar prepara la aplicación para ``extensions`` (precalentado).
+    """
+    setup_logging()  # proceso nuevo (spawn): no hereda los handlers del padre
+    with office_thread():
+        backend = _new_backend(backend_spec)
+        try:
+            if extensions:
+                backend.start(set(extensions))
+            while True:
+                try:
+                    job = conn.recv()
+                except EOFError:
+                    break
+                if job is None:
+                    break
+                src, dst = Path(job[0]), Path(job[1])
+                start = time.perf_counter()
+                error: Exception | None = None
+                try:
+                    if not backend.healthy():
+                        logger.warning("La instancia de Office no responde; se reemplaza")
+                        backend.close()
+                        backend = _new_backend(backend_spec)
+                    backend.start({src.suffix.lower()})
+                except Exception as e:
+                    error = e
+                conn.send(backend.process_ids())  # por si hay que terminarlos
+                try:
+                    if error is not None:
+                        raise error
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    with profile_stage("convert", src.name):
+                        backend.convert(src, dst)
+                    conn.send((True, time.perf_counter() - start, ""))
+                except Exception as e:
+                    logger.exception(f"Error convirtiendo {src.name} en proceso de Office: {e}")
+                    conn.send((False, time.perf_counter() - start, str(e)))
+        finally:
+            backend.close()
+            close_backends()
+
+
+class OfficeWorkerPool:
+    """
+    ``workers`` procesos de Office que atienden una cola común de documentos.
+
+    ``submit`` devuelve un ``Future`` con ``(pdf, segundos)``; si la
+    conversión falla, el ``Future`` termina con ``RuntimeError``.
+    """
+
+    def __init__(self, workers: int | None = None, max_jobs: int | None = None,
+                 backend: BackendSpec | None = None, idle_seconds: float | None = None):
+        self.workers = workers or default_office_workers()
+        self.max_jobs = office_max_jobs() if max_jobs is None else max_jobs
+        self.idle_seconds = office_idle_seconds() if idle_seconds is None else idle_seconds
+        self.backend = backend or office_backend_name()
+        self.restarts = 0     # procesos reemplazados por caída
+        self.recycles = 0     # procesos reciclados por ``max_jobs``
+        self.idle_stops = 0   # procesos detenidos por inactividad
+        self.timeouts = 0     # procesos terminados por tiempo agotado
+        self._extensions: frozenset[str] = frozenset()  # a precalentar en cada proceso
+        self._jobs: "queue.Queue[tuple[Future, Path, Path] | None]" = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._ctx = multiprocessing.get_context("spawn")  # COM no sobrevive a fork
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "OfficeWorkerPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+
+    def start(self, extensions: Iterable[str] = ()) -> None:
+        """
+        Arranca los hilos de despacho; cada uno lanza su proceso de inmediato.
+
+        Los procesos que se lancen desde ahora preparan la aplicación para
+        ``extensions`` antes de recibir documentos.
+        """
+        with self._lock:
+            self._extensions |= frozenset(extensions)
+            if self._threads:
+                return
+            for slot in range(self.workers):
+                t = threading.Thread(target=self._serve, args=(slot,),
+                                     name=f"office-{slot}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        logger.info(f"Pool de Office iniciado con {self.workers} procesos ({self._backend_label})")
+
+    def submit(self, src: Path, dst: Path) -> Future:
+        self.start()
+        future: Future = Future()
+        self._jobs.put((future, src, dst))
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+        for t in threads:
+            t.join()
+
+    @property
+    def _backend_label(self) -> str:
+        return self.backend if isinstance(self.backend, str) else self.backend.name
+
+    # -- hilo de despacho -------------------------------------------------
+    def _spawn(self, slot: int) -> tuple[BaseProcess, Connection]:
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_worker_main,
+                                 args=(child_conn, self.backend, self._extensions),
+                                 name=f"office-worker-{slot}", daemon=True)
+        proc.start()
+        child_conn.close()  # así recv() del padre detecta la muerte del hijo
+        return proc, parent_conn
+
+    @staticmethod
+    def _stop(proc: BaseProcess, conn: Connection, kill: bool = False) -> None:
+        try:
+            if not kill:
+                conn.send(None)
+        except OSError:
+            pass
+        conn.close()
+        proc.join(timeout=5 if kill else None)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+
+    @staticmethod
+    def _terminate(proc: BaseProcess, conn: Connection, office_pids: list[int]) -> int:
+        """Termina un trabajador colgado y su aplicación de Office; devuelve cuántos procesos."""
+        conn.close()
+        proc.kill()
+        proc.join()
+        return 1 + kill_processes(office_pids)
+
+    @staticmethod
+    def _recv(conn: Connection, deadline: float | None) -> Any:
+        """``conn.recv()``, o ``TimeoutError`` si no llega nada antes de ``deadline``."""
+        if deadline is not None and not conn.poll(max(0.0, deadline - time.monotonic())):
+            raise TimeoutError
+        return conn.recv()
+
+    def _serve(self, slot: int) -> None:
+        # El arranque de Office (segundos) se solapa con el resto del caso
+        proc: BaseProcess | None
+        conn: Connection | None
+        proc, conn = self._spawn(slot)
+        done = 0
+        office_pids: list[int] = []  # los que informó el trabajador en el último documento
+        try:
+            while True:
+                idle = self.idle_seconds if proc is not None and self.idle_seconds > 0 else None
+                try:
+                    item = self._jobs.get(timeout=idle)
+                except queue.Empty:  # solo con un proceso vivo (``idle``)
+                    if proc is not None and conn is not None:
+                        self._stop(proc, conn)
+                    proc = conn = None
+                    with self._lock:
+                        self.idle_stops += 1
+                    logger.info(f"Proceso de Office {slot} detenido tras {idle:.0f}s sin uso")
+                    continue
+                if item is None:
+                    break
+                future, src, dst = item
+                if not future.set_running_or_notify_cancel():
+                    continue  # cancelado antes de empezar
+
+                budget = conversion_timeout(src)
+                for attempt in (1, 2):
+                    if proc is not None and conn is not None and not proc.is_alive():
+                        # murió sin documento (Office cerrado o proceso terminado desde afuera)
+                        self._stop(proc, conn, kill=True)
+                        proc = conn = None
+                        with self._lock:
+                            self.restarts += 1
+                        logger.warning(f"El proceso de Office {slot} había terminado sin uso; "
+                                       f"se reemplaza")
+                    if proc is None or conn is None:
+                        proc, conn = self._spawn(slot)
+                        done = 0
+                        office_pids = []
+                    deadline = time.monotonic() + budget if budget else None
+                    replied = False  # el trabajador confirmó el documento (informó sus PID)
+                    try:
+                        conn.send((str(src), str(dst)))
+                        office_pids = self._recv(conn, deadline)
+                        replied = True
+                        ok, seconds, error = self._recv(conn, deadline)
+                        break
+                    except TimeoutError:
+                        killed = self._terminate(proc, conn, office_pids)
+                        proc = conn = None
+                        with self._lock:
+                            self.timeouts += 1
+                        record_timeout(src, budget, killed)
+                        future.set_exception(ConversionTimeout(src, budget))
+                        break
+                    except (EOFError, OSError):
+                        self._stop(proc, conn, kill=True)
+                        proc = conn = None
+                        with self._lock:
+                            self.restarts += 1
+                        if not replied and attempt == 1:
+                            # cayó antes de tomar el documento: no cuenta como intento
+                            logger.warning(f"El proceso de Office {slot} terminó antes de recibir "
+                                           f"{src.name}; se reemplaza y se reintenta")
+                            continue
+                        logger.error(f"El proceso de Office {slot} terminó convirtiendo "
+                                     f"{src.name}; se reemplaza")
+                        future.set_exception(RuntimeError(
+                            f"El proceso de Office terminó inesperadamente convirtiendo "
+                            f"{src.name}"))
+                        break
+                if future.done():
+                    continue
+
+                if ok:
+                    future.set_result((dst, seconds))
+                else:
+                    future.set_exception(RuntimeError(error))
+
+                done += 1
+                if done >= self.max_jobs and proc is not None and conn is not None:
+                    self._stop(proc, conn)
+                    proc = conn = None
+                    with self._lock:
+                        self.recycles += 1
+                    logger.info(f"Proceso de Office {slot} reciclado tras {done} documentos")
+        finally:
+            if proc is not None and conn is not None:
+                self._stop(proc, conn)
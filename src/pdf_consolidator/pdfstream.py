@@ -0,0 +1,334 @@
+"""
+Escritor de PDF en streaming.
+
+Cada objeto se serializa y se escribe en el archivo en cuanto está listo; solo
+se conservan en memoria los offsets para la tabla xref. Al cerrar se escriben
+el árbol de páginas, el catálogo, la xref y el trailer.
+
+``import_pages`` copia las páginas de un ``PdfReader`` (con todo lo que
+referencian) objeto a objeto, sin reconstruir el documento en memoria; es la
+base de la unión en streaming.
+
+Con ``compact=True`` la salida es PDF 1.5: los objetos que no son streams se
+agrupan en object streams comprimidos, la tabla xref es un cross-reference
+stream, los streams sin filtro se comprimen con Flate y los streams idénticos
+(fuentes, logos, perfiles ICC repetidos entre entradas) se escriben una vez.
+"""
+
+import hashlib
+import io
+import zlib
+from collections import deque
+from typing import BinaryIO
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NullObject, PdfObject, StreamObject,
+)
+
+PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+PDF_HEADER_COMPACT = b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n"
+OBJSTM_MAX_OBJECTS = 100  # objetos por object stream (acota la memoria del buffer)
+
+
+class Ref:
+    """Referencia indirecta a un objeto (``n 0 R``)."""
+
+    __slots__ = ("num",)
+
+    def __init__(self, num: int):
+        self.num = num
+
+    def __repr__(self) -> str:
+        return f"Ref({self.num})"
+
+
+class Name(str):
+    """Nombre PDF (se serializa como ``/Nombre``)."""
+
+
+def serialize(value: object) -> bytes:
+    """Serializa tipos básicos de Python a sintaxis PDF."""
+    if isinstance(value, Ref):
+        return b"%d 0 R" % value.num
+    if isinstance(value, Name):
+        return b"/" + value.encode("ascii")
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    if isinstance(value, int):
+        return b"%d" % value
+    if isinstance(value, float):
+        return (b"%.4f" % value).rstrip(b"0").rstrip(b".")
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, (list, tuple)):
+        return b"[" + b" ".join(serialize(v) for v in value) + b"]"
+    if isinstance(value, dict):
+        items = b" ".join(b"/" + k.encode("ascii") + b" " + serialize(v) for k, v in value.items())
+        return b"<< " + items + b" >>"
+    if value is None:
+        return b"null"
+    raise TypeError(f"Tipo no serializable en PDF: {type(value).__name__}")
+
+
+class StreamingPdfWriter:
+    """
+    Escribe un PDF objeto a objeto sobre un archivo binario abierto.
+
+    Uso típico:
+
+        with open(dst, "wb") as fp:
+            writer = StreamingPdfWriter(fp)
+            writer.add_image_page(entries, data, width_pt, height_pt)
+            writer.close()
+    """
+
+    def __init__(self, fp: BinaryIO, compact: bool = False):
+        self._fp = fp
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._next_num = 1
+        self._page_refs: list[Ref] = []
+        self.compact = compact
+        self._in_objstm: dict[int, tuple[int, int]] = {}  # objeto -> (object stream, índice)
+        self._objstm: list[tuple[int, bytes]] = []        # objetos aún sin volcar
+        self.shared: dict[bytes, Ref] = {}  # hash de stream ya escrito -> referencia
+        self._write(PDF_HEADER_COMPACT if compact else PDF_HEADER)
+        self.pages_ref = self.reserve()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_refs)
+
+    def _write(self, data: bytes) -> None:
+        self._fp.write(data)
+        self._pos += len(data)
+
+    def reserve(self) -> Ref:
+        """Reserva un número de objeto para escribirlo más tarde."""
+        ref = Ref(self._next_num)
+        self._next_num += 1
+        return ref
+
+    def write_object(self, ref: Ref, body: bytes) -> None:
+        """Escribe un objeto ya serializado (en modo compacto, dentro de un object stream)."""
+        if self.compact:
+            self._objstm.append((ref.num, body))
+            if len(self._objstm) >= OBJSTM_MAX_OBJECTS:
+                self._flush_objstm()
+            return
+        self._offsets[ref.num] = self._pos
+        self._write(b"%d 0 obj\n" % ref.num + body + b"\nendobj\n")
+
+    def _flush_objstm(self) -> None:
+        if not self._objstm:
+            return
+        stm_ref = self.reserve()
+        index, offset = [], 0
+        for i, (num, body) in enumerate(self._objstm):
+            index.append(b"%d %d" % (num, offset))
+            self._in_objstm[num] = (stm_ref.num, i)
+            offset += len(body) + 1
+        head = b" ".join(index) + b"\n"
+        payload = head + b"\n".join(body for _, body in self._objstm)
+        self._objstm = []
+        self.write_stream(stm_ref, {"Type": Name("ObjStm"), "N": len(index), "First": len(head),
+                                    "Filter": Name("FlateDecode")}, zlib.compress(payload))
+
+    def write_stream(self, ref: Ref, entries: dict, data: bytes) -> None:
+        """
+        Escribe un objeto stream; ``/Length`` se calcula automáticamente. En modo
+        compacto, los datos sin filtro se comprimen con Flate si así ocupan menos.
+        """
+        if self.compact and "Filter" not in entries:
+            packed = zlib.compress(data)
+            if len(packed) < len(data):
+                entries, data = dict(entries, Filter=Name("FlateDecode")), packed
+        entries = dict(entries, Length=len(data))
+        self._offsets[ref.num] = self._pos
+        self._write(b"%d 0 obj\n" % ref.num + serialize(entries) + b"\nstream\n")
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+
+    def add_page(self, page_ref: Ref) -> None:
+        """Registra una página ya escrita (su ``/Parent`` debe ser ``pages_ref``)."""
+        self._page_refs.append(page_ref)
+
+    def add_image_page(self, image_entries: dict, image_data: bytes,
+                       width_pt: float, height_pt: float) -> None:
+        """Escribe una página que muestra una sola imagen a página completa."""
+        image_ref = self.reserve()
+        content_ref = self.reserve()
+        page_ref = self.reserve()
+        self.write_stream(image_ref, dict(image_entries, Type=Name("XObject"),
+                                          Subtype=Name("Image")), image_data)
+        content = b"q %s 0 0 %s 0 0 cm /Im0 Do Q" % (serialize(float(width_pt)),
+                                                     serialize(float(height_pt)))
+        self.write_stream(content_ref, {}, content)
+        self.write_object(page_ref, serialize({
+            "Type": Name("Page"),
+            "Parent": self.pages_ref,
+            "MediaBox": [0, 0, float(width_pt), float(height_pt)],
+            "Resources": {"XObject": {"Im0": image_ref}},
+            "Contents": content_ref,
+        }))
+        self.add_page(page_ref)
+
+    def close(self) -> None:
+        """Escribe árbol de páginas, catálogo, xref y trailer."""
+        self.write_object(self.pages_ref, serialize({
+            "Type": Name("Pages"),
+            "Kids": self._page_refs,
+            "Count": len(self._page_refs),
+        }))
+        root_ref = self.reserve()
+        self.write_object(root_ref, serialize({"Type": Name("Catalog"), "Pages": self.pages_ref}))
+        if self.compact:
+            self._flush_objstm()
+            self._write_xref_stream(root_ref)
+            return
+
+        xref_pos = self._pos
+        size = self._next_num
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for num in range(1, size):
+            offset = self._offsets.get(num)
+            if offset is None:
+                lines.append(b"0000000000 65535 f \n")
+            else:
+                lines.append(b"%010d 00000 n \n" % offset)
+        self._write(b"".join(lines))
+        self._write(b"trailer\n" + serialize({"Size": size, "Root": root_ref})
+                    + b"\nstartxref\n%d\n%%%%EOF\n" % xref_pos)
+
+    def _write_xref_stream(self, root_ref: Ref) -> None:
+        """Tabla xref como stream (PDF 1.5): entradas binarias comprimidas."""
+        xref_ref = self.reserve()
+        xref_pos = self._pos
+        size = self._next_num
+        rows = [(0, 0, 0xFFFF)]
+        for num in range(1, size):
+            if num == xref_ref.num:
+                rows.append((1, xref_pos, 0))
+            elif num in self._offsets:
+                rows.append((1, self._offsets[num], 0))
+            elif num in self._in_objstm:
+                rows.append((2, *self._in_objstm[num]))
+            else:
+                rows.append((0, 0, 0))
+        width = max(1, (max(r[1] for r in rows).bit_length() + 7) // 8)
+        data = b"".join(bytes([kind]) + field.to_bytes(width, "big") + gen.to_bytes(2, "big")
+                        for kind, field, gen in rows)
+        self.write_stream(xref_ref, {"Type": Name("XRef"), "Size": size, "W": [1, width, 2],
+                                     "Root": root_ref, "Filter": Name("FlateDecode")},
+                          zlib.compress(data))
+        self._write(b"startxref\n%d\n%%%%EOF\n" % xref_pos)
+
+
+# =============================
+# Copia de páginas desde pypdf
+# =============================
+def _raw(obj: PdfObject) -> bytes:
+    buf = io.BytesIO()
+    obj.write_to_stream(buf)
+    return buf.getvalue()
+
+
+class _PageImporter:
+    """Copia las páginas de un lector y los objetos que alcanzan, una sola vez cada uno."""
+
+    def __init__(self, writer: StreamingPdfWriter, reader: PdfReader):
+        self.writer = writer
+        self.reader = reader
+        self.refs: dict[tuple[int, int], Ref] = {}
+        # (referencia nueva, objeto de origen, stream ya convertido en modo compacto)
+        self.pending: deque[tuple[Ref, IndirectObject, tuple | None]] = deque()
+        self.visiting: set[tuple[int, int]] = set()  # streams cuyo diccionario se está convirtiendo
+
+    def ref_for(self, ind: IndirectObject) -> Ref:
+        key = (ind.idnum, ind.generation)
+        ref = self.refs.get(key)
+        if ref is None:
+            obj = ind.get_object()
+            if isinstance(obj, DictionaryObject) and obj.get("/Type") == "/Pages":
+                # Nodos del árbol de páginas de origen (p. ej. /Parent): se usa el nuestro
+                return self.writer.pages_ref
+            converted = None
+            if self.writer.compact and isinstance(obj, StreamObject) and key not in self.visiting:
+                # Las referencias del diccionario se resuelven antes de calcular el hash: una
+                # imagen con el mismo perfil ICC (ya deduplicado) queda igual byte a byte
+                self.visiting.add(key)
+                try:
+                    entries = self.stream_entries(obj)
+                finally:
+                    self.visiting.discard(key)
+                if key in self.refs:  # ciclo: ya se asignó al volver a encontrarlo
+                    return self.refs[key]
+                digest = hashlib.sha256(serialize(entries))
+                digest.update(obj._data)
+                converted = entries, digest.digest()
+                shared = self.writer.shared.get(converted[1])
+                if shared is not None:  # mismo stream ya escrito (de esta u otra entrada)
+                    self.refs[key] = shared
+                    return shared
+            ref = self.refs[key] = self.writer.reserve()
+            self.pending.append((ref, ind, converted))
+        return ref
+
+    def convert(self, obj: PdfObject) -> Ref | dict | list | bytes:
+        """Objeto pypdf -> valores que entiende ``serialize`` (referencias renumeradas)."""
+        if isinstance(obj, IndirectObject):
+            return self.ref_for(obj)
+        if isinstance(obj, DictionaryObject):
+            return self.convert_dict(obj)
+        if isinstance(obj, ArrayObject):
+            return [self.convert(v) for v in obj]
+        return _raw(obj)
+
+    def convert_dict(self, obj: DictionaryObject) -> dict:
+        return {_raw(k)[1:].decode("ascii"): self.convert(v) for k, v in obj.items()}
+
+    def stream_entries(self, obj: StreamObject) -> dict:
+        return self.convert_dict(DictionaryObject((k, v) for k, v in obj.items() if k != "/Length"))
+
+    def write(self, ref: Ref, obj: PdfObject, converted: tuple | None = None) -> None:
+        if isinstance(obj, StreamObject):
+            entries = converted[0] if converted else self.stream_entries(obj)
+            self.writer.write_stream(ref, entries, obj._data)  # datos sin decodificar
+            if converted:
+                # Se comparte solo ya escrito: si la entrada falla después, nadie apunta a un hueco
+                self.writer.shared.setdefault(converted[1], ref)
+        else:
+            self.writer.write_object(ref, serialize(self.convert(obj)))
+
+    def drain(self) -> None:
+        while self.pending:
+            ref, ind, converted = self.pending.popleft()
+            obj = ind.get_object()
+            # una referencia a un objeto inexistente equivale a null (PDF 32000, 7.3.10)
+            self.write(ref, obj if obj is not None else NullObject(), converted)
+
+    def run(self) -> int:
+        pages = list(self.reader.pages)
+        page_refs = []
+        for page in pages:
+            ref = self.writer.reserve()
+            if page.indirect_reference is not None:
+                # Enlaces entre páginas del mismo documento apuntan a la copia
+                ind = page.indirect_reference
+                self.refs[(ind.idnum, ind.generation)] = ref
+            page_refs.append(ref)
+        for ref, page in zip(page_refs, pages):
+            # pypdf ya incorporó a la página los atributos heredados (Resources, MediaBox...)
+            entries = self.convert_dict(DictionaryObject(
+                (k, v) for k, v in page.items() if k != "/Parent"))
+            entries["Parent"] = self.writer.pages_ref
+            self.writer.write_object(ref, serialize(entries))
+            self.drain()
+            self.writer.add_page(ref)  # solo si todo lo que referencia quedó escrito
+        return len(pages)
+
+
+def import_pages(writer: StreamingPdfWriter, reader: PdfReader) -> int:
+    """Escribe en ``writer`` todas las páginas de ``reader``; devuelve cuántas."""
+    return _PageImporter(writer, reader).run()
@@ -0,0 +1,383 @@
+"""
+Ejecución del proceso de consolidación en segundo plano.
+
+``PipelineRunner`` convierte y une los documentos de un caso en un hilo
+propio y publica eventos de progreso en una ``queue.Queue``. La interfaz
+gráfica consume la cola con ``after()`` sin bloquear el bucle de Tk, y puede
+detener el proceso con ``cancel()``.
+
+``consolidate`` es el paso común (GUI y batch): por defecto une en modo
+encadenado, es decir, cada PDF se agrega a la salida en cuanto él y todos los
+anteriores están convertidos, en lugar de esperar al último. El resultado es
+idéntico byte a byte al de convertir todo y unir después. Las imágenes
+consecutivas se convierten en tandas (un PDF por tanda, ver ``engine``) y sus
+PDF llegan a la unión en memoria, sin pasar por disco (ver ``handoff``).
+"""
+
+import queue
+import shutil
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+
+from typing import Any, Callable, Iterable, Iterator
+
+from .cache import ConversionCache
+from .core import (
+    TEMP_DIR, MergeSink, get_config, logger, merge_pdfs, office_thread, use_streaming_merge,
+)
+from .engine import (
+    ConversionCancelled, ConversionEngine, DoneCallback, StartCallback, conversion_units,
+)
+from .handoff import MemoryPdf, discard_spill
+from .journal import JobJournal
+from .metrics import export_configured, file_size, record_span, run_context, span
+from .preflight import preflight
+from .profiling import profile_stage
+from .watchdog import timeout_reason
+
+# Tipos de evento publicados en la cola
+STARTED = "started"              # total = número de archivos
+FILE_STARTED = "file_started"    # index, name, bytes
+FILE_DONE = "file_done"          # index, name, bytes, seconds, ok (message: motivo del fallo)
+MERGE_STARTED = "merge_started"
+DONE = "done"                    # output, pages
+FAILED = "failed"                # message
+CANCELLED = "cancelled"
+
+TERMINAL_EVENTS = {DONE, FAILED, CANCELLED}
+
+
+@dataclass
+class ProgressEvent:
+    """Evento de progreso del proceso de consolidación."""
+    kind: str
+    elapsed: float = 0.0   # segundos desde el inicio del proceso
+    total: int = 0
+    index: int = -1
+    name: str = ""
+    bytes: int = 0
+    seconds: float = 0.0   # duración de la conversión del archivo
+    ok: bool = True
+    pages: int = 0
+    output: Path | None = None
+    message: str = ""
+
+
+class NothingConverted(RuntimeError):
+    """Ninguno de los archivos del caso se pudo convertir."""
+
+    def __init__(self) -> None:
+        super().__init__("No se pudo convertir ninguno de los archivos")
+
+
+def consolidate(engine: ConversionEngine, files: list[Path], temp_dir: Path, out_path: Path,
+                on_done: DoneCallback | None = None,
+                on_start: StartCallback | None = None,
+                on_merge: Callable[[], None] | None = None,
+                cancel: threading.Event | None = None,
+                pipelined: bool | None = None,
+                streaming: bool | None = None,
+                on_reject: Callable[[int, Path, str], None] | None = None,
+                journal: JobJournal | None = None) -> tuple[int, list[Path]]:
+    """
+    Convierte ``files`` y los une en ``out_path``.
+
+    Antes de convertir, todos los archivos pasan por la validación previa
+    (``preflight``): los rechazados no llegan al motor y cuentan como fallidos.
+
+    Con ``journal`` cada resultado queda registrado en la bitácora del
+    trabajo, y los archivos que ya figuran convertidos (con el original sin
+    cambios y el PDF intacto) se unen sin volver a convertirlos.
+
+    Args:
+        pipelined: Unir a medida que llegan las conversiones (por defecto
+            ``merge.pipelined`` de la configuración, activado)
+        streaming: Modo de unión; por defecto según el tamaño de ``files``
+        on_merge: Se invoca una vez, al comenzar la unión
+        on_reject: Se invoca con (índice, archivo, motivo) por cada archivo
+            rechazado en la validación previa
+        journal: Bitácora del trabajo (ver ``journal.JobJournal``)
+
+    Returns:
+        (páginas escritas, archivos que no se pudieron convertir)
+
+    Raises:
+        NothingConverted: Si no se convirtió ningún archivo
+        ConversionCancelled: Si se activó ``cancel``; ``out_path`` no se crea
+    """
+    with span("preflight", files=len(files)) as s, profile_stage("preflight"):
+        s.bytes_in = sum(file_size(f) for f in files)
+        rejected = preflight(files)
+        s.tags["rejected"] = str(len(rejected))
+    accepted = []  # índices de ``files`` que siguen adelante
+    for i, f in enumerate(files):
+        if f in rejected:
+            logger.warning(f"Archivo rechazado en la validación previa: {f.name}: {rejected[f]}")
+            if journal is not None:
+                journal.record(f, None, reason=rejected[f])
+            if on_reject:
+                on_reject(i, f, rejected[f])
+        else:
+            accepted.append(i)
+    if not accepted:
+        raise NothingConverted()
+
+    reused: dict[int, Path] = {}
+    if journal is not None:
+        reused = {i: pdf for i, pdf in journal.reusable(files).items()
+                  if files[i] not in rejected}
+        if reused:
+            logger.info(f"Reanudando {journal.name}: {len(reused)} de {len(accepted)} "
+                        f"archivos ya convertidos")
+
+    if pipelined is None:
+        pipelined = bool(get_config("merge", "pipelined", True))
+    if streaming is None:
+        # Según las entradas (no los PDFs convertidos) para que ambos modos coincidan
+        streaming = use_streaming_merge([files[i] for i in accepted])
+
+    results = _convert_accepted(engine, files, accepted, reused, temp_dir,
+                                on_done, on_start, cancel, journal)
+    try:
+        return _merge(results, files, out_path, list(rejected), on_merge, cancel,
+                      pipelined, streaming, journal)
+    finally:
+        discard_spill(temp_dir)
+
+
+def _merge(results: Iterator[tuple[int, int, Path | MemoryPdf | None]], files: list[Path],
+           out_path: Path, failed: list[Path], on_merge: Callable[[], None] | None,
+           cancel: threading.Event | None, pipelined: bool, streaming: bool,
+           journal: JobJournal | None) -> tuple[int, list[Path]]:
+    """Une los resultados de la conversión; ver ``consolidate``."""
+    if not pipelined:
+        finished = list(results)
+        failed += [files[i] for i, _, pdf in finished if pdf is None]
+        converted = _distinct((unit, pdf) for _, unit, pdf in finished if pdf)
+        if not converted:
+            raise NothingConverted()
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled()
+        if on_merge:
+            on_merge()
+        with span("merge", files=len(converted), streaming=streaming) as s, \
+                profile_stage("merge", out_path.name):
+            s.bytes_in = sum(file_size(pdf) for pdf in converted)
+            s.pages = merge_pdfs(converted, out_path, streaming)
+            s.bytes_out = file_size(out_path)
+        if journal is not None:
+            journal.finish(s.pages, failed)
+        return s.pages, failed
+
+    sink: MergeSink | None = None
+    merged = 0
+    last_unit = -1
+    merge_s, merge_bytes = 0.0, 0  # la unión se intercala con la conversión: se acumula
+    try:
+        for i, unit, pdf in results:
+            if pdf is None:
+                failed.append(files[i])
+                continue
+            if unit == last_unit:
+                continue  # resto de una tanda de imágenes: su PDF ya se agregó
+            last_unit = unit
+            if sink is None:
+                if on_merge:
+                    on_merge()
+                sink = MergeSink(out_path, streaming)
+            start = time.perf_counter()
+            with profile_stage("merge", pdf.name):
+                sink.add(pdf)
+            merge_s += time.perf_counter() - start
+            merge_bytes += file_size(pdf)
+            merged += 1
+        if sink is None:
+            raise NothingConverted()
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled()
+        record_span("merge", merge_s, bytes_in=merge_bytes, files=merged, streaming=streaming)
+        with span("write", streaming=streaming) as s, profile_stage("write", out_path.name):
+            s.pages = sink.close()
+            s.bytes_out = file_size(out_path)
+        if journal is not None:
+            journal.finish(s.pages, failed)
+        return s.pages, failed
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+
+
+def _distinct(pdfs: Iterable[tuple[int, Path | MemoryPdf]]) -> list[Path | MemoryPdf]:
+    """Un PDF por unidad de ``(unidad, pdf)`` (los archivos de una tanda comparten PDF)."""
+    unique: list[Path | MemoryPdf] = []
+    last_unit = -1
+    for unit, pdf in pdfs:
+        if unit != last_unit:
+            unique.append(pdf)
+            last_unit = unit
+    return unique
+
+
+def _convert_accepted(engine: ConversionEngine, files: list[Path], accepted: list[int],
+                      reused: dict[int, Path], temp_dir: Path,
+                      on_done: DoneCallback | None, on_start: StartCallback | None,
+                      cancel: threading.Event | None, journal: JobJournal | None
+                      ) -> Iterator[tuple[int, int, Path | MemoryPdf | None]]:
+    """
+    ``(índice, unidad, pdf)`` de los archivos aceptados en orden de ``files``.
+
+    La unidad es el índice del primer archivo de la tanda de imágenes (o del
+    archivo suelto) cuyo PDF trae ``pdf``: quien une agrega una vez por unidad,
+    no por PDF repetido. Los reutilizados de la bitácora se entregan sin pasar
+    por el motor; los de una misma tanda comparten PDF y unidad. Los callbacks
+    reciben siempre el índice de la lista original. Si hay reutilizados no se
+    arman tandas de imágenes: las páginas de una tanda salen juntas y un PDF
+    reutilizado intercalado quedaría fuera de lugar.
+    """
+    todo = [i for i in accepted if i not in reused]
+    units = conversion_units([files[i] for i in todo], group_images=not reused)
+    unit_of = {todo[k]: todo[unit[0]] for unit in units for k in unit}
+    reused_unit: dict[Path, int] = {}
+
+    def done(k: int, f: Path, pdf: Path | MemoryPdf | None, seconds: float) -> None:
+        if journal is not None:
+            journal.record(f, pdf, seconds)
+        if on_done:
+            on_done(todo[k], f, pdf, seconds)
+
+    def start(k: int, f: Path) -> None:
+        if on_start:
+            on_start(todo[k], f)
+
+    converted = engine.convert_ordered([files[i] for i in todo], temp_dir, on_done=done,
+                                       on_start=start if on_start else None, cancel=cancel,
+                                       in_memory=True, units=units)
+    for i in accepted:
+        if i in reused:
+            if on_done:
+                on_done(i, files[i], reused[i], 0.0)
+            yield i, reused_unit.setdefault(reused[i], i), reused[i]
+        else:
+            _, pdf = next(converted)
+            yield i, unit_of[i], pdf
+
+
+class PipelineRunner:
+    """
+    Convierte ``files`` y los une en ``out_path`` en un hilo de fondo.
+
+    Los eventos se leen de ``runner.events``; el último siempre es uno de
+    ``TERMINAL_EVENTS``. El trabajo se registra en la bitácora de ``temp_dir``
+    (``runner.journal``); si ya había una, se reanuda. Los temporales se
+    eliminan al terminar, salvo que queden conversiones para reanudar
+    (cancelado, interrumpido o con archivos fallidos).
+
+    Con ``engine`` se usa ese motor (y sus pools ya abiertos) en lugar de uno
+    propio, que se cerraría al terminar: así la interfaz conserva los procesos
+    de conversión y de Office entre un caso y el siguiente.
+    """
+
+    def __init__(self, files: list[Path], out_path: Path, temp_dir: Path = TEMP_DIR,
+                 cache: ConversionCache | None = None, max_workers: int | None = None,
+                 meta: dict[str, str] | None = None, engine: ConversionEngine | None = None):
+        self.files = files
+        self.out_path = out_path
+        self.temp_dir = temp_dir
+        self.cache = cache
+        self.max_workers = max_workers
+        self.meta = meta
+        self.engine = engine
+        self.journal = JobJournal(temp_dir)
+        self.events: "queue.Queue[ProgressEvent]" = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="consolidador", daemon=True)
+        self._start = 0.0
+
+    # -- control ----------------------------------------------------------
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Solicita detener el proceso; el archivo en curso termina antes de parar."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    # -- hilo de trabajo --------------------------------------------------
+    def _emit(self, kind: str, **fields: Any) -> None:
+        self.events.put(ProgressEvent(kind, elapsed=time.perf_counter() - self._start, **fields))
+
+    def _run(self) -> None:
+        try:
+            with run_context(), office_thread():
+                self._emit(STARTED, total=len(self.files))
+                self.temp_dir.mkdir(parents=True, exist_ok=True)
+                self.journal.start(self.files, self.out_path, self.meta)
+
+                pages = self._consolidate()
+                logger.info(f"Proceso completo -> {self.out_path}")
+                self._emit(DONE, output=self.out_path, pages=pages)
+        except NothingConverted as e:
+            self._emit(FAILED, message=f"{e}. Revise el log.")
+        except ConversionCancelled:
+            logger.warning("Proceso cancelado por el usuario")
+            self._emit(CANCELLED)
+        except Exception as e:
+            logger.exception(f"Error en el proceso de consolidación: {e}")
+            self._emit(FAILED, message=str(e))
+        finally:
+            with span("cleanup"):
+                if self.journal.resumable:
+                    logger.info(f"Trabajo conservado para reanudar: {self.temp_dir}")
+                else:
+                    shutil.rmtree(self.temp_dir, ignore_errors=True)
+            export_configured()
+
+    def _consolidate(self) -> int:
+        started = time.monotonic()  # solo cuentan los tiempos agotados de esta ejecución
+
+        def on_start(idx: int, f: Path) -> None:
+            self._emit(FILE_STARTED, index=idx, total=len(self.files),
+                       name=f.name, bytes=file_size(f))
+
+        def on_done(idx: int, f: Path, pdf: Path | MemoryPdf | None, seconds: float) -> None:
+            if pdf:
+                logger.info(f"Conversión completada en {seconds:.2f}s: {f.name}")
+            else:
+                logger.error(f"Conversión fallida en {seconds:.2f}s: {f.name}")
+            self._emit(FILE_DONE, index=idx, total=len(self.files), name=f.name,
+                       bytes=file_size(f), seconds=seconds, ok=pdf is not None,
+                       message="" if pdf else timeout_reason(f, started))
+
+        def on_reject(idx: int, f: Path, reason: str) -> None:
+            self._emit(FILE_DONE, index=idx, total=len(self.files), name=f.name,
+                       bytes=file_size(f), ok=False, message=reason)
+
+        def on_merge() -> None:
+            self._emit(MERGE_STARTED, total=len(self.files))
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            engine = self.engine
+            if engine is None:  # sin motor compartido: uno propio solo para esta ejecución
+                engine = stack.enter_context(ConversionEngine(self.max_workers, self.cache))
+            pages, _ = consolidate(engine, self.files, self.temp_dir, self.out_path,
+                                   on_done=on_done, on_start=on_start, on_merge=on_merge,
+                                   on_reject=on_reject, cancel=self._cancel,
+                                   journal=self.journal)
+        logger.info(f"Conversión y unión de {len(self.files)} archivos "
+                    f"en {time.perf_counter() - start:.2f}s")
+        return pages
@@ -0,0 +1,234 @@
+"""
+Validación previa de los archivos de entrada (firma, tamaño y estructura).
+
+``list_input_files`` admite un archivo por su extensión: un JPEG truncado o
+una página HTML guardada como ``.doc`` recién fallan dentro de la conversión,
+a veces después de varios segundos de Word. Antes de convertir, cada archivo
+pasa por ``check_file``:
+
+* Tamaño: vacío o mayor que ``security.max_file_size_mb`` (0 = sin límite).
+* Firma (``security.validate_file_types``): los primeros bytes deben
+  corresponder a la extensión (``%PDF-``, JPEG/PNG/TIFF, OLE2 o ZIP de
+  Office, RTF para Word).
+* Estructura básica: marcador ``%%EOF`` al final del PDF, fin de imagen en
+  JPEG/PNG, encabezado de imagen legible (sin decodificar los píxeles) y
+  directorio ZIP con las partes de Word o Excel.
+
+``preflight`` valida todos los archivos en paralelo (hilos: es casi todo
+E/S) y devuelve el motivo de cada rechazo; los rechazados no llegan al motor.
+"""
+
+import mmap
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .core import EXCEL_EXTS, IMAGE_EXTS, PDF_EXTS, WORD_EXTS, get_config
+
+HEAD_BYTES = 1024    # %PDF- puede venir precedido de basura en el primer KB
+TAIL_BYTES = 8192    # ventana rápida para %%EOF, EOI e IEND (si no, se busca en todo el archivo)
+MAX_THREADS = 8
+
+# Firmas reconocidas: (prefijo, formato)
+SIGNATURES = (
+    (b"%PDF-", "pdf"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+    (b"PK\x03\x04", "zip"),
+    (b"{\\rtf", "rtf"),
+)
+FORMAT_LABELS = {
+    "pdf": "PDF", "jpeg": "JPEG", "png": "PNG", "tiff": "TIFF", "ole": "Office 97-2003",
+    "zip": "ZIP", "rtf": "RTF", "html": "HTML", "xml": "XML", "texto": "texto",
+}
+IMAGE_FORMATS = {"jpeg", "png", "tiff"}  # img2pdf y PIL detectan el formato por contenido
+WORD_FORMATS = {"ole", "zip", "rtf"}
+EXCEL_FORMATS = {"ole", "zip"}
+OOXML_PARTS = {"word": "word/", "excel": "xl/"}
+
+
+@dataclass(frozen=True)
+class PreflightPolicy:
+    """Parámetros de la validación (sección ``security`` de la configuración)."""
+    validate_types: bool = True
+    max_bytes: int = 0   # 0 = sin límite
+
+
+def preflight_policy() -> PreflightPolicy:
+    max_mb = float(get_config("security", "max_file_size_mb", 0) or 0)
+    return PreflightPolicy(
+        validate_types=bool(get_config("security", "validate_file_types", True)),
+        max_bytes=int(max_mb * 1024 * 1024),
+    )
+
+
+def sniff(head: bytes) -> str:
+    """Formato según los primeros bytes (``desconocido`` si no se reconoce)."""
+    for prefix, fmt in SIGNATURES:
+        if head.startswith(prefix):
+            return fmt
+    if b"%PDF-" in head:
+        return "pdf"
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<!doctype html", b"<html", b"<head", b"<body", b"<meta")):
+        return "html"
+    if text.startswith(b"<?xml"):
+        return "xml"
+    if head and all(32 <= b < 127 or b in (9, 10, 13) for b in head[:256]):
+        return "texto"
+    return "desconocido"
+
+
+def _read_edges(path: Path, size: int) -> tuple[bytes, bytes]:
+    with open(path, "rb") as f:
+        head = f.read(HEAD_BYTES)
+        if size <= HEAD_BYTES:
+            return head, head
+        f.seek(max(0, size - TAIL_BYTES))
+        return head, f.read(TAIL_BYTES)
+
+
+def _find(path: Path, marker: bytes, start: int = 0) -> bool:
+    """Busca ``marker`` en el archivo mapeado en memoria (sin leerlo a un buffer)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm.find(marker, start) >= 0
+
+
+def _jpeg_scan_start(path: Path) -> int:
+    """
+    Posición del primer SOS de la imagen principal (-1 si los segmentos están rotos).
+
+    Recorre los segmentos por su longitud: la miniatura EXIF (con su propio
+    EOI) queda dentro de APP1 y se salta entera.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 2
+        while pos + 4 <= len(mm):
+            if mm[pos] != 0xFF:
+                return -1
+            marker = mm[pos + 1]
+            if marker == 0xFF:          # relleno entre segmentos
+                pos += 1
+                continue
+            if marker == 0xDA:
+                return pos
+            pos += 2 + int.from_bytes(mm[pos + 2:pos + 4], "big")
+    return -1
+
+
+def _jpeg_complete(path: Path, tail: bytes) -> bool:
+    if b"\xff\xd9" in tail:
+        return True
+    # Fotos con datos agregados al final (p. ej. "motion photos" con video):
+    # el EOI está antes; los datos comprimidos no pueden contener FF D9
+    start = _jpeg_scan_start(path)
+    return start >= 0 and _find(path, b"\xff\xd9", start)
+
+
+def _not_a(label: str, detected: str) -> str:
+    return f"el contenido no es {label} (parece {FORMAT_LABELS.get(detected, detected)})"
+
+
+def _check_image(path: Path, fmt: str, tail: bytes) -> str | None:
+    if fmt == "jpeg" and not _jpeg_complete(path, tail):
+        return "JPEG incompleto: falta el marcador de fin de imagen"
+    if fmt == "png" and b"IEND" not in tail and not _find(path, b"IEND"):
+        return "PNG incompleto: falta el bloque IEND"
+
+    from PIL import Image  # import local: solo si hace falta
+
+    try:
+        # open() lee solo el encabezado; los píxeles no se decodifican
+        with Image.open(path) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        return "imagen demasiado grande (posible bomba de descompresión)"
+    except Exception as e:
+        return f"imagen ilegible: {e}"
+    if not width or not height:
+        return "imagen sin dimensiones"
+    return None
+
+
+def _check_ooxml(path: Path, kind: str) -> str | None:
+    try:
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return "documento dañado o incompleto (ZIP ilegible)"
+    part = OOXML_PARTS[kind]
+    if "[Content_Types].xml" not in names or not any(n.startswith(part) for n in names):
+        label = "Word" if kind == "word" else "Excel"
+        return f"el ZIP no contiene un documento de {label}"
+    return None
+
+
+def check_file(path: Path, policy: PreflightPolicy | None = None) -> str | None:
+    """
+    Valida ``path`` sin convertirlo.
+
+    Returns:
+        Motivo del rechazo, o None si el archivo puede convertirse
+    """
+    policy = policy or preflight_policy()
+    try:
+        size = os.stat(path).st_size
+    except OSError as e:
+        return f"no se puede leer: {e.strerror or e}"
+    if size == 0:
+        return "archivo vacío"
+    if policy.max_bytes and size > policy.max_bytes:
+        return (f"excede el tamaño máximo ({size / 1024 / 1024:.1f} MB > "
+                f"{policy.max_bytes / 1024 / 1024:.0f} MB)")
+    if not policy.validate_types:
+        return None
+
+    ext = path.suffix.lower()
+    try:
+        head, tail = _read_edges(path, size)
+    except OSError as e:
+        return f"no se puede leer: {e.strerror or e}"
+    fmt = sniff(head)
+
+    if ext in PDF_EXTS:
+        if fmt != "pdf":
+            return _not_a("un PDF", fmt)
+        if b"%%EOF" not in tail and not _find(path, b"%%EOF"):
+            return "PDF incompleto: falta el marcador %%EOF final"
+    elif ext in IMAGE_EXTS:
+        if fmt not in IMAGE_FORMATS:
+            return _not_a("una imagen JPG/PNG/TIFF", fmt)
+        return _check_image(path, fmt, tail)
+    elif ext in WORD_EXTS:
+        if fmt not in WORD_FORMATS:
+            return _not_a("un documento de Word", fmt)
+        if fmt == "zip":
+            return _check_ooxml(path, "word")
+    elif ext in EXCEL_EXTS:
+        if fmt not in EXCEL_FORMATS:
+            return _not_a("un libro de Excel", fmt)
+        if fmt == "zip":
+            return _check_ooxml(path, "excel")
+    return None
+
+
+def preflight(files: list[Path], policy: PreflightPolicy | None = None) -> dict[Path, str]:
+    """
+    Valida ``files`` en paralelo.
+
+    Returns:
+        {archivo rechazado: motivo}, en el orden de ``files``
+    """
+    policy = policy or preflight_policy()
+    if len(files) <= 1:
+        reasons = [check_file(f, policy) for f in files]
+    else:
+        with ThreadPoolExecutor(min(MAX_THREADS, len(files)),
+                                thread_name_prefix="preflight") as pool:
+            reasons = list(pool.map(lambda f: check_file(f, policy), files))
+    return {f: reason for f, reason in zip(files, reasons) if reason}
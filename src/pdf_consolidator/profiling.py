@@ -0,0 +1,236 @@
+"""
+Perfilado por etapa: cProfile y tracemalloc bajo ``--profile``.
+
+Con el modo activo (``pdf-consolidator --profile ...``, ``python main.py
+--profile`` o ``profiling.enabled``) cada etapa envuelta en
+``profile_stage`` (``scan``, ``preflight``, cada conversión, cada PDF que se
+agrega a la unión y la escritura) se perfila y deja en la carpeta de la
+ejecución (``logs/profiles/<fecha>-<pid>/``, o bajo ``profiling.dir``):
+
+* ``<etapa>-<pid>-<hilo>.prof``: estadísticas de cProfile acumuladas de la
+  etapa en ese hilo (se leen con ``pstats``);
+* ``memory.jsonl``: una línea por llamada con duración, pico de memoria
+  (tracemalloc) y los ``profiling.top`` sitios que más memoria retenían al
+  terminar la etapa.
+
+Los procesos hijos (pool de imágenes y de Office) escriben en la misma
+carpeta: la reciben por la variable de entorno ``PDF_CONSOLIDATOR_PROFILE``.
+El pico es el del proceso entero mientras dura la etapa: con varios casos a
+la vez incluye lo que asignan los demás hilos.
+
+Desactivado, ``profile_stage`` solo consulta una variable global y devuelve
+un context manager vacío.
+
+``pdf-consolidator profile`` (``format_report``) ordena las funciones más
+costosas por etapa y los mayores picos de memoria de las últimas ejecuciones.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from .core import LOG_DIR, get_config, logger
+
+if TYPE_CHECKING:  # solo para anotaciones: desactivado no se importa nada
+    import cProfile
+    import tracemalloc
+
+PROFILE_ENV = "PDF_CONSOLIDATOR_PROFILE"
+PROFILES_DIR = LOG_DIR / "profiles"
+MEMORY_FILE = "memory.jsonl"
+
+_run_dir: Path | None = Path(os.environ[PROFILE_ENV]) if os.environ.get(PROFILE_ENV) else None
+_DISABLED = nullcontext()
+_profilers: dict[tuple[str, int], "cProfile.Profile"] = {}  # (etapa, hilo)
+_lock = threading.Lock()
+_local = threading.local()  # etapa activa en el hilo: las anidadas cuentan en la de afuera
+
+
+def profiles_dir() -> Path:
+    """Carpeta con una subcarpeta por ejecución perfilada (``profiling.dir``)."""
+    return Path(get_config("profiling", "dir", "") or PROFILES_DIR)
+
+
+def profiling_configured() -> bool:
+    """``profiling.enabled``: perfilar sin pasar ``--profile`` (p. ej. el ejecutable)."""
+    return bool(get_config("profiling", "enabled", False))
+
+
+def enable_profiling(base: Path | None = None) -> Path:
+    """Activa el perfilado en este proceso y sus hijos; devuelve la carpeta de la ejecución."""
+    global _run_dir
+    run_dir = (base or profiles_dir()) / f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+    run_dir.mkdir(parents=True, exist_ok=True)
+    os.environ[PROFILE_ENV] = str(run_dir)
+    _run_dir = run_dir
+    logger.info(f"Perfilado por etapa activo: {run_dir}")
+    return run_dir
+
+
+def disable_profiling() -> None:
+    global _run_dir
+    _run_dir = None
+    os.environ.pop(PROFILE_ENV, None)
+    with _lock:
+        _profilers.clear()
+
+
+def profile_stage(name: str, label: str = "") -> AbstractContextManager[None]:
+    """
+    Perfila el bloque como la etapa ``name`` (``label``: archivo o caso)::
+
+        with profile_stage("convert", src.name):
+            convert_to_pdf(src, temp_dir)
+    """
+    if _run_dir is None:
+        return _DISABLED
+    return _profiled(_run_dir, name, label)
+
+
+@contextmanager
+def _profiled(run_dir: Path, name: str, label: str) -> Iterator[None]:
+    if getattr(_local, "active", False):
+        yield
+        return
+    import cProfile  # import local: solo con el perfilado activo
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    key = (name, threading.get_ident())
+    with _lock:
+        profiler = _profilers.get(key)
+        if profiler is None:
+            profiler = _profilers[key] = cProfile.Profile()
+    _local.active = True
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - base
+        growth = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        _local.active = False
+        try:
+            _write(run_dir, name, label, profiler, seconds, peak, growth)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el perfil de {name}: {e}")
+
+
+def _where(stat: "tracemalloc.StatisticDiff") -> str:
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def _write(run_dir: Path, name: str, label: str, profiler: "cProfile.Profile",
+           seconds: float, peak: int, growth: "list[tracemalloc.StatisticDiff]") -> None:
+    run_dir.mkdir(parents=True, exist_ok=True)
+    path = run_dir / f"{name}-{os.getpid()}-{threading.get_ident()}.prof"
+    tmp = path.with_suffix(".tmp")
+    profiler.dump_stats(str(tmp))  # acumulado de la etapa en este hilo
+    os.replace(tmp, path)
+    top = int(get_config("profiling", "top", 10) or 0)
+    record = {
+        "stage": name, "label": label, "pid": os.getpid(), "ts": round(time.time(), 3),
+        "seconds": round(seconds, 6), "peak_bytes": max(peak, 0),
+        "top": [{"where": _where(s), "size": s.size_diff, "count": s.count_diff}
+                for s in growth if s.size_diff > 0][:top],
+    }
+    with open(run_dir / MEMORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# =============================
+# Informe
+# =============================
+@dataclass
+class HotFunction:
+    """Función de una etapa, sumada en todas las ejecuciones consideradas."""
+    stage: str
+    function: str
+    calls: int
+    own_s: float          # tiempo propio (sin las funciones que llama)
+    cumulative_s: float
+
+
+def profile_runs(base: Path | None = None, last: int | None = None) -> list[Path]:
+    """Carpetas de ejecución perfiladas, de la más antigua a la más reciente."""
+    base = base or profiles_dir()
+    if not base.is_dir():
+        return []
+    runs = sorted(p for p in base.iterdir() if p.is_dir())
+    return runs[-last:] if last else runs
+
+
+def _function_name(key: tuple[str, int, str]) -> str:
+    filename, line, function = key
+    if filename == "~":
+        return function  # built-in
+    return f"{Path(filename).name}:{line}({function})"
+
+
+def hot_functions(runs: list[Path], top: int = 15) -> dict[str, list[HotFunction]]:
+    """Por etapa, las ``top`` funciones con más tiempo propio en ``runs``."""
+    import pstats  # import local: solo para el informe
+
+    files: dict[str, list[str]] = {}
+    for run in runs:
+        for prof in run.glob("*.prof"):
+            files.setdefault(prof.name.split("-", 1)[0], []).append(str(prof))
+    ranking: dict[str, list[HotFunction]] = {}
+    for stage, paths in sorted(files.items()):
+        raw = pstats.Stats(*paths).stats  # type: ignore[attr-defined]  # no figura en typeshed
+        rows = [HotFunction(stage, _function_name(key), calls, own, cumulative)
+                for key, (_, calls, own, cumulative, _) in raw.items()]
+        rows.sort(key=lambda r: r.own_s, reverse=True)
+        ranking[stage] = rows[:top]
+    return ranking
+
+
+def load_memory(runs: list[Path]) -> list[dict]:
+    """Registros de ``memory.jsonl`` de ``runs`` (cada uno con su ``run``)."""
+    records = []
+    for run in runs:
+        path = run / MEMORY_FILE
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append({**json.loads(line), "run": run.name})
+                except json.JSONDecodeError:
+                    continue  # línea cortada por una caída
+    return records
+
+
+def format_report(runs: list[Path], top: int = 15) -> str:
+    """Funciones más costosas por etapa y mayores picos de memoria de ``runs``."""
+    mb = 1024 * 1024
+    memory = load_memory(runs)
+    lines = [f"Perfil de {len(runs)} ejecuciones ({runs[0].parent})"]
+    for stage, rows in hot_functions(runs, top).items():
+        calls = [r for r in memory if r["stage"] == stage]
+        lines += ["", f"[{stage}] {len(calls)} llamadas, {sum(r['seconds'] for r in calls):.2f}s",
+                  f"  {'propio':>9} {'acumulado':>10} {'llamadas':>9}  función"]
+        lines += [f"  {r.own_s:8.3f}s {r.cumulative_s:9.3f}s {r.calls:9d}  {r.function}"
+                  for r in rows]
+    peaks = sorted(memory, key=lambda r: r["peak_bytes"], reverse=True)[:top]
+    if peaks:
+        lines += ["", "Picos de memoria"]
+        for r in peaks:
+            label = f" {r['label']}" if r["label"] else ""
+            lines.append(f"  {r['peak_bytes'] / mb:8.1f} MB  {r['stage']}{label} ({r['run']})")
+            lines += [f"  {'':8}    {s['size'] / mb:6.1f} MB retenidos en {s['where']}"
+                      for s in r["top"][:3]]
+    return "\n".join(lines)
@@ -0,0 +1,197 @@
+"""
+Escaneo de carpetas de entrada con ``os.scandir`` y caché por mtime.
+
+``list_input_files`` se llama varias veces por caso (al cargar la lista, al
+validar, al terminar). En una carpeta de red con miles de archivos, un
+``iterdir()`` con un ``is_file()`` por entrada tarda segundos. Aquí:
+
+* ``os.scandir`` da el tipo de cada entrada sin ``stat`` extra (en Windows
+  también el tamaño y el mtime) y cada ``DirEntry`` se consulta una sola vez.
+* El resultado queda en caché mientras no cambie el mtime de la carpeta (y
+  de sus subcarpetas, si el escaneo es recursivo). Agregar, quitar o
+  renombrar archivos cambia ese mtime; modificar un archivo en su lugar no.
+* Cada ``InputFile`` trae tamaño, mtime y tipo, para no volver a consultar
+  el disco.
+
+Opcionalmente recorre subcarpetas (``scan.recursive``) y ordena en forma
+natural (``scan.natural_sort``: ``doc2`` antes que ``doc10``).
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .core import (
+    ALLOWED_EXTS, EXCEL_EXTS, EXCLUDED_FILES, IMAGE_EXTS, INPUT_DIR, PDF_EXTS, WORD_EXTS,
+    get_config,
+)
+
+# Un mtime de carpeta más reciente que esto puede no reflejar todavía un cambio
+# del mismo instante (FAT/SMB guardan el mtime con 2 s de resolución): no se cachea
+RACY_SECONDS = 2.0
+
+_KINDS = ((PDF_EXTS, "pdf"), (WORD_EXTS, "word"), (EXCEL_EXTS, "excel"), (IMAGE_EXTS, "imagen"))
+
+
+def file_kind(ext: str) -> str:
+    """Tipo de documento según la extensión (``pdf``, ``word``, ``excel``, ``imagen``)."""
+    ext = ext.lower()
+    for exts, kind in _KINDS:
+        if ext in exts:
+            return kind
+    return "otro"
+
+
+def natural_key(name: str) -> list:
+    """Clave de orden natural: los tramos numéricos se comparan como números."""
+    return [int(part) if part.isdigit() else part
+            for part in re.split(r"(\d+)", name.lower())]
+
+
+@dataclass(frozen=True)
+class InputFile:
+    """Archivo de entrada con los metadatos que entrega el escaneo."""
+    path: Path
+    size: int
+    mtime_ns: int
+    kind: str
+    rel: str = ""   # ruta relativa a la carpeta escaneada (clave de orden)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def ext(self) -> str:
+        return self.path.suffix.lower()
+
+
+def _sort_key(natural: bool) -> Callable[[InputFile], Any]:
+    if natural:
+        return lambda f: natural_key(f.rel)
+    return lambda f: f.rel.lower()
+
+
+class DirectoryScanner:
+    """
+    Escanea carpetas de entrada y recuerda el resultado por carpeta y opciones.
+
+    Es seguro usarlo desde varios hilos; ``hits`` y ``misses`` cuentan los
+    escaneos servidos desde la caché y los que recorrieron el disco.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._cache: dict[tuple, tuple[tuple, list[InputFile]]] = {}
+        self._lock = threading.Lock()
+
+    def scan(self, folder: Path, recursive: bool = False,
+             natural: bool = False) -> list[InputFile]:
+        """
+        Archivos admitidos de ``folder`` ordenados por nombre (o ruta relativa).
+
+        Returns:
+            Lista nueva en cada llamada (la caché no se comparte con quien llama)
+        """
+        key = (str(folder.resolve()), recursive, natural)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            signature, files = cached
+            if self._signature(folder, signature) == signature:
+                with self._lock:
+                    self.hits += 1
+                return list(files)
+
+        signature, files = self._walk(folder, recursive)
+        files.sort(key=_sort_key(natural))
+        with self._lock:
+            self.misses += 1
+            newest = max((mtime for _, mtime in signature), default=0)
+            if signature and newest / 1e9 < self.clock() - RACY_SECONDS:
+                self._cache[key] = (signature, files)
+            else:
+                self._cache.pop(key, None)
+        return list(files)
+
+    def invalidate(self, folder: Path | None = None) -> None:
+        """Olvida la caché de ``folder`` (o toda)."""
+        with self._lock:
+            if folder is None:
+                self._cache.clear()
+            else:
+                prefix = str(folder.resolve())
+                for key in [k for k in self._cache if k[0] == prefix]:
+                    del self._cache[key]
+
+    @staticmethod
+    def _signature(folder: Path, previous: tuple) -> tuple | None:
+        """mtime actual de cada carpeta de ``previous`` (None si alguna ya no existe)."""
+        current = []
+        for path, _ in previous:
+            try:
+                current.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                return None
+        return tuple(current)
+
+    @staticmethod
+    def _walk(folder: Path, recursive: bool) -> tuple[tuple, list[InputFile]]:
+        """Recorre ``folder``; devuelve ((carpeta, mtime)...) y los archivos admitidos."""
+        signature: list[tuple[str, int]] = []
+        files: list[InputFile] = []
+        pending = [(folder, "")]
+        while pending:
+            base, rel_dir = pending.pop()
+            try:
+                dir_mtime = os.stat(base).st_mtime_ns
+                it = os.scandir(base)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            signature.append((str(base), dir_mtime))
+            with it:
+                for entry in it:
+                    name = entry.name
+                    rel = rel_dir + name
+                    if entry.is_dir():
+                        if recursive and not name.startswith((".", "_")):
+                            pending.append((base / name, rel + "/"))
+                        continue
+                    dot = name.rfind(".")
+                    ext = name[dot:].lower() if dot > 0 else ""
+                    if ext not in ALLOWED_EXTS or name in EXCLUDED_FILES:
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()  # en Windows viene con la entrada, sin syscall
+                    except OSError:
+                        continue  # borrado durante el escaneo
+                    # base / name evita volver a parsear la ruta completa
+                    files.append(InputFile(base / name, st.st_size, st.st_mtime_ns,
+                                           file_kind(ext), rel))
+        return tuple(sorted(signature)), files
+
+
+_scanner = DirectoryScanner()
+
+
+def scan_inputs(input_dir: Path | None = None, recursive: bool | None = None,
+                natural: bool | None = None) -> list[InputFile]:
+    """
+    Archivos admitidos de ``input_dir`` (por defecto INPUT_DIR) con sus metadatos.
+
+    ``recursive`` y ``natural`` toman por defecto ``scan.recursive`` y
+    ``scan.natural_sort`` de la configuración (ambos desactivados).
+    """
+    if recursive is None:
+        recursive = bool(get_config("scan", "recursive", False))
+    if natural is None:
+        natural = bool(get_config("scan", "natural_sort", False))
+    return _scanner.scan(input_dir or INPUT_DIR, recursive, natural)
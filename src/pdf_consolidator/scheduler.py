@@ -0,0 +1,97 @@
+"""
+Planificador de casos concurrentes.
+
+``JobScheduler`` consolida varios casos a la vez: cada uno corre en un hilo
+propio (hasta ``jobs.max_concurrent``) con una carpeta de trabajo única bajo
+``TEMP_DIR``, y todos comparten un mismo ``ConversionEngine``. Los pools de
+imágenes y de Office quedan acotados por tipo de conversor y se reparten por
+turnos entre los casos activos, así el rendimiento total crece con los
+núcleos en lugar de limitarse a un caso por vez.
+
+    with JobScheduler(max_jobs=4) as scheduler:
+        futures = [scheduler.submit(case) for case in cases]
+        results = [f.result() for f in futures]
+"""
+
+import os
+import re
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from .batch import BatchCase, CaseResult, run_case
+from .cache import ConversionCache
+from .core import OUTPUT_DIR, TEMP_DIR, get_config, logger
+from .engine import ConversionEngine
+from .journal import find_pending
+
+MAX_AUTO_JOBS = 4  # cada caso en curso retiene sus PDFs convertidos en disco y memoria
+
+
+def default_max_jobs() -> int:
+    """Casos simultáneos según ``jobs.max_concurrent`` (0 = uno por núcleo, hasta 4)."""
+    configured = int(get_config("jobs", "max_concurrent", 0) or 0)
+    if configured > 0:
+        return configured
+    return max(1, min(os.cpu_count() or 1, MAX_AUTO_JOBS))
+
+
+def new_workspace(temp_dir: Path = TEMP_DIR, label: str = "job") -> Path:
+    """Crea una carpeta de trabajo con nombre único dentro de ``temp_dir``."""
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    prefix = re.sub(r"[^\w.-]+", "_", label)[:40] or "job"
+    return Path(tempfile.mkdtemp(prefix=f"{prefix}_", dir=temp_dir))
+
+
+class JobScheduler:
+    """
+    Ejecuta casos en paralelo sobre un motor de conversión compartido.
+
+    ``submit`` devuelve un ``Future`` con el ``CaseResult``; ``on_done`` (si se
+    indica) se invoca en el hilo del caso antes de resolverlo. Con ``resume``,
+    un caso con un trabajo interrumpido (misma salida) continúa en su carpeta
+    de trabajo en lugar de empezar de cero.
+    """
+
+    def __init__(self, max_jobs: int | None = None, output_dir: Path = OUTPUT_DIR,
+                 temp_dir: Path = TEMP_DIR, workers: int | None = None,
+                 cache: ConversionCache | None = None, office_workers: int | None = None,
+                 resume: bool = False):
+        self.max_jobs = max(1, max_jobs or default_max_jobs())
+        self.output_dir = output_dir
+        self.temp_dir = temp_dir
+        self.resume = resume
+        # Con casos simultáneos, Office siempre en procesos aparte (COM no admite varios hilos)
+        self.engine = ConversionEngine(workers, cache, office_workers,
+                                       inline_office=self.max_jobs == 1)
+        self._executor = ThreadPoolExecutor(self.max_jobs, thread_name_prefix="caso")
+
+    def __enter__(self) -> "JobScheduler":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+
+    def submit(self, case: BatchCase,
+               on_done: Callable[[CaseResult], None] | None = None) -> "Future[CaseResult]":
+        return self._executor.submit(self._run, case, on_done)
+
+    def _run(self, case: BatchCase, on_done: Callable[[CaseResult], None] | None) -> CaseResult:
+        pending = find_pending(case.output_name, self.temp_dir) if self.resume else None
+        if pending is not None:
+            work_dir = pending.work_dir  # reanuda: solo se convierte lo fallido o faltante
+        else:
+            work_dir = new_workspace(self.temp_dir, f"job_{case.output_name}")
+        result = run_case(case, self.output_dir, work_dir, self.engine)
+        if on_done:
+            try:
+                on_done(result)
+            except Exception as e:
+                logger.exception(f"Error al cerrar el caso {case.output_name}: {e}")
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Espera a los casos en curso (con ``wait``) y cierra los pools."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self.engine.shutdown()
@@ -0,0 +1,216 @@
+"""
+Conversión TIFF -> PDF en streaming.
+
+Procesa un frame a la vez y escribe cada página en el PDF en cuanto está
+lista, de modo que la memoria no crece con el número de páginas. Cuando la
+codificación lo permite, los datos comprimidos se copian tal cual:
+
+* CCITT Group 4 (faxes bilevel) -> ``/CCITTFaxDecode``
+* JPEG dentro de TIFF (compresión 7) -> ``/DCTDecode``
+
+El resto de frames se decodifican y se guardan con Flate conservando su
+profundidad de bits (bilevel a 1 bit, grises a 8 bits), sin forzar RGB.
+"""
+
+import io
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from .pdfstream import Name, StreamingPdfWriter
+
+if TYPE_CHECKING:  # Pillow se importa al convertir
+    from PIL.Image import Image
+    from PIL.TiffImagePlugin import ImageFileDirectory_v2, TiffImageFile
+
+# Etiquetas TIFF usadas (ver especificación TIFF 6.0)
+TAG_BITS_PER_SAMPLE = 258
+TAG_COMPRESSION = 259
+TAG_PHOTOMETRIC = 262
+TAG_FILL_ORDER = 266
+TAG_STRIP_OFFSETS = 273
+TAG_SAMPLES_PER_PIXEL = 277
+TAG_STRIP_BYTE_COUNTS = 279
+TAG_X_RESOLUTION = 282
+TAG_Y_RESOLUTION = 283
+TAG_PLANAR_CONFIG = 284
+TAG_RESOLUTION_UNIT = 296
+TAG_TILE_OFFSETS = 324
+TAG_JPEG_TABLES = 347
+
+COMPRESSION_G4 = 4
+COMPRESSION_JPEG = 7
+RESOLUTION_UNIT_NONE = 1  # proporción de aspecto, sin unidad física
+
+DEFAULT_DPI = 72.0  # mismo tamaño de página que Pillow cuando no hay DPI
+JPEG_QUALITY = 95   # recompresión de frames JPEG que no se pueden copiar tal cual
+
+_BIT_REVERSE = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+
+def _single_strip(tags: "ImageFileDirectory_v2") -> tuple[int, int] | None:
+    """Devuelve (offset, longitud) si el frame tiene una única tira y no usa tiles."""
+    if TAG_TILE_OFFSETS in tags:
+        return None
+    offsets = tags.get(TAG_STRIP_OFFSETS)
+    counts = tags.get(TAG_STRIP_BYTE_COUNTS)
+    if not offsets or not counts or len(offsets) != 1 or len(counts) != 1:
+        return None
+    return offsets[0], counts[0]
+
+
+def _read_strip(fh: BinaryIO, offset: int, length: int) -> bytes:
+    fh.seek(offset)
+    return fh.read(length)
+
+
+def _passthrough_g4(im: "TiffImageFile", fh: BinaryIO) -> tuple[dict, bytes] | None:
+    tags = im.tag_v2
+    strip = _single_strip(tags)
+    photometric = tags.get(TAG_PHOTOMETRIC)
+    if strip is None or photometric not in (0, 1):
+        return None
+    fill_order = tags.get(TAG_FILL_ORDER, 1)
+    if fill_order not in (1, 2):
+        return None
+    data = _read_strip(fh, *strip)
+    if fill_order == 2:
+        data = data.translate(_BIT_REVERSE)
+    width, height = im.size
+    entries = {
+        "Width": width, "Height": height,
+        "ColorSpace": Name("DeviceGray"), "BitsPerComponent": 1,
+        "Filter": Name("CCITTFaxDecode"),
+        "DecodeParms": {"K": -1, "Columns": width, "Rows": height,
+                        "BlackIs1": photometric == 1},
+    }
+    return entries, data
+
+
+def _passthrough_jpeg(im: "TiffImageFile", fh: BinaryIO) -> tuple[dict, bytes] | None:
+    tags = im.tag_v2
+    strip = _single_strip(tags)
+    photometric = tags.get(TAG_PHOTOMETRIC)
+    samples = tags.get(TAG_SAMPLES_PER_PIXEL, 1)
+    bits = tags.get(TAG_BITS_PER_SAMPLE, (8,))
+    if (strip is None or tags.get(TAG_PLANAR_CONFIG, 1) != 1
+            or any(b != 8 for b in bits)
+            or (photometric, samples) not in ((1, 1), (2, 3), (6, 3))):
+        return None
+    data = _read_strip(fh, *strip)
+    tables = tags.get(TAG_JPEG_TABLES)
+    if tables:
+        # Tablas compartidas (SOI..EOI) + datos de la tira (SOI..EOI) -> un JPEG completo
+        data = bytes(tables)[:-2] + data[2:]
+    if not data.startswith(b"\xff\xd8"):
+        return None
+    width, height = im.size
+    entries = {
+        "Width": width, "Height": height,
+        "ColorSpace": Name("DeviceGray" if samples == 1 else "DeviceRGB"),
+        "BitsPerComponent": 8,
+        "Filter": Name("DCTDecode"),
+    }
+    if photometric == 2:
+        # RGB sin transformación YCbCr
+        entries["DecodeParms"] = {"ColorTransform": 0}
+    return entries, data
+
+
+def _encode_decoded(im: "TiffImageFile") -> tuple[dict, bytes]:
+    """Codifica un frame decodificado conservando la menor profundidad posible."""
+    lossy_source = im.tag_v2.get(TAG_COMPRESSION) in (6, COMPRESSION_JPEG)
+    frame: "Image"
+    if im.mode == "1":
+        frame = im
+    elif im.mode in ("L", "RGB"):
+        frame = im
+    elif im.mode in ("LA", "I;16", "I;16B", "I", "F"):
+        frame = im.convert("L")
+    else:
+        frame = im.convert("RGB")
+
+    width, height = frame.size
+    if frame.mode == "1":
+        # En Pillow el bit 1 es blanco, igual que en DeviceGray
+        return ({"Width": width, "Height": height, "ColorSpace": Name("DeviceGray"),
+                 "BitsPerComponent": 1, "Filter": Name("FlateDecode")},
+                zlib.compress(frame.tobytes()))
+
+    color_space = Name("DeviceGray" if frame.mode == "L" else "DeviceRGB")
+    if lossy_source:
+        buf = io.BytesIO()
+        frame.save(buf, "JPEG", quality=JPEG_QUALITY)
+        return ({"Width": width, "Height": height, "ColorSpace": color_space,
+                 "BitsPerComponent": 8, "Filter": Name("DCTDecode")}, buf.getvalue())
+    return ({"Width": width, "Height": height, "ColorSpace": color_space,
+             "BitsPerComponent": 8, "Filter": Name("FlateDecode")},
+            zlib.compress(frame.tobytes()))
+
+
+def _page_size(im: "TiffImageFile") -> tuple[float, float]:
+    """
+    Tamaño de página en puntos según la resolución del frame.
+
+    Pillow informa ``dpi == (1, 1)`` cuando el TIFF no trae
+    XResolution/YResolution o su unidad es "ninguna": eso no es 1 dpi (la
+    página mediría 72 veces la imagen), así que se usa ``DEFAULT_DPI``.
+    """
+    tags = im.tag_v2
+    xdpi = ydpi = DEFAULT_DPI
+    if (TAG_X_RESOLUTION in tags and TAG_Y_RESOLUTION in tags
+            and tags.get(TAG_RESOLUTION_UNIT) != RESOLUTION_UNIT_NONE):
+        try:
+            xdpi, ydpi = (float(d) for d in im.info["dpi"])
+        except (KeyError, TypeError, ValueError):
+            xdpi = ydpi = DEFAULT_DPI
+    xdpi = xdpi if xdpi > 1 else DEFAULT_DPI
+    ydpi = ydpi if ydpi > 1 else DEFAULT_DPI
+    width, height = im.size
+    return width * 72.0 / xdpi, height * 72.0 / ydpi
+
+
+def encode_frame(im: "TiffImageFile", fh: BinaryIO) -> tuple[dict, bytes]:
+    """Devuelve (entradas del XObject, datos) para el frame actual de ``im``."""
+    compression = im.tag_v2.get(TAG_COMPRESSION)
+    encoded = None
+    if compression == COMPRESSION_G4:
+        encoded = _passthrough_g4(im, fh)
+    elif compression == COMPRESSION_JPEG:
+        encoded = _passthrough_jpeg(im, fh)
+    return encoded or _encode_decoded(im)
+
+
+def convert_tiff_to_pdf(src: Path, dst_pdf: Path) -> int:
+    """
+    Convierte un TIFF (multipágina o no) a PDF frame a frame.
+
+    Returns:
+        Número de páginas escritas
+
+    Raises:
+        RuntimeError: Si el TIFF no contiene frames o no es un TIFF
+    """
+    from PIL import Image  # import local: solo si hace falta
+    from PIL.TiffImagePlugin import TiffImageFile
+
+    dst_pdf.parent.mkdir(parents=True, exist_ok=True)
+    # Handle propio para leer tiras comprimidas sin alterar la posición de Pillow
+    with Image.open(src) as im, open(src, "rb") as fh, open(dst_pdf, "wb") as out:
+        if not isinstance(im, TiffImageFile):
+            raise RuntimeError(f"No es un TIFF: {src.name}")
+        writer = StreamingPdfWriter(out)
+        index = 0
+        while True:
+            try:
+                im.seek(index)
+            except EOFError:
+                break
+            entries, data = encode_frame(im, fh)
+            writer.add_image_page(entries, data, *_page_size(im))
+            del data
+            index += 1
+        if writer.page_count == 0:
+            raise RuntimeError(f"TIFF sin frames: {src.name}")
+        writer.close()
+    return writer.page_count
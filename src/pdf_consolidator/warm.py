@@ -0,0 +1,327 @@
+"""
+Convertidores de Office precalentados que sobreviven entre ejecuciones.
+
+Abrir Word, Excel o LibreOffice cuesta varios segundos. Antes, cada
+consolidación abría la instancia con el primer documento Office y la cerraba
+al terminar (``office_thread``), así que cada caso volvía a pagar el arranque.
+
+Un ``WarmConverter`` mantiene abierto un backend en un hilo propio (una
+instancia COM solo se puede usar desde el hilo que la creó) y recibe los
+documentos por una cola:
+
+* ``prewarm`` lo arranca en segundo plano: al abrir la interfaz o al aparecer
+  un documento Office en la lista de entrada, y al empezar cada caso, en
+  paralelo con la conversión de las imágenes;
+* antes de cada documento comprueba que la instancia responda
+  (``ConverterBackend.healthy``) y, si no, la reemplaza;
+* se recicla tras ``conversion.office_max_jobs`` documentos, para acotar la
+  memoria que Word y LibreOffice acumulan;
+* se cierra tras ``conversion.office_idle_seconds`` sin uso (0 = nunca) y se
+  vuelve a abrir con el próximo documento;
+* si un documento agota su tiempo (``watchdog``), se terminan los procesos de
+  la instancia y los documentos siguientes pasan a un hilo nuevo.
+
+Sirve cualquier ``ConverterBackend`` (nombre registrado o clase), incluido
+uno simulado en los tests. ``backends.backend_for`` lo usa para Word/Excel
+cuando ``conversion.office_keep_warm`` está activo; sin él usa
+``cold_converter``, que se cierra a los ``COLD_IDLE_SECONDS`` sin uso pero
+conserva el tiempo máximo por documento. Los procesos de ``office_pool``
+aplican el mismo ciclo de vida por su cuenta.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Iterable
+
+from .backends import OFFICE_EXTS, ConverterBackend, create_backend, office_backend_name
+from .core import get_config, logger, office_thread
+from .watchdog import ConversionTimeout, conversion_timeout, kill_processes, record_timeout
+
+# (future, origen, destino, extensiones); origen None = solo precalentar
+_Job = tuple[Future, "Path | None", "Path | None", set[str]]
+
+DEFAULT_IDLE_SECONDS = 300
+DEFAULT_MAX_JOBS = 50      # documentos por instancia antes de reciclarla
+COLD_IDLE_SECONDS = 5.0    # sin ``office_keep_warm``: cierre tras el último documento
+
+# Nombre registrado del backend, o una clase (útil en tests y benchmarks)
+BackendSpec = str | type[ConverterBackend]
+
+
+def keep_warm() -> bool:
+    """``conversion.office_keep_warm``: mantener Office abierto entre ejecuciones."""
+    return bool(get_config("conversion", "office_keep_warm", True))
+
+
+def office_idle_seconds() -> float:
+    """Segundos sin uso tras los que se cierra Office (``conversion.office_idle_seconds``)."""
+    return float(get_config("conversion", "office_idle_seconds", DEFAULT_IDLE_SECONDS) or 0)
+
+
+def office_max_jobs() -> int:
+    """Documentos por instancia o proceso de Office antes de reciclarlo."""
+    return int(get_config("conversion", "office_max_jobs", DEFAULT_MAX_JOBS) or 0)
+
+
+class _Session:
+    """Hilo que atiende al convertidor: su cola y su instancia del backend."""
+
+    def __init__(self) -> None:
+        self.queue: "queue.Queue[_Job | None]" = queue.Queue()
+        self.thread: threading.Thread | None = None
+        # Solo se tocan desde el hilo de la sesión (``pids``, también desde el watchdog)
+        self.instance: ConverterBackend | None = None
+        self.done = 0
+        self.warm_exts: set[str] = set()
+        self.current: Future | None = None    # documento en curso
+        self.pids: list[int] = []
+        self.abandoned = False
+
+
+class WarmConverter(ConverterBackend):
+    """
+    Backend ``backend`` abierto en un hilo propio, que atiende los documentos en orden.
+
+    Se usa como cualquier backend (``convert`` bloquea hasta terminar) o con
+    ``submit``, que devuelve un ``Future`` con el PDF. Los contadores
+    (``starts``, ``recycles``, ``replaced``, ``idle_stops``, ``timeouts``,
+    ``jobs``) sirven para diagnóstico y tests.
+
+    ``convert`` espera a lo sumo ``watchdog.conversion_timeout``: si se agota,
+    termina los procesos de la instancia colgada, abandona su hilo (los
+    documentos en cola pasan a uno nuevo) y lanza ``ConversionTimeout``.
+    """
+
+    extensions = OFFICE_EXTS
+
+    def __init__(self, backend: BackendSpec, idle_seconds: float | None = None,
+                 max_jobs: int | None = None):
+        self.backend = backend
+        self.name = backend if isinstance(backend, str) else backend.name
+        self.idle_seconds = office_idle_seconds() if idle_seconds is None else idle_seconds
+        self.max_jobs = office_max_jobs() if max_jobs is None else max_jobs
+        self.starts = 0       # instancias abiertas
+        self.recycles = 0     # cerradas por ``max_jobs``
+        self.replaced = 0     # cerradas porque no respondían
+        self.idle_stops = 0   # cerradas por inactividad
+        self.timeouts = 0     # abandonadas por tiempo agotado
+        self.jobs = 0
+        self._session: _Session | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def warm(self) -> bool:
+        """Si hay una instancia abierta ahora mismo."""
+        session = self._session
+        return session is not None and session.instance is not None
+
+    # -- interfaz ---------------------------------------------------------
+    def submit(self, src: Path, dst: Path) -> Future:
+        future: Future = Future()
+        self._put((future, src, dst, {src.suffix.lower()}))
+        return future
+
+    def convert(self, src: Path, dst: Path) -> None:
+        future = self.submit(src, dst)
+        budget = conversion_timeout(src)
+        try:
+            future.result(timeout=budget or None)
+        except FutureTimeout:
+            if not self._abandon(future, src, budget):
+                future.result()  # terminó justo al vencer el plazo
+                return
+            raise ConversionTimeout(src, budget) from None
+
+    def prewarm(self, extensions: Iterable[str] = ()) -> Future:
+        """Abre la instancia en segundo plano (y lo necesario para ``extensions``)."""
+        future: Future = Future()
+        self._put((future, None, None, set(extensions)))
+        return future
+
+    def close(self) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Cierra la instancia y detiene el hilo; el próximo documento los vuelve a abrir."""
+        with self._lock:
+            session, self._session = self._session, None
+            if session is not None:
+                session.queue.put(None)
+        if session is not None and session.thread is not None:
+            session.thread.join()
+
+    def _put(self, item: _Job | None) -> None:
+        with self._lock:
+            if self._session is None:
+                self._session = _Session()
+                self._session.thread = threading.Thread(
+                    target=self._serve, args=(self._session,), name=f"warm-{self.name}",
+                    daemon=True)
+                self._session.thread.start()
+            self._session.queue.put(item)
+
+    def _abandon(self, future: Future, src: Path, budget: float) -> bool:
+        """
+        Vencido el plazo de ``future``, deja atrás la sesión que lo demora.
+
+        Es la que lo está convirtiendo o la que está colgada con un documento
+        (o un precalentado) anterior. Devuelve False si ``future`` ya terminó.
+        """
+        with self._lock:
+            if future.done():
+                return False
+            session = self._session
+            pending = []
+            if session is None or future.running() and session.current is not future:
+                session = None  # su sesión ya quedó atrás por otro documento
+            else:
+                self._session = None
+                session.abandoned = True
+                while True:
+                    try:
+                        pending.append(session.queue.get_nowait())
+                    except queue.Empty:
+                        break
+            self.timeouts += 1
+        future.cancel()  # si seguía en cola ya no hay quien lo espere
+        # Con sus procesos terminados la llamada colgada falla y el hilo termina solo
+        record_timeout(src, budget, kill_processes(session.pids) if session else 0)
+        for item in pending:
+            if item is not None:
+                self._put(item)
+        return True
+
+    # -- hilo de cada sesión ------------------------------------------------
+    def _serve(self, session: _Session) -> None:
+        with office_thread():
+            try:
+                while not session.abandoned:
+                    timeout = self.idle_seconds if session.instance is not None \
+                        and self.idle_seconds > 0 else None
+                    try:
+                        item = session.queue.get(timeout=timeout)
+                    except queue.Empty:
+                        logger.info(f"{self.name}: {self.idle_seconds:.0f}s sin uso, se cierra")
+                        self._close(session)
+                        self.idle_stops += 1
+                        continue
+                    if item is None:
+                        break
+                    future, src, dst, extensions = item
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    session.current = future
+                    try:
+                        instance = self._ready(session, extensions)
+                        if src is not None and dst is not None:
+                            dst.parent.mkdir(parents=True, exist_ok=True)
+                            try:
+                                instance.convert(src, dst)
+                            finally:
+                                self._count_job(session, extensions)
+                        future.set_result(dst)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    finally:
+                        session.current = None
+            finally:
+                self._close(session)
+
+    def _ready(self, session: _Session, extensions: set[str]) -> ConverterBackend:
+        """Deja una instancia sana y preparada para ``extensions`` y la devuelve."""
+        if session.instance is not None and not session.instance.healthy():
+            logger.warning(f"{self.name} no responde; se reemplaza la instancia")
+            self._close(session)
+            self.replaced += 1
+        instance = session.instance
+        if instance is None:
+            instance = session.instance = self.backend() if isinstance(self.backend, type) \
+                else create_backend(self.backend)
+            session.done = 0
+            self.starts += 1
+        missing = extensions - session.warm_exts
+        if missing:
+            start = time.perf_counter()
+            instance.start(missing)
+            session.warm_exts |= missing
+            session.pids = instance.process_ids()
+            logger.info(f"{self.name} listo para {', '.join(sorted(missing))} "
+                        f"en {time.perf_counter() - start:.2f}s")
+        return instance
+
+    def _count_job(self, session: _Session, extensions: set[str]) -> None:
+        self.jobs += 1
+        session.done += 1
+        if self.max_jobs and session.done >= self.max_jobs and not session.abandoned:
+            logger.info(f"{self.name} reciclado tras {session.done} documentos")
+            extensions = extensions | session.warm_exts
+            self._close(session)
+            self.recycles += 1
+            try:
+                self._ready(session, extensions)  # el siguiente documento no espera el arranque
+            except Exception as e:
+                logger.warning(f"No se pudo volver a abrir {self.name} tras reciclarlo: {e}")
+
+    def _close(self, session: _Session) -> None:
+        instance, session.instance = session.instance, None
+        session.warm_exts = set()
+        session.pids = []
+        if instance is not None:
+            try:
+                instance.close()
+            except Exception as e:
+                logger.warning(f"Error cerrando {self.name}: {e}")
+
+
+# =============================
+# Instancias compartidas
+# =============================
+_warm: dict[str, WarmConverter] = {}
+_cold: dict[str, WarmConverter] = {}
+_warm_lock = threading.Lock()
+
+
+def warm_converter(name: str) -> WarmConverter:
+    """``WarmConverter`` compartido (por proceso) del backend ``name``."""
+    with _warm_lock:
+        converter = _warm.get(name)
+        if converter is None:
+            converter = _warm[name] = WarmConverter(name)
+        return converter
+
+
+def cold_converter(name: str) -> WarmConverter:
+    """
+    Convertidor de ``name`` sin ``office_keep_warm``: no queda abierto entre
+    ejecuciones (se cierra a los ``COLD_IDLE_SECONDS`` sin uso), pero cada
+    documento sigue vigilado por ``watchdog`` como en ``warm_converter``.
+    """
+    with _warm_lock:
+        converter = _cold.get(name)
+        if converter is None:
+            converter = _cold[name] = WarmConverter(name, idle_seconds=COLD_IDLE_SECONDS)
+        return converter
+
+
+def prewarm(files: Iterable[Path]) -> None:
+    """Precalienta en segundo plano el backend de Office si ``files`` incluye documentos Office."""
+    extensions = {f.suffix.lower() for f in files} & OFFICE_EXTS
+    if extensions and keep_warm():
+        warm_converter(office_backend_name()).prewarm(extensions)
+
+
+def shutdown_warm() -> None:
+    """Cierra todas las instancias precalentadas (al salir de la aplicación)."""
+    with _warm_lock:
+        converters = [*_warm.values(), *_cold.values()]
+        _warm.clear()
+        _cold.clear()
+    for converter in converters:
+        converter.shutdown()
+
+
+atexit.register(shutdown_warm)
@@ -0,0 +1,369 @@
+"""
+Modo daemon: vigila una bandeja de entrada y consolida cada caso al terminar de copiarse.
+
+Cada subcarpeta de la bandeja (``watch.inbox``) es un caso. Los metadatos se
+toman del archivo ``caso.json`` de la carpeta (``ident``, ``cliente``,
+``reembolso``) o, si no existe, del nombre de la carpeta con la forma
+``<ident>_<cliente>_<reembolso>`` (el cliente puede contener ``_``).
+
+Un caso se procesa cuando su carpeta no cambió durante ``watch.settle_seconds``
+(el operador o el escáner terminó de copiar). El PDF va a ``OUTPUT_DIR`` con el
+nombre de ``final_pdf_name`` y la carpeta se mueve a ``_procesados`` o
+``_fallidos`` dentro de la bandeja. Se procesan a lo sumo ``watch.max_cases``
+casos a la vez con ``scheduler.JobScheduler``.
+
+Los cambios se detectan con inotify si está instalado ``inotify_simple``
+(Linux) y, si no, revisando la bandeja con ``os.scandir`` cada
+``watch.poll_seconds``. Si se agotan los watches de inotify
+(``fs.inotify.max_user_watches``) también se pasa a revisar la bandeja.
+"""
+
+import errno
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from .batch import BatchCase, CaseResult
+from .cache import ConversionCache
+from .core import OUTPUT_DIR, TEMP_DIR, get_config, logger
+from .metrics import export_configured
+from .scheduler import JobScheduler
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags  # type: ignore[import-not-found]
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+INBOX_DIR = Path("data/inbox")
+SIDECAR_NAME = "caso.json"
+PROCESSED_DIRNAME = "_procesados"
+FAILED_DIRNAME = "_fallidos"
+DEFAULT_SETTLE_SECONDS = 30.0
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_MAX_CASES = 2
+
+# Firma de una carpeta: (nombre, tamaño, mtime) de cada entrada
+Signature = tuple[tuple[str, int, int], ...]
+
+
+def is_case_dir_name(name: str) -> bool:
+    """Las carpetas que empiezan con ``_`` o ``.`` (procesados, ocultas) no son casos."""
+    return not name.startswith(("_", "."))
+
+
+def case_from_folder(folder: Path) -> BatchCase:
+    """
+    Metadatos del caso desde ``caso.json`` o desde el nombre de la carpeta.
+
+    Raises:
+        ValueError: Si faltan campos o el nombre no tiene la forma esperada
+    """
+    sidecar = folder / SIDECAR_NAME
+    if sidecar.exists():
+        try:
+            record = json.loads(sidecar.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"{SIDECAR_NAME} ilegible en {folder.name}: {e}") from e
+        fields = [str(record.get(k) or "").strip() for k in ("ident", "cliente", "reembolso")]
+        if not all(fields):
+            raise ValueError(f"{SIDECAR_NAME} de {folder.name} debe tener ident, cliente y reembolso")
+        ident, cliente, reembolso = fields
+        return BatchCase(ident=ident, cliente=cliente, reembolso=reembolso, carpeta=folder)
+
+    parts = folder.name.split("_")
+    fields = [parts[0].strip(), " ".join(parts[1:-1]).strip(), parts[-1].strip()]
+    if len(parts) < 3 or not all(fields):
+        raise ValueError(f"La carpeta {folder.name} no tiene la forma ident_cliente_reembolso "
+                         f"ni un {SIDECAR_NAME}")
+    ident, cliente, reembolso = fields
+    return BatchCase(ident=ident, cliente=cliente, reembolso=reembolso, carpeta=folder)
+
+
+def folder_signature(folder: Path) -> Signature | None:
+    """Firma del contenido de ``folder`` (None si ya no existe)."""
+    try:
+        with os.scandir(folder) as it:
+            entries = []
+            for entry in it:
+                st = entry.stat(follow_symlinks=False)
+                entries.append((entry.name, st.st_size, st.st_mtime_ns))
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return tuple(sorted(entries))
+
+
+def list_case_dirs(inbox: Path) -> list[str]:
+    try:
+        with os.scandir(inbox) as it:
+            return sorted(e.name for e in it if e.is_dir() and is_case_dir_name(e.name))
+    except FileNotFoundError:
+        return []
+
+
+# =============================
+# Detección de cambios
+# =============================
+class PollingWatcher:
+    """Sin notificaciones del sistema: cada espera termina en una revisión completa."""
+
+    def __init__(self, inbox: Path, interval: float):
+        self.inbox = inbox
+        self.interval = interval
+
+    def wait(self, timeout: float) -> set[str] | None:
+        """Espera y devuelve las carpetas cambiadas; None = revisar todas."""
+        time.sleep(min(timeout, self.interval))
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Cambios vía inotify: solo se revisan las carpetas que recibieron eventos.
+
+    Un watch sigue al inode: al archivar un caso (moverlo a ``_procesados``) se
+    quita su watch explícitamente, porque IN_IGNORED no llega con un
+    movimiento. Si no quedan watches libres, ``exhausted`` pide pasar a
+    ``PollingWatcher``.
+    """
+
+    def __init__(self, inbox: Path):
+        f = inotify_flags
+        self.case_mask = (f.CREATE | f.MODIFY | f.CLOSE_WRITE | f.MOVED_TO | f.MOVED_FROM
+                          | f.DELETE | f.ATTRIB | f.MOVE_SELF)
+        self.inbox = inbox
+        self.exhausted = False  # sin watches libres: hay carpetas que nadie vigila
+        self._inotify = INotify()
+        self._inbox_wd = self._inotify.add_watch(
+            inbox, f.CREATE | f.MOVED_TO | f.MOVED_FROM | f.DELETE | f.ONLYDIR)
+        self._folders: dict[int, str] = {}
+        for name in list_case_dirs(inbox):
+            self._add(name)
+
+    def _add(self, name: str) -> None:
+        try:
+            wd = self._inotify.add_watch(self.inbox / name, self.case_mask)
+        except OSError as e:
+            if e.errno == errno.ENOSPC and not self.exhausted:
+                logger.warning(f"Sin watches de inotify libres para {name} "
+                               f"(fs.inotify.max_user_watches): se revisará la bandeja "
+                               f"periódicamente")
+                self.exhausted = True
+            return  # o la carpeta desapareció entre el evento y el registro
+        self._folders[wd] = name
+
+    def _forget(self, name: str) -> None:
+        """Quita el watch de la carpeta ``name`` (movida o borrada de la bandeja)."""
+        for wd in [wd for wd, folder in self._folders.items() if folder == name]:
+            del self._folders[wd]
+            try:
+                self._inotify.rm_watch(wd)
+            except OSError:
+                pass  # el kernel ya lo había quitado (carpeta borrada)
+
+    def wait(self, timeout: float) -> set[str] | None:
+        f = inotify_flags
+        changed: set[str] = set()
+        for event in self._inotify.read(timeout=int(timeout * 1000)):
+            if event.wd == self._inbox_wd:
+                if is_case_dir_name(event.name):
+                    changed.add(event.name)
+                    if event.mask & (f.MOVED_FROM | f.DELETE):
+                        self._forget(event.name)  # p. ej. archivada en ``_procesados``
+                    if event.mask & (f.CREATE | f.MOVED_TO):
+                        self._add(event.name)
+            elif event.wd in self._folders:
+                name = self._folders[event.wd]
+                changed.add(name)
+                if event.mask & f.MOVE_SELF:
+                    self._forget(name)  # movida fuera de la bandeja
+                elif event.mask & f.IGNORED:
+                    del self._folders[event.wd]  # carpeta borrada
+        return changed
+
+    def close(self) -> None:
+        self._inotify.close()
+
+
+# =============================
+# Daemon
+# =============================
+@dataclass
+class _Pending:
+    signature: Signature | None
+    changed_at: float
+
+
+class WatchDaemon:
+    """
+    Vigila ``inbox`` y consolida cada carpeta de caso que quedó quieta.
+
+    ``poll()`` hace una revisión y lanza los casos listos; ``run()`` repite
+    hasta ``stop()``. ``on_result`` se invoca (desde un hilo de trabajo) al
+    terminar cada caso.
+    """
+
+    def __init__(self, inbox: Path | None = None, output_dir: Path = OUTPUT_DIR,
+                 temp_dir: Path = TEMP_DIR, settle_seconds: float | None = None,
+                 poll_seconds: float | None = None, max_cases: int | None = None,
+                 workers: int | None = None, cache: ConversionCache | None = None,
+                 on_result: Callable[[CaseResult], None] | None = None,
+                 use_inotify: bool | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.inbox = inbox or Path(get_config("watch", "inbox", "") or INBOX_DIR)
+        self.settle_seconds = float(settle_seconds if settle_seconds is not None else
+                                    get_config("watch", "settle_seconds", DEFAULT_SETTLE_SECONDS))
+        self.poll_seconds = float(poll_seconds if poll_seconds is not None else
+                                  get_config("watch", "poll_seconds", DEFAULT_POLL_SECONDS))
+        self.max_cases = max(1, int(max_cases or get_config("watch", "max_cases",
+                                                            DEFAULT_MAX_CASES)))
+        self.on_result = on_result
+        self.clock = clock
+        self.use_inotify = HAS_INOTIFY if use_inotify is None else use_inotify and HAS_INOTIFY
+        # resume: tras reiniciar el demonio, un caso interrumpido retoma sus conversiones
+        self.scheduler = JobScheduler(self.max_cases, output_dir, temp_dir, workers, cache,
+                                      resume=True)
+        self._pending: dict[str, _Pending] = {}
+        self._running: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: PollingWatcher | InotifyWatcher | None = None
+
+    # -- revisión ---------------------------------------------------------
+    def poll(self, changed: set[str] | None = None) -> list[str]:
+        """
+        Actualiza el estado de las carpetas y lanza las que quedaron quietas.
+
+        Args:
+            changed: Carpetas con eventos de inotify; None revisa todas
+
+        Returns:
+            Nombres de las carpetas lanzadas en esta revisión
+        """
+        now = self.clock()
+        with self._lock:
+            busy = set(self._running)
+        names = list_case_dirs(self.inbox) if changed is None else sorted(changed)
+        if changed is None:
+            for gone in set(self._pending) - set(names):
+                del self._pending[gone]
+
+        for name in names:
+            if name in busy:
+                continue
+            signature = folder_signature(self.inbox / name)
+            if signature is None:
+                self._pending.pop(name, None)
+                continue
+            state = self._pending.get(name)
+            if state is None:
+                logger.info(f"Nuevo caso en la bandeja: {name}")
+                self._pending[name] = _Pending(signature, now)
+            elif state.signature != signature:
+                state.signature, state.changed_at = signature, now
+
+        # Las carpetas vacías esperan: recién creadas, la copia aún no empezó
+        ready = [name for name, state in sorted(self._pending.items())
+                 if state.signature and now - state.changed_at >= self.settle_seconds]
+        for name in ready:
+            del self._pending[name]
+            self._submit(name)
+        return ready
+
+    def _submit(self, name: str) -> None:
+        folder = self.inbox / name
+        try:
+            case = case_from_folder(folder)
+        except ValueError as e:
+            logger.error(f"Caso {name} descartado: {e}")
+            self._archive(folder, FAILED_DIRNAME)
+            return
+        logger.info(f"Consolidando caso {name} -> {case.output_name}")
+        future = self.scheduler.submit(case, on_done=lambda r: self._finish(folder, r))
+        with self._lock:
+            self._running[name] = future
+        future.add_done_callback(lambda _: self._forget(name))
+
+    def _finish(self, folder: Path, result: CaseResult) -> None:
+        """En el hilo del caso, al terminar: archivar la carpeta y avisar."""
+        self._archive(folder, PROCESSED_DIRNAME if result.ok else FAILED_DIRNAME)
+        if result.work_dir is not None:
+            # los originales ya se archivaron: no queda nada que reanudar en la bandeja
+            shutil.rmtree(result.work_dir, ignore_errors=True)
+        export_configured()
+        if self.on_result:
+            self.on_result(result)
+
+    def _forget(self, name: str) -> None:
+        with self._lock:
+            self._running.pop(name, None)
+
+    def _archive(self, folder: Path, dirname: str) -> Path:
+        """Mueve la carpeta del caso fuera de la bandeja (sin pisar una anterior)."""
+        dest_dir = self.inbox / dirname
+        dest_dir.mkdir(exist_ok=True)
+        dest = dest_dir / folder.name
+        if dest.exists():
+            dest = dest_dir / f"{folder.name}_{datetime.now():%Y%m%d-%H%M%S-%f}"
+        shutil.move(str(folder), str(dest))
+        return dest
+
+    # -- bucle ------------------------------------------------------------
+    def run(self) -> None:
+        """Vigila la bandeja hasta ``stop()``; espera a los casos en curso al salir."""
+        self.inbox.mkdir(parents=True, exist_ok=True)
+        self._watcher = None
+        if self.use_inotify:
+            try:
+                self._watcher = InotifyWatcher(self.inbox)
+                mode = "inotify"
+            except OSError as e:
+                logger.warning(f"No se pudo vigilar {self.inbox} con inotify: {e}")
+        if self._watcher is None:
+            self._watcher = PollingWatcher(self.inbox, self.poll_seconds)
+            mode = f"revisión cada {self.poll_seconds:g}s"
+        logger.info(f"Vigilando {self.inbox} ({mode}, {self.settle_seconds:g}s de espera, "
+                    f"hasta {self.max_cases} casos a la vez)")
+        try:
+            changed = None  # primera vuelta: revisar todo
+            while not self._stop.is_set():
+                self.poll(changed)
+                # Con casos pendientes hay que volver a tiempo para su ventana de espera
+                timeout = self.poll_seconds if not self._pending else min(
+                    self.poll_seconds, self._next_deadline() - self.clock())
+                changed = self._watcher.wait(max(0.05, timeout))
+                if isinstance(self._watcher, InotifyWatcher) and self._watcher.exhausted:
+                    self._watcher.close()
+                    self._watcher = PollingWatcher(self.inbox, self.poll_seconds)
+                    changed = None  # las carpetas sin watch solo se ven revisando todo
+        finally:
+            self.close()
+
+    def _next_deadline(self) -> float:
+        return min(s.changed_at for s in self._pending.values()) + self.settle_seconds
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait_idle(self) -> None:
+        """Espera a que terminen los casos lanzados."""
+        with self._lock:
+            futures = list(self._running.values())
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self.scheduler.shutdown()
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
@@ -0,0 +1,137 @@
+"""
+Tiempo máximo de conversión por archivo y terminación de conversores colgados.
+
+Un ``.doc`` con un diálogo oculto o un ``.xls`` dañado pueden dejar
+``ExportAsFixedFormat`` (o LibreOffice) esperando para siempre: antes, eso
+detenía el caso entero y, con él, todos los documentos Office siguientes.
+
+Cada conversión de Office tiene un presupuesto de tiempo según su tipo
+(``conversion.timeouts``, en segundos; 0 = sin límite)::
+
+    "timeouts": {"word": 180, "excel": 180, "xls": 60}
+
+Una clave por extensión (``xls``) tiene prioridad sobre la de su familia
+(``word``/``excel``). Al agotarse, quien espera el resultado termina el
+proceso del conversor (el trabajador de ``office_pool`` y la instancia de
+Word/Excel o ``soffice`` que usaba) y el archivo cuenta como fallido con el
+motivo (``timeout_reason``, solo para los tiempos agotados desde que empezó la
+ejecución que pregunta). El conversor se vuelve a abrir con el siguiente
+documento y el resto del caso sigue.
+
+``watchdog_stats()`` cuenta los tiempos agotados y los procesos terminados.
+"""
+
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .core import EXCEL_EXTS, WORD_EXTS, get_config, logger
+
+DEFAULT_TIMEOUTS = {"word": 180, "excel": 180}
+MAX_REASONS = 256  # motivos recordados (el modo vigilancia corre días)
+MAX_NAMES = 20     # archivos recordados en ``WatchdogStats.timed_out``
+
+
+class ConversionTimeout(RuntimeError):
+    """La conversión de ``src`` superó su presupuesto de ``seconds`` segundos."""
+
+    def __init__(self, src: Path, seconds: float):
+        super().__init__(f"{src.name}: {timeout_message(seconds)}")
+        self.src = src
+        self.seconds = seconds
+
+
+def timeout_message(seconds: float) -> str:
+    return f"tiempo de conversión agotado ({seconds:.0f}s)"
+
+
+def conversion_timeout(src: Path) -> float:
+    """Presupuesto en segundos para convertir ``src`` (0 = sin límite)."""
+    timeouts = {**DEFAULT_TIMEOUTS, **(get_config("conversion", "timeouts", {}) or {})}
+    ext = src.suffix.lower()
+    family = "word" if ext in WORD_EXTS else "excel" if ext in EXCEL_EXTS else ""
+    for key in (ext.lstrip("."), family):
+        if key and key in timeouts:
+            return float(timeouts[key] or 0)
+    return 0.0
+
+
+def kill_processes(pids: Iterable[int]) -> int:
+    """Termina los procesos ``pids`` sin esperar a que cierren; devuelve cuántos terminó."""
+    killed = 0
+    for pid in pids:
+        try:
+            # En Windows cualquier señal es TerminateProcess
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            killed += 1
+        except OSError:
+            pass  # ya había terminado
+    return killed
+
+
+# =============================
+# Contadores
+# =============================
+@dataclass
+class WatchdogStats:
+    """Conversiones cortadas por tiempo y procesos terminados."""
+    timeouts: int = 0
+    kills: int = 0
+    timed_out: list[str] = field(default_factory=list)  # últimos ``MAX_NAMES`` archivos
+
+
+_stats = WatchdogStats()
+_reasons: dict[Path, tuple[float, str]] = {}  # archivo -> (time.monotonic(), motivo)
+_lock = threading.Lock()
+
+
+def record_timeout(src: Path, seconds: float, killed: int) -> None:
+    """Registra que ``src`` agotó su tiempo y que se terminaron ``killed`` procesos."""
+    logger.error(f"{src.name}: sin respuesta tras {seconds:.0f}s; "
+                 f"{killed} proceso(s) de conversión terminado(s)")
+    with _lock:
+        _stats.timeouts += 1
+        _stats.kills += killed
+        _stats.timed_out = [*_stats.timed_out[-(MAX_NAMES - 1):], src.name]
+        _reasons.pop(src, None)  # al final: los más viejos se descartan primero
+        _reasons[src] = (time.monotonic(), timeout_message(seconds))
+        while len(_reasons) > MAX_REASONS:
+            del _reasons[next(iter(_reasons))]
+
+
+def timeout_reason(src: Path, since: float) -> str:
+    """
+    Motivo del fallo de ``src`` si agotó su tiempo de conversión desde
+    ``since`` (``time.monotonic()`` al empezar la ejecución); "" si no.
+
+    Un tiempo agotado de una ejecución anterior con el mismo archivo (la
+    interfaz, el modo vigilancia o un trabajo reanudado) no cuenta.
+    """
+    with _lock:
+        recorded, reason = _reasons.get(src, (0.0, ""))
+    return reason if recorded >= since else ""
+
+
+def watchdog_stats() -> WatchdogStats:
+    """Copia de los contadores acumulados en este proceso."""
+    with _lock:
+        return WatchdogStats(_stats.timeouts, _stats.kills, list(_stats.timed_out))
+
+
+def reset_watchdog_stats() -> None:
+    global _stats
+    with _lock:
+        _stats = WatchdogStats()
+        _reasons.clear()
+
+
+def format_watchdog_stats(stats: WatchdogStats) -> str:
+    names = ", ".join(stats.timed_out)
+    if stats.timeouts > len(stats.timed_out):
+        names = f"..., {names}"
+    return (f"Watchdog: {stats.timeouts} conversiones con tiempo agotado "
+            f"({names}), {stats.kills} procesos terminados")
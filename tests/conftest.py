@@ -1,10 +1,42 @@
 """Configuración de pytest para el proyecto PDF Consolidator."""
 
 import pytest
+import sys
 from pathlib import Path
 import tempfile
 import shutil
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfWriter
+
+from pdf_consolidator import core, metrics, profiling
+
+
+def make_pdf(path: Path, pages: int = 1) -> None:
+    """PDF nativo con ``pages`` páginas en blanco de 200 x 200 pt."""
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_logs(tmp_path_factory):
+    """
+    Logs, métricas y perfiles de la sesión en una carpeta temporal, nunca en
+    ``logs/`` del repositorio (también los procesos hijos, por ``LOG_ENV``).
+    """
+    log_dir = tmp_path_factory.mktemp("logs")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(core.LOG_ENV, str(log_dir))
+        mp.setattr(core, "LOG_DIR", log_dir)
+        mp.setattr(metrics, "METRICS_FILE", log_dir / "metrics.jsonl")
+        mp.setattr(profiling, "PROFILES_DIR", log_dir / "profiles")
+        yield log_dir
+        metrics.close()
+
 
 @pytest.fixture
 def temp_dir():
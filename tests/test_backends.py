@@ -0,0 +1,128 @@
+"""Tests del registro de backends de conversión."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfReader
+
+from pdf_consolidator import core
+from pdf_consolidator import backends
+from pdf_consolidator.backends import (
+    ConverterBackend, LibreOfficeBackend, backend_name_for, backend_stats,
+    close_backends, register_backend, reset_backend_stats,
+)
+from pdf_consolidator.cache import converter_id
+from pdf_consolidator.core import convert_to_pdf
+from pdf_consolidator.engine import convert_files
+
+# Sustituto de soffice: imita ``--convert-to pdf --outdir DIR archivo``
+FAKE_SOFFICE = f"""#!{sys.executable}
+import sys
+from pathlib import Path
+from pypdf import PdfWriter
+args = sys.argv[1:]
+out_dir = Path(args[args.index("--outdir") + 1])
+writer = PdfWriter()
+writer.add_blank_page(width=100, height=100)
+with open(out_dir / (Path(args[-1]).stem + ".pdf"), "wb") as f:
+    writer.write(f)
+"""
+
+
+@register_backend
+class FakeOfficeBackend(ConverterBackend):
+    name = "fake-office"
+    extensions = backends.OFFICE_EXTS
+    converted: list[str] = []
+
+    def convert(self, src, dst):
+        from pypdf import PdfWriter
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        with open(dst, "wb") as f:
+            writer.write(f)
+        self.converted.append(src.name)
+
+
+@pytest.fixture
+def office_backend(monkeypatch):
+    """Selecciona el backend de Office vía configuración."""
+    def select(name, **extra):
+        conversion = {"office_backend": name, **extra}
+        monkeypatch.setattr(core, "load_app_config", lambda: {"conversion": conversion})
+    yield select
+    close_backends()
+    reset_backend_stats()
+
+
+class TestRegistry:
+    """Tests de selección de backend."""
+
+    def test_builtin_selection(self, office_backend):
+        office_backend("libreoffice")
+        assert backend_name_for(Path("a.PNG")) == "image"
+        assert backend_name_for(Path("a.pdf")) == "pdf"
+        assert backend_name_for(Path("a.docx")) == "libreoffice"
+        with pytest.raises(RuntimeError):
+            backend_name_for(Path("a.txt"))
+
+    def test_auto_depends_on_platform(self, office_backend):
+        office_backend("auto")
+        expected = "office-com" if core.HAS_WIN32 else "libreoffice"
+        assert backend_name_for(Path("a.xlsx")) == expected
+
+    def test_unknown_backend_fails_conversion(self, office_backend, temp_dir):
+        office_backend("inexistente")
+        src = temp_dir / "a.docx"
+        src.write_bytes(b"x")
+        assert convert_to_pdf(src, temp_dir / "work") is None
+
+    def test_cache_key_includes_backend(self, office_backend):
+        office_backend("fake-office")
+        assert converter_id(Path("a.doc")).startswith("fake-office/")
+        office_backend("libreoffice")
+        assert converter_id(Path("a.doc")).startswith("libreoffice/")
+
+    def test_configured_backend_is_used_with_stats(self, office_backend, temp_dir):
+        office_backend("fake-office")
+        files = [temp_dir / "a.docx", temp_dir / "b.xls"]
+        for f in files:
+            f.write_bytes(b"x")
+        results = convert_files(files, temp_dir / "work", max_workers=1, office_workers=1)
+        assert all(results)
+        assert FakeOfficeBackend.converted[-2:] == ["a.docx", "b.xls"]
+        assert backend_stats()["fake-office"].conversions == 2
+
+
+class TestLibreOffice:
+    """Tests del backend LibreOffice (sin instalación real)."""
+
+    def test_missing_soffice(self, office_backend, temp_dir):
+        office_backend("libreoffice", libreoffice_path=str(temp_dir / "no_existe"))
+        backend = LibreOfficeBackend()
+        assert not backend.available()
+        with pytest.raises(RuntimeError, match="LibreOffice"):
+            backend.convert(temp_dir / "a.docx", temp_dir / "a.pdf")
+        backend.close()
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="script ejecutable POSIX")
+    def test_convert_to_fallback(self, office_backend, temp_dir):
+        soffice = temp_dir / "soffice"
+        soffice.write_text(FAKE_SOFFICE, encoding="utf-8")
+        soffice.chmod(0o755)
+        office_backend("libreoffice", libreoffice_path=str(soffice))
+
+        backend = LibreOfficeBackend()
+        backend.has_uno = False
+        src = temp_dir / "carta.docx"
+        src.write_bytes(b"x")
+        dst = temp_dir / "work" / "carta.pdf"
+        backend.convert(src, dst)
+        assert len(PdfReader(str(dst)).pages) == 1
+        assert list(dst.parent.iterdir()) == [dst]  # sin carpetas de salida residuales
+        backend.close()
+        assert not backend.profile_dir.exists()
@@ -0,0 +1,88 @@
+"""Tests del modo batch (manifiesto CSV/JSONL sin interfaz gráfica)."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfReader
+
+from pdf_consolidator.batch import load_manifest, run_batch, format_summary
+from pdf_consolidator.main import main
+from tests.conftest import make_pdf
+
+
+@pytest.fixture
+def cases_dir(temp_dir):
+    """Dos casos con PDFs nativos en carpetas separadas."""
+    for name, pages in (("caso1", 2), ("caso2", 3)):
+        folder = temp_dir / name
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", pages)
+        make_pdf(folder / "b.pdf", 1)
+    return temp_dir
+
+
+class TestManifest:
+    """Tests de lectura de manifiestos."""
+
+    def test_load_csv(self, cases_dir):
+        manifest = cases_dir / "casos.csv"
+        manifest.write_text("ident,cliente,reembolso,carpeta\n"
+                            "1,Juan Perez,10,caso1\n"
+                            "2,Ana,20,caso2\n", encoding="utf-8")
+        cases = load_manifest(manifest)
+        assert [c.ident for c in cases] == ["1", "2"]
+        assert cases[0].carpeta == cases_dir / "caso1"
+        assert cases[0].output_name == "1_Juan_Perez_10.pdf"
+
+    def test_load_jsonl(self, cases_dir):
+        manifest = cases_dir / "casos.jsonl"
+        manifest.write_text(json.dumps({"ident": "1", "cliente": "Ana", "reembolso": "5",
+                                        "carpeta": "caso1"}) + "\n\n", encoding="utf-8")
+        cases = load_manifest(manifest)
+        assert len(cases) == 1
+        assert cases[0].cliente == "Ana"
+
+    def test_missing_field(self, cases_dir):
+        manifest = cases_dir / "casos.csv"
+        manifest.write_text("ident,cliente,reembolso,carpeta\n1,,10,caso1\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="cliente"):
+            load_manifest(manifest)
+
+
+class TestRunBatch:
+    """Tests de ejecución de lotes."""
+
+    def test_run_batch_merges_each_case(self, cases_dir):
+        manifest = cases_dir / "casos.csv"
+        manifest.write_text("ident,cliente,reembolso,carpeta\n"
+                            "1,Juan,10,caso1\n2,Ana,20,caso2\n", encoding="utf-8")
+        out_dir = cases_dir / "out"
+        results = run_batch(load_manifest(manifest), output_dir=out_dir,
+                            temp_dir=cases_dir / "tmp")
+        assert all(r.ok for r in results)
+        assert [r.pages for r in results] == [3, 4]
+        assert len(PdfReader(str(out_dir / "2_Ana_20.pdf")).pages) == 4
+        assert "2/2 OK" in format_summary(results, 1.0)
+
+    def test_empty_case_fails_without_stopping_batch(self, cases_dir):
+        (cases_dir / "vacio").mkdir()
+        manifest = cases_dir / "casos.csv"
+        manifest.write_text("ident,cliente,reembolso,carpeta\n"
+                            "0,X,0,vacio\n1,Juan,10,caso1\n", encoding="utf-8")
+        results = run_batch(load_manifest(manifest), output_dir=cases_dir / "out",
+                            temp_dir=cases_dir / "tmp")
+        assert [r.ok for r in results] == [False, True]
+
+    def test_cli_exit_code(self, cases_dir, capsys):
+        manifest = cases_dir / "casos.csv"
+        manifest.write_text("ident,cliente,reembolso,carpeta\n1,Juan,10,caso1\n",
+                            encoding="utf-8")
+        code = main(["batch", str(manifest), "--no-cache", "--output", str(cases_dir / "out"),
+                     "--temp", str(cases_dir / "tmp")])
+        assert code == 0
+        assert "casos/min" in capsys.readouterr().out
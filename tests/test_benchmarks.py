@@ -0,0 +1,67 @@
+"""Tests de la suite de benchmarks (corpus determinista y detección de regresiones)."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfReader
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.suite import BenchResult, compare, main
+
+
+def _result(name: str, median: float) -> BenchResult:
+    return BenchResult(name, "merge", 3, median, median, median)
+
+
+class TestCorpus:
+    """Tests del generador de corpus."""
+
+    def test_same_seed_same_bytes(self, temp_dir):
+        a = generate_corpus(temp_dir / "a", "small")
+        b = generate_corpus(temp_dir / "b", "small")
+        assert [f.sha256 for f in a] == [f.sha256 for f in b]
+        assert {f.kind for f in a} == {"jpeg", "png", "tiff", "pdf"}
+
+    def test_pages_match_manifest(self, temp_dir):
+        files = generate_corpus(temp_dir, "small")
+        for f in files:
+            if f.kind == "pdf":
+                assert len(PdfReader(str(temp_dir / f.path)).pages) == f.pages
+
+    def test_existing_corpus_is_reused(self, temp_dir):
+        generate_corpus(temp_dir, "small")
+        marker = temp_dir / "files" / "img_320x240.jpg"
+        mtime = marker.stat().st_mtime_ns
+        generate_corpus(temp_dir, "small")
+        assert marker.stat().st_mtime_ns == mtime
+
+
+class TestRegressions:
+    """Tests de comparación contra la línea base."""
+
+    def test_threshold(self):
+        baseline = {"results": [{"name": "a", "median_s": 1.0}, {"name": "b", "median_s": 1.0}]}
+        regressions = compare([_result("a", 1.1), _result("b", 1.5), _result("nuevo", 9.0)],
+                              baseline, threshold=0.2)
+        assert [r.name for r in regressions] == ["b"]
+
+    def test_tiny_differences_are_noise(self):
+        baseline = {"results": [{"name": "a", "median_s": 0.001}]}
+        assert compare([_result("a", 0.003)], baseline, threshold=0.2) == []
+
+    def test_cli_fails_on_regression(self, temp_dir):
+        out = temp_dir / "bench.json"
+        args = ["--corpus", str(temp_dir / "corpus"), "--stage", "merge", "--repeat", "1"]
+        assert main(args + ["--out", str(out)]) == 0
+        data = json.loads(out.read_text(encoding="utf-8"))
+        assert data["meta"]["profile"] == "small"
+        assert {r["name"] for r in data["results"]} == {"merge/memoria", "merge/streaming"}
+
+        for r in data["results"]:
+            r["median_s"] /= 100  # línea base imposible de igualar
+        baseline = temp_dir / "baseline.json"
+        baseline.write_text(json.dumps(data), encoding="utf-8")
+        assert main(args + ["--baseline", str(baseline)]) == 1
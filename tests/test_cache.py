@@ -0,0 +1,93 @@
+"""Tests de la caché de conversiones."""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+
+from pdf_consolidator.cache import ConversionCache
+from pdf_consolidator.core import temp_pdf_path
+from pdf_consolidator.engine import convert_files
+
+
+@pytest.fixture
+def cache(temp_dir):
+    return ConversionCache(temp_dir / "cache", max_bytes=1024 * 1024)
+
+
+def _entry(temp_dir: Path, name: str, size: int) -> Path:
+    path = temp_dir / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+class TestConversionCache:
+    """Tests de claves, contadores y desalojo LRU."""
+
+    def test_key_depends_on_content_not_name(self, temp_dir):
+        a = _entry(temp_dir, "a.jpg", 10)
+        b = _entry(temp_dir, "b.jpg", 10)
+        c = _entry(temp_dir, "c.doc", 10)
+        assert ConversionCache.key_for(a) == ConversionCache.key_for(b)
+        assert ConversionCache.key_for(a) != ConversionCache.key_for(c)
+
+    def test_hit_and_miss_counters(self, cache, temp_dir):
+        pdf = _entry(temp_dir, "x.pdf", 100)
+        assert cache.get("ab" * 32, temp_dir / "out.pdf") is None
+        cache.put("ab" * 32, pdf)
+        assert cache.get("ab" * 32, temp_dir / "out.pdf") == temp_dir / "out.pdf"
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (1, 1, 1)
+
+        cache.save_stats()
+        cache.save_stats()  # no duplica lo ya guardado
+        assert cache.load_totals().hits == 1
+
+    def test_lru_eviction(self, temp_dir):
+        cache = ConversionCache(temp_dir / "cache", max_bytes=250)
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for age, key in enumerate(keys[:2]):
+            cache.put(key, _entry(temp_dir, f"{key}.pdf", 100))
+            entry = cache._entry_path(key)
+            os.utime(entry, (1000 + age, 1000 + age))
+        # Usar la primera entrada la vuelve la más reciente
+        assert cache.get(keys[0], temp_dir / "hit.pdf")
+        cache.put(keys[2], _entry(temp_dir, "nuevo.pdf", 100))
+        assert cache.stats.evictions == 1
+        assert cache._entry_path(keys[0]).exists()
+        assert not cache._entry_path(keys[1]).exists()
+        assert cache.total_bytes() == 200
+
+
+class TestEngineCache:
+    """Tests de integración del motor con la caché."""
+
+    def test_second_run_uses_cache(self, cache, temp_dir):
+        img = temp_dir / "foto.png"
+        Image.new("RGB", (40, 20), "white").save(img)
+        first = convert_files([img], temp_dir / "t1", max_workers=1, cache=cache)
+        second = convert_files([img], temp_dir / "t2", max_workers=1, cache=cache)
+        assert second[0] == temp_pdf_path(img, temp_dir / "t2")
+        assert second[0].read_bytes() == first[0].read_bytes()
+        assert cache.load_totals().hits == 1
+
+    def test_reconverting_into_same_dst_keeps_entry(self, cache, temp_dir):
+        """Reconvertir en la misma carpeta de trabajo no reescribe la entrada guardada."""
+        img = temp_dir / "a.png"
+        Image.new("RGB", (40, 20), "white").save(img)
+        key = ConversionCache.key_for(img)
+        work = temp_dir / "work"
+        convert_files([img], work, max_workers=1, cache=cache)
+        entry = cache._entry_path(key)
+        before = hashlib.sha256(entry.read_bytes()).hexdigest()
+
+        Image.new("RGB", (60, 30), "black").save(img)  # otro contenido, mismo temporal
+        [pdf] = convert_files([img], work, max_workers=1, cache=cache)
+        assert pdf == temp_pdf_path(img, work)
+        assert hashlib.sha256(entry.read_bytes()).hexdigest() == before
+        assert pdf.read_bytes() != entry.read_bytes()
@@ -0,0 +1,38 @@
+"""Tests de conversión de archivos a PDF."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfWriter
+
+from pdf_consolidator.core import convert_to_pdf, link_or_copy
+
+
+def _make_pdf(path: Path):
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+class TestNativePdf:
+    """Tests del paso directo de PDFs nativos."""
+
+    def test_native_pdf_is_not_copied(self, temp_dir):
+        src = temp_dir / "entrada.pdf"
+        _make_pdf(src)
+        work = temp_dir / "temp"
+        assert convert_to_pdf(src, work) == src
+        assert not work.exists()
+
+    def test_link_or_copy_shares_content(self, temp_dir):
+        src = temp_dir / "a.pdf"
+        _make_pdf(src)
+        dst = temp_dir / "temp" / "a.pdf"
+        method = link_or_copy(src, dst)
+        assert method in ("hardlink", "reflink", "copy")
+        assert dst.read_bytes() == src.read_bytes()
+        # Volver a materializar sobre un destino existente no falla
+        assert link_or_copy(src, dst) == method
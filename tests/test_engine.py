@@ -0,0 +1,127 @@
+"""Tests del motor de conversión multinúcleo."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from pdf_consolidator import core
+from pdf_consolidator.cache import ConversionCache
+from pdf_consolidator.core import convert_image_to_pdf, group_pdf_path, temp_pdf_path
+from pdf_consolidator.engine import ConversionEngine, convert_files, plan_units
+
+
+@pytest.fixture
+def mixed_files(temp_dir):
+    """Imágenes y PDFs con tamaños distintos para identificar cada página."""
+    files = []
+    for i in range(4):
+        img = temp_dir / f"img{i}.png"
+        Image.new("RGB", (100 + i * 10, 50), "white").save(img)
+        files.append(img)
+        pdf = temp_dir / f"doc{i}.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=300 + i, height=300)
+        with open(pdf, "wb") as f:
+            writer.write(f)
+        files.append(pdf)
+    return files
+
+
+def _first_width(pdf: Path) -> float:
+    return float(PdfReader(str(pdf)).pages[0].mediabox.width)
+
+
+class TestConversionEngine:
+    """Tests de orden y tolerancia a fallos del motor."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_preserves_input_order(self, mixed_files, temp_dir, workers):
+        out = temp_dir / "out"
+        results = convert_files(mixed_files, out, max_workers=workers)
+        assert [p.name.split(".")[0] for p in results] == [f.stem for f in mixed_files]
+        assert [_first_width(p) for p in results[1::2]] == [300, 301, 302, 303]
+
+    def test_failed_file_keeps_its_slot(self, mixed_files, temp_dir):
+        broken = temp_dir / "roto.jpg"
+        broken.write_bytes(b"\xff\xd8\xff\xe0\x00\x10JFIF")
+        files = [mixed_files[0], broken, mixed_files[1]]
+        done = []
+        with ConversionEngine(2) as engine:
+            results = engine.convert(files, temp_dir / "out",
+                                     on_done=lambda i, f, pdf, s: done.append(i))
+        assert results[1] is None
+        assert results[0] is not None and results[2] is not None
+        assert sorted(done) == [0, 1, 2]
+
+
+def _pages(pdf: Path) -> list[tuple[float, float]]:
+    return [(float(p.mediabox.width), float(p.mediabox.height))
+            for p in PdfReader(str(pdf)).pages]
+
+
+class TestImageGroups:
+    """Tandas de imágenes consecutivas convertidas con una sola llamada a img2pdf."""
+
+    def test_plan_units(self, mixed_files, temp_dir):
+        names = ["a.png", "b.jpg", "c.pdf", "d.png", "e.tif", "f.jpeg", "g.png", "h.png"]
+        files = [temp_dir / n for n in names]
+        assert plan_units(files) == [[i] for i in range(8)]
+        assert plan_units(files, 2) == [[0, 1], [2], [3], [4], [5, 6], [7]]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_consecutive_images_share_one_pdf(self, mixed_files, temp_dir, workers):
+        extra = []
+        for i in range(3):
+            img = temp_dir / f"extra{i}.jpg"
+            Image.new("RGB", (200 + i, 80), "red").save(img)
+            extra.append(img)
+        files = [mixed_files[0], *extra, mixed_files[1], mixed_files[2]]
+        with ConversionEngine(workers) as engine:
+            results = engine.convert(files, temp_dir / "out", group_images=True)
+        segment = results[0]
+        assert results[:4] == [segment] * 4 and segment == group_pdf_path(files[:4], temp_dir / "out")
+        assert segment.name.startswith("img0.png+3.")
+        # img2pdf asume 96 DPI: ancho en píxeles = ancho en puntos * 96 / 72
+        assert [w * 96 / 72 for w, _ in _pages(segment)] == pytest.approx([100, 200, 201, 202])
+        assert len({results[4], results[5], segment}) == 3  # el PDF corta la tanda
+
+    def test_pages_match_single_conversion(self, temp_dir, monkeypatch):
+        conversion = {"pdf_compression": True, "image_max_dpi": 50}
+        monkeypatch.setattr(core, "load_app_config", lambda: {"conversion": conversion})
+        files = []
+        for i, size in enumerate([(1200, 1700), (300, 200), (2000, 900)]):
+            img = temp_dir / f"f{i}.jpg"
+            Image.new("RGB", size, (30 * i, 90, 200)).save(img, dpi=(150, 150))
+            files.append(img)
+        expected = []
+        for f in files:
+            convert_image_to_pdf(f, temp_dir / "uno" / (f.name + ".pdf"))
+            expected += _pages(temp_dir / "uno" / (f.name + ".pdf"))
+        with ConversionEngine(1) as engine:
+            [segment, *_] = engine.convert(files, temp_dir / "out", group_images=True)
+        assert _pages(segment) == pytest.approx(expected, abs=0.01)
+
+    def test_broken_image_falls_back_to_single_files(self, mixed_files, temp_dir):
+        broken = temp_dir / "roto.png"
+        broken.write_bytes(b"\x89PNG\r\n\x1a\n roto")
+        files = [mixed_files[0], broken, mixed_files[2]]
+        with ConversionEngine(1) as engine:
+            results = engine.convert(files, temp_dir / "out", group_images=True)
+        assert results[1] is None
+        assert [results[0], results[2]] == [temp_pdf_path(f, temp_dir / "out") for f in (files[0], files[2])]
+
+    def test_group_is_cached_as_a_whole(self, mixed_files, temp_dir):
+        files = [mixed_files[0], mixed_files[2], mixed_files[4]]
+        cache = ConversionCache(temp_dir / "cache")
+        with ConversionEngine(1, cache=cache) as engine:
+            first = engine.convert(files, temp_dir / "a", group_images=True)
+            second = engine.convert(files, temp_dir / "b", group_images=True)
+        assert (cache.stats.hits, cache.stats.stores) == (1, 1)
+        assert second == [group_pdf_path(files, temp_dir / "b")] * 3
+        assert _pages(second[0]) == _pages(first[0])
@@ -0,0 +1,146 @@
+"""Tests de la entrega en memoria de los PDF convertidos a la unión."""
+
+import gc
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfReader
+
+from pdf_consolidator import engine as engine_mod
+from pdf_consolidator import handoff as handoff_mod
+from pdf_consolidator.cache import ConversionCache
+from pdf_consolidator.core import convert_to_pdf, group_pdf_path, temp_pdf_path
+from pdf_consolidator.engine import ConversionEngine
+from pdf_consolidator.handoff import (
+    HandoffPolicy, MemoryPdf, accept, format_handoff_stats, handoff_stats, package,
+    reset_handoff_stats,
+)
+from pdf_consolidator.pipeline import consolidate
+
+MB = 1024 * 1024
+
+
+def _images(folder: Path, count: int, ext: str = "png") -> list[Path]:
+    folder.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i in range(count):
+        path = folder / f"img{i}.{ext}"
+        Image.new("RGB", (40 + i, 40), (i * 40, 0, 0)).save(path)
+        files.append(path)
+    return files
+
+
+def _widths(pdf: Path | MemoryPdf) -> list[float]:
+    reader = PdfReader(io.BytesIO(pdf.data) if isinstance(pdf, MemoryPdf) else str(pdf))
+    return [float(p.mediabox.width) for p in reader.pages]
+
+
+class TestPackage:
+    """Umbral por resultado y ruta del spill."""
+
+    def test_threshold(self, temp_dir):
+        dst = temp_dir / "work" / "a.png.pdf"
+        kept = package(b"%PDF-1.4 chico", dst, HandoffPolicy(max_bytes=100))
+        assert isinstance(kept, MemoryPdf) and kept.name == "a.png.pdf" and not dst.exists()
+
+        spilled = package(b"%PDF-1.4" + b" " * 200, dst, HandoffPolicy(max_bytes=100))
+        assert spilled == dst and dst.stat().st_size == 208
+        assert package(b"%PDF-1.4", dst, HandoffPolicy()) == dst  # 0 = todo a disco
+
+    def test_spill_dir(self, temp_dir):
+        policy = HandoffPolicy(max_bytes=1, spill_dir=temp_dir / "shm")
+        pdf = package(b"%PDF-1.4 grande", temp_dir / "job_1" / "a.png.pdf", policy)
+        assert pdf == temp_dir / "shm" / "job_1" / "a.png.pdf" and pdf.exists()
+        handoff_mod.discard_spill(temp_dir / "job_1", policy)
+        assert not (temp_dir / "shm" / "job_1").exists()
+
+    def test_convert_to_pdf_matches_disk(self, temp_dir):
+        [src] = _images(temp_dir / "in", 1, "jpg")
+        pdf = convert_to_pdf(src, temp_dir / "work", HandoffPolicy(max_bytes=MB))
+        assert isinstance(pdf, MemoryPdf) and not (temp_dir / "work" / "img0.jpg.pdf").exists()
+        on_disk = convert_to_pdf(src, temp_dir / "disco")
+        assert _widths(pdf) == _widths(on_disk)
+
+
+class TestBudget:
+    """Presupuesto de lo retenido a la espera de la unión y contadores."""
+
+    def test_over_budget_spills_and_release(self, temp_dir):
+        reset_handoff_stats()
+        policy = HandoffPolicy(max_bytes=MB, budget_bytes=150)
+        first = accept(MemoryPdf(temp_dir / "a.pdf", b"x" * 100), policy)
+        second = accept(MemoryPdf(temp_dir / "b.pdf", b"y" * 100), policy)
+        assert isinstance(first, MemoryPdf)
+        assert second == temp_dir / "b.pdf" and second.read_bytes() == b"y" * 100
+
+        del first
+        gc.collect()
+        third = accept(MemoryPdf(temp_dir / "c.pdf", b"z" * 100), policy)
+        assert isinstance(third, MemoryPdf)
+
+        stats = handoff_stats()
+        assert (stats.kept, stats.kept_bytes, stats.spilled, stats.spilled_bytes) == (2, 200, 1, 100)
+        assert stats.peak_bytes == 100
+        assert format_handoff_stats(stats).startswith("Entrega a la unión: 2 en memoria")
+
+    def test_file_result_counts_as_spill(self, temp_dir):
+        reset_handoff_stats()
+        pdf = temp_dir / "a.pdf"
+        pdf.write_bytes(b"%PDF" * 10)
+        assert accept(pdf, HandoffPolicy(max_bytes=1)) == pdf
+        assert accept(pdf, HandoffPolicy(max_bytes=1), memory_capable=False) == pdf
+        assert handoff_stats().spilled == 1 and handoff_stats().spilled_bytes == 40
+
+
+class TestEngineHandoff:
+    """El motor entrega en memoria solo con ``in_memory``."""
+
+    def test_pool_results_in_memory(self, temp_dir, monkeypatch):
+        monkeypatch.setattr(engine_mod, "handoff_policy", lambda: HandoffPolicy(max_bytes=MB))
+        files = _images(temp_dir / "in", 4)
+        with ConversionEngine(max_workers=2) as engine:
+            disk = engine.convert(files, temp_dir / "disco")
+            memory = engine.convert(files, temp_dir / "work", in_memory=True)
+        assert all(isinstance(p, MemoryPdf) for p in memory)
+        assert not (temp_dir / "work").exists()
+        assert [w for p in memory for w in _widths(p)] == [w for p in disk for w in _widths(p)]
+
+    def test_groups_and_cache(self, temp_dir, monkeypatch):
+        monkeypatch.setattr(engine_mod, "handoff_policy", lambda: HandoffPolicy(max_bytes=MB))
+        files = _images(temp_dir / "in", 3)
+        cache = ConversionCache(temp_dir / "cache")
+        with ConversionEngine(max_workers=1, cache=cache) as engine:
+            first = engine.convert(files, temp_dir / "w1", group_images=True, in_memory=True)
+            second = engine.convert(files, temp_dir / "w2", group_images=True, in_memory=True)
+        assert isinstance(first[0], MemoryPdf) and first[0] is first[1] is first[2]
+        assert second == [group_pdf_path(files, temp_dir / "w2")] * 3  # acierto de caché: archivo
+        assert second[0].read_bytes() == first[0].data
+
+
+class TestConsolidateHandoff:
+    """La salida no cambia; lo que supera el umbral va a ``spill_dir`` y se limpia."""
+
+    def test_mixed_threshold(self, temp_dir, monkeypatch):
+        files = _images(temp_dir / "in", 2)
+        big = temp_dir / "in" / "img2.png"
+        Image.effect_noise((400, 400), 90).convert("RGB").save(big)
+        files.append(big)
+        policy = HandoffPolicy(max_bytes=64 * 1024, spill_dir=temp_dir / "shm")
+        monkeypatch.setattr(engine_mod, "handoff_policy", lambda: policy)
+        monkeypatch.setattr(handoff_mod, "handoff_policy", lambda: policy)
+        monkeypatch.setattr(engine_mod, "image_group_size", lambda: 1)
+        reset_handoff_stats()
+
+        with ConversionEngine(max_workers=1) as engine:
+            pages, failed = consolidate(engine, files, temp_dir / "job_1", temp_dir / "out.pdf")
+        assert (pages, failed) == (3, [])
+        stats = handoff_stats()
+        assert (stats.kept, stats.spilled) == (2, 1)
+        assert not (temp_dir / "shm" / "job_1").exists()
+        assert not temp_pdf_path(files[0], temp_dir / "job_1").exists()
+        widths = [float(p.mediabox.width) for p in PdfReader(str(temp_dir / "out.pdf")).pages]
+        assert widths[:2] == sorted(widths[:2]) and len(set(widths)) == 3
@@ -0,0 +1,160 @@
+"""Tests de la normalización de imágenes (resolución, recompresión y profundidad)."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import img2pdf
+from PIL import Image, ImageDraw
+from pypdf import PdfReader
+
+from pdf_consolidator import core, imaging
+from pdf_consolidator.cache import converter_id
+from pdf_consolidator.core import convert_image_to_pdf
+from pdf_consolidator.imaging import (
+    ImagePolicy, color_fraction, effective_dpi, midtone_fraction, normalize_image,
+    write_normalized_pdf,
+)
+
+POLICY = ImagePolicy(enabled=True, max_dpi=50, quality=80)
+
+
+def _photo(size=(1200, 900)) -> Image.Image:
+    """Degradado de colores: sin tonos planos, como una foto."""
+    im = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (im, im.transpose(Image.Transpose.ROTATE_90).resize(size),
+                               Image.new("L", size, 90)))
+
+
+def _text_scan(size=(600, 840), paper=(250, 250, 246)) -> Image.Image:
+    im = Image.new("RGB", size, paper)
+    draw = ImageDraw.Draw(im)
+    for y in range(60, size[1] - 60, 30):
+        draw.rectangle((50, y, size[0] - 50, y + 12), fill=(15, 15, 15))
+    return im
+
+
+def _xobject(pdf: Path):
+    page = PdfReader(str(pdf)).pages[0]
+    return page, page["/Resources"]["/XObject"]["/Im0"]
+
+
+def _mediabox(pdf_bytes: bytes) -> tuple[float, float]:
+    box = PdfReader(io.BytesIO(pdf_bytes)).pages[0].mediabox
+    return float(box.width), float(box.height)
+
+
+class TestDetection:
+    """Estadísticas de píxeles."""
+
+    def test_effective_dpi_uses_page_orientation(self):
+        # A4 apaisada: 11.69 x 8.27 pulgadas
+        assert effective_dpi((2339, 1654), "A4") == pytest.approx(200, rel=0.01)
+        assert effective_dpi((1654, 2339), "A4") == pytest.approx(200, rel=0.01)
+
+    def test_color_fraction(self):
+        assert color_fraction(_photo()) > 0.5
+        assert color_fraction(_text_scan()) == 0.0
+
+    def test_midtone_fraction(self):
+        assert midtone_fraction(_text_scan().convert("L")) == 0.0
+        assert midtone_fraction(Image.linear_gradient("L")) == pytest.approx(0.5)
+
+    def test_numpy_matches_pillow(self, monkeypatch):
+        pytest.importorskip("numpy")
+        photo, scan = _photo(), _text_scan().convert("L")
+        with_numpy = color_fraction(photo), midtone_fraction(scan)
+        monkeypatch.setattr(imaging, "HAS_NUMPY", False)
+        assert (color_fraction(photo), midtone_fraction(scan)) == pytest.approx(with_numpy)
+
+
+class TestNormalize:
+    """Recodificación antes de img2pdf."""
+
+    def test_large_photo_is_downsampled_keeping_page_size(self, temp_dir):
+        src = temp_dir / "foto.jpg"
+        _photo().save(src, quality=95, dpi=(150, 150))
+        dst = temp_dir / "foto.pdf"
+
+        assert write_normalized_pdf(src, dst, POLICY)
+        page, image = _xobject(dst)
+        assert image["/Filter"] == "/DCTDecode"
+        assert image["/Width"] < 1200
+        assert (float(page.mediabox.width), float(page.mediabox.height)) == \
+            pytest.approx(_mediabox(img2pdf.convert(str(src))), abs=0.01)
+        assert dst.stat().st_size < src.stat().st_size
+
+    def test_gray_scan_is_stored_in_gray(self, temp_dir):
+        src = temp_dir / "escaneo.png"
+        Image.linear_gradient("L").resize((300, 400)).convert("RGB").save(src)
+        dst = temp_dir / "escaneo.pdf"
+
+        assert write_normalized_pdf(src, dst, ImagePolicy(enabled=True))
+        _, image = _xobject(dst)
+        assert image["/ColorSpace"] == "/DeviceGray"
+        assert image["/BitsPerComponent"] == 8
+
+    def test_bilevel_scan_is_stored_at_one_bit(self, temp_dir):
+        src = temp_dir / "texto.jpg"
+        _text_scan().save(src, quality=90)
+        dst = temp_dir / "texto.pdf"
+
+        assert write_normalized_pdf(src, dst, ImagePolicy(enabled=True))
+        _, image = _xobject(dst)
+        assert image["/BitsPerComponent"] == 1
+        assert dst.stat().st_size < src.stat().st_size / 4
+
+    def test_small_color_image_keeps_original(self, temp_dir):
+        src = temp_dir / "logo.png"
+        _photo((200, 150)).save(src)
+        assert normalize_image(src, ImagePolicy(enabled=True)) is None
+
+    def test_exif_rotation_is_applied_to_pixels(self, temp_dir):
+        src = temp_dir / "girada.jpg"
+        exif = Image.Exif()
+        exif[imaging.EXIF_ORIENTATION] = 6  # 90° horario
+        _photo().save(src, quality=95, dpi=(150, 150), exif=exif)
+
+        result = normalize_image(src, POLICY)
+        assert result.size[0] < result.size[1]  # retrato tras girar
+        layout = img2pdf.get_fixed_dpi_layout_fun(result.dpi)
+        width, height = _mediabox(img2pdf.convert(result.data, layout_fun=layout))
+        assert width == pytest.approx(900 * 72 / 150, abs=0.01)
+        assert height == pytest.approx(1200 * 72 / 150, abs=0.01)
+
+
+class TestConfig:
+    """La etapa respeta la sección ``conversion`` de la configuración."""
+
+    @pytest.fixture
+    def config(self, monkeypatch):
+        def set_config(**conversion):
+            monkeypatch.setattr(core, "load_app_config", lambda: {"conversion": conversion})
+        return set_config
+
+    def test_disabled_compression_embeds_original(self, temp_dir, config):
+        config(pdf_compression=False)
+        src = temp_dir / "texto.jpg"
+        _text_scan().save(src, quality=90)
+        convert_image_to_pdf(src, temp_dir / "texto.pdf")
+        assert _xobject(temp_dir / "texto.pdf")[1]["/BitsPerComponent"] == 8
+
+    def test_enabled_compression_normalizes(self, temp_dir, config):
+        config(pdf_compression=True, image_quality=70)
+        src = temp_dir / "texto.jpg"
+        _text_scan().save(src, quality=90)
+        convert_image_to_pdf(src, temp_dir / "texto.pdf")
+        assert _xobject(temp_dir / "texto.pdf")[1]["/BitsPerComponent"] == 1
+
+    def test_cache_key_depends_on_policy(self, temp_dir, config):
+        src = temp_dir / "foto.jpg"
+        config(pdf_compression=True, image_quality=70)
+        first = converter_id(src)
+        config(pdf_compression=True, image_quality=90)
+        assert converter_id(src) != first
+        config(pdf_compression=False)
+        assert converter_id(src).endswith("/orig")
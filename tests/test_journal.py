@@ -0,0 +1,174 @@
+"""Tests de la bitácora de trabajos y de la reanudación de consolidaciones."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfReader
+
+from pdf_consolidator import engine as engine_mod
+from pdf_consolidator import journal as journal_mod
+from pdf_consolidator.batch import BatchCase, run_batch
+from pdf_consolidator.core import convert_to_pdf, group_pdf_path, temp_pdf_path
+from pdf_consolidator.engine import ConversionEngine
+from pdf_consolidator.handoff import HandoffPolicy
+from pdf_consolidator.journal import JobJournal, find_pending, pending_jobs
+from pdf_consolidator.main import main
+from pdf_consolidator.pipeline import consolidate
+
+
+def _images(folder: Path, count: int) -> list[Path]:
+    folder.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i in range(count):
+        path = folder / f"img{i}.png"
+        Image.new("RGB", (40 + i, 40), (i * 40, 0, 0)).save(path)
+        files.append(path)
+    return files
+
+
+def _consolidate(files, work_dir, out, journal):
+    started = []
+    with ConversionEngine(max_workers=1) as engine:
+        pages, failed = consolidate(engine, files, work_dir, out, journal=journal,
+                                    on_start=lambda i, f: started.append(i))
+    return pages, failed, started
+
+
+class TestJobJournal:
+    """Registro en JSONL y validación de lo reutilizable."""
+
+    def test_roundtrip_and_torn_line(self, temp_dir):
+        [src] = _images(temp_dir / "in", 1)
+        work = temp_dir / "work"
+        journal = JobJournal(work).start([src], temp_dir / "out.pdf", {"ident": "1"})
+        journal.record(src, convert_to_pdf(src, work), 0.5)
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"event": "file", "src": ')  # caída a mitad de línea
+
+        loaded = JobJournal(work)
+        assert loaded.meta == {"ident": "1"}
+        assert loaded.done == [src] and not loaded.finished
+        assert loaded.resumable
+        assert loaded.reusable([src]) == {0: temp_pdf_path(src, work)}
+
+    def test_changed_source_or_pdf_is_not_reused(self, temp_dir):
+        a, b = _images(temp_dir / "in", 2)
+        work = temp_dir / "work"
+        journal = JobJournal(work).start([a, b], temp_dir / "out.pdf")
+        for src in (a, b):
+            journal.record(src, convert_to_pdf(src, work))
+        Image.new("RGB", (90, 90), "blue").save(a)
+        os.utime(a, ns=(time.time_ns(), time.time_ns() + 10**9))
+        temp_pdf_path(b, work).write_bytes(b"%PDF-1.4 alterado")
+        assert JobJournal(work).reusable([a, b]) == {}
+
+    def test_image_group_is_reused_whole(self, temp_dir, monkeypatch):
+        monkeypatch.setattr(engine_mod, "handoff_policy", HandoffPolicy)  # tanda a disco
+        files = _images(temp_dir / "in", 4)
+        work = temp_dir / "work"
+        out = temp_dir / "out.pdf"
+        pages, failed, _ = _consolidate(files, work, out, JobJournal(work).start(files, out))
+        assert (pages, failed) == (4, [])
+        segment = group_pdf_path(files, work)
+        assert JobJournal(work).reusable(files) == {i: segment for i in range(4)}
+        widths = [float(p.mediabox.width) for p in PdfReader(str(out)).pages]
+        assert widths == sorted(widths) and len(set(widths)) == 4
+
+        # una imagen cambiada invalida la tanda entera, no solo su página
+        Image.new("RGB", (90, 40), "blue").save(files[2])
+        os.utime(files[2], ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert JobJournal(work).reusable(files) == {}
+
+    def test_memory_results_are_reconverted(self, temp_dir):
+        files = _images(temp_dir / "in", 3)
+        work = temp_dir / "work"
+        out = temp_dir / "out.pdf"
+        pages, failed, _ = _consolidate(files, work, out, JobJournal(work).start(files, out))
+        assert (pages, failed) == (3, [])
+        journal = JobJournal(work)
+        assert all(r.get("memory") and "pdf" not in r for r in journal.records.values())
+        assert journal.done == files and journal.reusable(files) == {}
+
+    def test_expired_jobs_are_pruned(self, temp_dir, monkeypatch):
+        [src] = _images(temp_dir / "in", 1)
+        work = temp_dir / "tmp" / "job_x"
+        journal = JobJournal(work).start([src, temp_dir / "falta.png"], temp_dir / "x.pdf")
+        journal.record(src, convert_to_pdf(src, work))
+        assert find_pending("x.pdf", temp_dir / "tmp") is not None
+
+        old = time.time() - 8 * 86400
+        os.utime(journal.path, (old, old))
+        monkeypatch.setattr(journal_mod, "keep_days", lambda: 7)
+        assert pending_jobs(temp_dir / "tmp") == []
+        assert not work.exists()
+
+
+class TestResume:
+    """Solo se convierten los archivos fallidos o faltantes."""
+
+    def test_resume_after_crash(self, temp_dir):
+        files = _images(temp_dir / "in", 4)
+        work = temp_dir / "work"
+        out = temp_dir / "out.pdf"
+        # simulamos una caída tras convertir los dos primeros
+        crashed = JobJournal(work).start(files, out)
+        for src in files[:2]:
+            crashed.record(src, convert_to_pdf(src, work))
+
+        pages, failed, started = _consolidate(files, work, out, JobJournal(work))
+        assert (pages, failed) == (4, [])
+        assert started == [2, 3]
+        widths = [float(p.mediabox.width) for p in PdfReader(str(out)).pages]
+        assert widths == sorted(widths) and len(set(widths)) == 4  # orden original
+        assert JobJournal(work).complete
+
+    def test_retry_failed_only(self, temp_dir):
+        folder = temp_dir / "caso"
+        _images(folder, 3)
+        bad = folder / "img1.png"
+        bad.write_bytes(b"\x89PNG\r\n\x1a\n roto")
+        case = BatchCase("1", "Ana", "5", folder)
+        kwargs = dict(output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp", workers=1, max_jobs=1)
+
+        [first] = run_batch([case], **kwargs)
+        assert first.failed_files == ["img1.png"] and first.pages == 2
+        assert first.work_dir is not None and first.work_dir.exists()
+
+        Image.new("RGB", (41, 40), "red").save(bad)
+        [second] = run_batch([case], resume=True, **kwargs)
+        assert second.ok and second.failed_files == [] and second.pages == 3
+        assert second.work_dir is None and not first.work_dir.exists()
+        assert pending_jobs(temp_dir / "tmp") == []
+
+    def test_cli_lists_and_resumes(self, temp_dir, capsys):
+        folder = temp_dir / "caso"
+        _images(folder, 2)
+        bad = folder / "img1.png"
+        bad.write_bytes(b"")
+        [result] = run_batch([BatchCase("7", "Luis", "9", folder)], output_dir=temp_dir / "out",
+                             temp_dir=temp_dir / "tmp", workers=1, max_jobs=1)
+        assert result.failed_files == ["img1.png"]
+
+        assert main(["resume", "--temp", str(temp_dir / "tmp")]) == 0
+        listing = capsys.readouterr().out
+        assert result.case.output_name in listing and "1/2 convertidos" in listing
+
+        Image.new("RGB", (41, 40), "red").save(bad)
+        name = Path(result.case.output_name).stem
+        assert main(["resume", name, "--temp", str(temp_dir / "tmp"), "--workers", "1",
+                     "--no-cache"]) == 0
+        assert len(PdfReader(str(temp_dir / "out" / result.case.output_name)).pages) == 2
+        assert pending_jobs(temp_dir / "tmp") == []
+
+    def test_cli_discard(self, temp_dir):
+        [src] = _images(temp_dir / "in", 1)
+        work = temp_dir / "tmp" / "job_y"
+        journal = JobJournal(work).start([src, temp_dir / "falta.png"], temp_dir / "y.pdf")
+        journal.record(src, convert_to_pdf(src, work))
+        assert main(["resume", "y", "--discard", "--temp", str(temp_dir / "tmp")]) == 0
+        assert not work.exists()
@@ -0,0 +1,141 @@
+"""Tests de la instrumentación por etapa (spans, JSONL y exportación Prometheus)."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+
+from pdf_consolidator import core, metrics
+from pdf_consolidator.engine import ConversionEngine
+from pdf_consolidator.main import main as cli_main
+from pdf_consolidator.metrics import (
+    Span, export_prometheus, flush, format_prometheus, load_spans, quantile, record_span,
+    run_context, span, summarize,
+)
+from pdf_consolidator.pipeline import consolidate
+
+
+@pytest.fixture
+def metrics_path(temp_dir, monkeypatch):
+    """Dirige los spans a un JSONL temporal (con su propio handler) durante el test."""
+    path = temp_dir / "metrics.jsonl"
+    metrics.close()
+    monkeypatch.setattr(core, "load_app_config",
+                        lambda: {"metrics": {"enabled": True, "file": str(path)}})
+    yield path
+    metrics.close()
+
+
+def _spans(path: Path) -> list[dict]:
+    flush()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestSpans:
+    """Registro de spans en el JSONL."""
+
+    def test_span_writes_jsonl_line(self, metrics_path):
+        with run_context("caso1"):
+            with span("merge", files=2) as s:
+                s.pages = 7
+        [line] = _spans(metrics_path)
+        assert line["name"] == "merge"
+        assert line["run"] == "caso1"
+        assert line["pages"] == 7
+        assert line["tags"] == {"files": "2"}
+        assert line["ok"] is True
+        assert line["duration_s"] >= 0
+
+    def test_failed_span_is_recorded(self, metrics_path):
+        with pytest.raises(ValueError):
+            with span("write"):
+                raise ValueError("disco lleno")
+        [line] = _spans(metrics_path)
+        assert line["ok"] is False
+
+    def test_disabled_metrics_write_nothing(self, metrics_path, monkeypatch):
+        monkeypatch.setattr(core, "load_app_config", lambda: {"metrics": {"enabled": False}})
+        record_span("convert", 0.1, type="jpg")
+        assert not metrics_path.exists()
+
+    def test_jsonl_rotates_like_app_log(self, metrics_path, monkeypatch):
+        monkeypatch.setattr(core, "load_app_config", lambda: {
+            "metrics": {"enabled": True, "file": str(metrics_path), "max_mb": 0.001}})
+        for i in range(40):
+            record_span("convert", 0.1, type="jpg", n=i)
+        flush()
+        backups = sorted(metrics_path.parent.glob("metrics.jsonl.*"))
+        assert backups and len(backups) <= metrics.METRICS_BACKUPS
+        assert metrics_path.stat().st_size <= 1100
+        assert load_spans(metrics_path)[-1].tags["n"] == "39"
+
+    def test_engine_tags_conversions_by_type(self, temp_dir, metrics_path):
+        files = []
+        for name in ("a.jpg", "b.png"):
+            Image.new("RGB", (40, 30), "white").save(temp_dir / name)
+            files.append(temp_dir / name)
+        with ConversionEngine(max_workers=1) as engine:
+            pages, failed = consolidate(engine, files, temp_dir / "work", temp_dir / "out.pdf")
+        assert (pages, failed) == (2, [])
+
+        spans = _spans(metrics_path)
+        converts = [s for s in spans if s["name"] == "convert"]
+        assert sorted(s["tags"]["type"] for s in converts) == ["jpg", "png"]
+        assert all(s["tags"]["backend"] == "image" and s["bytes_in"] > 0 for s in converts)
+        [write] = [s for s in spans if s["name"] == "write"]
+        assert write["pages"] == 2
+        assert write["bytes_out"] == (temp_dir / "out.pdf").stat().st_size
+
+
+class TestExport:
+    """Resumen por cuantiles y formato textfile de Prometheus."""
+
+    def test_quantile_interpolates(self):
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert quantile(values, 0.5) == 3.0
+        assert quantile(values, 0.95) == pytest.approx(4.8)
+        assert quantile([], 0.5) == 0.0
+
+    def test_summary_groups_by_stage_and_type(self):
+        spans = [Span("convert", duration_s=d, tags={"type": "jpg"}) for d in (0.1, 0.3)]
+        spans.append(Span("convert", duration_s=2.0, ok=False, tags={"type": "docx"}))
+        summary = summarize(spans)
+        assert summary[("convert", "jpg")]["count"] == 2
+        assert summary[("convert", "jpg")]["quantiles"][0.5] == pytest.approx(0.2)
+        assert summary[("convert", "docx")]["failures"] == 1
+
+    def test_prometheus_format(self):
+        text = format_prometheus(summarize([Span("merge", duration_s=0.5, pages=3)]))
+        assert "# TYPE consolidador_span_seconds summary" in text
+        assert 'consolidador_span_seconds{span="merge",quantile="0.95"} 0.500000' in text
+        assert 'consolidador_span_seconds_count{span="merge"} 1' in text
+        assert 'consolidador_span_pages_total{span="merge"} 3' in text
+
+    def test_export_filters_by_time(self, temp_dir):
+        source = temp_dir / "metrics.jsonl"
+        now = time.time()
+        lines = [{"name": "scan", "ts": now - 7200, "duration_s": 9.0},
+                 {"name": "scan", "ts": now, "duration_s": 0.2},
+                 "línea dañada"]
+        source.write_text("\n".join(json.dumps(x) for x in lines), encoding="utf-8")
+        assert len(load_spans(source)) == 2
+
+        out = temp_dir / "prom" / "consolidador.prom"
+        assert export_prometheus(out, source, since=now - 60) == 1
+        assert 'consolidador_span_seconds_sum{span="scan"} 0.200000' in out.read_text()
+
+    def test_cli_export(self, temp_dir, capsys):
+        source = temp_dir / "metrics.jsonl"
+        source.write_text(json.dumps({"name": "convert", "ts": time.time(), "duration_s": 0.1,
+                                      "tags": {"type": "pdf"}}) + "\n", encoding="utf-8")
+        out = temp_dir / "out.prom"
+        assert cli_main(["metrics", "export", "--input", str(source), "--out", str(out)]) == 0
+        assert 'type="pdf"' in out.read_text()
+        assert cli_main(["metrics", "summary", "--input", str(source)]) == 0
+        assert "convert" in capsys.readouterr().out
@@ -0,0 +1,127 @@
+"""Tests del pool de procesos de Office con un backend simulado."""
+
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfReader, PdfWriter
+
+from pdf_consolidator.backends import ConverterBackend
+from pdf_consolidator.core import temp_pdf_path
+from pdf_consolidator.engine import ConversionEngine
+from pdf_consolidator.office_pool import OfficeWorkerPool
+
+LATENCY = 0.5  # segundos simulados por documento
+
+
+class SlowFakeBackend(ConverterBackend):
+    """Imita a Word/LibreOffice: tarda ``LATENCY`` y escribe el PID en el PDF."""
+
+    name = "fake-slow"
+
+    def convert(self, src: Path, dst: Path) -> None:
+        content = src.read_text(encoding="utf-8")
+        if content == "crash":
+            os._exit(1)  # simula que la aplicación de Office se cae
+        if content == "error":
+            raise RuntimeError("documento dañado")
+        time.sleep(LATENCY)
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        writer.add_metadata({"/Producer": str(os.getpid())})
+        with open(dst, "wb") as f:
+            writer.write(f)
+
+
+def _docs(folder: Path, contents: list[str]) -> list[Path]:
+    files = []
+    for i, content in enumerate(contents):
+        path = folder / f"doc{i}.docx"
+        path.write_text(content, encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def _pid(pdf: Path) -> str:
+    return PdfReader(str(pdf)).metadata["/Producer"]
+
+
+class TestOfficeWorkerPool:
+    """Tests de despacho, reciclado y recuperación de caídas."""
+
+    def test_parallel_speedup(self, temp_dir):
+        files = _docs(temp_dir, ["ok"] * 4)
+        with OfficeWorkerPool(workers=4, backend=SlowFakeBackend) as pool:
+            # primera ronda: espera a que arranquen los 4 procesos
+            for f in [pool.submit(f, temp_dir / "warm" / f"{f.stem}.pdf") for f in files]:
+                f.result()
+            start = time.perf_counter()
+            futures = [pool.submit(f, temp_dir / "out" / f"{f.stem}.pdf") for f in files]
+            results = [f.result() for f in futures]
+            elapsed = time.perf_counter() - start
+        assert all(pdf.exists() for pdf, _ in results)
+        # En serie tardaría 4 x LATENCY; con 4 procesos, poco más que uno
+        assert elapsed < 3 * LATENCY
+
+    def test_recycle_after_max_jobs(self, temp_dir):
+        files = _docs(temp_dir, ["ok"] * 3)
+        with OfficeWorkerPool(workers=1, max_jobs=2, backend=SlowFakeBackend) as pool:
+            pdfs = [pool.submit(f, temp_dir / f"{f.stem}.pdf").result()[0] for f in files]
+        assert pool.recycles == 1
+        assert _pid(pdfs[0]) == _pid(pdfs[1]) != _pid(pdfs[2])
+
+    def test_idle_worker_is_stopped(self, temp_dir):
+        first, second = _docs(temp_dir, ["ok", "ok"])
+        with OfficeWorkerPool(workers=1, backend=SlowFakeBackend, idle_seconds=0.5) as pool:
+            a, _ = pool.submit(first, temp_dir / "a.pdf").result()
+            deadline = time.time() + 10
+            while pool.idle_stops == 0 and time.time() < deadline:
+                time.sleep(0.1)
+            b, _ = pool.submit(second, temp_dir / "b.pdf").result()
+        assert pool.idle_stops >= 1
+        assert _pid(a) != _pid(b)  # se lanzó un proceso nuevo con el siguiente documento
+
+    def test_crash_and_error_do_not_stop_pool(self, temp_dir):
+        files = _docs(temp_dir, ["crash", "error", "ok"])
+        with OfficeWorkerPool(workers=1, backend=SlowFakeBackend) as pool:
+            futures = [pool.submit(f, temp_dir / f"{f.stem}.pdf") for f in files]
+            with pytest.raises(RuntimeError, match="terminó inesperadamente"):
+                futures[0].result()
+            with pytest.raises(RuntimeError, match="dañado"):
+                futures[1].result()
+            assert futures[2].result()[0].exists()
+        assert pool.restarts == 1
+
+    def test_worker_killed_while_idle_is_replaced(self, temp_dir):
+        """Un trabajador que muere sin documento se reemplaza sin fallar el siguiente."""
+        first, second = _docs(temp_dir, ["ok", "ok"])
+        with OfficeWorkerPool(workers=1, backend=SlowFakeBackend) as pool:
+            a, _ = pool.submit(first, temp_dir / "a.pdf").result()
+            os.kill(int(_pid(a)), signal.SIGTERM)  # Office cerrado desde afuera
+            time.sleep(0.5)
+            b, _ = pool.submit(second, temp_dir / "b.pdf").result()
+        assert b.exists() and _pid(b) != _pid(a)
+        assert pool.restarts == 1
+
+    def test_engine_uses_office_pool(self, temp_dir, monkeypatch):
+        files = _docs(temp_dir, ["ok", "error", "ok"])
+        monkeypatch.setattr("pdf_consolidator.engine.OfficeWorkerPool",
+                            lambda workers: OfficeWorkerPool(workers, backend=SlowFakeBackend))
+        with ConversionEngine(max_workers=1, office_workers=2) as engine:
+            results = engine.convert(files, temp_dir / "work")
+        assert [r is not None for r in results] == [True, False, True]
+        assert results[0] == temp_pdf_path(files[0], temp_dir / "work")
+
+    def test_engine_without_inline_office_always_uses_pool(self, temp_dir, monkeypatch):
+        files = _docs(temp_dir, ["ok"])
+        monkeypatch.setattr("pdf_consolidator.engine.OfficeWorkerPool",
+                            lambda workers: OfficeWorkerPool(workers, backend=SlowFakeBackend))
+        with ConversionEngine(max_workers=1, office_workers=1, inline_office=False) as engine:
+            [pdf] = engine.convert(files, temp_dir / "work")
+        assert _pid(pdf) != str(os.getpid())
@@ -0,0 +1,194 @@
+"""Tests de unión de PDFs."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import img2pdf
+from PIL import Image, ImageCms
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, NameObject
+
+from pdf_consolidator.core import merge_pdfs
+
+
+def _make_pdf(path: Path, widths: list[int]):
+    writer = PdfWriter()
+    for w in widths:
+        writer.add_blank_page(width=w, height=100)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def _widths(path: Path) -> list[float]:
+    return [float(p.mediabox.width) for p in PdfReader(str(path)).pages]
+
+
+class TestMergePdfs:
+    """Tests de orden, conteo de páginas y tolerancia a errores."""
+
+    def test_merge_keeps_order_and_counts_pages(self, temp_dir):
+        a, b = temp_dir / "a.pdf", temp_dir / "b.pdf"
+        _make_pdf(a, [100, 101])
+        _make_pdf(b, [200])
+        out = temp_dir / "out" / "final.pdf"
+        assert merge_pdfs([b, a], out) == 3
+        assert _widths(out) == [200, 100, 101]
+
+    def test_inputs_are_released_after_merge(self, temp_dir):
+        a = temp_dir / "a.pdf"
+        _make_pdf(a, [100])
+        merge_pdfs([a], temp_dir / "final.pdf")
+        a.unlink()  # el mapeo en memoria ya está cerrado
+        assert not a.exists()
+
+    def test_unreadable_input_is_skipped(self, temp_dir):
+        good, empty = temp_dir / "ok.pdf", temp_dir / "vacio.pdf"
+        _make_pdf(good, [100])
+        empty.write_bytes(b"")
+        out = temp_dir / "final.pdf"
+        assert merge_pdfs([empty, good], out) == 1
+
+
+def _inherited_pdf(path: Path):
+    """PDF a mano: MediaBox y fuente heredadas del árbol de páginas, enlace entre páginas."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 /MediaBox [0 0 300 200]"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents 6 0 R /Annots [7 0 R] >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents 6 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length 37 >>\nstream\nBT /F1 12 Tf 20 100 Td (Hola) Tj ET\nendstream",
+        b"<< /Type /Annot /Subtype /Link /Rect [0 0 50 50] /Dest [4 0 R /Fit] >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+class TestStreamingMerge:
+    """Tests de la unión en streaming frente a la unión normal."""
+
+    def test_same_pages_as_normal_merge(self, temp_dir):
+        a, b, c = temp_dir / "a.pdf", temp_dir / "b.pdf", temp_dir / "c.pdf"
+        _make_pdf(a, [100, 101])
+        _make_pdf(b, [200])
+        _inherited_pdf(c)
+        normal, streamed = temp_dir / "normal.pdf", temp_dir / "streamed.pdf"
+        assert merge_pdfs([b, c, a], normal, streaming=False) == 5
+        assert merge_pdfs([b, c, a], streamed, streaming=True) == 5
+        assert _widths(streamed) == _widths(normal) == [200, 300, 300, 100, 101]
+        texts = [p.extract_text() for p in PdfReader(str(streamed)).pages]
+        assert texts[1:3] == ["Hola", "Hola"]
+
+    def test_shared_objects_and_links_are_remapped(self, temp_dir):
+        c = temp_dir / "c.pdf"
+        _inherited_pdf(c)
+        out = temp_dir / "final.pdf"
+        merge_pdfs([c, c], out, streaming=True, optimize=False)
+        pages = PdfReader(str(out)).pages
+        assert len(pages) == 4
+        # El contenido compartido se escribe una vez por entrada
+        contents = [p.raw_get("/Contents").idnum for p in pages]
+        assert contents[0] == contents[1] != contents[2] == contents[3]
+        # El enlace apunta a la copia de la página 2 de la misma entrada
+        dest = pages[2]["/Annots"][0].get_object()["/Dest"][0]
+        assert dest.idnum == pages[3].indirect_reference.idnum
+
+    def test_unreadable_input_is_skipped(self, temp_dir):
+        good, empty = temp_dir / "ok.pdf", temp_dir / "vacio.pdf"
+        _make_pdf(good, [100])
+        empty.write_bytes(b"")
+        out = temp_dir / "final.pdf"
+        assert merge_pdfs([empty, good], out, streaming=True) == 1
+        assert _widths(out) == [100]
+
+
+def _logo_pdf(path: Path, logo: bytes):
+    """PDF de una página con el mismo JPEG que otras entradas (como un membrete)."""
+    path.write_bytes(img2pdf.convert(logo))
+
+
+def _image_ids(path: Path) -> list[int]:
+    return [p["/Resources"].raw_get("/XObject").get_object().raw_get("/Im0").idnum
+            for p in PdfReader(str(path)).pages]
+
+
+@pytest.fixture
+def logo() -> bytes:
+    """JPEG con perfil ICC: la imagen referencia al perfil, que también se repite."""
+    srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    buf = io.BytesIO()
+    Image.effect_noise((300, 200), 50).convert("RGB").save(buf, "JPEG", quality=90,
+                                                          icc_profile=srgb)
+    return buf.getvalue()
+
+
+class TestMergeOptimization:
+    """Deduplicación, compresión y object streams al unir."""
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_identical_images_are_written_once(self, temp_dir, logo, streaming):
+        inputs = [temp_dir / f"doc{i}.pdf" for i in range(3)]
+        for path in inputs:
+            _logo_pdf(path, logo)
+        plain, optimized = temp_dir / "plain.pdf", temp_dir / "opt.pdf"
+        merge_pdfs(inputs, plain, streaming=streaming, optimize=False)
+        merge_pdfs(inputs, optimized, streaming=streaming, optimize=True)
+
+        assert len(set(_image_ids(plain))) == 3
+        assert len(set(_image_ids(optimized))) == 1
+        assert optimized.stat().st_size < plain.stat().st_size - 2 * len(logo) * 0.9
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_plain_content_streams_are_compressed(self, temp_dir, streaming):
+        src = temp_dir / "texto.pdf"
+        writer = PdfWriter()
+        page = writer.add_blank_page(width=300, height=800)
+        content = DecodedStreamObject()
+        content.set_data(b"BT /F1 10 Tf 20 780 Td 12 TL " + b"(Linea de texto) ' " * 60 + b"ET")
+        page[NameObject("/Contents")] = writer._add_object(content)
+        with open(src, "wb") as f:
+            writer.write(f)
+
+        out = temp_dir / "final.pdf"
+        merge_pdfs([src], out, streaming=streaming, optimize=True)
+        merged = PdfReader(str(out)).pages[0]["/Contents"].get_object()
+        assert merged["/Filter"] == "/FlateDecode"
+        assert merged.get_data() == content.get_data()
+        assert out.stat().st_size < src.stat().st_size
+
+    def test_streaming_writes_object_and_xref_streams(self, temp_dir):
+        src = temp_dir / "c.pdf"
+        _inherited_pdf(src)
+        out = temp_dir / "final.pdf"
+        assert merge_pdfs([src, src], out, streaming=True, optimize=True) == 4
+        data = out.read_bytes()
+        assert data.startswith(b"%PDF-1.5")
+        assert b"/ObjStm" in data and b"/XRef" in data
+        assert b"\nxref\n" not in data
+        pages = PdfReader(str(out)).pages
+        assert [float(p.mediabox.width) for p in pages] == [300] * 4
+        dest = pages[2]["/Annots"][0].get_object()["/Dest"][0]
+        assert dest.idnum == pages[3].indirect_reference.idnum
+
+    def test_optimization_can_be_disabled(self, temp_dir):
+        src = temp_dir / "c.pdf"
+        _inherited_pdf(src)
+        out = temp_dir / "final.pdf"
+        merge_pdfs([src], out, streaming=True, optimize=False)
+        data = out.read_bytes()
+        assert data.startswith(b"%PDF-1.4") and b"/ObjStm" not in data
@@ -0,0 +1,193 @@
+"""Tests del proceso de consolidación en segundo plano."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from pdf_consolidator.backends import ConverterBackend
+from pdf_consolidator.engine import ConversionCancelled, ConversionEngine
+from pdf_consolidator.office_pool import OfficeWorkerPool
+from pdf_consolidator.preflight import PreflightPolicy
+from pdf_consolidator.pipeline import (
+    PipelineRunner, STARTED, FILE_STARTED, FILE_DONE, MERGE_STARTED,
+    DONE, FAILED, CANCELLED, TERMINAL_EVENTS, NothingConverted, consolidate,
+)
+
+
+class LatencyBackend(ConverterBackend):
+    """Backend simulado: tarda los segundos escritos en el documento."""
+
+    name = "latencia"
+
+    def convert(self, src: Path, dst: Path) -> None:
+        time.sleep(float(src.read_text(encoding="utf-8")))
+        writer = PdfWriter()
+        writer.add_blank_page(width=100 + len(src.stem), height=100)
+        with open(dst, "wb") as f:
+            writer.write(f)
+
+
+@pytest.fixture
+def latency_engine(monkeypatch):
+    # los documentos simulados son texto con extensión .docx: sin validar la firma
+    monkeypatch.setattr("pdf_consolidator.preflight.preflight_policy",
+                        lambda: PreflightPolicy(validate_types=False))
+    monkeypatch.setattr("pdf_consolidator.engine.OfficeWorkerPool",
+                        lambda workers: OfficeWorkerPool(workers, backend=LatencyBackend))
+    with ConversionEngine(max_workers=2, office_workers=3) as engine:
+        yield engine
+
+
+def _docs(folder: Path, latencies: list[float]) -> list[Path]:
+    files = []
+    for i, latency in enumerate(latencies):
+        path = folder / f"doc{i}.docx"
+        path.write_text(str(latency), encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def _drain(runner: PipelineRunner, timeout: float = 30) -> list:
+    events = []
+    while True:
+        event = runner.events.get(timeout=timeout)
+        events.append(event)
+        if event.kind in TERMINAL_EVENTS:
+            return events
+
+
+@pytest.fixture
+def images(temp_dir):
+    files = []
+    for i, color in enumerate(("red", "green", "blue")):
+        path = temp_dir / f"img{i}.png"
+        Image.new("RGB", (60, 40), color).save(path)
+        files.append(path)
+    return files
+
+
+class TestPipelineRunner:
+    """Tests de eventos, salida y cancelación."""
+
+    def test_events_and_output(self, temp_dir, images):
+        out = temp_dir / "salida.pdf"
+        work = temp_dir / "work"
+        runner = PipelineRunner(images, out, work, max_workers=1)
+        runner.start()
+        events = _drain(runner)
+        runner.join()
+
+        kinds = [e.kind for e in events]
+        assert kinds[0] == STARTED and kinds[-1] == DONE
+        assert kinds.count(FILE_STARTED) == kinds.count(FILE_DONE) == 3
+        assert MERGE_STARTED in kinds
+        assert events[-1].pages == 3
+        assert len(PdfReader(str(out)).pages) == 3
+        assert not work.exists()
+
+    def test_all_failed(self, temp_dir):
+        bad = temp_dir / "roto.png"
+        bad.write_bytes(b"no es una imagen")
+        runner = PipelineRunner([bad], temp_dir / "salida.pdf", temp_dir / "work", max_workers=1)
+        runner.start()
+        events = _drain(runner)
+        assert events[-1].kind == FAILED
+        assert not events[-2].ok
+
+    def test_cancel_before_start(self, temp_dir, images):
+        out = temp_dir / "salida.pdf"
+        work = temp_dir / "work"
+        runner = PipelineRunner(images, out, work, max_workers=1)
+        runner.cancel()
+        runner.start()
+        assert _drain(runner)[-1].kind == CANCELLED
+        runner.join()
+        assert not out.exists()
+        assert not work.exists()
+
+
+class TestEngineCancel:
+    """Tests de cancelación en el motor de conversión."""
+
+    def test_cancelled_engine_raises(self, temp_dir, images):
+        cancel = threading.Event()
+        cancel.set()
+        with ConversionEngine(max_workers=1) as engine:
+            with pytest.raises(ConversionCancelled):
+                engine.convert(images, temp_dir / "work", cancel=cancel)
+
+
+class TestOrderedPipeline:
+    """Tests del modo encadenado (unión mientras se convierte)."""
+
+    def test_reorder_buffer_keeps_input_order(self, temp_dir, latency_engine):
+        files = _docs(temp_dir, [1.5, 0.0, 0.0])
+        finished = []
+        yielded = list(latency_engine.convert_ordered(
+            files, temp_dir / "work", on_done=lambda i, *_: finished.append(i)))
+        assert [i for i, _ in yielded] == [0, 1, 2]
+        assert finished[-1] == 0  # los rápidos esperaron su turno en el buffer
+
+    def test_merge_starts_before_conversion_ends(self, temp_dir, latency_engine):
+        files = _docs(temp_dir, [0.0, 1.0])
+        order = []
+        consolidate(latency_engine, files, temp_dir / "work", temp_dir / "out.pdf",
+                    on_done=lambda i, *_: order.append(f"done{i}"),
+                    on_merge=lambda: order.append("merge"), pipelined=True)
+        assert order == ["done0", "merge", "done1"]
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_pipelined_output_is_byte_identical(self, temp_dir, images, latency_engine,
+                                                streaming):
+        native = temp_dir / "nativo.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=300, height=300)
+        with open(native, "wb") as f:
+            writer.write(f)
+        files = _docs(temp_dir, [0.3, 0.0]) + images + [native]
+
+        outputs = []
+        for pipelined in (False, True):
+            out = temp_dir / f"out_{pipelined}.pdf"
+            pages, failed = consolidate(latency_engine, files, temp_dir / "work", out,
+                                        pipelined=pipelined, streaming=streaming)
+            assert (pages, failed) == (len(files), [])
+            outputs.append(out.read_bytes())
+        assert outputs[0] == outputs[1]
+
+    @pytest.mark.parametrize("pipelined", [False, True])
+    def test_same_name_in_subfolders(self, temp_dir, pipelined):
+        """``a/scan.tif`` y ``b/scan.tif`` (``scan.recursive``) no comparten temporal."""
+        files = []
+        for width, folder in ((100, "a"), (200, "b")):
+            (temp_dir / folder).mkdir()
+            for name, fmt in (("scan.tif", "TIFF"), ("foto.png", "PNG")):
+                path = temp_dir / folder / name
+                Image.new("RGB", (width, 50), "white").save(path, fmt, dpi=(72, 72))
+                files.append(path)
+        files.sort(key=lambda p: (p.name, p.parent.name))  # a/foto, b/foto, a/scan, b/scan
+        out = temp_dir / "out.pdf"
+        with ConversionEngine(max_workers=1) as engine:
+            pages, failed = consolidate(engine, files, temp_dir / "work", out,
+                                        pipelined=pipelined)
+        assert (pages, failed) == (4, [])
+        widths = [round(float(p.mediabox.width)) for p in PdfReader(str(out)).pages]
+        assert widths == [100, 200, 100, 200]
+
+    def test_nothing_converted_leaves_no_output(self, temp_dir):
+        bad = temp_dir / "roto.png"
+        bad.write_bytes(b"no es una imagen")
+        out = temp_dir / "out.pdf"
+        with ConversionEngine(max_workers=1) as engine:
+            with pytest.raises(NothingConverted):
+                consolidate(engine, [bad], temp_dir / "work", out, pipelined=True)
+        assert not out.exists()
+        assert not out.with_name("out.pdf.part").exists()
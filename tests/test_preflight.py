@@ -0,0 +1,155 @@
+"""Tests de la validación previa de archivos de entrada."""
+
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfWriter
+
+from pdf_consolidator.batch import BatchCase, format_case_line, run_batch
+from pdf_consolidator.engine import ConversionEngine
+from pdf_consolidator.pipeline import consolidate
+from pdf_consolidator.preflight import PreflightPolicy, check_file, preflight, sniff
+
+
+def _jpeg(size=(64, 48)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, "green").save(buf, "JPEG", exif=Image.Exif())
+    return buf.getvalue()
+
+
+def _ooxml(path: Path, part: str) -> Path:
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr(part, "<doc/>")
+    return path
+
+
+def _pdf(path: Path) -> Path:
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+class TestCheckFile:
+    """Firma, estructura y tamaño por tipo de archivo."""
+
+    def test_conftest_samples(self, sample_files):
+        assert check_file(sample_files["sample.pdf"]) is None
+        reason = check_file(sample_files["sample.jpg"])
+        assert reason and "JPEG incompleto" in reason
+
+    def test_html_renamed_as_doc(self, temp_dir):
+        fake = temp_dir / "carta.doc"
+        fake.write_text("<!DOCTYPE html><html><body>Hola</body></html>", encoding="utf-8")
+        assert check_file(fake) == "el contenido no es un documento de Word (parece HTML)"
+
+    def test_office_containers(self, temp_dir):
+        assert check_file(_ooxml(temp_dir / "a.docx", "word/document.xml")) is None
+        assert check_file(_ooxml(temp_dir / "b.xlsx", "xl/workbook.xml")) is None
+        assert "Word" in check_file(_ooxml(temp_dir / "c.docx", "xl/workbook.xml"))
+        ole = temp_dir / "d.xls"
+        ole.write_bytes(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 600)
+        assert check_file(ole) is None
+        cut = temp_dir / "e.docx"
+        cut.write_bytes((temp_dir / "a.docx").read_bytes()[:40])
+        assert "ZIP ilegible" in check_file(cut)
+
+    def test_images(self, temp_dir):
+        ok = temp_dir / "ok.jpg"
+        ok.write_bytes(_jpeg())
+        assert check_file(ok) is None
+
+        truncated = temp_dir / "cortada.jpg"
+        truncated.write_bytes(ok.read_bytes()[:-200])
+        assert "JPEG incompleto" in check_file(truncated)
+
+        # "motion photo": datos agregados después del fin de imagen
+        motion = temp_dir / "movimiento.jpg"
+        motion.write_bytes(ok.read_bytes() + b"\x00ftypmp42" + b"\x11" * 20_000)
+        assert check_file(motion) is None
+
+        png = temp_dir / "captura.png"
+        Image.new("RGB", (30, 30), "blue").save(png)
+        assert check_file(png) is None
+        png.write_bytes(png.read_bytes()[:-12])
+        assert "IEND" in check_file(png)
+
+        pdf_as_png = temp_dir / "falsa.png"
+        _pdf(pdf_as_png)
+        assert check_file(pdf_as_png) == "el contenido no es una imagen JPG/PNG/TIFF (parece PDF)"
+
+    def test_pdf_structure(self, temp_dir):
+        pdf = _pdf(temp_dir / "a.pdf")
+        pdf.write_bytes(pdf.read_bytes()[:-30])
+        assert check_file(pdf) == "PDF incompleto: falta el marcador %%EOF final"
+
+    def test_size_limits(self, temp_dir):
+        empty = temp_dir / "vacio.pdf"
+        empty.write_bytes(b"")
+        assert check_file(empty) == "archivo vacío"
+        big = _pdf(temp_dir / "grande.pdf")
+        reason = check_file(big, PreflightPolicy(max_bytes=100))
+        assert reason.startswith("excede el tamaño máximo")
+        assert check_file(big, PreflightPolicy(max_bytes=0)) is None
+
+    def test_type_validation_can_be_disabled(self, temp_dir):
+        fake = temp_dir / "carta.docx"
+        fake.write_text("texto", encoding="utf-8")
+        assert check_file(fake, PreflightPolicy(validate_types=False)) is None
+
+    @pytest.mark.parametrize("head, fmt", [
+        (b"%PDF-1.7", "pdf"), (b"\xef\xbb\xbf<html>", "html"), (b"<?xml version", "xml"),
+        (b"hola mundo", "texto"), (b"\x00\x01\x02", "desconocido"),
+    ])
+    def test_sniff(self, head, fmt):
+        assert sniff(head) == fmt
+
+
+class TestPreflightInPipeline:
+    """Los archivos rechazados no llegan al motor y se informa el motivo."""
+
+    def test_preflight_reports_only_rejected_in_order(self, temp_dir):
+        files = []
+        for i in range(12):
+            path = temp_dir / f"f{i:02d}.pdf"
+            if i % 3:
+                _pdf(path)
+            else:
+                path.write_text("no es pdf", encoding="utf-8")
+            files.append(path)
+        rejected = preflight(files)
+        assert list(rejected) == [files[i] for i in (0, 3, 6, 9)]
+
+    def test_rejected_files_skip_conversion(self, temp_dir):
+        good = _pdf(temp_dir / "a.pdf")
+        bad = temp_dir / "b.jpg"
+        bad.write_bytes(b"\xff\xd8\xff\xe0\x00\x10JFIF")
+        started, rejected = [], []
+        with ConversionEngine(max_workers=1) as engine:
+            pages, failed = consolidate(
+                engine, [bad, good], temp_dir / "work", temp_dir / "out.pdf",
+                on_start=lambda i, f: started.append((i, f.name)),
+                on_reject=lambda i, f, reason: rejected.append((i, f.name)))
+        assert (pages, failed) == (1, [bad])
+        assert rejected == [(0, "b.jpg")]
+        assert started == [(1, "a.pdf")]  # índice de la lista original
+
+    def test_batch_reports_reason(self, temp_dir):
+        folder = temp_dir / "caso"
+        folder.mkdir()
+        _pdf(folder / "a.pdf")
+        (folder / "carta.doc").write_text("<html></html>", encoding="utf-8")
+        [result] = run_batch([BatchCase("1", "Ana", "5", folder)], output_dir=temp_dir / "out",
+                             temp_dir=temp_dir / "tmp", workers=1, max_jobs=1)
+        assert result.ok and result.failed_files == ["carta.doc"]
+        assert "carta.doc (el contenido no es un documento de Word (parece HTML))" \
+            in format_case_line(result)
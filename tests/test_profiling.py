@@ -0,0 +1,119 @@
+"""Tests del perfilado por etapa (cProfile y tracemalloc)."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfWriter
+
+from pdf_consolidator import core
+from pdf_consolidator import profiling
+from pdf_consolidator.core import group_pdf_path
+from pdf_consolidator.engine import ConversionEngine
+from pdf_consolidator.main import main
+from pdf_consolidator.pipeline import consolidate
+from pdf_consolidator.profiling import (
+    disable_profiling, enable_profiling, format_report, hot_functions, load_memory,
+    profile_runs, profile_stage,
+)
+
+
+def _inputs(folder: Path, images: int) -> list[Path]:
+    folder.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i in range(images):
+        path = folder / f"img{i}.png"
+        Image.new("RGB", (40 + i, 40), (i * 40, 0, 0)).save(path)
+        files.append(path)
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    with open(folder / "z.pdf", "wb") as f:
+        writer.write(f)
+    return files + [folder / "z.pdf"]
+
+
+@pytest.fixture
+def profiled(temp_dir):
+    run_dir = enable_profiling(temp_dir / "profiles")
+    yield run_dir
+    disable_profiling()
+
+
+class TestDisabled:
+    """Sin ``--profile`` no se perfila ni se escribe nada."""
+
+    def test_null_context(self, temp_dir):
+        assert profiling._run_dir is None
+        assert profile_stage("convert", "a.png") is profile_stage("merge")
+        files = _inputs(temp_dir / "in", 2)
+        with ConversionEngine(max_workers=1) as engine:
+            consolidate(engine, files, temp_dir / "work", temp_dir / "out.pdf")
+        assert profile_runs(temp_dir / "profiles") == []
+
+
+class TestProfiledRun:
+    """Cada etapa deja su perfil y sus picos de memoria en la carpeta de la ejecución."""
+
+    def test_stages_are_written(self, temp_dir, profiled):
+        files = _inputs(temp_dir / "in", 3)
+        with ConversionEngine(max_workers=1) as engine:
+            pages, _ = consolidate(engine, files, temp_dir / "work", temp_dir / "out.pdf")
+        assert pages == 4
+
+        stages = {p.name.split("-", 1)[0] for p in profiled.glob("*.prof")}
+        assert {"preflight", "convert", "merge", "write"} <= stages
+        records = load_memory([profiled])
+        assert {r["stage"] for r in records} >= {"preflight", "convert", "merge", "write"}
+        merged = [r["label"] for r in records if r["stage"] == "merge"]
+        assert merged == [group_pdf_path(files[:3], temp_dir / "work").name, "z.pdf"]
+        assert all(r["peak_bytes"] >= 0 and r["seconds"] >= 0 for r in records)
+
+        ranking = hot_functions([profiled], top=5)
+        assert len(ranking["convert"]) == 5
+        assert ranking["convert"][0].own_s >= ranking["convert"][-1].own_s
+        report = format_report([profiled], top=5)
+        assert "[convert] 2 llamadas" in report  # la tanda de imágenes y el PDF nativo
+        assert "Picos de memoria" in report
+
+    def test_pool_children_profile_too(self, temp_dir, profiled):
+        files = _inputs(temp_dir / "in", 3)[:3]
+        with ConversionEngine(max_workers=2) as engine:
+            assert all(engine.convert(files, temp_dir / "work"))
+        pids = {int(p.name.split("-")[1]) for p in profiled.glob("convert-*.prof")}
+        assert pids and os.getpid() not in pids
+        assert len([r for r in load_memory([profiled]) if r["stage"] == "convert"]) == 3
+
+    def test_nested_stage_counts_in_outer(self, profiled):
+        with profile_stage("merge", "afuera"):
+            with profile_stage("convert", "adentro"):
+                bytearray(1024)
+        assert [r["label"] for r in load_memory([profiled])] == ["afuera"]
+
+
+class TestCli:
+    """``--profile`` activa el modo y ``profile`` informa las ejecuciones."""
+
+    def test_flag_and_report(self, temp_dir, monkeypatch, capsys):
+        base = temp_dir / "profiles"
+        monkeypatch.setattr(core, "load_app_config", lambda: {"profiling": {"dir": str(base)}})
+        try:
+            assert main(["--profile", "metrics", "summary", "--input",
+                         str(temp_dir / "nada.jsonl")]) == 0
+            assert profiling._run_dir is not None and profiling._run_dir.parent == base
+            with profile_stage("scan", "caso"):
+                sorted(range(1000))
+        finally:
+            disable_profiling()
+        capsys.readouterr()
+
+        assert main(["profile", "--runs", "0"]) == 0
+        out = capsys.readouterr().out
+        assert out.startswith("Perfil de 1 ejecuciones") and "[scan] 1 llamadas" in out
+        record = json.loads((profile_runs(base)[0] / "memory.jsonl").read_text().splitlines()[0])
+        assert record["stage"] == "scan" and record["label"] == "caso"
@@ -0,0 +1,95 @@
+"""Tests del escáner de carpetas de entrada con caché."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pdf_consolidator import core
+from pdf_consolidator.core import list_input_files
+from pdf_consolidator.scanner import DirectoryScanner, natural_key, scan_inputs
+
+
+def _later():
+    """Reloj adelantado: los mtime recién escritos ya no cuentan como recientes."""
+    return time.time() + 60
+
+
+@pytest.fixture
+def folder(temp_dir):
+    for name in ("doc10.pdf", "doc2.docx", "Foto.JPG", "notas.txt", "README.md", "hoja.xlsx"):
+        (temp_dir / name).write_bytes(b"x" * len(name))
+    (temp_dir / "sub").mkdir()
+    (temp_dir / "sub" / "anexo.pdf").write_bytes(b"anexo")
+    return temp_dir
+
+
+class TestScan:
+    """Filtro, orden y metadatos."""
+
+    def test_same_result_as_before(self, folder):
+        files = DirectoryScanner().scan(folder)
+        assert [f.name for f in files] == ["doc10.pdf", "doc2.docx", "Foto.JPG", "hoja.xlsx"]
+        assert [f.kind for f in files] == ["pdf", "word", "imagen", "excel"]
+        assert files[0].size == len("doc10.pdf")
+        assert list_input_files(folder) == [f.path for f in files]
+
+    def test_natural_sort(self, folder):
+        files = DirectoryScanner().scan(folder, natural=True)
+        assert [f.name for f in files][:2] == ["doc2.docx", "doc10.pdf"]
+        assert natural_key("img9.png") < natural_key("IMG10.png")
+
+    def test_recursive(self, folder):
+        (folder / "_procesados").mkdir()
+        (folder / "_procesados" / "viejo.pdf").write_bytes(b"x")
+        files = DirectoryScanner().scan(folder, recursive=True)
+        assert "sub/anexo.pdf" in [f.rel for f in files]
+        assert "viejo.pdf" not in [f.name for f in files]
+
+    def test_missing_folder(self, temp_dir):
+        assert DirectoryScanner().scan(temp_dir / "no-existe") == []
+
+    def test_config_defaults(self, folder, monkeypatch):
+        monkeypatch.setattr(core, "load_app_config",
+                            lambda: {"scan": {"recursive": True, "natural_sort": True}})
+        names = [f.name for f in scan_inputs(folder)]
+        assert names.index("doc2.docx") < names.index("doc10.pdf")
+        assert "anexo.pdf" in names
+
+
+class TestCache:
+    """La caché se invalida con el mtime de la carpeta."""
+
+    def test_hit_until_folder_changes(self, folder):
+        scanner = DirectoryScanner(clock=_later)
+        first = scanner.scan(folder)
+        assert scanner.scan(folder) == first
+        assert (scanner.hits, scanner.misses) == (1, 1)
+
+        (folder / "nuevo.png").write_bytes(b"x")
+        os.utime(folder, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert "nuevo.png" in [f.name for f in scanner.scan(folder)]
+        assert scanner.misses == 2
+
+    def test_subfolder_change_invalidates_recursive_scan(self, folder):
+        scanner = DirectoryScanner(clock=_later)
+        scanner.scan(folder, recursive=True)
+        (folder / "sub" / "otro.pdf").write_bytes(b"x")
+        os.utime(folder / "sub", ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert "otro.pdf" in [f.name for f in scanner.scan(folder, recursive=True)]
+        assert scanner.hits == 0
+
+    def test_recent_mtime_is_not_cached(self, folder):
+        scanner = DirectoryScanner()  # reloj real: la carpeta se acaba de modificar
+        scanner.scan(folder)
+        scanner.scan(folder)
+        assert scanner.hits == 0
+
+    def test_returned_list_is_a_copy(self, folder):
+        scanner = DirectoryScanner(clock=_later)
+        scanner.scan(folder).clear()
+        assert scanner.scan(folder)
@@ -0,0 +1,148 @@
+"""Tests del planificador de casos concurrentes y del reparto justo de los pools."""
+
+import sys
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+from pypdf import PdfReader
+
+from pdf_consolidator.batch import BatchCase, run_batch
+from pdf_consolidator.core import temp_pdf_path
+from pdf_consolidator.engine import FairDispatcher
+from pdf_consolidator.scheduler import JobScheduler, new_workspace
+from tests.conftest import make_pdf
+
+
+class RecordingPool:
+    """Pool simulado: registra el orden de despacho y se resuelve a mano."""
+
+    def __init__(self):
+        self.dispatched: list[str] = []
+        self.futures: list[Future] = []
+        self.cond = threading.Condition()
+
+    def submit(self, label: str) -> Future:
+        future: Future = Future()
+        with self.cond:
+            self.dispatched.append(label)
+            self.futures.append(future)
+            self.cond.notify_all()
+        return future
+
+    def wait_dispatched(self, count: int) -> None:
+        with self.cond:
+            assert self.cond.wait_for(lambda: len(self.dispatched) >= count, timeout=5)
+
+
+class TestFairDispatcher:
+    """Turnos entre trabajos y cancelación de lo que espera."""
+
+    def test_jobs_take_turns(self):
+        pool = RecordingPool()
+        dispatcher = FairDispatcher(pool.submit, slots=1)
+        try:
+            dispatcher.submit(0, "bloqueo")
+            pool.wait_dispatched(1)
+            grande = [dispatcher.submit(1, f"a{i}") for i in range(4)]
+            chico = [dispatcher.submit(2, f"b{i}") for i in range(2)]
+            for n in range(1, 7):
+                pool.futures[n - 1].set_result(n)
+                pool.wait_dispatched(n + 1)
+            pool.futures[6].set_result(7)
+            assert [f.result(5) for f in grande + chico] == [2, 4, 6, 7, 3, 5]
+        finally:
+            dispatcher.shutdown()
+        # El caso chico no espera a que termine el grande
+        assert pool.dispatched == ["bloqueo", "a0", "b0", "a1", "b1", "a2", "a3"]
+
+    def test_cancelled_while_queued_never_dispatched(self):
+        pool = RecordingPool()
+        dispatcher = FairDispatcher(pool.submit, slots=1)
+        try:
+            first = dispatcher.submit(1, "x")
+            pool.wait_dispatched(1)
+            second = dispatcher.submit(1, "y")
+            assert second.cancel()
+            third = dispatcher.submit(1, "z")
+            pool.futures[0].set_result("ok")
+            pool.wait_dispatched(2)
+            assert first.result(5) == "ok"
+            assert third.cancel() is False  # ya está en el pool
+        finally:
+            dispatcher.shutdown()
+        assert pool.dispatched == ["x", "z"]
+
+
+class TestWorkspaces:
+    """Carpetas de trabajo y temporales sin colisiones."""
+
+    def test_new_workspace_is_unique(self, temp_dir):
+        a = new_workspace(temp_dir, "job_1_Ana_5.pdf")
+        b = new_workspace(temp_dir, "job_1_Ana_5.pdf")
+        assert a != b and a.is_dir() and b.is_dir()
+        assert a.parent == temp_dir and a.name.startswith("job_1_Ana_5.pdf_")
+
+    def test_same_stem_different_extension(self, temp_dir):
+        assert temp_pdf_path(temp_dir / "foto.jpg", temp_dir) != \
+            temp_pdf_path(temp_dir / "foto.png", temp_dir)
+
+    def test_same_stem_files_are_all_merged(self, temp_dir):
+        folder = temp_dir / "caso"
+        folder.mkdir()
+        Image.new("RGB", (60, 40), "red").save(folder / "foto.jpg")
+        Image.new("RGB", (80, 40), "blue").save(folder / "foto.png")
+        make_pdf(folder / "foto.pdf")
+        [result] = run_batch([BatchCase("1", "Ana", "5", folder)], output_dir=temp_dir / "out",
+                             temp_dir=temp_dir / "tmp", workers=1, max_jobs=1)
+        assert result.ok and result.pages == 3
+        widths = [float(p.mediabox.width) for p in PdfReader(str(result.output)).pages]
+        assert len(set(widths)) == 3
+
+
+class TestJobScheduler:
+    """Casos simultáneos sobre un motor compartido."""
+
+    def test_cases_run_concurrently_in_own_workspaces(self, temp_dir, monkeypatch):
+        from pdf_consolidator import scheduler
+
+        seen: list[Path] = []
+        both_running = threading.Barrier(2, timeout=5)
+        original = scheduler.run_case
+
+        def run_case(case, output_dir, work_dir, engine):
+            seen.append(work_dir)
+            both_running.wait()  # falla si los casos corren de a uno
+            return original(case, output_dir, work_dir, engine)
+
+        monkeypatch.setattr(scheduler, "run_case", run_case)
+        cases = []
+        for i in range(2):
+            folder = temp_dir / f"caso{i}"
+            folder.mkdir()
+            make_pdf(folder / "a.pdf", i + 1)
+            cases.append(BatchCase(str(i), "Cliente", "1", folder))
+
+        with JobScheduler(max_jobs=2, output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp",
+                          workers=1) as jobs:
+            results = [f.result() for f in [jobs.submit(c) for c in cases]]
+
+        assert [r.pages for r in results] == [1, 2]
+        assert len(set(seen)) == 2
+        assert not any(p.exists() for p in seen)
+
+    def test_run_batch_keeps_manifest_order(self, temp_dir):
+        cases = []
+        for i, pages in enumerate((3, 1, 2)):
+            folder = temp_dir / f"caso{i}"
+            folder.mkdir()
+            make_pdf(folder / "a.pdf", pages)
+            cases.append(BatchCase(str(i), "Cliente", "1", folder))
+        done = []
+        results = run_batch(cases, output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp",
+                            workers=1, max_jobs=3, on_result=done.append)
+        assert [r.pages for r in results] == [3, 1, 2]
+        assert sorted(r.case.ident for r in done) == ["0", "1", "2"]
@@ -0,0 +1,90 @@
+"""Tests del arranque liviano: importaciones diferidas, logging explícito e icono en caché."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+
+from pdf_consolidator import core
+from pdf_consolidator.assets import cached_icon
+
+SRC = Path(__file__).parent.parent / "src"
+HEAVY = ("pypdf", "img2pdf", "PIL", "pikepdf")
+
+
+def _import_in_subprocess(cwd: Path, code: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(SRC)!r}); {code}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    return proc.stdout.strip()
+
+
+class TestLazyImports:
+    """Importar el paquete no carga las dependencias de conversión ni toca el disco."""
+
+    def test_core_does_not_import_converters(self, temp_dir):
+        loaded = _import_in_subprocess(
+            temp_dir,
+            "import pdf_consolidator, pdf_consolidator.core; "
+            f"print(sorted(m for m in sys.modules if m.split('.')[0] in {HEAVY!r}))",
+        )
+        assert loaded == "[]"
+
+    def test_import_has_no_side_effects(self, temp_dir):
+        _import_in_subprocess(temp_dir, "import pdf_consolidator.core")
+        assert list(temp_dir.iterdir()) == []
+
+    def test_lazy_exports(self, temp_dir):
+        out = _import_in_subprocess(
+            temp_dir,
+            "import pdf_consolidator as p; print('pdf_consolidator.batch' in sys.modules); "
+            "print(p.run_batch.__module__)",
+        )
+        assert out.splitlines() == ["False", "pdf_consolidator.batch"]
+
+    def test_setup_logging_is_idempotent(self, temp_dir, monkeypatch):
+        monkeypatch.setattr(core, "_log_handler", None)
+        try:
+            core.setup_logging(temp_dir / "logs")
+            handler = core._log_handler
+            core.setup_logging(temp_dir / "otros")
+            assert core._log_handler is handler
+            assert (temp_dir / "logs" / "app.log").exists()
+            assert not (temp_dir / "otros").exists()
+        finally:
+            core.logger.removeHandler(core._log_handler)
+
+
+class TestCachedIcon:
+    """Icono reducido en caché por contenido del original."""
+
+    def test_reused_and_regenerated_on_change(self, temp_dir):
+        src = temp_dir / "logo.webp"
+        Image.new("RGBA", (300, 195), "red").save(src)
+        cache_dir = temp_dir / "cache"
+
+        icon = cached_icon(src, (32, 32), cache_dir)
+        with Image.open(icon) as image:
+            assert image.size == (32, 32)
+        stamp = icon.stat().st_mtime_ns
+        assert cached_icon(src, (32, 32), cache_dir) == icon
+        assert icon.stat().st_mtime_ns == stamp
+
+        Image.new("RGBA", (300, 195), "blue").save(src)
+        updated = cached_icon(src, (32, 32), cache_dir)
+        assert updated != icon
+        assert [p.name for p in cache_dir.iterdir()] == [updated.name]
+
+    def test_new_mtime_same_content_is_a_hit(self, temp_dir):
+        """Como al extraer el ejecutable --onefile: mismo archivo, mtime nuevo."""
+        src = temp_dir / "logo.webp"
+        Image.new("RGBA", (300, 195), "red").save(src)
+        icon = cached_icon(src, (32, 32), temp_dir / "cache")
+        copy = temp_dir / "extraido" / "logo.webp"
+        copy.parent.mkdir()
+        copy.write_bytes(src.read_bytes())
+        assert cached_icon(copy, (32, 32), temp_dir / "cache") == icon
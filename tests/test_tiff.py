@@ -0,0 +1,89 @@
+"""Tests de la conversión TIFF -> PDF en streaming."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image, ImageChops, ImageDraw, TiffImagePlugin
+from pypdf import PdfReader
+
+from pdf_consolidator.tiff import convert_tiff_to_pdf
+
+
+def _frames(mode, background, count=3, size=(160, 80)):
+    frames = []
+    for i in range(count):
+        im = Image.new(mode, size, background)
+        ImageDraw.Draw(im).rectangle((10 + i * 20, 10, 50 + i * 20, 50), fill=0)
+        frames.append(im)
+    return frames
+
+
+def _save(path, frames, **kwargs):
+    frames[0].save(path, save_all=True, append_images=frames[1:], **kwargs)
+
+
+def _xobject(page):
+    return page["/Resources"]["/XObject"]["/Im0"]
+
+
+class TestTiffStreaming:
+    """Tests de fidelidad y rutas sin decodificación."""
+
+    def test_group4_is_embedded_without_decoding(self, temp_dir, monkeypatch):
+        monkeypatch.setattr(TiffImagePlugin, "STRIP_SIZE", 1 << 20)  # una sola tira
+        frames = _frames("1", 1)
+        src = temp_dir / "fax.tif"
+        _save(src, frames, compression="group4", dpi=(144, 144))
+
+        dst = temp_dir / "fax.pdf"
+        assert convert_tiff_to_pdf(src, dst) == 3
+        reader = PdfReader(str(dst))
+        for frame, page in zip(frames, reader.pages):
+            assert _xobject(page)["/Filter"] == "/CCITTFaxDecode"
+            assert float(page.mediabox.width) == 80  # 160 px a 144 dpi
+            decoded = page.images[0].image.convert("1")
+            assert ImageChops.difference(decoded.convert("L"), frame.convert("L")).getbbox() is None
+
+    def test_bilevel_keeps_one_bit_depth(self, temp_dir):
+        src = temp_dir / "scan.tif"
+        _save(src, _frames("1", 1))
+        dst = temp_dir / "scan.pdf"
+        convert_tiff_to_pdf(src, dst)
+        assert _xobject(PdfReader(str(dst)).pages[0])["/BitsPerComponent"] == 1
+
+    @pytest.mark.parametrize("mode,background", [("RGB", "white"), ("L", 255)])
+    def test_lossless_frames_roundtrip(self, temp_dir, mode, background):
+        frames = _frames(mode, background)
+        src = temp_dir / "lzw.tif"
+        _save(src, frames, compression="tiff_lzw")
+        dst = temp_dir / "lzw.pdf"
+        convert_tiff_to_pdf(src, dst)
+        for frame, page in zip(frames, PdfReader(str(dst)).pages):
+            decoded = page.images[0].image.convert(mode)
+            assert ImageChops.difference(decoded, frame).getbbox() is None
+
+    def test_jpeg_strips_are_copied(self, temp_dir):
+        src = temp_dir / "foto.tif"
+        _save(src, _frames("RGB", "white"), compression="jpeg")
+        dst = temp_dir / "foto.pdf"
+        convert_tiff_to_pdf(src, dst)
+        page = PdfReader(str(dst)).pages[0]
+        assert _xobject(page)["/Filter"] == "/DCTDecode"
+        assert page.images[0].image.size == (160, 80)
+
+    @pytest.mark.parametrize("unit", [None, 1])
+    def test_untagged_resolution_is_not_one_dpi(self, temp_dir, unit):
+        """Sin XResolution/YResolution (o sin unidad) Pillow dice 1 dpi: la página no crece."""
+        src = temp_dir / "sin_dpi.tif"
+        info = TiffImagePlugin.ImageFileDirectory_v2()
+        if unit is not None:
+            info[282], info[283], info[296] = 1, 1, unit
+        Image.new("L", (50, 100), 255).save(src, tiffinfo=info)
+        dst = temp_dir / "sin_dpi.pdf"
+        convert_tiff_to_pdf(src, dst)
+        box = PdfReader(str(dst)).pages[0].mediabox
+        assert (float(box.width), float(box.height)) == (50, 100)
@@ -0,0 +1,176 @@
+"""Tests del ciclo de vida de los convertidores de Office precalentados."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfReader, PdfWriter
+
+from pdf_consolidator import core
+from pdf_consolidator.backends import (
+    OFFICE_EXTS, ConverterBackend, close_backends, register_backend,
+)
+from pdf_consolidator.engine import ConversionEngine, convert_files
+from pdf_consolidator.warm import WarmConverter, warm_converter
+
+STARTUP = 0.4  # segundos simulados de arranque de la aplicación
+
+
+@register_backend
+class FakeWarmOffice(ConverterBackend):
+    """Imita a Word: arranque lento, instancia atada a un hilo y estado de salud."""
+
+    name = "fake-warm"
+    extensions = OFFICE_EXTS
+    instances: list["FakeWarmOffice"] = []
+
+    def __init__(self):
+        self.started: set[str] = set()
+        self.alive = True
+        self.closed = False
+        self.threads: set[int] = set()
+        self.instances.append(self)
+
+    def start(self, extensions):
+        time.sleep(STARTUP)
+        self.started |= extensions
+
+    def healthy(self):
+        return self.alive
+
+    def convert(self, src, dst):
+        self.threads.add(threading.get_ident())
+        if src.read_text(encoding="utf-8") == "error":
+            raise RuntimeError("documento dañado")
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        writer.add_metadata({"/Producer": str(id(self))})
+        with open(dst, "wb") as f:
+            writer.write(f)
+
+    def close(self):
+        self.closed = True
+
+
+def _docs(folder: Path, contents: list[str], ext: str = "docx") -> list[Path]:
+    files = []
+    for i, content in enumerate(contents):
+        path = folder / f"doc{i}.{ext}"
+        path.write_text(content, encoding="utf-8")
+        files.append(path)
+    return files
+
+
+@pytest.fixture
+def converter():
+    FakeWarmOffice.instances.clear()
+    created = []
+
+    def make(**kwargs):
+        kwargs.setdefault("idle_seconds", 0)
+        kwargs.setdefault("max_jobs", 0)
+        created.append(WarmConverter(FakeWarmOffice, **kwargs))
+        return created[-1]
+    yield make
+    for c in created:
+        c.shutdown()
+
+
+class TestWarmConverter:
+    """Precalentado, reciclado, salud e inactividad con un backend simulado."""
+
+    def test_prewarm_hides_startup(self, temp_dir, converter):
+        warm = converter()
+        warm.prewarm({".docx"}).result()
+        [doc] = _docs(temp_dir, ["ok"])
+        start = time.perf_counter()
+        warm.convert(doc, temp_dir / "out" / "doc0.pdf")
+        assert time.perf_counter() - start < STARTUP
+        warm.convert(doc, temp_dir / "out" / "doc0b.pdf")  # "otra ejecución": misma instancia
+        assert warm.starts == 1 and warm.jobs == 2
+        [instance] = FakeWarmOffice.instances
+        assert instance.started == {".docx"}
+        # siempre desde el hilo propio, nunca desde el que llama (requisito de COM)
+        assert len(instance.threads) == 1 and threading.get_ident() not in instance.threads
+
+    def test_recycle_after_max_jobs(self, temp_dir, converter):
+        warm = converter(max_jobs=2)
+        files = _docs(temp_dir, ["ok"] * 3)
+        pdfs = [temp_dir / f"{f.stem}.pdf" for f in files]
+        for f, pdf in zip(files, pdfs):
+            warm.convert(f, pdf)
+        producers = [PdfReader(str(p)).metadata["/Producer"] for p in pdfs]
+        assert producers[0] == producers[1] != producers[2]
+        assert warm.recycles == 1 and FakeWarmOffice.instances[0].closed
+        assert FakeWarmOffice.instances[1].started == {".docx"}  # reabierta ya preparada
+
+    def test_unhealthy_instance_is_replaced(self, temp_dir, converter):
+        warm = converter()
+        first, second = _docs(temp_dir, ["ok", "ok"])
+        warm.convert(first, temp_dir / "a.pdf")
+        FakeWarmOffice.instances[0].alive = False  # Word colgado o cerrado por el usuario
+        warm.convert(second, temp_dir / "b.pdf")
+        assert warm.replaced == 1 and len(FakeWarmOffice.instances) == 2
+        assert FakeWarmOffice.instances[0].closed
+
+    def test_idle_timeout(self, temp_dir, converter):
+        warm = converter(idle_seconds=0.2)
+        warm.prewarm({".xlsx"}).result()
+        deadline = time.time() + 5
+        while warm.warm and time.time() < deadline:
+            time.sleep(0.05)
+        assert warm.idle_stops == 1 and FakeWarmOffice.instances[0].closed
+        [doc] = _docs(temp_dir, ["ok"], "xlsx")
+        warm.convert(doc, temp_dir / "a.pdf")  # se vuelve a abrir con el próximo documento
+        assert warm.starts == 2
+
+    def test_errors_do_not_stop_converter(self, temp_dir, converter):
+        warm = converter()
+        bad, good = _docs(temp_dir, ["error", "ok"])
+        with pytest.raises(RuntimeError, match="dañado"):
+            warm.convert(bad, temp_dir / "a.pdf")
+        warm.convert(good, temp_dir / "b.pdf")
+        assert (temp_dir / "b.pdf").exists() and warm.starts == 1
+
+
+class TestEngineKeepsOfficeWarm:
+    """Los casos consecutivos del mismo proceso comparten la instancia de Office."""
+
+    @pytest.fixture
+    def fake_office(self, monkeypatch):
+        FakeWarmOffice.instances.clear()
+        conversion = {"office_backend": "fake-warm", "office_workers": 1}
+        monkeypatch.setattr(core, "load_app_config", lambda: {"conversion": conversion})
+        yield conversion
+        close_backends()  # también las precalentadas
+
+    def test_consecutive_runs_reuse_instance(self, temp_dir, fake_office):
+        files = _docs(temp_dir, ["ok", "ok"])
+        for run in range(2):
+            results = convert_files(files, temp_dir / f"run{run}", max_workers=1)
+            assert all(r is not None for r in results)
+        assert len(FakeWarmOffice.instances) == 1
+        assert warm_converter("fake-warm").jobs == 4
+
+    def test_engine_prewarm(self, temp_dir, fake_office):
+        files = _docs(temp_dir, ["ok"])
+        with ConversionEngine(max_workers=1) as engine:
+            engine.prewarm(files)
+            deadline = time.time() + 5
+            while not FakeWarmOffice.instances or not FakeWarmOffice.instances[0].started:
+                assert time.time() < deadline
+                time.sleep(0.05)
+            start = time.perf_counter()
+            [pdf] = engine.convert(files, temp_dir / "work")
+            assert pdf is not None and time.perf_counter() - start < STARTUP
+
+    def test_disabled(self, temp_dir, fake_office):
+        fake_office["office_keep_warm"] = False
+        files = _docs(temp_dir, ["ok"])
+        convert_files(files, temp_dir / "work", max_workers=1)
+        assert warm_converter("fake-warm").jobs == 0
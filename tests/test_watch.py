@@ -0,0 +1,264 @@
+"""Tests del modo daemon que vigila la bandeja de casos."""
+
+import errno
+import json
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfReader
+
+from pdf_consolidator import watch
+from pdf_consolidator.watch import (
+    FAILED_DIRNAME, PROCESSED_DIRNAME, InotifyWatcher, WatchDaemon, case_from_folder,
+    folder_signature,
+)
+from tests.conftest import make_pdf
+
+Event = namedtuple("Event", "wd mask cookie name")
+
+
+class FakeFlags:
+    """Los bits de ``inotify_simple.flags`` que usa el vigilante."""
+    MODIFY, ATTRIB, CLOSE_WRITE, MOVED_FROM, MOVED_TO = 0x2, 0x4, 0x8, 0x40, 0x80
+    CREATE, DELETE, MOVE_SELF, IGNORED, ONLYDIR = 0x100, 0x200, 0x800, 0x8000, 0x1000000
+
+
+class FakeINotify:
+    """``INotify`` con un máximo de watches; los eventos se encolan a mano en ``events``."""
+
+    limit = 100
+
+    def __init__(self):
+        self.watches: dict[int, Path] = {}
+        self.events: list[Event] = []
+        self._next = 1
+
+    def add_watch(self, path, mask):
+        if len(self.watches) >= self.limit:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        wd, self._next = self._next, self._next + 1
+        self.watches[wd] = Path(path)
+        return wd
+
+    def rm_watch(self, wd):
+        if self.watches.pop(wd, None) is None:
+            raise OSError(errno.EINVAL, "Invalid argument")
+
+    def read(self, timeout=None):
+        events, self.events = self.events, []
+        if not events:
+            time.sleep((timeout or 0) / 1000)
+        return events
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def inbox(temp_dir):
+    path = temp_dir / "inbox"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def fake_inotify(monkeypatch):
+    monkeypatch.setattr(watch, "INotify", FakeINotify, raising=False)
+    monkeypatch.setattr(watch, "inotify_flags", FakeFlags, raising=False)
+    monkeypatch.setattr(watch, "HAS_INOTIFY", True)
+    return FakeINotify
+
+
+@pytest.fixture
+def daemon(inbox, temp_dir):
+    clock = FakeClock()
+    results = []
+    d = WatchDaemon(inbox, output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp",
+                    settle_seconds=10, poll_seconds=0.05, max_cases=2, workers=1,
+                    on_result=results.append, use_inotify=False, clock=clock)
+    d.clock_ = clock
+    d.results = results
+    yield d
+    d.close()
+
+
+class TestCaseMetadata:
+    """Metadatos del caso desde el nombre de la carpeta o ``caso.json``."""
+
+    def test_from_folder_name(self, inbox):
+        folder = inbox / "123_Juan_Perez_45"
+        folder.mkdir()
+        case = case_from_folder(folder)
+        assert (case.ident, case.cliente, case.reembolso) == ("123", "Juan Perez", "45")
+        assert case.output_name == "123_Juan_Perez_45.pdf"
+
+    def test_sidecar_takes_precedence(self, inbox):
+        folder = inbox / "escaner-07"
+        folder.mkdir()
+        (folder / "caso.json").write_text(
+            json.dumps({"ident": "9", "cliente": "Ana Gómez", "reembolso": "3"}), encoding="utf-8")
+        assert case_from_folder(folder).output_name == "9_Ana_Gomez_3.pdf"
+
+    def test_invalid_name(self, inbox):
+        folder = inbox / "sin-datos"
+        folder.mkdir()
+        with pytest.raises(ValueError, match="ident_cliente_reembolso"):
+            case_from_folder(folder)
+
+    def test_signature_changes_with_content(self, inbox):
+        folder = inbox / "1_A_2"
+        folder.mkdir()
+        empty = folder_signature(folder)
+        (folder / "a.pdf").write_bytes(b"x")
+        assert folder_signature(folder) != empty
+        assert folder_signature(inbox / "no-existe") is None
+
+
+class TestDaemon:
+    """Ventana de espera, concurrencia y archivado de carpetas."""
+
+    def test_case_waits_for_settle_window(self, daemon, inbox, temp_dir):
+        folder = inbox / "1_Juan_10"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", 2)
+        assert daemon.poll() == []
+
+        daemon.clock_.now = 6
+        make_pdf(folder / "b.pdf", 1)  # sigue copiando: la ventana se reinicia
+        assert daemon.poll() == []
+        daemon.clock_.now = 12
+        assert daemon.poll() == []
+
+        daemon.clock_.now = 16.5
+        assert daemon.poll() == ["1_Juan_10"]
+        daemon.wait_idle()
+
+        assert len(PdfReader(str(temp_dir / "out" / "1_Juan_10.pdf")).pages) == 3
+        assert (inbox / PROCESSED_DIRNAME / "1_Juan_10" / "a.pdf").exists()
+        assert not folder.exists()
+        assert [r.ok for r in daemon.results] == [True]
+
+    def test_failed_and_invalid_cases_are_archived(self, daemon, inbox):
+        (inbox / "2_Ana_20").mkdir()               # sin archivos admitidos
+        (inbox / "2_Ana_20" / "notas.txt").write_text("x")
+        (inbox / "carpeta-suelta").mkdir()         # sin metadatos
+        make_pdf(inbox / "carpeta-suelta" / "a.pdf")
+        (inbox / "_procesados").mkdir()            # no es un caso
+        daemon.poll()
+        daemon.clock_.now = 11
+        assert daemon.poll() == ["2_Ana_20", "carpeta-suelta"]
+        daemon.wait_idle()
+
+        assert sorted(p.name for p in (inbox / FAILED_DIRNAME).iterdir()) == \
+            ["2_Ana_20", "carpeta-suelta"]
+        assert [r.ok for r in daemon.results] == [False]
+
+    def test_bounded_concurrency(self, inbox, temp_dir, monkeypatch):
+        from pdf_consolidator import scheduler
+
+        running, peak = 0, 0
+        lock = threading.Lock()
+        release, two_running = threading.Event(), threading.Event()
+
+        def fake_run_case(case, output_dir, work_dir, engine):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+                if running == 2:
+                    two_running.set()
+            release.wait(5)
+            with lock:
+                running -= 1
+            return scheduler.CaseResult(case=case, output=output_dir / case.output_name)
+
+        monkeypatch.setattr(scheduler, "run_case", fake_run_case)
+        for i in range(5):
+            (inbox / f"{i}_Cliente_{i}").mkdir()
+            make_pdf(inbox / f"{i}_Cliente_{i}" / "a.pdf")
+        (inbox / "9_Vacia_9").mkdir()  # carpeta recién creada: todavía no es un caso
+        d = WatchDaemon(inbox, output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp",
+                        settle_seconds=0, max_cases=2, workers=1, use_inotify=False)
+        try:
+            assert len(d.poll()) == 5
+            assert d.poll() == []  # en curso: no se vuelven a lanzar
+            assert two_running.wait(5)
+            release.set()
+            d.wait_idle()
+        finally:
+            d.close()
+        assert peak == 2
+        assert len(list((inbox / PROCESSED_DIRNAME).iterdir())) == 5
+
+    def test_run_until_stopped(self, inbox, temp_dir):
+        folder = inbox / "3_Luis_30"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf")
+        done = threading.Event()
+        d = WatchDaemon(inbox, output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp",
+                        settle_seconds=0.1, poll_seconds=0.05, workers=1, use_inotify=False,
+                        on_result=lambda r: done.set())
+        thread = threading.Thread(target=d.run)
+        thread.start()
+        try:
+            assert done.wait(10)
+        finally:
+            d.stop()
+            thread.join(10)
+        assert (temp_dir / "out" / "3_Luis_30.pdf").exists()
+
+
+class TestInotifyWatcher:
+    """Watches de inotify: se liberan al archivar y, si se agotan, se revisa a mano."""
+
+    def test_archived_case_releases_watch(self, inbox, fake_inotify):
+        (inbox / "1_Ana_10").mkdir()
+        watcher = InotifyWatcher(inbox)
+        fake = watcher._inotify
+        [(case_wd, _)] = [(wd, p) for wd, p in fake.watches.items() if p.name == "1_Ana_10"]
+        # ``_archive`` mueve la carpeta dentro de la bandeja: el watch seguiría al inode
+        fake.events = [Event(case_wd, FakeFlags.MOVE_SELF, 0, ""),
+                       Event(watcher._inbox_wd, FakeFlags.MOVED_FROM, 1, "1_Ana_10")]
+        assert watcher.wait(0.01) == {"1_Ana_10"}
+        assert list(fake.watches) == [watcher._inbox_wd] and watcher._folders == {}
+
+    def test_exhausted_watches_fall_back_to_polling(self, inbox, temp_dir, fake_inotify,
+                                                    monkeypatch):
+        monkeypatch.setattr(FakeINotify, "limit", 1)  # solo la bandeja
+        old = inbox / "1_Ana_10"
+        old.mkdir()
+        make_pdf(old / "a.pdf")
+        done = []
+        d = WatchDaemon(inbox, output_dir=temp_dir / "out", temp_dir=temp_dir / "tmp",
+                        settle_seconds=0.1, poll_seconds=0.05, workers=1, use_inotify=True,
+                        on_result=done.append)
+        thread = threading.Thread(target=d.run)
+        thread.start()
+        try:
+            deadline = time.time() + 10
+            while not done and time.time() < deadline:
+                time.sleep(0.05)
+            new = inbox / "2_Luis_20"  # llega después: sin evento de inotify, solo revisando
+            new.mkdir()
+            make_pdf(new / "a.pdf")
+            while len(done) < 2 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            d.stop()
+            thread.join(10)
+        assert sorted(r.case.output_name for r in done) == ["1_Ana_10.pdf", "2_Luis_20.pdf"]
@@ -0,0 +1,228 @@
+"""Tests del tiempo máximo de conversión y de la terminación de conversores colgados."""
+
+import os
+import subprocess
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pypdf import PdfWriter
+
+from pdf_consolidator import core
+from pdf_consolidator import office_pool as office_pool_mod
+from pdf_consolidator.backends import OFFICE_EXTS, ConverterBackend, close_backends, register_backend
+from pdf_consolidator.batch import BatchCase, format_case_line, run_batch
+from pdf_consolidator.engine import convert_files
+from pdf_consolidator.office_pool import OfficeWorkerPool
+from pdf_consolidator.warm import WarmConverter
+from pdf_consolidator.watchdog import (
+    MAX_NAMES, ConversionTimeout, conversion_timeout, format_watchdog_stats, record_timeout,
+    reset_watchdog_stats, timeout_reason, watchdog_stats,
+)
+
+BUDGET = 1.0  # segundos por documento en los tests
+
+
+def _alive(pid: int) -> bool:
+    """Si ``pid`` sigue corriendo (un zombi sin recoger cuenta como terminado)."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@register_backend
+class HangingOffice(ConverterBackend):
+    """
+    Imita a Word: la "aplicación" es un proceso aparte, y un documento
+    ``cuelga`` la deja esperando hasta que alguien termina ese proceso.
+    """
+
+    name = "fake-hang"
+    extensions = OFFICE_EXTS
+
+    def __init__(self):
+        self.app: subprocess.Popen | None = None
+
+    def start(self, extensions):
+        if self.app is None:
+            self.app = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+
+    def process_ids(self):
+        return [self.app.pid] if self.app is not None else []
+
+    def convert(self, src, dst):
+        if b"cuelga" in src.read_bytes():
+            dst.with_suffix(".pid").write_text(str(self.app.pid), encoding="ascii")
+            while self.app.poll() is None:  # ExportAsFixedFormat sin volver
+                time.sleep(0.05)
+            raise RuntimeError("el servidor RPC no está disponible")
+        if b"rompe" in src.read_bytes():
+            raise RuntimeError("documento dañado")
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        with open(dst, "wb") as f:
+            writer.write(f)
+
+    def close(self):
+        if self.app is not None:
+            self.app.kill()
+            self.app.wait()
+
+
+class StuckInWorker(ConverterBackend):
+    """En un proceso del pool: ``cuelga`` no vuelve nunca, aunque muera la aplicación."""
+
+    name = "fake-stuck"
+
+    def __init__(self):
+        self.app = None
+
+    def start(self, extensions):
+        if self.app is None:
+            self.app = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+
+    def process_ids(self):
+        return [self.app.pid] if self.app is not None else []
+
+    def convert(self, src, dst):
+        if b"cuelga" in src.read_bytes():
+            dst.with_suffix(".pid").write_text(f"{os.getpid()} {self.app.pid}", encoding="ascii")
+            time.sleep(600)
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        with open(dst, "wb") as f:
+            writer.write(f)
+
+    def close(self):
+        if self.app is not None:
+            self.app.kill()
+            self.app.wait()
+
+
+def _docs(folder: Path, contents: list[str]) -> list[Path]:
+    """Documentos Word mínimos (pasan la validación previa) con ``contents`` sin comprimir."""
+    folder.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i, content in enumerate(contents):
+        path = folder / f"doc{i}.docx"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("[Content_Types].xml", "<Types/>")
+            zf.writestr("word/document.xml", f"<doc>{content}</doc>")
+        files.append(path)
+    return files
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    """Configuración con presupuestos cortos para Word y el backend colgable."""
+    reset_watchdog_stats()
+    conversion = {"office_backend": "fake-hang", "office_workers": 1,
+                  "timeouts": {"word": BUDGET, "xls": 0}}
+    monkeypatch.setattr(core, "load_app_config", lambda: {"conversion": conversion})
+    yield conversion
+    close_backends()
+
+
+class TestBudgets:
+    """Presupuesto por familia, por extensión y valores por defecto."""
+
+    def test_lookup(self, budget):
+        assert conversion_timeout(Path("a.docx")) == BUDGET
+        assert conversion_timeout(Path("a.xls")) == 0        # la extensión manda
+        assert conversion_timeout(Path("a.xlsx")) == 180     # valor por defecto
+        assert conversion_timeout(Path("a.png")) == 0
+
+    def test_timed_out_names_are_capped(self, temp_dir, budget):
+        for i in range(MAX_NAMES + 5):
+            record_timeout(temp_dir / f"doc{i}.docx", BUDGET, 0)
+        stats = watchdog_stats()
+        assert stats.timeouts == MAX_NAMES + 5 and len(stats.timed_out) == MAX_NAMES
+        assert stats.timed_out[-1] == f"doc{MAX_NAMES + 4}.docx"
+        assert "(..., doc5.docx," in format_watchdog_stats(stats)
+
+
+class TestWarmConverterWatchdog:
+    """El convertidor del proceso principal abandona la instancia colgada."""
+
+    def test_hung_document_is_killed_and_rest_continues(self, temp_dir, budget):
+        hung, ok = _docs(temp_dir, ["cuelga", "ok"])
+        warm = WarmConverter(HangingOffice, idle_seconds=0, max_jobs=0)
+        try:
+            start = time.perf_counter()
+            with pytest.raises(ConversionTimeout, match="tiempo de conversión agotado"):
+                warm.convert(hung, temp_dir / "out" / "doc0.pdf")
+            assert time.perf_counter() - start < BUDGET + 2
+            app_pid = int((temp_dir / "out" / "doc0.pid").read_text(encoding="ascii"))
+            deadline = time.time() + 5
+            while _alive(app_pid) and time.time() < deadline:
+                time.sleep(0.05)
+            assert not _alive(app_pid)
+
+            warm.convert(ok, temp_dir / "out" / "doc1.pdf")  # instancia nueva
+            assert (temp_dir / "out" / "doc1.pdf").exists()
+            assert warm.timeouts == 1 and warm.starts == 2
+        finally:
+            warm.shutdown()
+        stats = watchdog_stats()
+        assert (stats.timeouts, stats.kills, stats.timed_out) == (1, 1, ["doc0.docx"])
+        assert timeout_reason(hung, since=0) == "tiempo de conversión agotado (1s)"
+        assert timeout_reason(hung, since=time.monotonic()) == ""  # de otra ejecución
+        assert format_watchdog_stats(stats).startswith("Watchdog: 1 conversiones")
+
+
+    def test_without_keep_warm(self, temp_dir, budget):
+        """Sin ``office_keep_warm`` la conversión en el proceso también tiene plazo."""
+        budget["office_keep_warm"] = False
+        hung, ok = _docs(temp_dir, ["cuelga", "ok"])
+        start = time.perf_counter()
+        results = convert_files([hung, ok], temp_dir / "out", max_workers=1)
+        assert time.perf_counter() - start < BUDGET + 5
+        assert results[0] is None and results[1].exists()
+        app_pid = int(next((temp_dir / "out").glob("doc0.docx*.pid")).read_text(encoding="ascii"))
+        assert not _alive(app_pid)
+        assert watchdog_stats().timed_out == ["doc0.docx"]
+
+
+class TestOfficePoolWatchdog:
+    """El pool termina el proceso trabajador colgado y su aplicación."""
+
+    def test_worker_and_app_are_killed(self, temp_dir, monkeypatch):
+        reset_watchdog_stats()
+        monkeypatch.setattr(office_pool_mod, "conversion_timeout", lambda src: BUDGET)
+        hung, ok = _docs(temp_dir, ["cuelga", "ok"])
+        with OfficeWorkerPool(workers=1, backend=StuckInWorker, idle_seconds=0) as pool:
+            assert pool.submit(ok, temp_dir / "warm.pdf").result()  # arranque fuera del plazo
+            futures = [pool.submit(f, temp_dir / f"{f.stem}.pdf") for f in (hung, ok)]
+            with pytest.raises(ConversionTimeout):
+                futures[0].result()
+            pdf, _ = futures[1].result()
+        assert pdf.exists() and pool.timeouts == 1 and pool.restarts == 0
+        worker_pid, app_pid = map(int, (temp_dir / "doc0.pid").read_text().split())
+        assert not _alive(worker_pid) and not _alive(app_pid)
+        assert watchdog_stats().kills == 2
+
+
+class TestBatchReportsTimeouts:
+    """Un documento colgado no detiene el caso y el motivo figura en el resumen."""
+
+    def test_case_line(self, temp_dir, budget):
+        folder = temp_dir / "caso"
+        _docs(folder, ["ok", "cuelga", "ok"])
+        [result] = run_batch([BatchCase("1", "Ana", "5", folder)], output_dir=temp_dir / "out",
+                             temp_dir=temp_dir / "tmp", workers=1, max_jobs=1)
+        assert result.pages == 2 and result.failed_files == ["doc1.docx"]
+        assert "doc1.docx (tiempo de conversión agotado (1s))" in format_case_line(result)
+        assert watchdog_stats().timeouts == 1
+
+        # otra ejecución: el mismo archivo falla por otro motivo, no por tiempo
+        _docs(folder, ["ok", "rompe", "ok"])
+        [result] = run_batch([BatchCase("1", "Ana", "5", folder)], output_dir=temp_dir / "out",
+                             temp_dir=temp_dir / "tmp", workers=1, max_jobs=1)
+        assert result.failed_files == ["doc1.docx"] and "tiempo" not in format_case_line(result)